@@ -14,34 +14,54 @@ Features:
 - QR code generation for easy mobile connection
 - Token-based authentication
 - Comprehensive logging and monitoring
+- Optional multi-worker mode (MOBILEMIRROR_WORKERS) with auth lockout and
+  the terminal session registry in a shared state store
 
 Endpoints:
 - GET /: Health check and status
-- GET /files: List directory contents
+- GET /files: List directory contents (cursor pages, sort, name/type filters)
+- GET /files/content: Stream raw file bytes (HTTP Range, tail=N, start_line/end_line)
 - POST /files: Create new files
 - PUT /files: Update existing files
+- GET /search: Recursive filename glob / content regex search streamed as NDJSON
+- POST /write: Atomic full write, or incremental splices/unified diff against a base hash
 - DELETE /files: Remove files
 - WebSocket /terminal: Real-time terminal access
 - GET /screen: Screen streaming endpoint
-- POST /mouse: Mouse input simulation
-- GET /qr: Generate connection QR code
+- WebSocket /screen/stream: Native in-process capture stream (dirty tiles)
+- POST /mouse: Mouse input simulation (single event or batched "events" array)
+- WebSocket /input: Streamed mouse and keyboard events
+- GET /qr: Generate connection QR code (cached; ETag / 304)
+- GET /log: Last n log records, read backwards (level/module filters)
+- GET /log/stream: Tail-follow of the log as Server-Sent Events (same filters)
+- GET /metrics: Prometheus metrics (latency histograms, counters, gauges)
 """
 
 import uvicorn
 from fastapi import FastAPI, WebSocket, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pathlib import Path
 import asyncio
 from typing import Optional
 
 # Local module imports
-from .file_ops import list_files, read_file, write_file
+from .file_ops import list_files, read_file, write_file, patch_file, stream_file, DEFAULT_PAGE_SIZE
+from .file_search import prepare_search, stream_search
+from .log_stream import read_recent_logs, prepare_log_follow, stream_log, DEFAULT_LINES as DEFAULT_LOG_LINES
 from .terminal_bridge import handle_terminal
-from .mouse_input import move_mouse
+from .mouse_input import move_mouse, send_input_events
+from .input_stream import handle_input
 from .screen_streamer import start_stream
+from .screen_capture import handle_screen_stream
 from .utils.qr_generator import generate_qr
+from .utils.mesh_address import get_mesh_address
 from .utils.logger import get_logger, log_api_request, log_performance
-from .utils.auth import verify_token
+from .utils.auth import verify_token_async
+from .utils.executors import PoolSaturated, run_blocking
+from .utils.metrics import MetricsMiddleware, render_metrics
+from .utils.compression import CompressionMiddleware
+from .utils.workers import WORKER_COUNT, run_workers
 
 # Initialize logger for this module
 logger = get_logger(__name__)
@@ -72,8 +92,31 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added before metrics so request timings include compression
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
-logger.info("FastAPI application configured with CORS middleware")
+logger.info("FastAPI application configured with CORS, compression and metrics middleware")
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    """Shed load instead of queueing without bound behind slow disks"""
+    return JSONResponse({"error": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+
+def _conditional(result: dict, status_code: int = 200):
+    """JSON response carrying the result's ETag, or 304 if the client's copy is current"""
+    headers = {"ETag": result["etag"], "Cache-Control": "no-cache"} if "etag" in result else None
+    if result.get("not_modified"):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(result, status_code=status_code, headers=headers)
+
+async def require_token(request: Request):
+    """Check the Authorization header without blocking the event loop"""
+    token = request.headers.get("Authorization", "")
+    ip_address = request.client.host if request.client else "unknown"
+    if not await verify_token_async(token, ip_address):
+        logger.warning(f"Unauthorized request from {ip_address}")
+        raise HTTPException(status_code=403, detail="Invalid token")
 
 # ─────────── API ROUTES ───────────
 
@@ -91,40 +134,98 @@ def index():
 
 @app.get("/files")
 @log_api_request
-def get_files(request: Request, path: str = "."):
-    """List files in the specified directory"""
+async def get_files(request: Request, path: str = ".", cursor: Optional[str] = None,
+                    limit: int = DEFAULT_PAGE_SIZE, sort: str = "name", order: str = "asc",
+                    pattern: Optional[str] = None, kind: Optional[str] = None,
+                    show_hidden: bool = True, format: str = "full", since: Optional[str] = None):
+    """List one page of files; "since" returns only changes after that sync_token"""
     logger.debug(f"File listing requested for path: {path}")
     
-    token = request.headers.get("Authorization", "")
-    if not verify_token(token):
-        logger.warning(f"Unauthorized file access attempt from {request.client.host if request.client else 'unknown'}")
-        raise HTTPException(status_code=403, detail="Invalid token")
+    await require_token(request)
     
     try:
-        files = list_files(path)
-        logger.info(f"Successfully listed {len(files)} files in {path}")
-        return files
+        files = await run_blocking("io", list_files, path, cursor, limit, sort, order,
+                                   pattern, kind, show_hidden, format, since,
+                                   request.headers.get("If-None-Match"))
+        logger.info(f"Successfully listed {len(files.get('items', files.get('changed', [])))} files in {path}")
+        return _conditional(files)
+    except PoolSaturated:
+        raise
     except Exception as e:
         logger.error(f"Failed to list files in {path}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to list files")
 
+@app.get("/files/content")
+@log_api_request
+async def get_file_content(request: Request, path: str, tail: Optional[int] = None,
+                           start_line: Optional[int] = None, end_line: Optional[int] = None):
+    """Stream file contents as raw bytes without loading the file into memory"""
+    await require_token(request)
+    
+    # Opening may build a line index, so it runs on the io pool too
+    result = await run_blocking("io", stream_file, path, request.headers.get("Range"),
+                                tail, start_line, end_line)
+    if "error" in result:
+        if result.get("status_code") == 416:
+            return JSONResponse(result, status_code=416,
+                                headers={"Content-Range": f"bytes */{result['size']}"})
+        return JSONResponse(result, status_code=404 if "does not exist" in result["error"] else 400)
+    
+    start, end, size = result["start"], result["end"], result["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start),
+        "X-Content-Offset": str(start),
+        "X-File-Size": str(size)
+    }
+    if result["status_code"] == 206:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    if "start_line" in result:
+        headers["X-Start-Line"] = str(result["start_line"])
+    
+    # Sync iterators are drained in Starlette's threadpool, keeping disk I/O off the event loop
+    return StreamingResponse(result["chunks"], status_code=result["status_code"],
+                             media_type=result["media_type"], headers=headers)
+
+@app.get("/search")
+@log_api_request
+async def search_files(request: Request, root: str = ".", glob: Optional[str] = None,
+                       query: Optional[str] = None, regex: bool = True, case_sensitive: bool = False,
+                       max_results: int = 1000, gitignore: bool = True):
+    """Search a tree by filename glob and/or content, streaming results as NDJSON"""
+    await require_token(request)
+    
+    prepared = await run_blocking("io", prepare_search, root, glob, query, regex,
+                                  case_sensitive, max_results, gitignore)
+    if "error" in prepared:
+        return JSONResponse(prepared, status_code=400)
+    
+    # Starlette closes the generator when the client disconnects, which cancels the search
+    return StreamingResponse(stream_search(prepared["query"]), media_type="application/x-ndjson")
+
 @app.post("/read")
 @log_api_request
 async def open_file(req: Request):
-    """Read file contents"""
-    token = req.headers.get("Authorization", "")
-    if not verify_token(token):
-        raise HTTPException(status_code=403, detail="Invalid token")
+    """Read file contents; supports If-None-Match"""
+    await require_token(req)
     data = await req.json()
-    return read_file(data.get("path", ""))
+    return _conditional(await run_blocking("io", read_file, data.get("path", ""),
+                                           req.headers.get("If-None-Match")))
 
 @app.post("/write")
 async def save_file(req: Request):
-    token = req.headers.get("Authorization", "")
-    if not verify_token(token):
-        raise HTTPException(status_code=403, detail="Invalid token")
+    """Write file contents, or apply "splices"/"diff" against "base_hash" """
+    await require_token(req)
     data = await req.json()
-    return write_file(data.get("path", ""), data.get("content", ""))
+    if "splices" in data or "diff" in data:
+        result = await run_blocking("io", patch_file, data.get("path", ""), data.get("base_hash", ""),
+                                    splices=data.get("splices"), diff=data.get("diff"))
+    else:
+        result = await run_blocking("io", write_file, data.get("path", ""), data.get("content", ""),
+                                    base_hash=data.get("base_hash"))
+    if result.get("conflict"):
+        return JSONResponse(result, status_code=409)
+    return result
 
 @app.websocket("/terminal")
 async def ws_terminal(websocket: WebSocket):
@@ -132,54 +233,85 @@ async def ws_terminal(websocket: WebSocket):
 
 @app.post("/mouse")
 async def handle_mouse(req: Request):
-    token = req.headers.get("Authorization", "")
-    if not verify_token(token):
-        raise HTTPException(status_code=403, detail="Invalid token")
+    await require_token(req)
     data = await req.json()
-    return move_mouse(data.get("x"), data.get("y"), data.get("click", False))
+    if "events" in data:
+        # Batched form: {"events": [{"type": "move", "x": 10, "y": 20}, ...]}
+        return await run_blocking("input", send_input_events, data["events"])
+    return await run_blocking("input", move_mouse, data.get("x"), data.get("y"), data.get("click", False))
+
+@app.websocket("/screen/stream")
+async def ws_screen_stream(websocket: WebSocket):
+    """Native capture stream of dirty tiles for the mobile web UI"""
+    await handle_screen_stream(websocket)
+
+@app.websocket("/input")
+async def ws_input(websocket: WebSocket):
+    """Authenticated mouse/keyboard event stream"""
+    await handle_input(websocket)
 
 @app.get("/qr")
-def qr():
-    url = f"https://{get_headscale_ip()}:5000"
-    return generate_qr(url)
+async def qr(request: Request, format: str = "base64", size: str = "medium",
+             error_correction: str = "M", style: str = "default"):
+    """Connection QR code as PNG (format=png) or JSON with a data URL; supports If-None-Match"""
+    # A cold mesh-address lookup runs subprocesses; keep it off the event loop
+    url = f"https://{await run_blocking('io', get_headscale_ip)}:5000"
+    result = await run_blocking("cpu", generate_qr, url, "png" if format == "png" else "base64",
+                                size, error_correction, style)
+    if result.get("status") != "success":
+        return JSONResponse(result, status_code=500)
+    
+    # The JSON body carries a timestamp, so it only gets a weak validator
+    etag = result.pop("etag")
+    if format != "png":
+        etag = f"W/{etag}"
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status_code=304, headers=headers)
+    
+    if format == "png":
+        return Response(result["qr_data"], media_type="image/png", headers=headers)
+    return JSONResponse(result, headers=headers)
 
 @app.get("/log")
 @log_api_request
-def get_log():
+async def get_log(request: Request, n: int = DEFAULT_LOG_LINES, level: Optional[str] = None,
+                  module: Optional[str] = None):
     """Get recent log entries for debugging"""
-    logger.info("Log request received")
-    from .utils.logger import log_event  # Import legacy function
-    return {"log": log_event("query", inline=True)}
+    await require_token(request)
+    
+    result = await run_blocking("io", read_recent_logs, n, level, module)
+    if "error" in result:
+        return JSONResponse(result, status_code=400)
+    return result
+
+@app.get("/log/stream")
+@log_api_request
+async def follow_log(request: Request, n: int = 0, level: Optional[str] = None,
+                     module: Optional[str] = None):
+    """Follow the log as Server-Sent Events, optionally starting with the last n records"""
+    await require_token(request)
+    
+    prepared = prepare_log_follow(n, level, module)
+    if "error" in prepared:
+        return JSONResponse(prepared, status_code=400)
+    
+    return StreamingResponse(stream_log(prepared["filter"], prepared["backlog"]),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Prometheus text exposition of the in-process metrics"""
+    await require_token(request)
+    
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 # ─────────── UTIL ───────────
 
 def get_headscale_ip():
-    """Get the headscale mesh IP address for this node"""
-    try:
-        from subprocess import check_output
-        # Try to get IP from headscale status
-        result = check_output(["headscale", "nodes", "list", "--output", "json"]).decode()
-        import json
-        nodes = json.loads(result)
-        if nodes:
-            # Return the first node's IP
-            return nodes[0].get('ip_addresses', ['localhost'])[0]
-    except:
-        pass
-    
-    # Fallback to checking network interfaces using ip command
-    try:
-        from subprocess import check_output
-        result = check_output(["ip", "addr", "show"]).decode()
-        import re
-        # Look for headscale IP range (100.64.0.0/10)
-        matches = re.findall(r'inet (100\.\d+\.\d+\.\d+)', result)
-        if matches:
-            return matches[0]
-    except:
-        pass
-    
-    return "localhost"
+    """Get the headscale mesh IP address for this node (cached, refreshed on address changes)"""
+    return get_mesh_address()
 
 def get_tailscale_ip():
     """Legacy tailscale function - redirects to headscale"""
@@ -192,7 +324,8 @@ def main():
     """Main application entry point"""
     logger.info("Mobile Mirror backend starting up", extra={
         "host": "0.0.0.0",
-        "port": PORT
+        "port": PORT,
+        "workers": WORKER_COUNT
     })
     
     try:
@@ -201,7 +334,13 @@ def main():
     except Exception as e:
         logger.error("Failed to initialize screen streaming", exc_info=True)
     
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+    # Resolve the mesh address up front; a netlink listener keeps it current
+    logger.info(f"Mesh address: {get_mesh_address()}")
+    
+    if WORKER_COUNT > 1:
+        run_workers("mobilemirror.backend.app:app", "0.0.0.0", PORT, WORKER_COUNT)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=PORT)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
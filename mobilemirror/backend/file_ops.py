@@ -8,9 +8,11 @@ Supports browsing, reading, writing, and managing files with comprehensive
 logging and error handling.
 
 Functions:
-- list_files(path): List directory contents with metadata
+- list_files(path, ...): List one page of directory contents with metadata
 - read_file(path): Read file contents safely
-- write_file(path, content): Write content to file
+- stream_file(path, ...): Stream raw bytes with HTTP Range, tail and line modes
+- write_file(path, content): Write content to file atomically
+- patch_file(path, base_hash, ...): Apply byte-range splices or a unified diff
 - delete_file(path): Remove files securely
 - get_file_info(path): Get detailed file metadata
 
@@ -19,29 +21,451 @@ Security Features:
 - Permission checking before operations
 - Comprehensive audit logging
 - Error handling with sanitized responses
+
+Directory Listings:
+- One os.scandir pass per directory with a single stat per entry; access
+  flags are derived from the mode bits instead of os.access calls
+- Listings are kept in an LRU cache, invalidated by inotify when available
+- Pages are addressed by opaque cursors; sorting and filtering happen
+  server-side on the cached listing
+- Each scan has a content fingerprint that serves as its ETag and sync
+  token; recent scans are kept so "since=<token>" returns only the entries
+  added, changed or removed after it
+- "compact" format sends the parent path once and items as arrays
+
+Streaming Reads:
+- Content is yielded in STREAM_CHUNK_SIZE blocks, so there is no size cap
+- "tail N" seeks backwards from the end of the file in blocks
+- "lines X-Y" seeks to the nearest checkpoint of a sparse line-offset index
+  that is cached per file and extended in place as logs grow
+
+Writes:
+- New contents go to a temp file in the same directory, are fsynced and
+  moved over the original with os.replace, so a crash never loses the file
+- Patches carry the SHA-256 of the contents they were made against and are
+  rejected with "conflict" if the file has changed since
 """
 
+import base64
+import binascii
+import fnmatch
+import hashlib
+import itertools
+import json
+import mimetypes
 import os
+import re
 import stat
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple, Union
 from datetime import datetime
 
+from .utils.fs_watch import get_watcher
 from .utils.logger import get_logger, log_performance
 
 # Initialize module logger
 logger = get_logger(__name__)
 
+# Listing settings
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+LISTING_CACHE_SIZE = 64           # Directories kept in memory
+LISTING_CACHE_TTL = 5             # Seconds; only for listings inotify is not watching
+LISTING_HISTORY_SIZE = 4          # Earlier scans kept per directory for diff requests
+LISTING_FORMATS = ("full", "compact")
+COMPACT_FIELDS = ["name", "type", "size", "mtime", "permissions", "readable", "writable"]
+
+# Read settings
+MAX_READ_SIZE = 10 * 1024 * 1024  # In-memory JSON reads only; streamed reads are unbounded
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_TAIL_LINES = 100000
+LINE_INDEX_STRIDE = 1000          # Keep the byte offset of every Nth line
+LINE_INDEX_CACHE_SIZE = 32        # Files whose line index is kept in memory
+BINARY_SNIFF_SIZE = 8192
+MAX_PATCH_SPLICES = 1000
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+HUNK_HEADER_PATTERN = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header cannot be served for the file size"""
+    pass
+
+class LineIndex:
+    """Sparse byte offsets of every LINE_INDEX_STRIDE-th line of one file
+    
+    offsets[i] is where line i * stride starts (lines are 0-based). The index
+    remembers how far it has scanned so an appended-to file only needs its
+    new bytes counted.
+    """
+    
+    def __init__(self, inode: int):
+        self.inode = inode
+        self.offsets = [0]
+        self.scanned = 0        # Bytes counted so far
+        self.lines = 0          # Newlines seen in the first ``scanned`` bytes
+        self.mtime_ns = 0
+        self.lock = threading.Lock()
+    
+    def extend(self, f, size: int):
+        """Count newlines from ``scanned`` up to ``size``"""
+        f.seek(self.scanned)
+        pos = self.scanned
+        while pos < size:
+            block = f.read(min(STREAM_CHUNK_SIZE, size - pos))
+            if not block:
+                break
+            start = 0
+            while True:
+                nl = block.find(b"\n", start)
+                if nl < 0:
+                    break
+                self.lines += 1
+                if self.lines % LINE_INDEX_STRIDE == 0:
+                    self.offsets.append(pos + nl + 1)
+                start = nl + 1
+            pos += len(block)
+        self.scanned = pos
+
+_line_indexes: "OrderedDict[str, LineIndex]" = OrderedDict()
+_line_indexes_lock = threading.Lock()
+
+def _resolve_readable_file(path: str) -> Tuple[Path, Optional[Dict[str, Any]]]:
+    """Resolve a path and check it is an existing, readable regular file"""
+    abs_path = Path(path).expanduser().resolve()
+    
+    if not abs_path.exists():
+        logger.warning(f"Attempted to read non-existent file: {abs_path}")
+        return abs_path, {"error": "File does not exist", "path": str(abs_path)}
+    
+    if not abs_path.is_file():
+        logger.warning(f"Attempted to read non-file: {abs_path}")
+        return abs_path, {"error": "Path is not a file", "path": str(abs_path)}
+    
+    if not os.access(abs_path, os.R_OK):
+        logger.error(f"Permission denied reading file: {abs_path}")
+        return abs_path, {"error": "Permission denied", "path": str(abs_path)}
+    
+    return abs_path, None
+
+class DirectoryListing:
+    """Cached scan of one directory, with sorted views built on demand"""
+    
+    def __init__(self, path: str, entries: List[Dict[str, Any]], summary: Dict[str, int], mtime_ns: int):
+        self.path = path
+        self.entries = entries
+        self.summary = summary
+        self.mtime_ns = mtime_ns
+        self.built = time.monotonic()
+        self.generation = next(_listing_generations)
+        self.watched = False
+        self._views: Dict[Tuple[str, str], Tuple[List[Dict[str, Any]], Dict[str, int]]] = {}
+        self._fingerprint: Optional[str] = None
+    
+    @property
+    def fingerprint(self) -> str:
+        """Hash of every entry's name, size, mtime and mode; stable across rescans"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=8)
+            for entry in sorted(self.entries, key=lambda e: e["name"]):
+                digest.update(_entry_signature(entry).encode("utf-8", "surrogateescape") + b"\n")
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+    
+    def view(self, sort: str, order: str) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Entries sorted directories-first by ``sort``, plus a name -> position map"""
+        key = (sort, order)
+        view = self._views.get(key)
+        if view is None:
+            ordered = sorted(self.entries, key=SORT_KEYS[sort], reverse=order == "desc")
+            ordered.sort(key=lambda e: not e["is_dir"])
+            view = (ordered, {e["name"]: i for i, e in enumerate(ordered)})
+            self._views[key] = view
+        return view
+
+SORT_KEYS = {
+    "name": lambda e: (e["name"].lower(), e["name"]),
+    "size": lambda e: (e["size"] or 0, e["name"]),
+    "modified": lambda e: (e["mtime"], e["name"]),
+    "type": lambda e: (os.path.splitext(e["name"])[1].lower(), e["name"].lower())
+}
+
+_listing_generations = itertools.count(1)
+_listing_cache: "OrderedDict[str, DirectoryListing]" = OrderedDict()
+_listing_cache_lock = threading.Lock()
+
+# Recent scans per directory for diff requests: path -> fingerprint -> entries
+_listing_history: "OrderedDict[str, OrderedDict[str, List[Dict[str, Any]]]]" = OrderedDict()
+
+# Credentials used to derive access flags from stat results
+_euid = os.geteuid() if hasattr(os, "geteuid") else -1
+_groups = set(os.getgroups()) | {os.getegid()} if hasattr(os, "getegid") else set()
+
+def _access_from_stat(st: os.stat_result) -> Tuple[bool, bool]:
+    """Readable/writable for the current user from mode bits, without os.access syscalls"""
+    if _euid == 0:
+        return True, True
+    mode = st.st_mode
+    if st.st_uid == _euid:
+        return bool(mode & stat.S_IRUSR), bool(mode & stat.S_IWUSR)
+    if st.st_gid in _groups:
+        return bool(mode & stat.S_IRGRP), bool(mode & stat.S_IWGRP)
+    return bool(mode & stat.S_IROTH), bool(mode & stat.S_IWOTH)
+
+def _scan_directory(abs_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Read a directory with os.scandir, stat-ing each entry once"""
+    entries = []
+    total_size = 0
+    file_count = 0
+    dir_count = 0
+    
+    with os.scandir(abs_path) as it:
+        for entry in it:
+            try:
+                # DirEntry caches this; it follows symlinks like Path.stat()
+                st = entry.stat()
+                is_dir = stat.S_ISDIR(st.st_mode)
+                readable, writable = _access_from_stat(st)
+                entries.append({
+                    "name": entry.name,
+                    "is_dir": is_dir,
+                    "size": None if is_dir else st.st_size,
+                    "mtime": st.st_mtime,
+                    "mode": st.st_mode,
+                    "readable": readable,
+                    "writable": writable
+                })
+                if is_dir:
+                    dir_count += 1
+                else:
+                    file_count += 1
+                    total_size += st.st_size
+            except OSError as e:
+                logger.debug(f"Could not access item {entry.path}: {e}")
+                entries.append({"name": entry.name, "is_dir": False, "size": None,
+                                "mtime": 0, "error": True})
+    
+    summary = {
+        "total_items": len(entries),
+        "files": file_count,
+        "directories": dir_count,
+        "total_size": total_size
+    }
+    return entries, summary
+
+def _entry_signature(entry: Dict[str, Any]) -> str:
+    return f"{entry['name']}\0{entry.get('size')}\0{entry.get('mtime')}\0{entry.get('mode')}"
+
+def _format_compact(entry: Dict[str, Any]) -> List[Any]:
+    """Render a cached entry as a COMPACT_FIELDS row"""
+    if entry.get("error"):
+        return [entry["name"], "unknown", None, 0, None, False, False]
+    return [
+        entry["name"],
+        "dir" if entry["is_dir"] else "file",
+        entry["size"],
+        int(entry["mtime"]),
+        stat.filemode(entry["mode"]),
+        entry["readable"],
+        entry["writable"]
+    ]
+
+def _format_entry(abs_path: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Render a cached entry in the /files item format"""
+    path = os.path.join(abs_path, entry["name"])
+    if entry.get("error"):
+        return {"name": entry["name"], "path": path, "type": "unknown", "error": "Access denied"}
+    return {
+        "name": entry["name"],
+        "path": path,
+        "type": "dir" if entry["is_dir"] else "file",
+        "size": entry["size"],
+        "modified": datetime.fromtimestamp(entry["mtime"]).isoformat(),
+        "permissions": stat.filemode(entry["mode"]),
+        "readable": entry["readable"],
+        "writable": entry["writable"]
+    }
+
+def _on_directory_change(path: str, name: str, mask: int):
+    """inotify callback: drop the cached listing of a changed directory"""
+    invalidate_listing(path)
+
+def invalidate_listing(path: Optional[str] = None):
+    """
+    Drop cached directory listings
+    
+    Args:
+        path: Resolved directory to drop, or None to clear the whole cache
+    """
+    with _listing_cache_lock:
+        if path is None:
+            dropped = list(_listing_cache.values())
+            _listing_cache.clear()
+        else:
+            listing = _listing_cache.pop(path, None)
+            dropped = [listing] if listing else []
+    
+    watcher = get_watcher()
+    for listing in dropped:
+        if listing.watched:
+            watcher.unwatch(listing.path, _on_directory_change)
+
+get_watcher().on_overflow(invalidate_listing)
+
+def _get_listing(abs_path: str, dir_stat: os.stat_result) -> Tuple[DirectoryListing, bool]:
+    """
+    Return a fresh listing for a directory, from cache when still valid
+    
+    A cached listing is valid while its directory mtime is unchanged (entries
+    added, removed or renamed) and, if the directory is watched, until inotify
+    reports any change inside it; unwatched listings also expire after
+    LISTING_CACHE_TTL so changes to file sizes show up.
+    
+    Returns:
+        Tuple of (listing, served_from_cache)
+    """
+    with _listing_cache_lock:
+        listing = _listing_cache.get(abs_path)
+        if listing is not None:
+            fresh = listing.mtime_ns == dir_stat.st_mtime_ns and (
+                listing.watched or time.monotonic() - listing.built < LISTING_CACHE_TTL)
+            if fresh:
+                _listing_cache.move_to_end(abs_path)
+                return listing, True
+    
+    invalidate_listing(abs_path)
+    
+    # Watch before scanning, so a change made during the scan is not missed
+    changed = threading.Event()
+    
+    def on_scan_change(path: str, name: str, mask: int):
+        changed.set()
+    
+    watcher = get_watcher()
+    scan_watched = watcher.watch(abs_path, on_scan_change)
+    entries, summary = _scan_directory(abs_path)
+    listing = DirectoryListing(abs_path, entries, summary, dir_stat.st_mtime_ns)
+    listing.watched = scan_watched and watcher.watch(abs_path, _on_directory_change)
+    
+    fingerprint = listing.fingerprint
+    evicted = []
+    with _listing_cache_lock:
+        _listing_cache[abs_path] = listing
+        while len(_listing_cache) > LISTING_CACHE_SIZE:
+            evicted.append(_listing_cache.popitem(last=False)[1])
+        
+        history = _listing_history.setdefault(abs_path, OrderedDict())
+        history[fingerprint] = entries
+        history.move_to_end(fingerprint)
+        while len(history) > LISTING_HISTORY_SIZE:
+            history.popitem(last=False)
+        _listing_history.move_to_end(abs_path)
+        while len(_listing_history) > LISTING_CACHE_SIZE * 2:
+            _listing_history.popitem(last=False)
+    for old in evicted:
+        if old.watched:
+            watcher.unwatch(old.path, _on_directory_change)
+    if scan_watched:
+        watcher.unwatch(abs_path, on_scan_change)
+    if changed.is_set():
+        invalidate_listing(abs_path)  # Serve this scan once, but rescan next time
+    return listing, False
+
+def _encode_cursor(listing: DirectoryListing, index: int, last_name: str) -> str:
+    raw = json.dumps({"g": listing.generation, "i": index, "n": last_name}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str, listing: DirectoryListing, positions: Dict[str, int]) -> int:
+    """
+    Turn a cursor into the index to resume from
+    
+    Cursors from an older scan of the directory resume after the last name
+    they returned, so entries added or removed meanwhile do not shift pages.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        index = int(data["i"])
+        if data["g"] != listing.generation and data["n"] in positions:
+            index = positions[data["n"]] + 1
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    return max(0, index)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak If-None-Match comparison against one ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == bare:
+            return True
+    return False
+
+def file_etag(file_stat: os.stat_result) -> str:
+    """Validator for a file's contents, from its inode, mtime and size"""
+    return f'W/"{file_stat.st_ino:x}-{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+def _listing_etag(listing: DirectoryListing, params: Tuple[Any, ...]) -> str:
+    # The same scan renders differently per page, sort, filter and format
+    variant = hashlib.blake2b(repr(params).encode("utf-8", "surrogateescape"), digest_size=4).hexdigest()
+    return f'W/"{listing.fingerprint}-{variant}"'
+
+def _listing_diff(abs_path: str, listing: DirectoryListing,
+                  since: str) -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+    """
+    Entries added or changed, and names removed, since an earlier scan
+    
+    Returns:
+        (changed entries, removed names), or None if that scan is no longer kept
+    """
+    if since == listing.fingerprint:
+        return [], []
+    with _listing_cache_lock:
+        base = _listing_history.get(abs_path, {}).get(since)
+    if base is None:
+        return None
+    
+    previous = {entry["name"]: _entry_signature(entry) for entry in base}
+    changed = [entry for entry in listing.entries
+               if previous.get(entry["name"]) != _entry_signature(entry)]
+    current = {entry["name"] for entry in listing.entries}
+    removed = sorted(name for name in previous if name not in current)
+    return changed, removed
+
 @log_performance
-def list_files(path: str = ".") -> Dict[str, Any]:
+def list_files(path: str = ".", cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+               sort: str = "name", order: str = "asc", pattern: Optional[str] = None,
+               kind: Optional[str] = None, show_hidden: bool = True, format: str = "full",
+               since: Optional[str] = None, if_none_match: Optional[str] = None) -> Dict[str, Any]:
     """
-    List files and directories in the specified path
+    List one page of files and directories in the specified path
     
     Args:
         path: Directory path to list (defaults to current directory)
+        cursor: Opaque cursor from a previous page's "next_cursor"
+        limit: Maximum items per page
+        sort: One of "name", "size", "modified", "type" (directories always first)
+        order: "asc" or "desc"
+        pattern: Case-insensitive glob matched against entry names
+        kind: "file" or "dir" to return only that type
+        show_hidden: Include dotfiles
+        format: "full" (item objects) or "compact" (COMPACT_FIELDS rows, no paths)
+        since: "sync_token" of an earlier listing; returns only what changed
+        if_none_match: ETag(s) the client already holds
         
     Returns:
-        Dictionary containing path info and file listing
+        Dictionary containing path info, one page of items, "next_cursor",
+        "sync_token" and "etag"; {"not_modified": True, ...} if the ETag
+        matched; with ``since``, "changed" items and "removed" names instead
         
     Raises:
         SecurityError: If path traversal is attempted
@@ -67,61 +491,98 @@ def list_files(path: str = ".") -> Dict[str, Any]:
             logger.error(f"Permission denied accessing: {abs_path}")
             return {"error": "Permission denied", "path": str(abs_path)}
 
+        if sort not in SORT_KEYS or order not in ("asc", "desc"):
+            return {"error": f"Invalid sort: {sort} {order}", "path": str(abs_path)}
+        if kind not in (None, "file", "dir"):
+            return {"error": f"Invalid kind: {kind}", "path": str(abs_path)}
+        if format not in LISTING_FORMATS:
+            return {"error": f"Invalid format: {format}", "path": str(abs_path)}
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        
+        listing, cached = _get_listing(str(abs_path), abs_path.stat())
+        etag = _listing_etag(listing, (cursor, limit, sort, order, pattern, kind,
+                                       show_hidden, format, since))
+        if etag_matches(if_none_match, etag):
+            return {"not_modified": True, "etag": etag, "path": str(abs_path)}
+        
+        matcher = re.compile(fnmatch.translate(pattern), re.IGNORECASE).match if pattern else None
+        
+        def wanted(entry: Dict[str, Any]) -> bool:
+            if not show_hidden and entry["name"].startswith("."):
+                return False
+            if kind and ("dir" if entry["is_dir"] else "file") != kind:
+                return False
+            return not matcher or bool(matcher(entry["name"]))
+        
+        render = _format_compact if format == "compact" else (
+            lambda entry: _format_entry(listing.path, entry))
+        
+        diff = _listing_diff(listing.path, listing, since) if since else None
+        if diff is not None:
+            changed, removed = diff
+            result = {
+                "path": str(abs_path),
+                "mode": "diff",
+                "since": since,
+                "sync_token": listing.fingerprint,
+                "etag": etag,
+                "changed": [render(entry) for entry in changed if wanted(entry)],
+                "removed": removed,
+                "summary": listing.summary
+            }
+            if format == "compact":
+                result["fields"] = COMPACT_FIELDS
+            logger.info(f"Listed changes in directory: {abs_path}", extra={
+                "path": str(abs_path),
+                "changed": len(changed),
+                "removed": len(removed)
+            })
+            return result
+        
+        ordered, positions = listing.view(sort, order)
+        
+        try:
+            index = _decode_cursor(cursor, listing, positions) if cursor else 0
+        except ValueError:
+            return {"error": "Invalid cursor", "path": str(abs_path)}
+        
+        # Walk from the cursor until the page is full; filters only cost what they scan
         items = []
-        total_size = 0
-        file_count = 0
-        dir_count = 0
+        while index < len(ordered) and len(items) < limit:
+            entry = ordered[index]
+            index += 1
+            if wanted(entry):
+                items.append(render(entry))
         
-        for item in abs_path.iterdir():
-            try:
-                item_stat = item.stat()
-                item_info = {
-                    "name": item.name,
-                    "path": str(item),
-                    "type": "dir" if item.is_dir() else "file",
-                    "size": item_stat.st_size if item.is_file() else None,
-                    "modified": datetime.fromtimestamp(item_stat.st_mtime).isoformat(),
-                    "permissions": stat.filemode(item_stat.st_mode),
-                    "readable": os.access(item, os.R_OK),
-                    "writable": os.access(item, os.W_OK)
-                }
-                
-                if item.is_file():
-                    file_count += 1
-                    total_size += item_stat.st_size
-                else:
-                    dir_count += 1
-                
-                items.append(item_info)
-                
-            except (OSError, PermissionError) as e:
-                logger.warning(f"Could not access item {item}: {e}")
-                items.append({
-                    "name": item.name,
-                    "path": str(item),
-                    "type": "unknown",
-                    "error": "Access denied"
-                })
-
-        # Sort items: directories first, then files, both alphabetically
-        items.sort(key=lambda x: (x["type"] != "dir", x["name"].lower()))
+        next_cursor = None
+        if index < len(ordered):
+            next_cursor = _encode_cursor(listing, index, ordered[index - 1]["name"])
 
         result = {
             "path": str(abs_path),
             "items": items,
-            "summary": {
-                "total_items": len(items),
-                "files": file_count,
-                "directories": dir_count,
-                "total_size": total_size
+            "summary": listing.summary,
+            "next_cursor": next_cursor,
+            "sync_token": listing.fingerprint,
+            "etag": etag,
+            "page": {
+                "limit": limit,
+                "sort": sort,
+                "order": order,
+                "returned": len(items),
+                "cached": cached
             }
         }
+        if format == "compact":
+            result["fields"] = COMPACT_FIELDS
+        if since:
+            result["mode"] = "full"  # The "since" scan is no longer kept; resync from this
 
         logger.info(f"Successfully listed directory: {abs_path}", extra={
             "path": str(abs_path),
             "item_count": len(items),
-            "file_count": file_count,
-            "dir_count": dir_count
+            "total_items": listing.summary["total_items"],
+            "cached": cached
         })
         
         return result
@@ -134,43 +595,40 @@ def list_files(path: str = ".") -> Dict[str, Any]:
         return {"error": f"Failed to list directory: {str(e)}"}
 
 @log_performance
-def read_file(path: str) -> Dict[str, Any]:
+def read_file(path: str, if_none_match: Optional[str] = None) -> Dict[str, Any]:
     """
     Read file contents safely with encoding detection
     
     Args:
         path: File path to read
+        if_none_match: ETag(s) the client already holds
         
     Returns:
-        Dictionary containing file content and metadata
+        Dictionary containing file content, metadata and "etag", or
+        {"not_modified": True, ...} if the ETag still matches
     """
     logger.debug(f"Reading file: {path}")
     
     try:
         # Resolve and validate path
-        abs_path = Path(path).expanduser().resolve()
-        
-        # Security checks
-        if not abs_path.exists():
-            logger.warning(f"Attempted to read non-existent file: {abs_path}")
-            return {"error": "File does not exist", "path": str(abs_path)}
-        
-        if not abs_path.is_file():
-            logger.warning(f"Attempted to read non-file: {abs_path}")
-            return {"error": "Path is not a file", "path": str(abs_path)}
-        
-        if not os.access(abs_path, os.R_OK):
-            logger.error(f"Permission denied reading file: {abs_path}")
-            return {"error": "Permission denied", "path": str(abs_path)}
+        abs_path, error = _resolve_readable_file(path)
+        if error:
+            return error
         
         # Get file metadata
         file_stat = abs_path.stat()
         file_size = file_stat.st_size
+        etag = file_etag(file_stat)
+        if etag_matches(if_none_match, etag):
+            return {"not_modified": True, "etag": etag, "path": str(abs_path)}
         
         # Check file size (limit to 10MB for safety)
-        if file_size > 10 * 1024 * 1024:
+        if file_size > MAX_READ_SIZE:
             logger.warning(f"Attempted to read large file: {abs_path} ({file_size} bytes)")
-            return {"error": "File too large (max 10MB)", "path": str(abs_path)}
+            return {
+                "error": "File too large (max 10MB); use /files/content to stream it",
+                "path": str(abs_path)
+            }
         
         # Try to read with UTF-8, fallback to binary
         try:
@@ -189,10 +647,12 @@ def read_file(path: str) -> Dict[str, Any]:
         result = {
             "path": str(abs_path),
             "content": content,
+            "etag": etag,
             "metadata": {
                 "size": file_size,
                 "encoding": encoding,
                 "is_binary": is_binary,
+                "sha256": file_sha256(abs_path),
                 "modified": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
                 "permissions": stat.filemode(file_stat.st_mode)
             }
@@ -214,15 +674,383 @@ def read_file(path: str) -> Dict[str, Any]:
         })
         return {"error": f"Failed to read file: {str(e)}"}
 
+def parse_range_header(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header
+    
+    Args:
+        header: Range header value, e.g. "bytes=0-1023" or "bytes=-500"
+        size: Current file size
+    
+    Returns:
+        Inclusive (start, end) byte positions, or None to serve the whole file
+    
+    Raises:
+        RangeNotSatisfiable: If the range lies outside the file
+    """
+    if not header:
+        return None
+    
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        # Multi-range and malformed requests are allowed to fall back to 200
+        return None
+    
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - length), size - 1
+    
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(header)
+    return start, end
+
+def iter_file_range(path: Union[str, Path], start: int, end: int,
+                    chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Yield bytes ``start``..``end`` (inclusive) of a file in chunks
+    
+    Args:
+        path: File to read
+        start: First byte offset
+        end: Last byte offset
+        chunk_size: Maximum bytes per chunk
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def _guess_media_type(path: Path) -> str:
+    """Media type from the extension, falling back to a NUL-byte sniff"""
+    media_type, _ = mimetypes.guess_type(path.name)
+    if media_type:
+        if media_type.startswith("text/"):
+            media_type += "; charset=utf-8"
+        return media_type
+    
+    with open(path, "rb") as f:
+        head = f.read(BINARY_SNIFF_SIZE)
+    return "application/octet-stream" if b"\0" in head else "text/plain; charset=utf-8"
+
+def tail_offset(path: Union[str, Path], lines: int, size: int) -> int:
+    """
+    Find where the last ``lines`` lines of a file start by reading backwards
+    
+    Args:
+        path: File to scan
+        lines: Number of trailing lines wanted
+        size: File size to treat as the end of the file
+    
+    Returns:
+        Byte offset of the first wanted line
+    """
+    if lines <= 0 or size == 0:
+        return size
+    
+    with open(path, "rb") as f:
+        # A trailing newline terminates the last line rather than starting a new one
+        f.seek(size - 1)
+        pos = size - 1 if f.read(1) == b"\n" else size
+        newlines = 0
+        while pos > 0:
+            block_start = max(0, pos - STREAM_CHUNK_SIZE)
+            f.seek(block_start)
+            block = f.read(pos - block_start)
+            end = len(block)
+            while True:
+                nl = block.rfind(b"\n", 0, end)
+                if nl < 0:
+                    break
+                newlines += 1
+                if newlines == lines:
+                    return block_start + nl + 1
+                end = nl
+            pos = block_start
+    return 0
+
+def _get_line_index(path: Path, file_stat: os.stat_result) -> LineIndex:
+    """Fetch or build the cached line index for a file, extending it if the file grew"""
+    key = str(path)
+    with _line_indexes_lock:
+        index = _line_indexes.get(key)
+        # A new inode or a shrunk file means the old offsets are meaningless
+        if index is None or index.inode != file_stat.st_ino or file_stat.st_size < index.scanned:
+            index = LineIndex(file_stat.st_ino)
+            _line_indexes[key] = index
+            while len(_line_indexes) > LINE_INDEX_CACHE_SIZE:
+                _line_indexes.popitem(last=False)
+        _line_indexes.move_to_end(key)
+    
+    with index.lock:
+        # Same size but newer mtime: rewritten in place, so start over
+        if file_stat.st_size == index.scanned and file_stat.st_mtime_ns != index.mtime_ns and index.scanned:
+            index.__init__(file_stat.st_ino)
+        if file_stat.st_size > index.scanned:
+            with open(path, "rb") as f:
+                index.extend(f, file_stat.st_size)
+        index.mtime_ns = file_stat.st_mtime_ns
+    return index
+
+def line_range_offsets(path: Path, file_stat: os.stat_result,
+                       start_line: int, end_line: Optional[int]) -> Tuple[int, int]:
+    """
+    Map 1-based inclusive line numbers to a byte span using the line index
+    
+    Args:
+        path: File to read
+        file_stat: Current stat of the file
+        start_line: First line wanted (1-based)
+        end_line: Last line wanted, or None for end of file
+    
+    Returns:
+        (start, end) byte offsets, end exclusive
+    """
+    index = _get_line_index(path, file_stat)
+    size = file_stat.st_size
+    
+    def seek_line(f, line: int) -> int:
+        """Byte offset where 0-based ``line`` starts (size if past the end)"""
+        checkpoint = min(line // LINE_INDEX_STRIDE, len(index.offsets) - 1)
+        pos = index.offsets[checkpoint]
+        skip = line - checkpoint * LINE_INDEX_STRIDE
+        f.seek(pos)
+        while skip > 0 and pos < size:
+            block = f.read(min(STREAM_CHUNK_SIZE, size - pos))
+            if not block:
+                break
+            start = 0
+            while skip > 0:
+                nl = block.find(b"\n", start)
+                if nl < 0:
+                    break
+                skip -= 1
+                start = nl + 1
+            if skip == 0:
+                return pos + start
+            pos += len(block)
+        return pos if skip == 0 else size
+    
+    with open(path, "rb") as f:
+        start = seek_line(f, start_line - 1)
+        end = size if end_line is None else seek_line(f, end_line)
+    return start, max(start, end)
+
+@log_performance
+def stream_file(path: str, range_header: Optional[str] = None, tail: Optional[int] = None,
+                start_line: Optional[int] = None, end_line: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Prepare a streamed read of raw file bytes
+    
+    Exactly one mode applies: ``tail`` (last N lines), ``start_line``/``end_line``
+    (1-based inclusive line span) or a byte range from ``range_header``. With
+    none of them the whole file is streamed.
+    
+    Args:
+        path: File path to read
+        range_header: HTTP Range header value
+        tail: Number of trailing lines to return
+        start_line: First line to return (1-based)
+        end_line: Last line to return (inclusive)
+    
+    Returns:
+        Dictionary with "chunks" (an iterator of bytes), the served byte span,
+        media type and HTTP status, or an "error" key
+    """
+    logger.debug(f"Streaming file: {path}", extra={
+        "range": range_header,
+        "tail": tail,
+        "start_line": start_line,
+        "end_line": end_line
+    })
+    
+    try:
+        abs_path, error = _resolve_readable_file(path)
+        if error:
+            return error
+        
+        file_stat = abs_path.stat()
+        size = file_stat.st_size
+        result: Dict[str, Any] = {
+            "path": str(abs_path),
+            "size": size,
+            "media_type": _guess_media_type(abs_path),
+            "modified": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+            "status_code": 200
+        }
+        
+        if tail is not None:
+            if tail < 0 or tail > MAX_TAIL_LINES:
+                return {"error": f"tail must be between 0 and {MAX_TAIL_LINES}", "path": str(abs_path)}
+            start, end = tail_offset(abs_path, tail, size), size
+            result["mode"] = "tail"
+        elif start_line is not None or end_line is not None:
+            first = start_line or 1
+            if first < 1 or (end_line is not None and end_line < first):
+                return {"error": "Invalid line range", "path": str(abs_path)}
+            start, end = line_range_offsets(abs_path, file_stat, first, end_line)
+            result["mode"] = "lines"
+            result["start_line"] = first
+        else:
+            span = parse_range_header(range_header, size)
+            if span:
+                start, end = span[0], span[1] + 1
+                result["status_code"] = 206
+            else:
+                start, end = 0, size
+            result["mode"] = "range" if span else "full"
+        
+        result["start"] = start
+        result["end"] = end
+        result["chunks"] = iter_file_range(abs_path, start, end - 1) if end > start else iter(())
+        
+        logger.info(f"Streaming file: {abs_path}", extra={
+            "path": str(abs_path),
+            "mode": result["mode"],
+            "bytes": end - start,
+            "size": size
+        })
+        return result
+    
+    except RangeNotSatisfiable:
+        logger.warning(f"Unsatisfiable range for {path}: {range_header}")
+        return {"error": "Range not satisfiable", "path": path, "size": size, "status_code": 416}
+    except Exception as e:
+        logger.error(f"Error streaming file {path}", exc_info=True, extra={
+            "path": path,
+            "error_type": type(e).__name__
+        })
+        return {"error": f"Failed to read file: {str(e)}"}
+
+class WriteConflict(Exception):
+    """Raised when a file changed since the client read it"""
+    pass
+
+class PatchError(Exception):
+    """Raised when a patch payload is malformed or does not apply"""
+    pass
+
+# Mode for newly created files, as open() would give them (umask read once at import)
+_umask = os.umask(0)
+os.umask(_umask)
+NEW_FILE_MODE = 0o666 & ~_umask
+
+_path_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+_path_locks_lock = threading.Lock()
+
+def _path_lock(path: Path) -> threading.Lock:
+    """Lock serialising check-and-replace for one path within this process"""
+    with _path_locks_lock:
+        lock = _path_locks.get(str(path))
+        if lock is None:
+            lock = threading.Lock()
+            _path_locks[str(path)] = lock
+        return lock
+
+def file_sha256(path: Union[str, Path]) -> Optional[str]:
+    """
+    Hash a file's contents in chunks
+    
+    Returns:
+        Hex SHA-256 digest, or None if the file does not exist
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+class _HashingWriter:
+    """File wrapper that hashes and counts everything written through it"""
+    
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data: bytes):
+        self.digest.update(data)
+        self.size += len(data)
+        self.f.write(data)
+
+def _atomic_write(abs_path: Path, produce: Callable[[_HashingWriter], None]) -> Tuple[int, str]:
+    """
+    Write a file via a temp file in the same directory, fsync and os.replace
+    
+    Readers see either the old or the new contents, never a partial file,
+    and a crash at any point leaves the original untouched.
+    
+    Args:
+        abs_path: Destination path
+        produce: Callback writing the new contents to the given writer
+    
+    Returns:
+        Tuple of (bytes written, hex SHA-256 of the new contents)
+    """
+    abs_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=abs_path.parent, prefix=f".{abs_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            writer = _HashingWriter(f)
+            produce(writer)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        # Keep the original's permissions; mkstemp creates files as 0600
+        try:
+            os.chmod(tmp_name, stat.S_IMODE(abs_path.stat().st_mode))
+        except FileNotFoundError:
+            os.chmod(tmp_name, NEW_FILE_MODE)
+        
+        os.replace(tmp_name, abs_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    
+    # Persist the rename itself
+    dir_fd = os.open(abs_path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    
+    return writer.size, writer.digest.hexdigest()
+
+def _check_base_hash(abs_path: Path, base_hash: Optional[str]):
+    """Raise WriteConflict if the file no longer matches what the client read"""
+    if base_hash is None:
+        return
+    current = file_sha256(abs_path)
+    if current != base_hash:
+        raise WriteConflict(current)
+
 @log_performance
-def write_file(path: str, content: str, encoding: str = "utf-8") -> Dict[str, Any]:
+def write_file(path: str, content: str, encoding: str = "utf-8",
+               base_hash: Optional[str] = None) -> Dict[str, Any]:
     """
-    Write content to file safely with backup and validation
+    Write content to file atomically (temp file, fsync, os.replace)
     
     Args:
         path: File path to write
         content: Content to write
         encoding: Text encoding to use
+        base_hash: SHA-256 the file must still have, to detect concurrent edits
         
     Returns:
         Dictionary containing operation status
@@ -231,30 +1059,11 @@ def write_file(path: str, content: str, encoding: str = "utf-8") -> Dict[str, An
     
     try:
         abs_path = Path(path).expanduser().resolve()
+        data = content.encode(encoding)
         
-        # Create backup if file exists
-        backup_path = None
-        if abs_path.exists():
-            backup_path = abs_path.with_suffix(abs_path.suffix + ".bak")
-            logger.debug(f"Creating backup: {backup_path}")
-            abs_path.rename(backup_path)
-        
-        # Write new content
-        abs_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(abs_path, "w", encoding=encoding) as f:
-            f.write(content)
-        
-        # Verify write
-        if not abs_path.exists():
-            raise IOError("File was not created successfully")
-        
-        written_size = abs_path.stat().st_size
-        
-        # Remove backup on successful write
-        if backup_path and backup_path.exists():
-            backup_path.unlink()
-            logger.debug(f"Removed backup: {backup_path}")
+        with _path_lock(abs_path):
+            _check_base_hash(abs_path, base_hash)
+            written_size, digest = _atomic_write(abs_path, lambda w: w.write(data))
         
         logger.info(f"Successfully wrote file: {abs_path}", extra={
             "path": str(abs_path),
@@ -266,24 +1075,216 @@ def write_file(path: str, content: str, encoding: str = "utf-8") -> Dict[str, An
             "status": "success",
             "path": str(abs_path),
             "size": written_size,
-            "encoding": encoding
+            "encoding": encoding,
+            "sha256": digest
         }
         
+    except WriteConflict as e:
+        logger.warning(f"Write conflict on {path}: file changed since it was read")
+        return {"error": "File changed since it was read", "path": path, "sha256": e.args[0], "conflict": True}
     except Exception as e:
-        # Restore backup if write failed
-        if backup_path and backup_path.exists():
-            try:
-                backup_path.rename(abs_path)
-                logger.info(f"Restored backup after write failure: {abs_path}")
-            except Exception as restore_error:
-                logger.error(f"Failed to restore backup: {restore_error}")
-        
         logger.error(f"Error writing file {path}", exc_info=True, extra={
             "path": path,
             "error_type": type(e).__name__
         })
         return {"error": f"Failed to write file: {str(e)}"}
 
+def _copy_range(src, writer: _HashingWriter, count: int):
+    """Copy ``count`` bytes from the current position of ``src``"""
+    while count > 0:
+        chunk = src.read(min(STREAM_CHUNK_SIZE, count))
+        if not chunk:
+            raise PatchError("Splice extends past end of file")
+        writer.write(chunk)
+        count -= len(chunk)
+
+def _normalize_splices(splices: Any, size: int) -> List[Tuple[int, int, bytes]]:
+    """Validate splices and return them sorted as (start, end, data)"""
+    if not isinstance(splices, list) or not splices:
+        raise PatchError("splices must be a non-empty list")
+    if len(splices) > MAX_PATCH_SPLICES:
+        raise PatchError(f"Too many splices (max {MAX_PATCH_SPLICES})")
+    
+    result = []
+    for splice in splices:
+        try:
+            start, end = int(splice["start"]), int(splice["end"])
+            if "data_b64" in splice:
+                data = base64.b64decode(splice["data_b64"], validate=True)
+            else:
+                data = str(splice.get("data", "")).encode("utf-8")
+        except (KeyError, TypeError, ValueError, binascii.Error):
+            raise PatchError("Each splice needs integer start/end and data or data_b64")
+        if not 0 <= start <= end <= size:
+            raise PatchError(f"Splice {start}-{end} outside file of {size} bytes")
+        result.append((start, end, data))
+    
+    result.sort(key=lambda s: (s[0], s[1]))
+    for (_, prev_end, _), (start, _, _) in zip(result, result[1:]):
+        if start < prev_end:
+            raise PatchError("Splices overlap")
+    return result
+
+def _apply_splices(src, writer: _HashingWriter, splices: List[Tuple[int, int, bytes]], size: int):
+    """Stream base bytes to the writer, substituting each spliced range"""
+    pos = 0
+    for start, end, data in splices:
+        _copy_range(src, writer, start - pos)
+        writer.write(data)
+        src.seek(end)
+        pos = end
+    _copy_range(src, writer, size - pos)
+
+def _apply_unified_diff(src, writer: _HashingWriter, diff: str):
+    """
+    Stream base lines to the writer while applying unified diff hunks
+    
+    Context and removed lines must match the base exactly (ignoring line
+    terminators); added lines take the base file's line ending.
+    """
+    lines = diff.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    
+    # Added lines follow the line ending of the file's first line
+    start = src.tell()
+    newline = b"\r\n" if src.readline().endswith(b"\r\n") else b"\n"
+    src.seek(start)
+    
+    base_line = 0        # 0-based index of the next unread base line
+    i = 0
+    hunks = 0
+    
+    def next_base() -> bytes:
+        nonlocal base_line
+        line = src.readline()
+        if not line:
+            raise PatchError(f"Hunk extends past end of file at line {base_line + 1}")
+        base_line += 1
+        return line
+    
+    def strip_eol(line: bytes) -> bytes:
+        return line[:-2] if line.endswith(b"\r\n") else line.rstrip(b"\n")
+    
+    while i < len(lines):
+        header = HUNK_HEADER_PATTERN.match(lines[i])
+        if not header:
+            if hunks == 0 and not lines[i].startswith("@@"):
+                i += 1  # "---"/"+++" file headers and any preamble
+                continue
+            raise PatchError(f"Malformed hunk header: {lines[i][:80]}")
+        hunks += 1
+        old_start = int(header.group(1))
+        # "-0,0" inserts before the first line; otherwise start is 1-based
+        target = old_start - 1 if header.group(2) != "0" else old_start
+        if target < base_line:
+            raise PatchError("Hunks overlap or are out of order")
+        while base_line < target:
+            writer.write(next_base())
+        i += 1
+        
+        while i < len(lines) and not lines[i].startswith("@@"):
+            line = lines[i]
+            tag, text = line[:1], line[1:].encode("utf-8")
+            if tag in (" ", "-"):
+                base = next_base()
+                if strip_eol(base) != text:
+                    raise PatchError(f"Patch does not apply at line {base_line}")
+                if tag == " ":
+                    writer.write(base)
+            elif tag == "+":
+                no_eol = i + 1 < len(lines) and lines[i + 1].startswith("\\")
+                writer.write(text if no_eol else text + newline)
+            elif tag == "\\":
+                pass  # "\ No newline at end of file" handled with the line before it
+            elif line == "":
+                # Some editors strip the leading space of empty context lines
+                base = next_base()
+                if strip_eol(base) != b"":
+                    raise PatchError(f"Patch does not apply at line {base_line}")
+                writer.write(base)
+            else:
+                raise PatchError(f"Unexpected diff line: {line[:80]}")
+            i += 1
+    
+    if hunks == 0:
+        raise PatchError("No hunks in diff")
+    
+    # Remainder of the file after the last hunk
+    for chunk in iter(lambda: src.read(STREAM_CHUNK_SIZE), b""):
+        writer.write(chunk)
+
+@log_performance
+def patch_file(path: str, base_hash: str, splices: Optional[List[Dict[str, Any]]] = None,
+               diff: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Apply an incremental edit to a file and replace it atomically
+    
+    The base file is streamed into the temp file with the edits applied, so
+    only the changed regions travel over the wire and nothing is held in
+    memory beyond one chunk.
+    
+    Args:
+        path: File path to patch
+        base_hash: SHA-256 of the contents the edit was made against
+        splices: Byte-range replacements, each {"start", "end", "data"} or
+            {"start", "end", "data_b64"}, offsets into the base contents
+        diff: Unified diff against the base contents
+    
+    Returns:
+        Dictionary containing operation status and the new SHA-256
+    """
+    logger.debug(f"Patching file: {path}")
+    
+    try:
+        abs_path, error = _resolve_readable_file(path)
+        if error:
+            return error
+        if not base_hash:
+            return {"error": "base_hash is required for patches", "path": str(abs_path)}
+        if (splices is None) == (diff is None):
+            return {"error": "Provide exactly one of splices or diff", "path": str(abs_path)}
+        
+        with _path_lock(abs_path):
+            _check_base_hash(abs_path, base_hash)
+            with open(abs_path, "rb") as src:
+                size = os.fstat(src.fileno()).st_size
+                if splices is not None:
+                    edits = _normalize_splices(splices, size)
+                    produce = lambda w: _apply_splices(src, w, edits, size)
+                    payload = sum(len(data) for _, _, data in edits)
+                else:
+                    produce = lambda w: _apply_unified_diff(src, w, diff)
+                    payload = len(diff)
+                written_size, digest = _atomic_write(abs_path, produce)
+        
+        logger.info(f"Successfully patched file: {abs_path}", extra={
+            "path": str(abs_path),
+            "size": written_size,
+            "mode": "splices" if splices is not None else "diff",
+            "payload_bytes": payload
+        })
+        
+        return {
+            "status": "success",
+            "path": str(abs_path),
+            "size": written_size,
+            "sha256": digest
+        }
+    
+    except WriteConflict as e:
+        logger.warning(f"Patch conflict on {path}: file changed since it was read")
+        return {"error": "File changed since it was read", "path": path, "sha256": e.args[0], "conflict": True}
+    except PatchError as e:
+        logger.warning(f"Rejected patch for {path}: {e}")
+        return {"error": f"Patch failed: {e}", "path": path}
+    except Exception as e:
+        logger.error(f"Error patching file {path}", exc_info=True, extra={
+            "path": path,
+            "error_type": type(e).__name__
+        })
+        return {"error": f"Failed to patch file: {str(e)}"}
+
 @log_performance
 def delete_file(path: str) -> Dict[str, Any]:
     """
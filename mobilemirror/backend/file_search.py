@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror File Search Module
+================================
+
+Recursive filename and content search for the mobile file browser, so a
+file deep in a large repository can be found in one request instead of
+walking /files a directory at a time.
+
+Features:
+- Filename glob matching (against the name, or the relative path if the
+  glob contains "/")
+- Content regex search of text files in a shared worker pool
+- Results streamed as NDJSON while they are found
+- .gitignore rules honoured at every level; .git is never entered
+- Cancellation as soon as the client disconnects
+- Completed results cached per (root, query) and invalidated by inotify
+  on any directory the search walked; each directory is watched before it
+  is scanned, so a change made while the search runs is not missed
+
+Result Lines:
+- {"type": "file", "path": ...}                              glob-only hits
+- {"type": "match", "path": ..., "line": n, "column": c, "text": ...}
+- {"type": "done", "files_scanned": n, "results": n, "truncated": bool,
+   "cached": bool, "elapsed_ms": n}
+- {"type": "error", "error": ...}                            server too busy
+
+Security Considerations:
+- Root is resolved and must be a readable directory
+- Result count, per-file matches and searched file size are bounded
+- Binary files are skipped
+"""
+
+import asyncio
+import fnmatch
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Pattern, Set, Tuple
+
+from .utils.executors import PoolSaturated, run_blocking
+from .utils.fs_watch import get_watcher
+from .utils.logger import get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+SEARCH_WORKERS = min(8, (os.cpu_count() or 2))
+MAX_RESULTS = 5000
+MAX_MATCHES_PER_FILE = 100
+MAX_GREP_FILE_SIZE = 20 * 1024 * 1024
+MAX_LINE_PREVIEW = 300
+MAX_QUERY_LENGTH = 1000
+BINARY_SNIFF_SIZE = 8192
+SEARCH_CACHE_SIZE = 32
+SEARCH_CACHE_TTL = 10        # Seconds; only for results inotify could not fully watch
+ALWAYS_SKIPPED = {".git"}
+
+_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="file-search")
+
+class GitIgnore:
+    """Rules from one .gitignore, matched against paths relative to its directory"""
+    
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple[Pattern, bool, bool]] = []  # (regex, negated, dir_only)
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this directory
+            anchored = "/" in line
+            line = line.lstrip("/")
+            regex = _translate_gitignore(line)
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            self.rules.append((re.compile(f"^{regex}$"), negated, dir_only))
+    
+    @classmethod
+    def load(cls, directory: str) -> Optional["GitIgnore"]:
+        try:
+            with open(os.path.join(directory, ".gitignore"), encoding="utf-8", errors="replace") as f:
+                rules = cls(f.readlines())
+        except OSError:
+            return None
+        return rules if rules.rules else None
+    
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True/False if a rule decides, None if no rule matches"""
+        result = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negated
+        return result
+
+def _translate_gitignore(pattern: str) -> str:
+    """Translate one gitignore glob to a regex fragment"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end < 0:
+                out.append(re.escape("["))
+                i += 1
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+def _is_ignored(ignores: List[Tuple[str, GitIgnore]], path: str, is_dir: bool) -> bool:
+    """Apply .gitignore files from the root down; deeper files take precedence"""
+    ignored = False
+    for base, rules in ignores:
+        decision = rules.match(os.path.relpath(path, base).replace(os.sep, "/"), is_dir)
+        if decision is not None:
+            ignored = decision
+    return ignored
+
+class SearchQuery:
+    """Validated search parameters; also the cache key"""
+    
+    def __init__(self, root: str, glob: Optional[str], query: Optional[str],
+                 regex: bool, case_sensitive: bool, max_results: int, respect_gitignore: bool):
+        self.root = root
+        self.glob = glob or None
+        self.query = query or None
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        self.max_results = max_results
+        self.respect_gitignore = respect_gitignore
+        
+        flags = 0 if case_sensitive else re.IGNORECASE
+        self.name_matcher: Optional[Callable[[str], Any]] = None
+        self.glob_on_path = bool(self.glob and "/" in self.glob)
+        if self.glob:
+            self.name_matcher = re.compile(fnmatch.translate(self.glob), flags).match
+        self.content_pattern: Optional[Pattern] = None
+        if self.query:
+            source = self.query if regex else re.escape(self.query)
+            self.content_pattern = re.compile(source.encode("utf-8"), flags)
+    
+    @property
+    def key(self) -> Tuple:
+        return (self.root, self.glob, self.query, self.regex, self.case_sensitive,
+                self.max_results, self.respect_gitignore)
+
+class CachedSearch:
+    """Completed result lines of one search and the directories they depend on"""
+    
+    def __init__(self, lines: List[bytes], directories: Set[str], watched: bool,
+                 files_scanned: int, truncated: bool):
+        self.lines = lines
+        self.directories = directories
+        self.watched = watched
+        self.files_scanned = files_scanned
+        self.truncated = truncated
+        self.created = time.monotonic()
+
+_cache: "OrderedDict[Tuple, CachedSearch]" = OrderedDict()
+_dir_keys: Dict[str, Set[Tuple]] = {}   # Watched directory -> cache keys depending on it
+_cache_lock = threading.Lock()
+
+def _on_tree_change(path: str, name: str, mask: int):
+    """inotify callback: drop every cached search that walked this directory"""
+    with _cache_lock:
+        keys = list(_dir_keys.get(path, ()))
+    for key in keys:
+        _drop_cached(key)
+
+def _drop_cached(key: Tuple):
+    with _cache_lock:
+        entry = _cache.pop(key, None)
+        if entry is None:
+            return
+        released = []
+        for directory in entry.directories:
+            keys = _dir_keys.get(directory)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del _dir_keys[directory]
+                released.append(directory)
+    watcher = get_watcher()
+    for directory in released:
+        watcher.unwatch(directory, _on_tree_change)
+
+def invalidate_search_cache():
+    """Drop all cached search results"""
+    with _cache_lock:
+        keys = list(_cache)
+    for key in keys:
+        _drop_cached(key)
+
+def _get_cached(key: Tuple) -> Optional[CachedSearch]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if entry.watched or time.monotonic() - entry.created < SEARCH_CACHE_TTL:
+            _cache.move_to_end(key)
+            return entry
+    _drop_cached(key)
+    return None
+
+def _store_cached(key: Tuple, lines: List[bytes], job: "SearchJob"):
+    """
+    Cache completed results
+    
+    Takes over the watches the job held during its walk. Results are not
+    cached if anything changed mid-walk, and expire after SEARCH_CACHE_TTL if
+    the watch budget ran out before every directory was watched.
+    """
+    if job.changed:
+        return
+    watcher = get_watcher()
+    watched = [] if job.watch_failed else job.watched
+    with _cache_lock:
+        _cache[key] = CachedSearch(lines, set(watched), not job.watch_failed,
+                                   job.files_scanned, job.truncated)
+        for directory in watched:
+            keys = _dir_keys.setdefault(directory, set())
+            if not keys:
+                # The job's watch keeps the kernel watch alive, so this cannot fail
+                watcher.watch(directory, _on_tree_change)
+            keys.add(key)
+        evicted = list(_cache)[:max(0, len(_cache) - SEARCH_CACHE_SIZE)]
+    job.release_watches()
+    if job.changed:
+        evicted.append(key)  # Changed before the cache's own watches were in place
+    for old in evicted:
+        _drop_cached(old)
+
+get_watcher().on_overflow(invalidate_search_cache)
+
+class SearchJob:
+    """One running search; results are handed to ``emit`` from worker threads"""
+    
+    def __init__(self, query: SearchQuery, emit: Callable[[Dict[str, Any]], None]):
+        self.query = query
+        self.emit = emit
+        self.cancelled = threading.Event()
+        self.files_scanned = 0
+        self.results = 0
+        self.truncated = False
+        self.watched: List[str] = []
+        self.watch_failed = False
+        self.changed = False
+        self._lock = threading.Lock()
+    
+    def _on_change(self, path: str, name: str, mask: int):
+        """inotify callback for directories walked so far"""
+        self.changed = True
+    
+    def _watch(self, directory: str):
+        """Watch a directory before scanning it; give up on watching once the budget runs out"""
+        if self.watch_failed:
+            return
+        if get_watcher().watch(directory, self._on_change):
+            with self._lock:
+                self.watched.append(directory)
+        else:
+            self.watch_failed = True
+            self.release_watches()
+    
+    def release_watches(self):
+        """Drop the watches taken during the walk"""
+        with self._lock:
+            watched, self.watched = self.watched, []
+        watcher = get_watcher()
+        for directory in watched:
+            watcher.unwatch(directory, self._on_change)
+    
+    def _add_result(self, result: Dict[str, Any]) -> bool:
+        """Emit one result; False once the result limit is reached"""
+        with self._lock:
+            if self.results >= self.query.max_results:
+                self.truncated = True
+                self.cancelled.set()
+                return False
+            self.results += 1
+        self.emit(result)
+        return True
+    
+    def walk(self):
+        """Yield (absolute path, relative path) of candidate files, pruning ignored trees"""
+        root = self.query.root
+        stack: List[Tuple[str, List[Tuple[str, GitIgnore]]]] = [(root, [])]
+        while stack and not self.cancelled.is_set():
+            directory, ignores = stack.pop()
+            self._watch(directory)
+            if self.query.respect_gitignore:
+                rules = GitIgnore.load(directory)
+                if rules:
+                    ignores = ignores + [(directory, rules)]
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if is_dir and entry.name in ALWAYS_SKIPPED:
+                    continue
+                if ignores and _is_ignored(ignores, entry.path, is_dir):
+                    continue
+                if is_dir:
+                    subdirs.append(entry.path)
+                else:
+                    yield entry.path, os.path.relpath(entry.path, root)
+            # Reverse so directories are visited in name order
+            stack.extend((d, ignores) for d in sorted(subdirs, reverse=True))
+    
+    def grep(self, path: str, rel_path: str):
+        """Search one file's contents, emitting match lines"""
+        if self.cancelled.is_set():
+            return
+        try:
+            if os.stat(path).st_size > MAX_GREP_FILE_SIZE:
+                return
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        if b"\0" in data[:BINARY_SNIFF_SIZE]:
+            return
+        with self._lock:
+            self.files_scanned += 1
+        
+        matches = 0
+        for match in self.query.content_pattern.finditer(data):
+            if self.cancelled.is_set() or matches >= MAX_MATCHES_PER_FILE:
+                return
+            line_start = data.rfind(b"\n", 0, match.start()) + 1
+            line_end = data.find(b"\n", match.start())
+            if line_end < 0:
+                line_end = len(data)
+            text = data[line_start:line_end][:MAX_LINE_PREVIEW].decode("utf-8", errors="replace")
+            if not self._add_result({
+                "type": "match",
+                "path": rel_path,
+                "line": data.count(b"\n", 0, line_start) + 1,
+                "column": match.start() - line_start + 1,
+                "text": text.rstrip("\r")
+            }):
+                return
+            matches += 1
+    
+    def run(self):
+        """Walk the tree, matching names inline and fanning content searches out to the pool"""
+        query = self.query
+        in_flight = set()
+        limit = SEARCH_WORKERS * 4
+        try:
+            for path, rel_path in self.walk():
+                if query.name_matcher:
+                    target = rel_path.replace(os.sep, "/") if query.glob_on_path else os.path.basename(path)
+                    if not query.name_matcher(target):
+                        continue
+                if query.content_pattern is None:
+                    self.files_scanned += 1
+                    if not self._add_result({"type": "file", "path": rel_path}):
+                        break
+                    continue
+                if len(in_flight) >= limit:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                in_flight.add(_pool.submit(self.grep, path, rel_path))
+            wait(in_flight)
+        except Exception:
+            self.cancelled.set()
+            raise
+
+def prepare_search(root: str, glob: Optional[str] = None, query: Optional[str] = None,
+                   regex: bool = True, case_sensitive: bool = False,
+                   max_results: int = MAX_RESULTS, respect_gitignore: bool = True) -> Dict[str, Any]:
+    """
+    Validate search parameters
+    
+    Args:
+        root: Directory to search under
+        glob: Filename glob
+        query: Content pattern (regex unless ``regex`` is False)
+        regex: Treat ``query`` as a regular expression
+        case_sensitive: Match case exactly
+        max_results: Stop after this many results
+        respect_gitignore: Skip paths ignored by .gitignore files
+    
+    Returns:
+        Dictionary with "query" (a SearchQuery) or an "error" key
+    """
+    abs_root = Path(root).expanduser().resolve()
+    if not abs_root.is_dir():
+        return {"error": "Root is not a directory", "path": str(abs_root)}
+    if not os.access(abs_root, os.R_OK | os.X_OK):
+        return {"error": "Permission denied", "path": str(abs_root)}
+    if not glob and not query:
+        return {"error": "Provide a glob, a query, or both"}
+    if len(glob or "") > MAX_QUERY_LENGTH or len(query or "") > MAX_QUERY_LENGTH:
+        return {"error": "Query too long"}
+    
+    try:
+        search = SearchQuery(str(abs_root), glob, query, regex, case_sensitive,
+                             max(1, min(int(max_results), MAX_RESULTS)), respect_gitignore)
+    except re.error as e:
+        return {"error": f"Invalid pattern: {e}"}
+    return {"status": "success", "query": search}
+
+def _encode(result: Dict[str, Any]) -> bytes:
+    return json.dumps(result, separators=(",", ":")).encode("utf-8") + b"\n"
+
+async def stream_search(query: SearchQuery) -> AsyncIterator[bytes]:
+    """
+    Run a search and yield NDJSON lines as results arrive
+    
+    Closing the iterator (e.g. on client disconnect) cancels the search.
+    
+    Args:
+        query: Validated query from prepare_search
+    """
+    started = time.monotonic()
+    cached = _get_cached(query.key)
+    if cached is not None:
+        for line in cached.lines:
+            yield line
+        yield _encode({
+            "type": "done",
+            "files_scanned": cached.files_scanned,
+            "results": len(cached.lines),
+            "truncated": cached.truncated,
+            "cached": True,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1)
+        })
+        return
+    
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    job = SearchJob(query, lambda result: loop.call_soon_threadsafe(queue.put_nowait, _encode(result)))
+    
+    logger.info("Search started", extra={"root": query.root, "glob": query.glob, "query": query.query})
+    runner = asyncio.ensure_future(run_blocking("io", job.run))
+    # Results are queued from the worker before the runner completes, so this comes last
+    runner.add_done_callback(lambda _: queue.put_nowait(finished))
+    lines: List[bytes] = []
+    completed = False
+    try:
+        while True:
+            line = await queue.get()
+            if line is finished:
+                break
+            lines.append(line)
+            yield line
+        try:
+            await runner
+        except PoolSaturated:
+            yield _encode({"type": "error", "error": "Server busy, try again"})
+            return
+        completed = True
+    finally:
+        if not completed:
+            # Client went away: stop the walker and any queued greps
+            job.cancelled.set()
+            runner.add_done_callback(lambda _: job.release_watches())
+            logger.info("Search cancelled", extra={"root": query.root, "results": job.results})
+    
+    # Truncated results are still a deterministic answer for this query
+    try:
+        await run_blocking("io", _store_cached, query.key, lines, job)
+    except PoolSaturated:
+        pass  # Caching is an optimisation; the results were already sent
+    finally:
+        job.release_watches()
+    
+    elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+    logger.info("Search completed", extra={
+        "root": query.root,
+        "files_scanned": job.files_scanned,
+        "results": job.results,
+        "truncated": job.truncated,
+        "elapsed_ms": elapsed_ms
+    })
+    yield _encode({
+        "type": "done",
+        "files_scanned": job.files_scanned,
+        "results": job.results,
+        "truncated": job.truncated,
+        "cached": False,
+        "elapsed_ms": elapsed_ms
+    })
+
+def get_search_stats() -> Dict[str, Any]:
+    """Get search cache statistics"""
+    with _cache_lock:
+        return {
+            "cached_searches": len(_cache),
+            "watched_directories": len(_dir_keys),
+            "workers": SEARCH_WORKERS,
+            "watcher": get_watcher().get_stats()
+        }
\ No newline at end of file
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Input Stream Module
+=================================
+
+WebSocket input channel for mouse and keyboard events. A client
+authenticates once per connection and then streams compact events instead
+of issuing one HTTP POST per pointer movement.
+
+Features:
+- Single authentication per connection (first message, query or header)
+- Compact binary, msgpack or JSON event encodings
+- Absolute and relative moves, clicks, button press/release, scroll, keys
+- Motion coalesced server-side to INPUT_REFRESH_HZ; only the latest
+  pointer state is applied each frame
+- Discrete events (clicks, keys, scroll) keep their order relative to motion
+
+Binary Encoding (little-endian, several events may share one frame):
+- 0x01 move      uint16 x, uint16 y
+- 0x02 move_rel  int16 dx, int16 dy
+- 0x03 click     uint8 button
+- 0x04 down      uint8 button
+- 0x05 up        uint8 button
+- 0x06 scroll    int8 dx, int8 dy
+- 0x07 key       uint8 length, keysym (ASCII)
+- 0x08 key_down  uint8 length, keysym (ASCII)
+- 0x09 key_up    uint8 length, keysym (ASCII)
+
+Msgpack and JSON frames carry an event dict or a list of event dicts in
+the same shape accepted by mouse_input.send_input_events.
+
+Security Considerations:
+- Connections are closed with code 4003 unless the token verifies
+- Events are validated and rate limited by mouse_input
+"""
+
+import asyncio
+import json
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+from fastapi import WebSocket, WebSocketDisconnect
+from .mouse_input import send_input_events
+from .utils.auth import authenticate_websocket
+from .utils.executors import PoolSaturated, run_blocking
+from .utils.logger import get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+INPUT_REFRESH_HZ = 60      # Motion is applied at most this often
+AUTH_TIMEOUT = 10          # Seconds to wait for the auth message
+MAX_FRAME_EVENTS = 256
+
+# Binary opcodes -> (event type, struct format of the fixed-size payload)
+BINARY_OPCODES = {
+    0x01: ("move", struct.Struct("<HH")),
+    0x02: ("move_rel", struct.Struct("<hh")),
+    0x03: ("click", struct.Struct("<B")),
+    0x04: ("down", struct.Struct("<B")),
+    0x05: ("up", struct.Struct("<B")),
+    0x06: ("scroll", struct.Struct("<bb")),
+    0x07: ("key", None),
+    0x08: ("key_down", None),
+    0x09: ("key_up", None),
+}
+
+class InputProtocolError(Exception):
+    """Raised for malformed input stream frames"""
+    pass
+
+def decode_binary_frame(frame: bytes) -> List[Dict[str, Any]]:
+    """
+    Decode a binary frame into input events
+    
+    Args:
+        frame: Concatenated opcode-prefixed events
+    
+    Returns:
+        List of event dicts
+    """
+    events = []
+    pos = 0
+    while pos < len(frame):
+        if len(events) >= MAX_FRAME_EVENTS:
+            raise InputProtocolError("Too many events in frame")
+        opcode = frame[pos]
+        pos += 1
+        if opcode not in BINARY_OPCODES:
+            raise InputProtocolError(f"Unknown opcode: {opcode:#04x}")
+        kind, layout = BINARY_OPCODES[opcode]
+        
+        if layout is None:
+            if pos >= len(frame):
+                raise InputProtocolError("Truncated key event")
+            length = frame[pos]
+            keysym = frame[pos + 1:pos + 1 + length]
+            if len(keysym) != length:
+                raise InputProtocolError("Truncated key event")
+            pos += 1 + length
+            events.append({"type": kind, "keysym": keysym.decode("ascii", errors="replace")})
+            continue
+        
+        if pos + layout.size > len(frame):
+            raise InputProtocolError(f"Truncated {kind} event")
+        values = layout.unpack_from(frame, pos)
+        pos += layout.size
+        if kind == "move":
+            events.append({"type": kind, "x": values[0], "y": values[1]})
+        elif kind in ("move_rel", "scroll"):
+            events.append({"type": kind, "dx": values[0], "dy": values[1]})
+        else:
+            events.append({"type": kind, "button": values[0]})
+    return events
+
+def _as_event_list(payload: Any) -> List[Dict[str, Any]]:
+    """Normalise a decoded msgpack/JSON payload to a list of event dicts"""
+    if isinstance(payload, dict):
+        payload = payload.get("events", [payload])
+    if not isinstance(payload, list) or not all(isinstance(e, dict) for e in payload):
+        raise InputProtocolError("Expected an event object or a list of events")
+    if len(payload) > MAX_FRAME_EVENTS:
+        raise InputProtocolError("Too many events in frame")
+    return payload
+
+class InputCoalescer:
+    """Collects events between frames, keeping only the latest pointer motion
+    
+    An absolute move replaces any motion pending before it; relative moves
+    after it are summed. Discrete events flush the pending motion first so
+    a click always lands where the pointer was when it was sent.
+    """
+    
+    def __init__(self):
+        self._events: List[Dict[str, Any]] = []
+        self._abs: Optional[Tuple[int, int]] = None
+        self._rel = [0, 0]
+        self.received = 0
+        self.coalesced = 0
+    
+    def add(self, event: Dict[str, Any]):
+        self.received += 1
+        kind = event.get("type")
+        if kind == "move":
+            if self._abs is not None or self._rel != [0, 0]:
+                self.coalesced += 1
+            self._abs = (event.get("x"), event.get("y"))
+            self._rel = [0, 0]
+        elif kind == "move_rel":
+            if self._rel != [0, 0]:
+                self.coalesced += 1
+            self._rel[0] += int(event.get("dx", 0))
+            self._rel[1] += int(event.get("dy", 0))
+        else:
+            self._flush_motion()
+            self._events.append(event)
+    
+    def _flush_motion(self):
+        if self._abs is not None:
+            self._events.append({"type": "move", "x": self._abs[0], "y": self._abs[1]})
+        if self._rel != [0, 0]:
+            self._events.append({"type": "move_rel", "dx": self._rel[0], "dy": self._rel[1]})
+        self._abs = None
+        self._rel = [0, 0]
+    
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return everything pending in order and reset"""
+        self._flush_motion()
+        events, self._events = self._events, []
+        return events
+
+class InputStream:
+    """One authenticated /input connection"""
+    
+    def __init__(self, websocket: WebSocket, encoding: str = "binary"):
+        self.websocket = websocket
+        self.encoding = encoding
+        self.coalescer = InputCoalescer()
+        self.batches_applied = 0
+        self.errors = 0
+        self._pending = asyncio.Event()
+    
+    def decode(self, message: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Decode one WebSocket message according to the negotiated encoding"""
+        if message.get("text") is not None:
+            return _as_event_list(json.loads(message["text"]))
+        data = message.get("bytes") or b""
+        if self.encoding == "msgpack":
+            return _as_event_list(msgpack.unpackb(data, raw=False))
+        return decode_binary_frame(data)
+    
+    async def receive_loop(self):
+        """Read frames and queue their events for the next flush"""
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                for event in self.decode(message):
+                    self.coalescer.add(event)
+            except (InputProtocolError, ValueError, TypeError) as e:
+                self.errors += 1
+                logger.warning(f"Invalid input frame: {e}")
+                await self._report_error(str(e))
+                continue
+            self._pending.set()
+    
+    async def flush_loop(self):
+        """Apply pending events at most INPUT_REFRESH_HZ times per second"""
+        interval = 1.0 / INPUT_REFRESH_HZ
+        while True:
+            # Idle connections cost nothing until an event arrives
+            await self._pending.wait()
+            started = time.monotonic()
+            self._pending.clear()
+            
+            events = self.coalescer.drain()
+            if events:
+                try:
+                    result = await run_blocking("input", send_input_events, events)
+                except PoolSaturated as e:
+                    result = {"status": "error", "error": str(e)}
+                self.batches_applied += 1
+                if result.get("status") != "success":
+                    self.errors += 1
+                    await self._report_error(result.get("error", "Input failed"))
+            
+            # Wait out the rest of the frame so motion arriving meanwhile is coalesced
+            remaining = interval - (time.monotonic() - started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+    
+    async def _report_error(self, error: str):
+        try:
+            await self.websocket.send_text(json.dumps({"type": "error", "error": error}))
+        except Exception:
+            pass
+
+async def handle_input(websocket: WebSocket):
+    """
+    Handle a new /input WebSocket connection
+    
+    Args:
+        websocket: WebSocket connection from client
+    """
+    encoding = websocket.query_params.get("encoding", "binary")
+    if encoding == "msgpack" and not MSGPACK_AVAILABLE:
+        encoding = "binary"
+    
+    await websocket.accept()
+    
+    if not await authenticate_websocket(websocket, AUTH_TIMEOUT):
+        logger.warning("Unauthorized input stream connection")
+        await websocket.close(code=4003)
+        return
+    
+    await websocket.send_text(json.dumps({
+        "type": "ready",
+        "encoding": encoding,
+        "refresh_hz": INPUT_REFRESH_HZ
+    }))
+    logger.info("Input stream connected", extra={"encoding": encoding})
+    
+    stream = InputStream(websocket, encoding)
+    tasks = [
+        asyncio.ensure_future(stream.receive_loop()),
+        asyncio.ensure_future(stream.flush_loop())
+    ]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Apply anything still pending, e.g. the release of a drag
+        remaining = stream.coalescer.drain()
+        if remaining:
+            try:
+                await run_blocking("input", send_input_events, remaining)
+            except PoolSaturated:
+                logger.warning("Dropped final input batch: input pool saturated")
+        
+        logger.info("Input stream disconnected", extra={
+            "events_received": stream.coalescer.received,
+            "motion_coalesced": stream.coalescer.coalesced,
+            "batches_applied": stream.batches_applied,
+            "errors": stream.errors
+        })
\ No newline at end of file
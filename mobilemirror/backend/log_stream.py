@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Log Stream Module
+===============================
+
+Recent log lines and live tail-follow of mobilemirror.log for the /log
+endpoints, without ever loading the (up to 10 MB) log file into memory.
+
+Features:
+- Last N records read backwards from the end of the file in fixed blocks
+- Follow mode that starts at the end of the file and wakes on inotify
+  events for the log directory (polling when inotify is unavailable)
+- Rotation detected by inode: the old file is drained, then the new one is
+  read from its start; truncation rewinds to the beginning
+- Server-side filtering by minimum level and by logger (module) subtree
+- Server-Sent Events output with periodic keepalive comments
+
+Security Considerations:
+- Only the mobilemirror log file is ever opened; callers cannot pass paths
+- Backlog size, scanned bytes and line length are bounded
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from .utils.executors import PoolSaturated, run_blocking
+from .utils.fs_watch import get_watcher
+from .utils.logger import LOG_DIR, _qualified_name, get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+LOG_FILE = LOG_DIR / "mobilemirror.log"
+DEFAULT_LINES = 50
+MAX_LINES = 5000
+READ_BLOCK_SIZE = 64 * 1024
+MAX_SCAN_BYTES = 16 * 1024 * 1024   # Backwards scans stop here even if filters matched little
+MAX_LINE_LENGTH = 64 * 1024         # Longer partial lines are emitted as they are
+POLL_INTERVAL = 1.0                 # Seconds between checks when inotify is unavailable
+KEEPALIVE_INTERVAL = 15.0
+
+# "[2024-01-01 12:00:00] [mobilemirror.app] [INFO] message" (text format)
+TEXT_RECORD_PATTERN = re.compile(rb"^\[[^\]]*\] \[([^\]]+)\] \[([A-Z]+)\] ")
+
+class LogFilter:
+    """Minimum level and logger subtree a record must match"""
+    
+    def __init__(self, level: Optional[str] = None, module: Optional[str] = None):
+        self.min_level: Optional[int] = None
+        if level:
+            value = logging.getLevelName(level.upper())
+            if not isinstance(value, int):
+                raise ValueError(f"Unknown log level: {level}")
+            self.min_level = value
+        self.module = _qualified_name(module) if module else None
+    
+    @property
+    def active(self) -> bool:
+        return self.min_level is not None or self.module is not None
+    
+    @staticmethod
+    def parse(line: bytes) -> Optional[Tuple[str, str]]:
+        """
+        Extract (level, logger name) from a record's first line
+        
+        Returns:
+            None for lines that do not start a record (e.g. traceback lines)
+        """
+        if line.startswith(b"{"):
+            try:
+                record = json.loads(line)
+                return str(record["level"]), str(record["module"])
+            except (ValueError, KeyError, TypeError):
+                return None
+        match = TEXT_RECORD_PATTERN.match(line)
+        if match:
+            return match.group(2).decode("ascii"), match.group(1).decode("utf-8", "replace")
+        return None
+    
+    def matches(self, level: str, name: str) -> bool:
+        if self.min_level is not None:
+            value = logging.getLevelName(level)
+            if not isinstance(value, int) or value < self.min_level:
+                return False
+        if self.module is not None:
+            return name == self.module or name.startswith(self.module + ".")
+        return True
+
+def _read_last_records(f: BinaryIO, end: int, count: int,
+                       log_filter: LogFilter) -> List[bytes]:
+    """
+    Read the last ``count`` matching records before ``end``, one block at a time
+    
+    Lines that do not start a record are kept with the record above them.
+    
+    Returns:
+        Lines in file order, without trailing newlines
+    """
+    records: List[List[bytes]] = []
+    continuation: List[bytes] = []
+    remainder = b""
+    position = end
+    
+    while position > 0 and len(records) < count and end - position < MAX_SCAN_BYTES:
+        size = min(READ_BLOCK_SIZE, position)
+        position -= size
+        f.seek(position)
+        block = f.read(size) + remainder
+        lines = block.split(b"\n")
+        # The first piece may be the tail of a line that starts in an earlier block
+        remainder = lines.pop(0) if position > 0 else b""
+        
+        for line in reversed(lines):
+            if not line:
+                continue
+            parsed = log_filter.parse(line)
+            if parsed is None:
+                continuation.append(line)
+                continue
+            if log_filter.matches(*parsed):
+                records.append([line] + continuation[::-1])
+                if len(records) >= count:
+                    break
+            continuation = []
+    
+    # Lines above the first record in the file can only be shown unfiltered
+    if len(records) < count and continuation and not log_filter.active and position == 0:
+        records.append(continuation[::-1])
+    
+    return [line for record in reversed(records) for line in record]
+
+def read_recent_logs(lines: int = DEFAULT_LINES, level: Optional[str] = None,
+                     module: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get the most recent log records
+    
+    Args:
+        lines: Number of records to return
+        level: Minimum level name (e.g. "WARNING")
+        module: Logger name or prefix, with or without the "mobilemirror." root
+    
+    Returns:
+        Dictionary with the log text and line count, or an "error" key
+    """
+    try:
+        log_filter = LogFilter(level, module)
+    except ValueError as e:
+        return {"error": str(e)}
+    count = max(1, min(int(lines), MAX_LINES))
+    
+    try:
+        with open(LOG_FILE, "rb") as f:
+            end = os.fstat(f.fileno()).st_size
+            found = _read_last_records(f, end, count, log_filter)
+    except FileNotFoundError:
+        found = []
+    
+    return {
+        "status": "success",
+        "log": "\n".join(line.decode("utf-8", "replace") for line in found),
+        "lines": len(found)
+    }
+
+def prepare_log_follow(backlog: int = 0, level: Optional[str] = None,
+                       module: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Validate tail-follow parameters
+    
+    Args:
+        backlog: Recent records to send before following
+        level: Minimum level name
+        module: Logger name or prefix
+    
+    Returns:
+        Dictionary with "filter" (a LogFilter) and "backlog", or an "error" key
+    """
+    try:
+        log_filter = LogFilter(level, module)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"status": "success", "filter": log_filter,
+            "backlog": max(0, min(int(backlog), MAX_LINES))}
+
+def _sse(line: bytes) -> bytes:
+    return b"data: " + line.replace(b"\r", b"") + b"\n\n"
+
+class LogFollower:
+    """Incremental reader of the log file that survives rotation and truncation"""
+    
+    def __init__(self, path: Path, log_filter: LogFilter):
+        self.path = path
+        self.filter = log_filter
+        self._file: Optional[BinaryIO] = None
+        self._inode: Optional[int] = None
+        self._partial = b""
+        self._showing = not log_filter.active  # Whether continuation lines are shown
+        self.rotations = 0
+    
+    def open(self, backlog: int = 0) -> List[bytes]:
+        """Position at the end of the file, returning up to ``backlog`` recent lines"""
+        recent: List[bytes] = []
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            return recent
+        stat = os.fstat(self._file.fileno())
+        self._inode = stat.st_ino
+        if backlog:
+            recent = _read_last_records(self._file, stat.st_size, backlog, self.filter)
+        self._file.seek(stat.st_size)
+        return recent
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def read_new(self) -> List[bytes]:
+        """Return complete, matching lines appended since the last call"""
+        lines: List[bytes] = []
+        while True:
+            if self._file is not None:
+                chunk = self._file.read(READ_BLOCK_SIZE)
+                if chunk:
+                    self._collect(chunk, lines)
+                    continue
+            if not self._check_replaced():
+                return lines
+    
+    def _check_replaced(self) -> bool:
+        """Handle rotation or truncation at EOF; True if there is more to read"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False  # Mid-rotation; the new file appears shortly
+        
+        if self._file is None or stat.st_ino != self._inode:
+            # Rotated: everything in the old file has been read, continue in the new one
+            if self._file is not None:
+                self.rotations += 1
+                self._file.close()
+            self._file = open(self.path, "rb")
+            self._inode = os.fstat(self._file.fileno()).st_ino
+            self._partial = b""
+            return True
+        if stat.st_size < self._file.tell():
+            self._file.seek(0)
+            self._partial = b""
+            return True
+        return False
+    
+    def _collect(self, chunk: bytes, lines: List[bytes]):
+        pieces = (self._partial + chunk).split(b"\n")
+        self._partial = pieces.pop()
+        if len(self._partial) > MAX_LINE_LENGTH:
+            pieces.append(self._partial)
+            self._partial = b""
+        for line in pieces:
+            if not line:
+                continue
+            parsed = self.filter.parse(line)
+            if parsed is not None:
+                self._showing = self.filter.matches(*parsed)
+            if self._showing:
+                lines.append(line)
+
+async def stream_log(log_filter: LogFilter, backlog: int = 0) -> AsyncIterator[bytes]:
+    """
+    Follow the log file, yielding Server-Sent Events
+    
+    Each log line is one ``data:`` event. Closing the iterator (e.g. on
+    client disconnect) removes the inotify subscription.
+    
+    Args:
+        log_filter: Filter from prepare_log_follow
+        backlog: Recent matching records to send first
+    """
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+    log_dir, log_name = str(LOG_FILE.parent), LOG_FILE.name
+    
+    def on_change(directory: str, name: str, mask: int):
+        if name in (log_name, ""):
+            loop.call_soon_threadsafe(changed.set)
+    
+    watcher = get_watcher()
+    watching = watcher.watch(log_dir, on_change)
+    follower = LogFollower(LOG_FILE, log_filter)
+    
+    try:
+        for line in await run_blocking("io", follower.open, backlog):
+            yield _sse(line)
+        yield b": following\n\n"
+        
+        last_sent = time.monotonic()
+        while True:
+            # Clear before reading so an append racing with the read still wakes us
+            changed.clear()
+            try:
+                lines = await run_blocking("io", follower.read_new)
+            except PoolSaturated:
+                lines = []  # Read again on the next wake-up
+            if lines:
+                yield b"".join(_sse(line) for line in lines)
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= KEEPALIVE_INTERVAL:
+                yield b": keepalive\n\n"
+                last_sent = time.monotonic()
+            
+            try:
+                await asyncio.wait_for(changed.wait(), KEEPALIVE_INTERVAL if watching else POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if watching:
+            watcher.unwatch(log_dir, on_change)
+        follower.close()
+        logger.debug("Log follow ended", extra={"rotations": follower.rotations})
@@ -4,133 +4,346 @@ Mobile Mirror Mouse Input Module
 ===============================
 
 Provides secure mouse input simulation for mobile-to-desktop control.
-Uses xdotool to translate mobile touch events into desktop mouse actions.
+Translates mobile touch events into desktop mouse actions through a
+long-lived input backend instead of one process per event.
 
 Features:
-- Mouse movement simulation
-- Click event simulation
+- Mouse movement simulation (absolute and relative)
+- Click, press/release and scroll event simulation
+- Keyboard key taps and press/release by X keysym name
+- Batched event arrays applied in one backend round-trip
 - Coordinate validation and bounds checking
 - Security controls to prevent abuse
 - Comprehensive logging and audit trail
 - Performance monitoring
 
+Input Backends:
+- XTestBackend: persistent python-xlib connection using the XTest extension;
+  screen geometry is cached and refreshed on RandR screen-change events
+- XdotoolBackend: fallback when python-xlib is unavailable; each batch is
+  chained into a single xdotool invocation
+
+The display is taken from MOBILEMIRROR_DISPLAY, then DISPLAY, then ":0".
+Tests can point it at a virtual framebuffer, e.g. ``Xvfb :99 &`` and
+``MOBILEMIRROR_DISPLAY=:99``.
+
 Security Considerations:
 - Input validation for coordinates
-- Rate limiting to prevent spam
+- Token-bucket rate limiting to prevent spam
 - Logging all mouse actions for audit
 - Bounds checking to prevent out-of-screen actions
 """
 
+import os
+import re
 import subprocess
+import threading
 import time
-from typing import Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+
+try:
+    from Xlib import X, XK, display as xdisplay
+    from Xlib.ext import randr, xtest
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
 
 from .utils.logger import get_logger, log_performance
+from .utils.metrics import Counter
 
 # Initialize module logger
 logger = get_logger(__name__)
 
 # Security and performance settings
-MAX_ACTIONS_PER_SECOND = 50
-MAX_ACTIONS_PER_MINUTE = 1000
-SCREEN_BOUNDS_CACHE_TTL = 30  # seconds
+MAX_ACTIONS_PER_SECOND = 120  # Sustained event rate (covers 60 Hz drags with clicks)
+MAX_ACTIONS_BURST = 240       # Bucket capacity for short bursts
+MAX_EVENTS_PER_BATCH = MAX_ACTIONS_BURST  # A full batch must fit in the bucket
+MAX_SCROLL_CLICKS = 50        # Per scroll event and axis
+SCREEN_BOUNDS_CACHE_TTL = 30  # seconds; only used by the xdotool fallback
+DEFAULT_SCREEN_BOUNDS = (1920, 1080)
+INPUT_DISPLAY = os.environ.get("MOBILEMIRROR_DISPLAY", os.environ.get("DISPLAY", ":0"))
 
-# Rate limiting tracking
-action_timestamps = []
-screen_bounds_cache = {"bounds": None, "timestamp": None}
+# Event types accepted by send_input_events
+EVENT_TYPES = ("move", "move_rel", "click", "down", "up", "scroll", "key", "key_down", "key_up")
+KEY_EVENT_TYPES = ("key", "key_down", "key_up")
+VALID_BUTTONS = (1, 2, 3)
+KEYSYM_PATTERN = re.compile(r"^[A-Za-z0-9_]{1,32}$")
+
+# Metrics
+INPUT_EVENTS = Counter(
+    "mobilemirror_input_events_total",
+    "Input events applied, by event type",
+    ["type"]
+)
+INPUT_BATCHES = Counter(
+    "mobilemirror_input_batches_total",
+    "Input batches submitted, by outcome",
+    ["status"]
+)
 
 class MouseInputError(Exception):
     """Custom exception for mouse input errors"""
     pass
 
-def get_screen_bounds() -> Tuple[int, int]:
+class TokenBucket:
+    """Token-bucket rate limiter: O(1) per check, no timestamp lists"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.rejected = 0
+        self._lock = threading.Lock()
+    
+    def consume(self, cost: float = 1) -> bool:
+        """Take ``cost`` tokens if available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return True
+            self.rejected += 1
+            return False
+
+# Rate limiting tracking
+rate_limiter = TokenBucket(MAX_ACTIONS_PER_SECOND, MAX_ACTIONS_BURST)
+
+class XTestBackend:
+    """Persistent X connection injecting events through the XTest extension"""
+    
+    name = "xtest"
+    
+    def __init__(self, display_name: str = INPUT_DISPLAY):
+        self.display_name = display_name
+        self._display = xdisplay.Display(display_name)
+        self._root = self._display.screen().root
+        self._bounds = self._read_geometry()
+        self._keycodes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        
+        try:
+            self._display.xrandr_select_input(self._root, randr.RRScreenChangeNotifyMask)
+            self._randr = True
+        except Exception:
+            logger.warning("RandR unavailable; screen geometry will not track resolution changes")
+            self._randr = False
+        
+        logger.info(f"XTest input backend connected to {display_name}", extra={
+            "screen": f"{self._bounds[0]}x{self._bounds[1]}"
+        })
+    
+    def _read_geometry(self) -> Tuple[int, int]:
+        screen = self._display.screen()
+        return (screen.width_in_pixels, screen.height_in_pixels)
+    
+    def _process_randr_events(self):
+        """Refresh cached geometry if a RandR screen change is queued"""
+        if not self._randr:
+            return
+        changed = False
+        while self._display.pending_events():
+            event = self._display.next_event()
+            if event.__class__.__name__ == "ScreenChangeNotify":
+                changed = True
+        if changed:
+            self._bounds = self._read_geometry()
+            logger.info(f"Screen geometry changed: {self._bounds[0]}x{self._bounds[1]}")
+    
+    def screen_bounds(self) -> Tuple[int, int]:
+        with self._lock:
+            self._process_randr_events()
+            return self._bounds
+    
+    def apply(self, events: List[Dict[str, Any]]):
+        """Inject a validated batch of events and flush once"""
+        with self._lock:
+            for event in events:
+                kind = event["type"]
+                if kind == "move":
+                    xtest.fake_input(self._display, X.MotionNotify, x=event["x"], y=event["y"])
+                elif kind == "move_rel":
+                    xtest.fake_input(self._display, X.MotionNotify, detail=True,
+                                     x=event["dx"], y=event["dy"])
+                elif kind == "click":
+                    xtest.fake_input(self._display, X.ButtonPress, event["button"])
+                    xtest.fake_input(self._display, X.ButtonRelease, event["button"])
+                elif kind == "down":
+                    xtest.fake_input(self._display, X.ButtonPress, event["button"])
+                elif kind == "up":
+                    xtest.fake_input(self._display, X.ButtonRelease, event["button"])
+                elif kind == "scroll":
+                    for button, count in _scroll_clicks(event):
+                        for _ in range(count):
+                            xtest.fake_input(self._display, X.ButtonPress, button)
+                            xtest.fake_input(self._display, X.ButtonRelease, button)
+                elif kind in KEY_EVENT_TYPES:
+                    keycode = self._keycode(event["keysym"])
+                    if kind != "key_up":
+                        xtest.fake_input(self._display, X.KeyPress, keycode)
+                    if kind != "key_down":
+                        xtest.fake_input(self._display, X.KeyRelease, keycode)
+            self._display.flush()
+    
+    def _keycode(self, keysym_name: str) -> int:
+        keycode = self._keycodes.get(keysym_name)
+        if keycode is None:
+            keycode = self._display.keysym_to_keycode(XK.string_to_keysym(keysym_name))
+            if not keycode:
+                raise MouseInputError(f"Unknown key: {keysym_name}")
+            self._keycodes[keysym_name] = keycode
+        return keycode
+    
+    def close(self):
+        try:
+            self._display.close()
+        except Exception:
+            pass
+
+class XdotoolBackend:
+    """Fallback backend chaining each batch into a single xdotool process"""
+    
+    name = "xdotool"
+    
+    def __init__(self, display_name: str = INPUT_DISPLAY):
+        self.display_name = display_name
+        self._env = {**os.environ, "DISPLAY": display_name}
+        self._bounds: Optional[Tuple[int, int]] = None
+        self._bounds_time = 0.0
+    
+    def screen_bounds(self) -> Tuple[int, int]:
+        if self._bounds and time.monotonic() - self._bounds_time < SCREEN_BOUNDS_CACHE_TTL:
+            return self._bounds
+        try:
+            result = subprocess.run(
+                ["xdotool", "getdisplaygeometry"],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=5,
+                env=self._env
+            )
+            width, height = result.stdout.split()
+            self._bounds = (int(width), int(height))
+            logger.debug(f"Screen bounds detected: {width}x{height}")
+        except Exception:
+            logger.error("Failed to get screen bounds", exc_info=True)
+            self._bounds = self._bounds or DEFAULT_SCREEN_BOUNDS
+        self._bounds_time = time.monotonic()
+        return self._bounds
+    
+    def apply(self, events: List[Dict[str, Any]]):
+        """Run a whole batch as one chained xdotool command line"""
+        args = ["xdotool"]
+        for event in events:
+            kind = event["type"]
+            if kind == "move":
+                args += ["mousemove", str(event["x"]), str(event["y"])]
+            elif kind == "move_rel":
+                args += ["mousemove_relative", "--", str(event["dx"]), str(event["dy"])]
+            elif kind == "click":
+                args += ["click", str(event["button"])]
+            elif kind == "down":
+                args += ["mousedown", str(event["button"])]
+            elif kind == "up":
+                args += ["mouseup", str(event["button"])]
+            elif kind == "scroll":
+                for button, count in _scroll_clicks(event):
+                    args += ["click", "--repeat", str(count), str(button)]
+            elif kind in KEY_EVENT_TYPES:
+                args += [kind.replace("_", ""), event["keysym"]]
+        if len(args) > 1:
+            subprocess.run(args, check=True, timeout=2, env=self._env)
+    
+    def close(self):
+        pass
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_input_backend():
     """
-    Get current screen resolution with caching
+    Get the process-wide input backend, connecting on first use
     
     Returns:
-        Tuple of (width, height)
+        XTestBackend if python-xlib can reach the display, else XdotoolBackend
     """
-    global screen_bounds_cache
+    global _backend
     
-    # Check cache validity
-    now = datetime.now()
-    if (screen_bounds_cache["timestamp"] and 
-        screen_bounds_cache["bounds"] and
-        (now - screen_bounds_cache["timestamp"]).total_seconds() < SCREEN_BOUNDS_CACHE_TTL):
-        return screen_bounds_cache["bounds"]
+    if _backend is not None:
+        return _backend
     
+    with _backend_lock:
+        if _backend is None:
+            if XLIB_AVAILABLE:
+                try:
+                    _backend = XTestBackend(INPUT_DISPLAY)
+                except Exception:
+                    logger.warning(f"XTest backend unavailable on {INPUT_DISPLAY}, using xdotool", exc_info=True)
+            if _backend is None:
+                _backend = XdotoolBackend(INPUT_DISPLAY)
+                logger.info(f"xdotool input backend selected for {INPUT_DISPLAY}")
+        return _backend
+
+def reset_input_backend():
+    """Close the current backend so the next call reconnects"""
+    global _backend
+    
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = None
+
+def _scroll_clicks(event: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """Translate scroll deltas into (button, count) wheel clicks"""
+    clicks = []
+    dy, dx = event.get("dy", 0), event.get("dx", 0)
+    if dy:
+        clicks.append((5 if dy > 0 else 4, abs(dy)))
+    if dx:
+        clicks.append((7 if dx > 0 else 6, abs(dx)))
+    return clicks
+
+def get_screen_bounds() -> Tuple[int, int]:
+    """
+    Get current screen resolution from the input backend's cache
+    
+    Returns:
+        Tuple of (width, height)
+    """
     try:
-        # Get screen dimensions using xdpyinfo
-        result = subprocess.run(
-            ["xdpyinfo"], 
-            capture_output=True, 
-            text=True, 
-            check=True,
-            timeout=5
-        )
-        
-        # Parse dimensions from output
-        for line in result.stdout.split('\n'):
-            if 'dimensions:' in line:
-                # Example: "  dimensions:    1920x1080 pixels (508x285 millimeters)"
-                dims = line.split()[1].split('x')
-                width = int(dims[0])
-                height = int(dims[1].split('p')[0])  # Remove 'pixels' suffix
-                
-                screen_bounds_cache = {
-                    "bounds": (width, height),
-                    "timestamp": now
-                }
-                
-                logger.debug(f"Screen bounds detected: {width}x{height}")
-                return (width, height)
-        
-        # Fallback if parsing fails
-        logger.warning("Could not parse screen dimensions, using default")
-        return (1920, 1080)
-        
+        return get_input_backend().screen_bounds()
     except Exception as e:
         logger.error("Failed to get screen bounds", exc_info=True)
-        return (1920, 1080)  # Safe default
+        return DEFAULT_SCREEN_BOUNDS  # Safe default
 
-def check_rate_limit() -> bool:
+def check_rate_limit(cost: int = 1) -> bool:
     """
     Check if action is within rate limits
     
+    Args:
+        cost: Number of events being submitted
+    
     Returns:
         True if action is allowed, False if rate limited
     """
-    global action_timestamps
-    
-    now = datetime.now()
-    
-    # Remove timestamps older than 1 minute
-    action_timestamps = [ts for ts in action_timestamps if (now - ts).total_seconds() < 60]
-    
-    # Check per-minute limit
-    if len(action_timestamps) >= MAX_ACTIONS_PER_MINUTE:
-        logger.warning("Rate limit exceeded: too many actions per minute")
-        return False
-    
-    # Check per-second limit
-    recent_actions = [ts for ts in action_timestamps if (now - ts).total_seconds() < 1]
-    if len(recent_actions) >= MAX_ACTIONS_PER_SECOND:
-        logger.warning("Rate limit exceeded: too many actions per second")
-        return False
-    
-    # Record this action
-    action_timestamps.append(now)
-    return True
+    if rate_limiter.consume(cost):
+        return True
+    logger.warning("Rate limit exceeded: too many input events")
+    return False
 
-def validate_coordinates(x: int, y: int) -> bool:
+def validate_coordinates(x: int, y: int, bounds: Optional[Tuple[int, int]] = None) -> bool:
     """
     Validate mouse coordinates are within screen bounds
     
     Args:
         x: X coordinate
         y: Y coordinate
-        
+        bounds: Screen size to check against (looked up if omitted)
+    
     Returns:
         True if coordinates are valid
     """
@@ -138,7 +351,7 @@ def validate_coordinates(x: int, y: int) -> bool:
         logger.warning(f"Invalid coordinates: negative values ({x}, {y})")
         return False
     
-    width, height = get_screen_bounds()
+    width, height = bounds or get_screen_bounds()
     
     if x >= width or y >= height:
         logger.warning(f"Coordinates out of bounds: ({x}, {y}) vs screen ({width}x{height})")
@@ -146,142 +359,195 @@ def validate_coordinates(x: int, y: int) -> bool:
     
     return True
 
+def _normalize_event(event: Dict[str, Any], bounds: Tuple[int, int]) -> Dict[str, Any]:
+    """
+    Validate one input event and coerce its fields to ints
+    
+    Raises:
+        MouseInputError: If the event is malformed or out of bounds
+    """
+    if not isinstance(event, dict) or event.get("type") not in EVENT_TYPES:
+        raise MouseInputError(f"Unknown event type: {event.get('type') if isinstance(event, dict) else event}")
+    
+    kind = event["type"]
+    try:
+        if kind == "move":
+            x, y = int(event["x"]), int(event["y"])
+            if not validate_coordinates(x, y, bounds):
+                raise MouseInputError(f"Invalid coordinates: ({x}, {y})")
+            return {"type": kind, "x": x, "y": y}
+        if kind == "move_rel":
+            return {"type": kind, "dx": int(event.get("dx", 0)), "dy": int(event.get("dy", 0))}
+        if kind == "scroll":
+            dx = max(-MAX_SCROLL_CLICKS, min(MAX_SCROLL_CLICKS, int(event.get("dx", 0))))
+            dy = max(-MAX_SCROLL_CLICKS, min(MAX_SCROLL_CLICKS, int(event.get("dy", 0))))
+            return {"type": kind, "dx": dx, "dy": dy}
+        if kind in KEY_EVENT_TYPES:
+            keysym = str(event["keysym"])
+            if not KEYSYM_PATTERN.match(keysym):
+                raise MouseInputError(f"Invalid keysym: {keysym[:32]}")
+            return {"type": kind, "keysym": keysym}
+        button = int(event.get("button", 1))
+    except (KeyError, TypeError, ValueError):
+        raise MouseInputError(f"Malformed {kind} event")
+    
+    if button not in VALID_BUTTONS:
+        raise MouseInputError(f"Invalid mouse button: {button}")
+    return {"type": kind, "button": button}
+
 @log_performance
-def move_mouse(x: Optional[int] = None, y: Optional[int] = None, 
-               click: bool = False, button: int = 1) -> Dict[str, Any]:
+def send_input_events(events: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Simulate mouse movement and/or clicking
+    Validate and apply a batch of input events in one backend round-trip
     
     Args:
-        x: X coordinate (None to skip movement)
-        y: Y coordinate (None to skip movement)
-        click: Whether to perform a click
-        button: Mouse button (1=left, 2=middle, 3=right)
-        
+        events: List of events, each one of
+            {"type": "move", "x": int, "y": int}
+            {"type": "move_rel", "dx": int, "dy": int}
+            {"type": "click" | "down" | "up", "button": 1-3}
+            {"type": "scroll", "dx": int, "dy": int}  (wheel clicks)
+            {"type": "key" | "key_down" | "key_up", "keysym": "Return"}
+    
     Returns:
         Dictionary containing operation status and details
     """
-    logger.debug(f"Mouse action requested: move=({x}, {y}), click={click}, button={button}")
+    if not isinstance(events, list) or not events:
+        return {"status": "error", "error": "No events provided"}
+    
+    if len(events) > MAX_EVENTS_PER_BATCH:
+        logger.warning(f"Input batch too large: {len(events)} events")
+        return {
+            "status": "error",
+            "error": f"Too many events (max {MAX_EVENTS_PER_BATCH})",
+            "count": len(events)
+        }
+    
+    if not check_rate_limit(len(events)):
+        INPUT_BATCHES.labels("rate_limited").inc()
+        return {
+            "status": "error",
+            "error": "Rate limit exceeded",
+            "action": "input_events"
+        }
     
     try:
-        # Rate limiting check
-        if not check_rate_limit():
-            return {
-                "status": "error",
-                "error": "Rate limit exceeded",
-                "action": "move_mouse"
-            }
-        
-        # Validate inputs
-        if button not in [1, 2, 3]:
-            logger.warning(f"Invalid mouse button: {button}")
-            return {
-                "status": "error", 
-                "error": "Invalid mouse button",
-                "button": button
-            }
-        
-        # Validate coordinates if movement requested
-        if x is not None and y is not None:
-            if not validate_coordinates(x, y):
-                return {
-                    "status": "error",
-                    "error": "Invalid coordinates",
-                    "x": x,
-                    "y": y
-                }
-        
-        # Perform mouse movement
-        if x is not None and y is not None:
-            try:
-                subprocess.run(
-                    ["xdotool", "mousemove", str(x), str(y)], 
-                    check=True,
-                    timeout=2
-                )
-                logger.info(f"Mouse moved to ({x}, {y})")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to move mouse to ({x}, {y})", exc_info=True)
-                return {
-                    "status": "error",
-                    "error": f"Mouse movement failed: {e}",
-                    "x": x,
-                    "y": y
-                }
+        backend = get_input_backend()
+        bounds = backend.screen_bounds()
+        normalized = [_normalize_event(event, bounds) for event in events]
+        backend.apply(normalized)
         
-        # Perform mouse click
-        if click:
-            try:
-                subprocess.run(
-                    ["xdotool", "click", str(button)], 
-                    check=True,
-                    timeout=2
-                )
-                logger.info(f"Mouse button {button} clicked at ({x}, {y})")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to click mouse button {button}", exc_info=True)
-                return {
-                    "status": "error",
-                    "error": f"Mouse click failed: {e}",
-                    "button": button
-                }
-        
-        # Return success status
-        result: Dict[str, Any] = {
+        INPUT_BATCHES.labels("success").inc()
+        for event in normalized:
+            INPUT_EVENTS.labels(event["type"]).inc()
+        logger.debug(f"Applied {len(normalized)} input events via {backend.name}")
+        return {
             "status": "success",
-            "action": "mouse_input",
+            "action": "input_events",
+            "count": len(normalized),
+            "backend": backend.name,
             "timestamp": datetime.now().isoformat()
         }
-        
-        if x is not None and y is not None:
-            result["x"] = x
-            result["y"] = y
-            result["moved"] = True
-        else:
-            result["moved"] = False
-            
-        if click:
-            result["clicked"] = True
-            result["button"] = button
-        else:
-            result["clicked"] = False
-        
-        return result
-        
+    
+    except MouseInputError as e:
+        INPUT_BATCHES.labels("rejected").inc()
+        logger.warning(f"Rejected input batch: {e}")
+        return {"status": "error", "error": str(e)}
     except subprocess.TimeoutExpired:
+        INPUT_BATCHES.labels("error").inc()
         logger.error("Mouse action timed out")
         return {
             "status": "error",
             "error": "Operation timed out"
         }
     except Exception as e:
+        INPUT_BATCHES.labels("error").inc()
         logger.error("Unexpected error in mouse input", exc_info=True, extra={
-            "x": x,
-            "y": y,
-            "click": click,
-            "button": button,
+            "event_count": len(events),
             "error_type": type(e).__name__
         })
+        # A broken X connection is re-established on the next batch
+        reset_input_backend()
         return {
             "status": "error",
             "error": f"Unexpected error: {str(e)}"
         }
 
+@log_performance
+def move_mouse(x: Optional[int] = None, y: Optional[int] = None,
+               click: bool = False, button: int = 1) -> Dict[str, Any]:
+    """
+    Simulate mouse movement and/or clicking
+    
+    Args:
+        x: X coordinate (None to skip movement)
+        y: Y coordinate (None to skip movement)
+        click: Whether to perform a click
+        button: Mouse button (1=left, 2=middle, 3=right)
+    
+    Returns:
+        Dictionary containing operation status and details
+    """
+    logger.debug(f"Mouse action requested: move=({x}, {y}), click={click}, button={button}")
+    
+    moved = x is not None and y is not None
+    events: List[Dict[str, Any]] = []
+    if moved:
+        events.append({"type": "move", "x": x, "y": y})
+    if click:
+        events.append({"type": "click", "button": button})
+    
+    if not events:
+        return {
+            "status": "success",
+            "action": "mouse_input",
+            "moved": False,
+            "clicked": False,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    outcome = send_input_events(events)
+    if outcome["status"] != "success":
+        return {**outcome, "action": "move_mouse"}
+    
+    # Return success status
+    result: Dict[str, Any] = {
+        "status": "success",
+        "action": "mouse_input",
+        "timestamp": outcome["timestamp"]
+    }
+    
+    if moved:
+        result["x"] = x
+        result["y"] = y
+        result["moved"] = True
+    else:
+        result["moved"] = False
+    
+    if click:
+        result["clicked"] = True
+        result["button"] = button
+    else:
+        result["clicked"] = False
+    
+    return result
+
 def get_mouse_stats() -> Dict[str, Any]:
     """Get mouse input statistics and status"""
-    now = datetime.now()
-    recent_actions = [ts for ts in action_timestamps if (now - ts).total_seconds() < 60]
-    
     width, height = get_screen_bounds()
+    backend = get_input_backend()
     
     return {
         "screen_resolution": {"width": width, "height": height},
+        "backend": backend.name,
+        "display": backend.display_name,
         "rate_limiting": {
-            "actions_last_minute": len(recent_actions),
-            "max_per_minute": MAX_ACTIONS_PER_MINUTE,
-            "max_per_second": MAX_ACTIONS_PER_SECOND
+            "tokens_available": round(rate_limiter.tokens, 1),
+            "rejected": rate_limiter.rejected,
+            "max_per_second": MAX_ACTIONS_PER_SECOND,
+            "burst": MAX_ACTIONS_BURST
         },
         "tools_available": {
+            "xlib": XLIB_AVAILABLE,
             "xdotool": check_xdotool_available()
         }
     }
@@ -0,0 +1,667 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Native Screen Capture Module
+==========================================
+
+In-process capture and encoding pipeline that streams the desktop to the
+mobile web UI over a WebSocket, alongside the x11vnc server managed by
+screen_streamer.
+
+Pipeline:
+- Capture: XShmGetImage into one shared-memory segment reused every frame
+  (falls back to Pillow's ImageGrab when MIT-SHM is unavailable)
+- Diff: per-row CRC32 finds changed bands, then per-tile hashes inside those
+  bands give the dirty tiles; adjacent dirty tiles are merged into rectangles
+- Encode: only dirty rectangles are encoded as JPEG or WebP
+- Transport: binary WebSocket frames; the client acks each frame, and the
+  measured RTT and unacknowledged queue depth drive JPEG/WebP quality and
+  pause capture when the client falls behind
+
+Wire Format (little-endian):
+- Frame header: uint32 seq, uint16 width, uint16 height, uint16 rect count,
+  uint8 format (1=jpeg, 2=webp), uint8 keyframe
+- Per rect: uint16 x, uint16 y, uint16 w, uint16 h, uint32 length, data
+- Client -> server JSON: {"type": "ack", "seq": n}, {"type": "keyframe"},
+  {"type": "config", "fps": 15, "format": "webp"}
+
+Benchmark (headless):
+    Xvfb :99 -screen 0 1920x1080x24 &
+    python -m mobilemirror.backend.screen_capture --display :99 --seconds 10
+"""
+
+import argparse
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from io import BytesIO
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from PIL import Image, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from .utils.logger import get_logger
+from .utils.metrics import Counter, Histogram
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+CAPTURE_DISPLAY = os.environ.get("MOBILEMIRROR_DISPLAY", os.environ.get("DISPLAY", ":0"))
+TILE_SIZE = 64
+DEFAULT_FPS = 15
+MAX_FPS = 30
+DEFAULT_QUALITY = 70
+MIN_QUALITY = 25
+MAX_QUALITY = 85
+MAX_IN_FLIGHT = 3          # Unacknowledged frames before capture pauses
+TARGET_RTT = 0.15          # Seconds; quality drops when the smoothed RTT exceeds this
+
+FRAME_HEADER = struct.Struct("<IHHHBB")
+RECT_HEADER = struct.Struct("<HHHHI")
+FORMAT_CODES = {"jpeg": 1, "webp": 2}
+
+# Metrics
+FRAME_STAGE_SECONDS = Histogram(
+    "mobilemirror_screen_frame_stage_seconds",
+    "Time spent per captured frame in each pipeline stage",
+    ["stage"]
+)
+FRAMES_SENT = Counter(
+    "mobilemirror_screen_frames_total",
+    "Screen frames with changes encoded for viewers"
+)
+FRAME_BYTES = Counter(
+    "mobilemirror_screen_frame_bytes_total",
+    "Bytes of encoded screen frames"
+)
+ACK_RTT_SECONDS = Histogram(
+    "mobilemirror_screen_ack_rtt_seconds",
+    "Time from sending a frame to the viewer acknowledging it"
+)
+_CAPTURE_SECONDS = FRAME_STAGE_SECONDS.labels("capture")
+_DIFF_SECONDS = FRAME_STAGE_SECONDS.labels("diff")
+_ENCODE_SECONDS = FRAME_STAGE_SECONDS.labels("encode")
+
+class ScreenCaptureError(Exception):
+    """Raised when the display cannot be captured"""
+    pass
+
+class Frame(NamedTuple):
+    """A captured frame; ``buffer`` is only valid until the next capture"""
+    buffer: memoryview
+    width: int
+    height: int
+    stride: int
+    raw_mode: str          # Pillow raw mode of the pixel data
+    bytes_per_pixel: int
+
+# ─────────── Capture backends ───────────
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+class _XImage(ctypes.Structure):
+    # Leading fields of Xlib's XImage; only these are read
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+_x_errors = {"count": 0}
+
+@_X_ERROR_HANDLER
+def _on_x_error(display, event):
+    # Xlib's default error handler exits the process; just count errors instead
+    _x_errors["count"] += 1
+    return 0
+
+class XShmGrabber:
+    """Captures the root window through MIT-SHM into a reused shared segment"""
+    
+    name = "xshm"
+    ZPIXMAP = 2
+    IPC_PRIVATE = 0
+    IPC_CREAT = 0o1000
+    IPC_RMID = 0
+    
+    def __init__(self, display_name: str = CAPTURE_DISPLAY):
+        x11_path = ctypes.util.find_library("X11")
+        xext_path = ctypes.util.find_library("Xext")
+        if not x11_path or not xext_path:
+            raise ScreenCaptureError("libX11/libXext not found")
+        
+        self._x11 = ctypes.CDLL(x11_path)
+        self._xext = ctypes.CDLL(xext_path)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._declare_prototypes()
+        
+        self._x11.XSetErrorHandler(_on_x_error)
+        
+        self._display = self._x11.XOpenDisplay(display_name.encode())
+        if not self._display:
+            raise ScreenCaptureError(f"Cannot open display {display_name}")
+        if not self._xext.XShmQueryExtension(self._display):
+            self._x11.XCloseDisplay(self._display)
+            raise ScreenCaptureError("MIT-SHM extension not available")
+        
+        self.display_name = display_name
+        self._image = None
+        self._shminfo = _XShmSegmentInfo()
+        self._create_image()
+    
+    def _declare_prototypes(self):
+        x11, xext, libc = self._x11, self._xext, self._libc
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XSetErrorHandler.argtypes = [_X_ERROR_HANDLER]
+        x11.XSetErrorHandler.restype = ctypes.c_void_p
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+            ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint
+        ]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+            ctypes.c_int, ctypes.c_int, ctypes.c_ulong
+        ]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+    
+    def _create_image(self):
+        """Allocate the shared XImage for the current screen size"""
+        screen = self._x11.XDefaultScreen(self._display)
+        self.width = self._x11.XDisplayWidth(self._display, screen)
+        self.height = self._x11.XDisplayHeight(self._display, screen)
+        self._root = self._x11.XDefaultRootWindow(self._display)
+        
+        image = self._xext.XShmCreateImage(
+            self._display,
+            self._x11.XDefaultVisual(self._display, screen),
+            self._x11.XDefaultDepth(self._display, screen),
+            self.ZPIXMAP, None, ctypes.byref(self._shminfo),
+            self.width, self.height
+        )
+        if not image:
+            raise ScreenCaptureError("XShmCreateImage failed")
+        
+        size = image.contents.bytes_per_line * image.contents.height
+        shmid = self._libc.shmget(self.IPC_PRIVATE, size, self.IPC_CREAT | 0o600)
+        if shmid < 0:
+            self._x11.XDestroyImage(image)
+            raise ScreenCaptureError(f"shmget failed: errno {ctypes.get_errno()}")
+        address = self._libc.shmat(shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            self._libc.shmctl(shmid, self.IPC_RMID, None)
+            self._x11.XDestroyImage(image)
+            raise ScreenCaptureError(f"shmat failed: errno {ctypes.get_errno()}")
+        
+        self._shminfo.shmid = shmid
+        self._shminfo.shmaddr = address
+        self._shminfo.readOnly = 0
+        image.contents.data = address
+        self._xext.XShmAttach(self._display, ctypes.byref(self._shminfo))
+        self._x11.XSync(self._display, 0)
+        # Mark for removal now; the segment lives until both sides detach
+        self._libc.shmctl(shmid, self.IPC_RMID, None)
+        
+        self._image = image
+        self._stride = image.contents.bytes_per_line
+        self._bpp = image.contents.bits_per_pixel // 8
+        self._buffer = memoryview((ctypes.c_char * size).from_address(address)).cast("B")
+        logger.info(f"XShm capture attached: {self.width}x{self.height}", extra={
+            "display": self.display_name,
+            "segment_bytes": size
+        })
+    
+    def _destroy_image(self):
+        if self._image is None:
+            return
+        try:
+            self._buffer.release()
+        except BufferError:
+            pass  # A caller still holds a view; the mapping goes away with shmdt
+        self._xext.XShmDetach(self._display, ctypes.byref(self._shminfo))
+        self._x11.XSync(self._display, 0)
+        self._libc.shmdt(self._shminfo.shmaddr)
+        self._image.contents.data = None
+        self._x11.XDestroyImage(self._image)
+        self._image = None
+    
+    def grab(self) -> Frame:
+        """Capture the root window into the shared buffer"""
+        errors = _x_errors["count"]
+        ok = self._xext.XShmGetImage(self._display, self._root, self._image, 0, 0, 0xFFFFFFFF)
+        if not ok or _x_errors["count"] != errors:
+            # Usually a resolution change: reallocate at the new size once
+            logger.info("XShmGetImage failed; re-creating capture image")
+            self._destroy_image()
+            self._create_image()
+            if not self._xext.XShmGetImage(self._display, self._root, self._image, 0, 0, 0xFFFFFFFF):
+                raise ScreenCaptureError("XShmGetImage failed")
+        return Frame(self._buffer, self.width, self.height, self._stride, "BGRX", self._bpp)
+    
+    def close(self):
+        self._destroy_image()
+        if self._display:
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+
+class PillowGrabber:
+    """Fallback capture through Pillow's ImageGrab (one copy per frame)"""
+    
+    name = "pillow"
+    
+    def __init__(self, display_name: str = CAPTURE_DISPLAY):
+        if not PIL_AVAILABLE:
+            raise ScreenCaptureError("Pillow not installed")
+        from PIL import ImageGrab
+        self._grab = ImageGrab.grab
+        self.display_name = display_name
+    
+    def grab(self) -> Frame:
+        image = self._grab(xdisplay=self.display_name).convert("RGB")
+        data = image.tobytes()
+        return Frame(memoryview(data), image.width, image.height, image.width * 3, "RGB", 3)
+    
+    def close(self):
+        pass
+
+def open_grabber(display_name: str = CAPTURE_DISPLAY):
+    """Open the fastest capture backend available for a display"""
+    try:
+        return XShmGrabber(display_name)
+    except (ScreenCaptureError, OSError, AttributeError) as e:
+        logger.warning(f"XShm capture unavailable ({e}); falling back to Pillow")
+    return PillowGrabber(display_name)
+
+# ─────────── Dirty-tile detection ───────────
+
+class TileDiffer:
+    """Finds changed screen regions by hashing rows, then tiles within bands"""
+    
+    def __init__(self, tile_size: int = TILE_SIZE):
+        self.tile_size = tile_size
+        self._size: Optional[Tuple[int, int]] = None
+        self._row_hashes: List[int] = []
+        self._tile_hashes: Dict[Tuple[int, int], int] = {}
+    
+    def reset(self):
+        """Forget previous hashes so the next diff returns the whole screen"""
+        self._size = None
+    
+    def diff(self, frame: Frame) -> List[Tuple[int, int, int, int]]:
+        """
+        Compare a frame against the previous one
+        
+        Returns:
+            Dirty rectangles (x, y, w, h), horizontally merged per tile row
+        """
+        tile = self.tile_size
+        buf, stride = frame.buffer, frame.stride
+        row_bytes = frame.width * frame.bytes_per_pixel
+        full = self._size != (frame.width, frame.height)
+        
+        row_hashes = [
+            zlib.crc32(buf[y * stride:y * stride + row_bytes]) for y in range(frame.height)
+        ]
+        
+        rects = []
+        tile_span = tile * frame.bytes_per_pixel
+        for band_y in range(0, frame.height, tile):
+            band_h = min(tile, frame.height - band_y)
+            if not full and row_hashes[band_y:band_y + band_h] == self._row_hashes[band_y:band_y + band_h]:
+                continue
+            
+            run_start = None
+            for tile_x in range(0, frame.width, tile):
+                tile_w = min(tile, frame.width - tile_x)
+                start = tile_x * frame.bytes_per_pixel
+                crc = 0
+                for y in range(band_y, band_y + band_h):
+                    offset = y * stride + start
+                    crc = zlib.crc32(buf[offset:offset + min(tile_span, row_bytes - start)], crc)
+                key = (tile_x, band_y)
+                changed = full or self._tile_hashes.get(key) != crc
+                self._tile_hashes[key] = crc
+                
+                if changed and run_start is None:
+                    run_start = tile_x
+                elif not changed and run_start is not None:
+                    rects.append((run_start, band_y, tile_x - run_start, band_h))
+                    run_start = None
+            if run_start is not None:
+                rects.append((run_start, band_y, frame.width - run_start, band_h))
+        
+        self._row_hashes = row_hashes
+        self._size = (frame.width, frame.height)
+        return rects
+
+# ─────────── Encoding ───────────
+
+def encode_rects(frame: Frame, rects: List[Tuple[int, int, int, int]],
+                 fmt: str = "jpeg", quality: int = DEFAULT_QUALITY) -> List[bytes]:
+    """
+    Encode dirty rectangles straight from the capture buffer
+    
+    Each rectangle is decoded from the shared buffer by offset and stride,
+    so the full frame is never copied.
+    """
+    encoded = []
+    pil_format = "WEBP" if fmt == "webp" else "JPEG"
+    for x, y, w, h in rects:
+        offset = y * frame.stride + x * frame.bytes_per_pixel
+        image = Image.frombuffer("RGB", (w, h), frame.buffer[offset:], "raw",
+                                 frame.raw_mode, frame.stride, 1)
+        out = BytesIO()
+        image.save(out, pil_format, quality=quality)
+        encoded.append(out.getvalue())
+    return encoded
+
+def pack_frame(seq: int, frame: Frame, rects: List[Tuple[int, int, int, int]],
+               payloads: List[bytes], fmt: str, keyframe: bool) -> bytes:
+    """Serialise encoded rectangles into one binary WebSocket message"""
+    parts = [FRAME_HEADER.pack(seq & 0xFFFFFFFF, frame.width, frame.height,
+                               len(rects), FORMAT_CODES[fmt], int(keyframe))]
+    for (x, y, w, h), payload in zip(rects, payloads):
+        parts.append(RECT_HEADER.pack(x, y, w, h, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+class AdaptiveQuality:
+    """Adjusts encoder quality from smoothed RTT and unacknowledged frames"""
+    
+    def __init__(self, quality: int = DEFAULT_QUALITY):
+        self.quality = quality
+        self.rtt: Optional[float] = None
+    
+    def on_ack(self, rtt: float, in_flight: int):
+        self.rtt = rtt if self.rtt is None else 0.8 * self.rtt + 0.2 * rtt
+        if self.rtt > TARGET_RTT or in_flight >= MAX_IN_FLIGHT - 1:
+            self.quality = max(MIN_QUALITY, self.quality - 10)
+        elif self.rtt < TARGET_RTT / 2 and in_flight == 0:
+            self.quality = min(MAX_QUALITY, self.quality + 5)
+
+class CapturePipeline:
+    """Capture, diff and encode for one viewer; CPU work runs in a thread"""
+    
+    def __init__(self, display_name: str = CAPTURE_DISPLAY, fmt: str = "jpeg"):
+        if not PIL_AVAILABLE:
+            raise ScreenCaptureError("Pillow is required for encoding")
+        self.grabber = open_grabber(display_name)
+        self.differ = TileDiffer()
+        self.fmt = "jpeg"
+        self.set_format(fmt)
+        self.quality = AdaptiveQuality()
+        self.seq = 0
+        self.stats = {"frames": 0, "bytes": 0, "rects": 0, "capture_s": 0.0, "diff_s": 0.0, "encode_s": 0.0}
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def set_format(self, fmt: Any) -> bool:
+        """Switch the encoding used from the next frame on; False if unsupported"""
+        if fmt not in FORMAT_CODES or (fmt == "webp" and not features.check("webp")):
+            return False
+        self.fmt = fmt
+        return True
+    
+    def produce(self, keyframe: bool = False) -> Optional[bytes]:
+        """Capture one frame; returns a packed message or None if nothing changed"""
+        with self._lock:
+            if self._closed:
+                return None
+            fmt = self.fmt  # one format per frame even if a config message switches it
+            started = time.perf_counter()
+            frame = self.grabber.grab()
+            captured = time.perf_counter()
+            if keyframe:
+                self.differ.reset()
+            rects = self.differ.diff(frame)
+            diffed = time.perf_counter()
+            _CAPTURE_SECONDS.observe(captured - started)
+            _DIFF_SECONDS.observe(diffed - captured)
+            if not rects:
+                self.stats["capture_s"] += captured - started
+                self.stats["diff_s"] += diffed - captured
+                return None
+            
+            payloads = encode_rects(frame, rects, fmt, self.quality.quality)
+            self.seq += 1
+            message = pack_frame(self.seq, frame, rects, payloads, fmt, keyframe)
+            encoded = time.perf_counter()
+            _ENCODE_SECONDS.observe(encoded - diffed)
+            FRAMES_SENT.inc()
+            FRAME_BYTES.inc(len(message))
+            
+            self.stats["frames"] += 1
+            self.stats["bytes"] += len(message)
+            self.stats["rects"] += len(rects)
+            self.stats["capture_s"] += captured - started
+            self.stats["diff_s"] += diffed - captured
+            self.stats["encode_s"] += encoded - diffed
+            return message
+    
+    def close(self):
+        """Release the grabber once any in-flight produce() has finished with it"""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self.grabber.close()
+
+# ─────────── WebSocket streaming ───────────
+
+async def handle_screen_stream(websocket):
+    """
+    Stream the desktop to an authenticated WebSocket client
+    
+    Args:
+        websocket: WebSocket connection from client
+    """
+    from .utils.auth import authenticate_websocket
+    
+    await websocket.accept()
+    if not await authenticate_websocket(websocket):
+        logger.warning("Unauthorized screen stream connection")
+        await websocket.close(code=4003)
+        return
+    
+    if not PIL_AVAILABLE:
+        await websocket.send_text(json.dumps({"type": "error", "error": "Pillow not installed"}))
+        await websocket.close(code=1011)
+        return
+    
+    try:
+        pipeline = await asyncio.to_thread(CapturePipeline, CAPTURE_DISPLAY,
+                                           websocket.query_params.get("format", "jpeg"))
+    except Exception as e:
+        logger.error("Failed to start capture pipeline", exc_info=True)
+        await websocket.send_text(json.dumps({"type": "error", "error": str(e)}))
+        await websocket.close(code=1011)
+        return
+    
+    fps = DEFAULT_FPS
+    sent_at: Dict[int, float] = {}
+    acked = asyncio.Event()
+    wants_keyframe = True
+    
+    await websocket.send_text(json.dumps({
+        "type": "ready",
+        "backend": pipeline.grabber.name,
+        "format": pipeline.fmt,
+        "fps": fps
+    }))
+    logger.info("Screen stream connected", extra={"backend": pipeline.grabber.name, "format": pipeline.fmt})
+    
+    async def receive_loop():
+        nonlocal fps, wants_keyframe
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            try:
+                data = json.loads(message.get("text") or "{}")
+            except ValueError:
+                continue
+            kind = data.get("type")
+            if kind == "ack":
+                sent = sent_at.pop(data.get("seq"), None)
+                if sent is not None:
+                    rtt = time.monotonic() - sent
+                    ACK_RTT_SECONDS.observe(rtt)
+                    pipeline.quality.on_ack(rtt, len(sent_at))
+                acked.set()
+            elif kind == "keyframe":
+                wants_keyframe = True
+            elif kind == "config":
+                requested = data.get("fps")
+                if isinstance(requested, (int, float)) and not isinstance(requested, bool) and requested == requested:
+                    fps = max(1, min(MAX_FPS, int(requested)))
+                if "format" in data and not pipeline.set_format(data["format"]):
+                    logger.debug(f"Ignoring unsupported screen format: {str(data['format'])[:16]}")
+    
+    async def send_loop():
+        nonlocal wants_keyframe
+        while True:
+            started = time.monotonic()
+            # Backpressure: stop capturing while too many frames are unacknowledged
+            while len(sent_at) >= MAX_IN_FLIGHT:
+                acked.clear()
+                try:
+                    await asyncio.wait_for(acked.wait(), timeout=2.0)
+                except asyncio.TimeoutError:
+                    sent_at.clear()
+                    pipeline.quality.quality = MIN_QUALITY
+                    wants_keyframe = True
+            
+            keyframe, wants_keyframe = wants_keyframe, False
+            message = await asyncio.to_thread(pipeline.produce, keyframe)
+            if message is not None:
+                sent_at[pipeline.seq] = time.monotonic()
+                await websocket.send_bytes(message)
+            
+            await asyncio.sleep(max(0.0, 1.0 / fps - (time.monotonic() - started)))
+    
+    tasks = [asyncio.ensure_future(receive_loop()), asyncio.ensure_future(send_loop())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() and task.exception().__class__.__name__ != "WebSocketDisconnect":
+                logger.error("Screen stream error", exc_info=task.exception())
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Cancelling send_loop does not stop a produce() already running in its
+        # worker thread; close() waits for it before freeing the shared memory
+        await asyncio.to_thread(pipeline.close)
+        logger.info("Screen stream disconnected", extra=get_pipeline_stats(pipeline))
+
+def get_pipeline_stats(pipeline: CapturePipeline) -> Dict[str, Any]:
+    """Summarise a pipeline's per-frame timings and sizes"""
+    stats = pipeline.stats
+    frames = max(1, stats["frames"])
+    return {
+        "frames": stats["frames"],
+        "avg_bytes_per_frame": stats["bytes"] // frames,
+        "avg_rects_per_frame": round(stats["rects"] / frames, 1),
+        "avg_encode_ms": round(stats["encode_s"] * 1000 / frames, 2),
+        "quality": pipeline.quality.quality,
+        "rtt_ms": round(pipeline.quality.rtt * 1000, 1) if pipeline.quality.rtt else None
+    }
+
+# ─────────── Benchmark ───────────
+
+def run_benchmark(display_name: str = CAPTURE_DISPLAY, seconds: float = 10.0,
+                  fmt: str = "jpeg", quality: int = DEFAULT_QUALITY) -> Dict[str, Any]:
+    """
+    Measure capture throughput and frame sizes against a display
+    
+    Runs the capture/diff/encode loop as fast as possible. Point it at Xvfb
+    with some activity (e.g. ``xterm -e top``) for a dirty-region workload.
+    
+    Returns:
+        Dictionary with frames per second and bytes per frame
+    """
+    pipeline = CapturePipeline(display_name, fmt)
+    pipeline.quality.quality = quality
+    captures = 0
+    try:
+        pipeline.produce(keyframe=True)
+        keyframe_bytes = pipeline.stats["bytes"]
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        while time.perf_counter() < deadline:
+            pipeline.produce()
+            captures += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        pipeline.close()
+    
+    stats = pipeline.stats
+    delta_frames = max(1, stats["frames"] - 1)
+    return {
+        "backend": pipeline.grabber.name,
+        "format": pipeline.fmt,
+        "quality": quality,
+        "resolution": f"{pipeline.grabber.width}x{pipeline.grabber.height}" if hasattr(pipeline.grabber, "width") else None,
+        "captures_per_second": round(captures / elapsed, 1),
+        "frames_with_changes": stats["frames"] - 1,
+        "keyframe_bytes": keyframe_bytes,
+        "avg_bytes_per_delta_frame": (stats["bytes"] - keyframe_bytes) // delta_frames,
+        "avg_capture_ms": round(stats["capture_s"] * 1000 / (captures + 1), 2),
+        "avg_diff_ms": round(stats["diff_s"] * 1000 / (captures + 1), 2),
+        "avg_encode_ms": round(stats["encode_s"] * 1000 / max(1, stats["frames"]), 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Mobile Mirror screen capture benchmark")
+    parser.add_argument("--display", default=CAPTURE_DISPLAY)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--format", default="jpeg", choices=sorted(FORMAT_CODES))
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.display, args.seconds, args.format, args.quality), indent=2))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -15,6 +15,7 @@ Features:
 - Connection monitoring and statistics
 - Resource usage optimization
 - Automatic cleanup and recovery
+- Native in-process capture stream (see screen_capture) for the web UI
 
 Security Considerations:
 - Optional password protection
@@ -31,6 +32,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from .screen_capture import PIL_AVAILABLE
 from .utils.logger import get_logger, log_performance
 
 # Initialize module logger
@@ -74,9 +76,9 @@ def check_display_available() -> bool:
             logger.debug("X11 display :0 is available for streaming")
         else:
             logger.warning("X11 display :0 is not available")
-            
-        return available
         
+        return available
+    
     except Exception as e:
         logger.error("Failed to check display availability", exc_info=True)
         return False
@@ -141,7 +143,7 @@ def kill_existing_vnc():
                             proc.kill()
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
-                
+    
     except Exception as e:
         logger.warning("Error killing existing VNC processes", exc_info=True)
 
@@ -156,7 +158,7 @@ def start_stream(password: Optional[str] = None,
         password: Optional VNC password for security
         quality: Stream quality (low, medium, high)
         allow_remote: Allow connections from remote IPs
-        
+    
     Returns:
         Dictionary containing operation status and details
     """
@@ -282,7 +284,7 @@ def start_stream(password: Optional[str] = None,
             "password_protected": password is not None,
             "start_time": stream_start_time.isoformat()
         }
-        
+    
     except Exception as e:
         logger.error("Failed to start screen streaming", exc_info=True)
         streaming_process = None
@@ -341,7 +343,7 @@ def stop_stream() -> Dict[str, Any]:
             "message": "Screen streaming stopped",
             "uptime_seconds": uptime
         }
-        
+    
     except Exception as e:
         logger.error("Failed to stop screen streaming", exc_info=True)
         return {
@@ -380,6 +382,12 @@ def get_stream_status() -> Dict[str, Any]:
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             pass
     
+    # Native WebSocket capture pipeline (no VNC client needed)
+    status["native_stream"] = {
+        "endpoint": "/screen/stream",
+        "encoder_available": PIL_AVAILABLE
+    }
+    
     # Check tool availability
     status["tools"] = check_vnc_tools()
     status["display_available"] = check_display_available()
@@ -14,53 +14,182 @@ Features:
 - Security controls and session management
 - Comprehensive logging and monitoring
 - Connection cleanup and resource management
+- Event-driven PTY reads (no polling) with coalesced binary frames
+- Output backpressure when the WebSocket is slower than the shell
+- Detach/reattach with a bounded scrollback ring buffer
+- Terminal resize via TIOCSWINSZ
+- Multi-worker mode: sessions are recorded in the shared state store with
+  the worker that owns the PTY; reattaching through another worker is
+  relayed to the owner over loopback
+- Per-session byte counters on /metrics, labelled by a reusable slot
+  number (shown as ``metrics_slot`` in session stats), never the session id
+
+Protocol:
+- Query parameters: ``session_id`` and ``offset`` to reattach, ``cols``/``rows``
+  for the initial window size
+- Server -> client: one JSON text frame ``{"type": "session", ...}`` on attach,
+  then shell output as binary frames
+- Client -> server: binary frames are keyboard input; text frames are JSON
+  control messages (``{"type": "resize", "cols": 80, "rows": 24}`` or
+  ``{"type": "input", "data": "..."}``), anything else is treated as input
 
 Security Considerations:
 - Terminal sessions are isolated per connection
+- Session ids are unguessable random tokens
 - Shell commands are logged for audit purposes
 - Resource limits to prevent abuse
-- Automatic cleanup on disconnect
+- Automatic cleanup after the reattach grace period
 """
 
 import asyncio
+import errno
+import fcntl
+import json
+import logging
 import os
 import pty
+import secrets
 import signal
-import select
-from typing import Dict, Optional
+import struct
+import termios
+from typing import Any, Callable, Dict, Optional, Tuple
 from datetime import datetime
 
+import websockets
 from fastapi import WebSocket, WebSocketDisconnect
-from .utils.logger import get_logger, log_performance
+from .utils.executors import run_blocking
+from .utils.logger import get_logger, log_performance, set_log_sampling
+from .utils.metrics import REGISTRY
+from .utils.state_store import get_store
+from .utils.workers import get_worker_address
 
 # Initialize module logger
 logger = get_logger(__name__)
 
+# Per-keystroke audit lines go to a child logger whose DEBUG output is sampled
+input_logger = get_logger(f"{__name__}.input")
+set_log_sampling("DEBUG", float(os.environ.get("MOBILEMIRROR_TERMINAL_LOG_SAMPLE", "0.05")), input_logger.name)
+
 # Configuration
 SHELL = os.environ.get("SHELL", "/bin/bash")
 MAX_BUFFER_SIZE = 8192
-READ_TIMEOUT = 0.1
+MAX_FRAME_SIZE = 64 * 1024      # Largest single binary WebSocket frame
+OUTPUT_HIGH_WATER = 256 * 1024  # Pause reading the PTY above this many unsent bytes
+OUTPUT_LOW_WATER = 64 * 1024    # Resume reading once unsent output drains below this
+SCROLLBACK_SIZE = 512 * 1024    # Per-session replay buffer (must exceed OUTPUT_HIGH_WATER)
+SESSION_GRACE_PERIOD = 300      # Seconds a detached session is kept alive
+MAX_TERMINAL_DIMENSION = 1000
+SESSION_REGISTRY_PREFIX = "terminal:session:"  # State store key -> owning worker address
+METRICS_SESSION_SLOTS = 32      # Live sessions given their own /metrics series
 
 # Active terminal sessions registry
 active_sessions: Dict[str, Dict] = {}
 
+# Byte and frame totals of sessions that have already ended (for /metrics)
+_closed_totals = {"sent": 0, "received": 0, "frames": 0}
+
+# /metrics slot numbers held by live sessions; freed slots are reused so the
+# per-session label set stays bounded by METRICS_SESSION_SLOTS
+_metrics_slots: set = set()
+
+def _claim_metrics_slot() -> Optional[int]:
+    for slot in range(METRICS_SESSION_SLOTS):
+        if slot not in _metrics_slots:
+            _metrics_slots.add(slot)
+            return slot
+    return None  # Counted in the totals only
+
+class ScrollbackBuffer:
+    """Fixed-size ring buffer of terminal output addressed by absolute offset
+    
+    ``end`` counts every byte ever written, so a client that remembers how
+    many bytes it has received can ask for exactly what it missed. Only the
+    last ``capacity`` bytes are retained.
+    """
+    
+    def __init__(self, capacity: int = SCROLLBACK_SIZE):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self.end = 0
+    
+    @property
+    def start(self) -> int:
+        """Oldest absolute offset still held in the buffer"""
+        return max(0, self.end - self.capacity)
+    
+    def write(self, data: bytes):
+        """Append output, overwriting the oldest bytes when full"""
+        total = len(data)
+        if total >= self.capacity:
+            data = data[-self.capacity:]
+        pos = (self.end + total - len(data)) % self.capacity
+        first = min(len(data), self.capacity - pos)
+        self._buf[pos:pos + first] = data[:first]
+        if first < len(data):
+            self._buf[:len(data) - first] = data[first:]
+        self.end += total
+    
+    def read(self, offset: int, limit: int) -> bytes:
+        """Return up to ``limit`` bytes starting at absolute ``offset``"""
+        offset = max(offset, self.start)
+        count = min(limit, self.end - offset)
+        if count <= 0:
+            return b""
+        pos = offset % self.capacity
+        first = min(count, self.capacity - pos)
+        if first == count:
+            return bytes(self._buf[pos:pos + count])
+        return bytes(self._buf[pos:]) + bytes(self._buf[:count - first])
+
 class TerminalSession:
-    """Manages a single terminal session with PTY and WebSocket"""
+    """Manages a single terminal session with PTY and WebSocket
     
-    def __init__(self, websocket: WebSocket, session_id: str):
-        self.websocket = websocket
+    Shell output is read with ``loop.add_reader`` on a non-blocking PTY fd,
+    so an idle terminal costs nothing until the shell writes. All output goes
+    through the scrollback ring buffer; the attached client's offset into it
+    is the send queue. While more than OUTPUT_HIGH_WATER bytes are unsent the
+    reader is paused, which blocks the shell until the WebSocket catches up.
+    A detached session keeps draining the PTY into scrollback so the shell
+    never blocks, and is cleaned up after SESSION_GRACE_PERIOD.
+    """
+    
+    def __init__(self, session_id: str, cols: Optional[int] = None, rows: Optional[int] = None):
+        self.websocket: Optional[WebSocket] = None
         self.session_id = session_id
         self.pid: Optional[int] = None
         self.fd: Optional[int] = None
         self.start_time = datetime.now()
+        self.detached_at: Optional[datetime] = None
         self.command_count = 0
         self.bytes_sent = 0
         self.bytes_received = 0
+        self.frames_sent = 0
+        self.reattach_count = 0
+        self.metrics_slot: Optional[int] = None
+        self.window_size: Optional[Tuple[int, int]] = None
+        self.scrollback = ScrollbackBuffer()
+        self.client_offset = 0
+        
+        self._initial_size = (cols, rows)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._output_ready = asyncio.Event()
+        self._reading = False
+        self._shell_closed = False
+        self._pumps: list = []
+        self._grace_handle: Optional[asyncio.TimerHandle] = None
         
         logger.info(f"Created terminal session: {session_id}")
     
+    @property
+    def attached(self) -> bool:
+        return self.websocket is not None
+    
+    @property
+    def unsent_bytes(self) -> int:
+        return self.scrollback.end - self.client_offset if self.attached else 0
+    
     async def start(self):
-        """Start the PTY and begin communication"""
+        """Start the PTY and begin draining its output"""
         try:
             logger.debug(f"Starting PTY for session {self.session_id}")
             
@@ -85,67 +214,282 @@ class TerminalSession:
                     "start_time": self.start_time,
                     "pid": self.pid
                 }
+                self.metrics_slot = _claim_metrics_slot()
+                await _registry_call(_register_session, self.session_id, self.pid)
                 
-                # Start communication tasks
-                await asyncio.gather(
-                    self._read_from_shell(),
-                    self._write_to_shell(),
-                    return_exceptions=True
-                )
+                cols, rows = self._initial_size
+                if cols and rows:
+                    self.resize(cols, rows)
                 
+                os.set_blocking(self.fd, False)
+                self._loop = asyncio.get_running_loop()
+                self._resume_reading()
+        
         except Exception as e:
             logger.error(f"Failed to start terminal session {self.session_id}", exc_info=True)
             await self.cleanup()
             raise
     
-    async def _read_from_shell(self):
-        """Read output from shell and send to WebSocket"""
+    async def attach(self, websocket: WebSocket, offset: Optional[int] = None):
+        """
+        Attach a WebSocket and serve it until it disconnects
+        
+        Args:
+            websocket: Accepted WebSocket connection
+            offset: Absolute output offset the client has already received
+                (replays everything still in scrollback if None)
+        """
+        # Claim the session before awaiting anything, so the old attachment's
+        # cleanup sees it was replaced and leaves this one alone
+        old_pumps, old_websocket = self._pumps, self.websocket
+        self._pumps = []
+        if self._grace_handle is not None:
+            self._grace_handle.cancel()
+            self._grace_handle = None
+        
+        if old_pumps:
+            # A newer connection takes the session over from the old one
+            logger.info(f"Session {self.session_id} taken over by new connection")
+            for task in old_pumps:
+                task.cancel()
+            await asyncio.gather(*old_pumps, return_exceptions=True)
+            try:
+                await old_websocket.close(code=4001)
+            except Exception:
+                pass
+        
+        if self.detached_at is not None:
+            self.reattach_count += 1
+        self.websocket = websocket
+        self.detached_at = None
+        self.client_offset = self.scrollback.start if offset is None else min(
+            max(offset, self.scrollback.start), self.scrollback.end
+        )
+        
+        await websocket.send_text(json.dumps({
+            "type": "session",
+            "session_id": self.session_id,
+            "offset": self.client_offset,
+            "requested_offset": offset,
+            "missed_bytes": max(0, self.client_offset - offset) if offset is not None else 0,
+            "cols": self.window_size[0] if self.window_size else None,
+            "rows": self.window_size[1] if self.window_size else None
+        }))
+        logger.info(f"WebSocket attached to session {self.session_id}", extra={
+            "offset": self.client_offset,
+            "scrollback_end": self.scrollback.end
+        })
+        
+        self._output_ready.set()
+        pumps = [
+            asyncio.ensure_future(self._read_from_shell(websocket)),
+            asyncio.ensure_future(self._write_to_shell(websocket))
+        ]
+        self._pumps = pumps
+        try:
+            await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pumps:
+                task.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+            
+            # Only the current attachment may detach; a takeover already replaced us
+            if self._pumps is pumps:
+                self._pumps = []
+                if self._shell_closed:
+                    try:
+                        await websocket.close()
+                    except Exception:
+                        pass
+                    await self.cleanup()
+                else:
+                    self.detach(websocket)
+    
+    def detach(self, websocket: WebSocket):
+        """Drop the WebSocket but keep the shell running for the grace period"""
+        if self.websocket is not websocket:
+            return  # Already taken over by a newer connection
+        self.websocket = None
+        self.detached_at = datetime.now()
+        self._resume_reading()
+        if self._loop is not None and self.session_id in active_sessions:
+            self._grace_handle = self._loop.call_later(SESSION_GRACE_PERIOD, self._on_grace_expired)
+        logger.info(f"Terminal session detached: {self.session_id}", extra={
+            "grace_period_seconds": SESSION_GRACE_PERIOD
+        })
+    
+    def _on_grace_expired(self):
+        """Tear down a session nobody reattached to"""
+        self._grace_handle = None
+        if not self.attached:
+            logger.info(f"Reattach grace period expired for session {self.session_id}")
+            asyncio.ensure_future(self.cleanup())
+    
+    def resize(self, cols: int, rows: int):
+        """
+        Set the PTY window size with TIOCSWINSZ
+        
+        Repeated identical sizes are ignored so the shell only sees SIGWINCH
+        (and full-screen programs only redraw) when the size really changes.
+        """
+        try:
+            cols, rows = int(cols), int(rows)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid resize request for session {self.session_id}: {cols}x{rows}")
+            return
+        if not (0 < cols <= MAX_TERMINAL_DIMENSION and 0 < rows <= MAX_TERMINAL_DIMENSION):
+            logger.warning(f"Out of range resize for session {self.session_id}: {cols}x{rows}")
+            return
+        if self.fd is None or self.window_size == (cols, rows):
+            return
+        
+        fcntl.ioctl(self.fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+        self.window_size = (cols, rows)
+        logger.debug(f"Resized session {self.session_id} to {cols}x{rows}")
+    
+    def _resume_reading(self):
+        """Register the PTY fd with the event loop"""
+        if not self._reading and self.fd is not None and not self._shell_closed:
+            self._loop.add_reader(self.fd, self._on_pty_readable)
+            self._reading = True
+    
+    def _pause_reading(self):
+        """Stop watching the PTY fd so the shell blocks on a full PTY buffer"""
+        if self._reading and self.fd is not None:
+            self._loop.remove_reader(self.fd)
+        self._reading = False
+    
+    def _on_pty_readable(self):
+        """Event loop callback: drain whatever the PTY has buffered"""
+        try:
+            while self.unsent_bytes < OUTPUT_HIGH_WATER:
+                data = os.read(self.fd, MAX_BUFFER_SIZE)
+                if not data:
+                    self._on_shell_closed()
+                    break
+                self.scrollback.write(data)
+                if len(data) < MAX_BUFFER_SIZE:
+                    break
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            if e.errno == errno.EIO:  # Input/output error (shell closed)
+                self._on_shell_closed()
+            else:
+                logger.error(f"PTY read error for session {self.session_id}", exc_info=True)
+                self._on_shell_closed()
+        
+        if self.unsent_bytes >= OUTPUT_HIGH_WATER:
+            self._pause_reading()
+        if self.attached:
+            self._output_ready.set()
+    
+    def _on_shell_closed(self):
+        """Mark the shell as exited and stop watching its fd"""
+        if not self._shell_closed:
+            logger.info(f"Shell terminated for session {self.session_id}")
+        self._pause_reading()
+        self._shell_closed = True
+        if not self.attached:
+            # Nobody to deliver the final output to; keep scrollback until grace expiry
+            return
+        self._output_ready.set()
+    
+    async def _read_from_shell(self, websocket: WebSocket):
+        """Send unsent scrollback to the WebSocket as binary frames"""
         logger.debug(f"Starting shell reader for session {self.session_id}")
         
         try:
             while True:
-                if self.fd is None:
-                    break
-                
-                # Use select to check for data availability
-                ready, _, _ = select.select([self.fd], [], [], READ_TIMEOUT)
+                await self._output_ready.wait()
+                self._output_ready.clear()
                 
-                if ready:
-                    try:
-                        data = os.read(self.fd, MAX_BUFFER_SIZE)
-                        if not data:
-                            logger.debug(f"Shell closed for session {self.session_id}")
-                            break
-                        
-                        decoded = data.decode(errors="ignore")
-                        await self.websocket.send_text(decoded)
-                        
-                        self.bytes_sent += len(data)
-                        
-                        # Log significant output for audit
-                        if len(decoded.strip()) > 0:
-                            logger.debug(f"Shell output for session {self.session_id}", extra={
-                                "output_length": len(decoded),
-                                "bytes_sent": self.bytes_sent
-                            })
-                            
-                    except OSError as e:
-                        if e.errno == 5:  # Input/output error (shell closed)
-                            logger.info(f"Shell terminated for session {self.session_id}")
-                            break
-                        else:
-                            raise
-                
-                await asyncio.sleep(0.01)  # Small delay to prevent busy loop
+                while self.client_offset < self.scrollback.end:
+                    self.client_offset = max(self.client_offset, self.scrollback.start)
+                    frame = self.scrollback.read(self.client_offset, MAX_FRAME_SIZE)
+                    
+                    await websocket.send_bytes(frame)
+                    self.client_offset += len(frame)
+                    self.bytes_sent += len(frame)
+                    self.frames_sent += 1
+                    
+                    # Backpressure: resume reading only once the socket has drained us
+                    if self.unsent_bytes < OUTPUT_LOW_WATER:
+                        self._resume_reading()
                 
+                if self._shell_closed:
+                    logger.debug(f"Shell closed for session {self.session_id}")
+                    break
+        
         except WebSocketDisconnect:
             logger.info(f"WebSocket disconnected for session {self.session_id}")
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Shell read error for session {self.session_id}", exc_info=True)
-        finally:
-            await self.cleanup()
     
-    async def _write_to_shell(self):
+    async def _write_all(self, data: bytes):
+        """Write to the non-blocking PTY, waiting for writability if it is full"""
+        view = memoryview(data)
+        while view:
+            if self.fd is None:
+                return
+            try:
+                written = os.write(self.fd, view)
+                view = view[written:]
+            except BlockingIOError:
+                writable = self._loop.create_future()
+                self._loop.add_writer(self.fd, writable.set_result, None)
+                try:
+                    await writable
+                finally:
+                    if self.fd is not None:
+                        self._loop.remove_writer(self.fd)
+    
+    async def _handle_control(self, text: str) -> bool:
+        """
+        Handle a JSON control message
+        
+        Returns:
+            True if the text was a control message, False if it is plain input
+        """
+        if not text.startswith("{"):
+            return False
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return False
+        if not isinstance(message, dict):
+            return False
+        
+        message_type = message.get("type")
+        if message_type == "resize":
+            self.resize(message.get("cols"), message.get("rows"))
+            return True
+        if message_type == "input":
+            await self._send_input(str(message.get("data", "")).encode())
+            return True
+        return False
+    
+    async def _send_input(self, data: bytes):
+        """Write keyboard input to the shell with audit logging"""
+        if not data:
+            return
+        
+        # Log commands for audit (but not passwords/sensitive data)
+        if input_logger.isEnabledFor(logging.DEBUG):
+            text = data.decode(errors="replace")
+            sanitized = text.replace('\r', '\\r').replace('\n', '\\n')
+            if not any(keyword in text.lower() for keyword in ['password', 'passwd', 'secret', 'key']):
+                input_logger.debug(f"Command input for session {self.session_id}: {sanitized}")
+            else:
+                input_logger.debug(f"Sensitive input for session {self.session_id}: [REDACTED]")
+        
+        await self._write_all(data)
+        self.bytes_received += len(data)
+        self.command_count += data.count(b'\n')  # Approximate command count
+    
+    async def _write_to_shell(self, websocket: WebSocket):
         """Read input from WebSocket and write to shell"""
         logger.debug(f"Starting shell writer for session {self.session_id}")
         
@@ -154,52 +498,63 @@ class TerminalSession:
                 if self.fd is None:
                     break
                 
-                try:
-                    message = await self.websocket.receive_text()
-                    
-                    if message:
-                        # Log commands for audit (but not passwords/sensitive data)
-                        sanitized = message.replace('\r', '\\r').replace('\n', '\\n')
-                        if not any(keyword in message.lower() for keyword in ['password', 'passwd', 'secret', 'key']):
-                            logger.debug(f"Command input for session {self.session_id}: {sanitized}")
-                        else:
-                            logger.debug(f"Sensitive input for session {self.session_id}: [REDACTED]")
-                        
-                        os.write(self.fd, message.encode())
-                        self.bytes_received += len(message.encode())
-                        self.command_count += message.count('\n')  # Approximate command count
-                        
-                except WebSocketDisconnect:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
                     logger.info(f"WebSocket disconnected for session {self.session_id}")
                     break
-                    
+                
+                if message.get("bytes") is not None:
+                    await self._send_input(message["bytes"])
+                else:
+                    text = message.get("text") or ""
+                    if not await self._handle_control(text):
+                        await self._send_input(text.encode())
+        
+        except WebSocketDisconnect:
+            logger.info(f"WebSocket disconnected for session {self.session_id}")
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Shell write error for session {self.session_id}", exc_info=True)
-        finally:
-            await self.cleanup()
     
     async def cleanup(self):
         """Clean up PTY and session resources"""
+        if self.fd is None and self.pid is None:
+            return
+        
         logger.debug(f"Cleaning up session {self.session_id}")
         
         try:
-            # Close file descriptor
+            if self._grace_handle is not None:
+                self._grace_handle.cancel()
+                self._grace_handle = None
+            
+            # Stop watching and close file descriptor
             if self.fd is not None:
-                os.close(self.fd)
-                self.fd = None
+                self._pause_reading()
+                fd, self.fd = self.fd, None
+                os.close(fd)
             
             # Terminate child process
             if self.pid is not None:
+                pid, self.pid = self.pid, None
                 try:
-                    os.kill(self.pid, signal.SIGTERM)
-                    os.waitpid(self.pid, 0)  # Wait for process to terminate
-                except (OSError, ProcessLookupError):
+                    os.kill(pid, signal.SIGTERM)
+                    # Reap off the event loop so a slow-exiting shell cannot stall it
+                    await asyncio.to_thread(os.waitpid, pid, 0)
+                except (OSError, ProcessLookupError, ChildProcessError):
                     pass  # Process may already be dead
-                self.pid = None
             
             # Remove from active sessions
             if self.session_id in active_sessions:
                 del active_sessions[self.session_id]
+            await _registry_call(_unregister_session, self.session_id)
+            _closed_totals["sent"] += self.bytes_sent
+            _closed_totals["received"] += self.bytes_received
+            _closed_totals["frames"] += self.frames_sent
+            if self.metrics_slot is not None:
+                _metrics_slots.discard(self.metrics_slot)
+                self.metrics_slot = None
             
             # Log session statistics
             duration = (datetime.now() - self.start_time).total_seconds()
@@ -207,32 +562,154 @@ class TerminalSession:
                 "duration_seconds": duration,
                 "commands_executed": self.command_count,
                 "bytes_sent": self.bytes_sent,
-                "bytes_received": self.bytes_received
+                "bytes_received": self.bytes_received,
+                "frames_sent": self.frames_sent,
+                "reattach_count": self.reattach_count
             })
-            
+        
         except Exception as e:
             logger.error(f"Error during session cleanup {self.session_id}", exc_info=True)
 
+def _int_param(websocket: WebSocket, name: str) -> Optional[int]:
+    """Parse an optional integer query parameter"""
+    value = websocket.query_params.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+# ─────────── Multi-worker session registry ───────────
+
+def _register_session(session_id: str, shell_pid: int):
+    get_store().set(SESSION_REGISTRY_PREFIX + session_id,
+                    json.dumps({**get_worker_address(), "shell_pid": shell_pid}))
+
+def _unregister_session(session_id: str):
+    get_store().delete(SESSION_REGISTRY_PREFIX + session_id)
+
+def _find_owner(session_id: str) -> Optional[Dict[str, Any]]:
+    """Live worker owning a session this process does not hold, if any"""
+    raw = get_store().get(SESSION_REGISTRY_PREFIX + session_id)
+    if raw is None:
+        return None
+    owner = json.loads(raw)
+    if owner["pid"] != os.getpid():
+        try:
+            os.kill(owner["pid"], 0)
+            return owner
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            return owner
+    # Left behind by a worker that died (or by us before a crash): the PTY is gone
+    get_store().delete(SESSION_REGISTRY_PREFIX + session_id)
+    return None
+
+async def _registry_call(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a registry operation off the loop; registry trouble never breaks a terminal"""
+    if get_worker_address() is None:
+        return None  # Single process: active_sessions is the whole registry
+    try:
+        return await run_blocking("io", func, *args)
+    except Exception:
+        logger.warning("Terminal session registry unavailable", exc_info=True)
+        return None
+
+async def _relay_to_owner(websocket: WebSocket, owner: Dict[str, Any]) -> bool:
+    """
+    Relay a reattaching client to the worker process that holds its PTY
+    
+    Args:
+        websocket: Not yet accepted client connection
+        owner: Registry entry of the owning worker
+    
+    Returns:
+        False if the owner could not be reached; the client is untouched then
+    """
+    uri = f"ws://127.0.0.1:{owner['port']}/terminal?{websocket.url.query}"
+    try:
+        upstream = await websockets.connect(uri, max_size=None)
+    except Exception as e:
+        logger.warning(f"Worker {owner['pid']} unreachable for terminal relay: {e}")
+        return False
+    
+    await websocket.accept()
+    logger.info(f"Relaying terminal connection to worker {owner['index']} (pid {owner['pid']})")
+    
+    async def client_to_owner():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                await upstream.send(message["bytes"])
+            elif message.get("text") is not None:
+                await upstream.send(message["text"])
+    
+    async def owner_to_client():
+        async for frame in upstream:
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+    
+    pumps = [asyncio.ensure_future(client_to_owner()), asyncio.ensure_future(owner_to_client())]
+    try:
+        await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pumps:
+            task.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
+        await upstream.close()
+        try:
+            # Pass on the owner's close code, e.g. 4001 when another client took over
+            await websocket.close(code=upstream.close_code or 1000)
+        except Exception:
+            pass
+    return True
+
 @log_performance
 async def handle_terminal(websocket: WebSocket):
     """
     Handle a new terminal WebSocket connection
     
+    Reattaches to an existing session when a known ``session_id`` is given
+    (relaying to the owning worker in multi-worker mode), otherwise starts
+    a new shell.
+    
     Args:
         websocket: WebSocket connection from client
     """
-    session_id = f"term_{id(websocket)}_{int(datetime.now().timestamp())}"
+    requested_id = websocket.query_params.get("session_id")
+    session_id = requested_id or "unassigned"
     
     logger.info(f"New terminal connection request: {session_id}")
     
     try:
+        if requested_id and requested_id not in active_sessions:
+            owner = await _registry_call(_find_owner, requested_id)
+            if owner is not None and await _relay_to_owner(websocket, owner):
+                return
+        
         await websocket.accept()
         logger.info(f"WebSocket terminal connection accepted: {session_id}")
         
-        # Create and start terminal session
-        session = TerminalSession(websocket, session_id)
-        await session.start()
+        session_data = active_sessions.get(requested_id) if requested_id else None
+        if session_data is not None:
+            session = session_data["session"]
+            logger.info(f"Reattaching to terminal session: {session.session_id}")
+        else:
+            # Create and start a new terminal session
+            session_id = f"term_{secrets.token_urlsafe(16)}"
+            session = TerminalSession(
+                session_id,
+                cols=_int_param(websocket, "cols"),
+                rows=_int_param(websocket, "rows")
+            )
+            await session.start()
         
+        await session.attach(websocket, _int_param(websocket, "offset") if session_data else None)
+    
     except WebSocketDisconnect:
         logger.info(f"Terminal WebSocket disconnected: {session_id}")
     except Exception as e:
@@ -259,7 +736,39 @@ def get_session_stats() -> Dict:
             "duration_seconds": duration,
             "commands_executed": session.command_count,
             "bytes_sent": session.bytes_sent,
-            "bytes_received": session.bytes_received
+            "bytes_received": session.bytes_received,
+            "frames_sent": session.frames_sent,
+            "attached": session.attached,
+            "detached_since": session.detached_at.isoformat() if session.detached_at else None,
+            "reattach_count": session.reattach_count,
+            "metrics_slot": session.metrics_slot,
+            "scrollback_bytes": session.scrollback.end - session.scrollback.start,
+            "unsent_bytes": session.unsent_bytes,
+            "window_size": session.window_size
         })
     
-    return stats
\ No newline at end of file
+    return stats
+
+def _collect_metrics():
+    """Scrape-time terminal metrics; the I/O paths only bump plain ints"""
+    sessions = [data["session"] for data in list(active_sessions.values())]
+    sent = _closed_totals["sent"] + sum(session.bytes_sent for session in sessions)
+    received = _closed_totals["received"] + sum(session.bytes_received for session in sessions)
+    frames = _closed_totals["frames"] + sum(session.frames_sent for session in sessions)
+    attached = sum(1 for session in sessions if session.attached)
+    
+    yield ("mobilemirror_terminal_bytes_total", "counter",
+           "Terminal bytes relayed, by direction (sent = PTY to client)",
+           [({"direction": "sent"}, sent), ({"direction": "received"}, received)])
+    yield ("mobilemirror_terminal_session_bytes_total", "counter",
+           "Terminal bytes relayed per live session, by metrics slot and direction",
+           [sample for session in sessions if session.metrics_slot is not None
+            for sample in (({"slot": str(session.metrics_slot), "direction": "sent"}, session.bytes_sent),
+                           ({"slot": str(session.metrics_slot), "direction": "received"}, session.bytes_received))])
+    yield ("mobilemirror_terminal_frames_total", "counter",
+           "Terminal output frames sent to clients", [({}, frames)])
+    yield ("mobilemirror_terminal_sessions", "gauge",
+           "Live terminal sessions, by attachment state",
+           [({"state": "attached"}, attached), ({"state": "detached"}, len(sessions) - attached)])
+
+REGISTRY.register_collector(_collect_metrics)
\ No newline at end of file
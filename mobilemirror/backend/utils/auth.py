@@ -15,24 +15,32 @@ Features:
 - Comprehensive audit logging
 - Security breach detection
 - Token expiration and rotation
+- Verified-token cache with TTL and explicit invalidation
+- Token ids so a presented key is checked against a single stored hash
 
 Security Features:
 - Secure token generation and validation
 - Protection against timing attacks
-- Failed attempt tracking and blocking
+- Failed attempt tracking and blocking, shared between API workers through
+  the state store
 - Comprehensive security audit logging
 """
 
 import os
+import asyncio
+import json
 import hmac
 import hashlib
 import secrets
 import time
+import threading
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from .executors import run_blocking
 from .logger import get_logger, log_performance
+from .state_store import get_store
 
 # Initialize module logger
 logger = get_logger(__name__)
@@ -42,10 +50,22 @@ DEFAULT_TOKEN = "mobilemirror-access"
 TOKEN_FILE = Path.home() / ".local/share/mobilemirror/auth/tokens.conf"
 MAX_FAILED_ATTEMPTS = 5
 LOCKOUT_DURATION = 300  # 5 minutes in seconds
+TOKEN_CACHE_TTL = 300  # seconds a verified token stays trusted without rehashing
+TOKEN_CACHE_MAX_ENTRIES = 1024
+TOKEN_ID_SEPARATOR = "."
 
-# Security tracking
-failed_attempts: Dict[str, List[float]] = {}
-blocked_ips: Dict[str, float] = {}
+# Security tracking keys in the shared state store
+FAILED_ATTEMPTS_PREFIX = "auth:failed:"
+BLOCKED_IP_PREFIX = "auth:blocked:"
+
+# Token file cache, reloaded only when the file's mtime changes
+_token_file_cache: Dict = {"mtime": None, "loaded": False, "tokens": {}, "by_id": {}, "legacy": []}
+
+# Verified-token cache: keyed digest of the presented token -> (expires_at, token_name)
+# The key is per-process so cached digests are useless outside this process.
+_token_cache_key = secrets.token_bytes(32)
+_verified_tokens: Dict[bytes, Tuple[float, str]] = {}
+_token_lock = threading.Lock()
 
 def ensure_auth_directory():
     """Ensure authentication directory exists"""
@@ -111,17 +131,12 @@ def is_ip_blocked(ip_address: str) -> bool:
     Returns:
         True if IP is blocked
     """
-    if ip_address not in blocked_ips:
-        return False
-    
-    block_time = blocked_ips[ip_address]
-    if time.time() - block_time > LOCKOUT_DURATION:
-        # Unblock expired blocks
-        del blocked_ips[ip_address]
-        logger.info(f"IP address unblocked after lockout period: {ip_address}")
+    try:
+        # Blocks are stored with a LOCKOUT_DURATION TTL, so expired ones read as absent
+        return get_store().get(BLOCKED_IP_PREFIX + ip_address) is not None
+    except Exception:
+        logger.error(f"Failed to check lockout for {ip_address}", exc_info=True)
         return False
-    
-    return True
 
 def record_failed_attempt(ip_address: str):
     """
@@ -130,79 +145,170 @@ def record_failed_attempt(ip_address: str):
     Args:
         ip_address: IP address of failed attempt
     """
-    current_time = time.time()
-    
-    # Clean old attempts (older than lockout duration)
-    if ip_address in failed_attempts:
-        failed_attempts[ip_address] = [
-            attempt_time for attempt_time in failed_attempts[ip_address]
-            if current_time - attempt_time < LOCKOUT_DURATION
-        ]
-    else:
-        failed_attempts[ip_address] = []
+    store = get_store()
+    try:
+        # Attempts older than the lockout duration drop out of the window
+        attempts = store.record_event(FAILED_ATTEMPTS_PREFIX + ip_address, LOCKOUT_DURATION)
     
-    # Record this attempt
-    failed_attempts[ip_address].append(current_time)
+        # Check if IP should be blocked
+        if attempts >= MAX_FAILED_ATTEMPTS:
+            store.set(BLOCKED_IP_PREFIX + ip_address, str(time.time()), ttl=LOCKOUT_DURATION)
+            store.clear_events(FAILED_ATTEMPTS_PREFIX + ip_address)
+    except Exception:
+        logger.error(f"Failed to record failed attempt from {ip_address}", exc_info=True)
+        return
     
-    # Check if IP should be blocked
-    if len(failed_attempts[ip_address]) >= MAX_FAILED_ATTEMPTS:
-        blocked_ips[ip_address] = current_time
+    if attempts >= MAX_FAILED_ATTEMPTS:
         logger.warning(f"IP address blocked due to repeated failed attempts: {ip_address}", extra={
             "ip_address": ip_address,
-            "failed_attempts": len(failed_attempts[ip_address]),
+            "failed_attempts": attempts,
             "lockout_duration": LOCKOUT_DURATION
         })
     else:
         logger.warning(f"Failed authentication attempt from {ip_address}", extra={
             "ip_address": ip_address,
-            "attempt_count": len(failed_attempts[ip_address]),
+            "attempt_count": attempts,
             "max_attempts": MAX_FAILED_ATTEMPTS
         })
 
+def _parse_token_file() -> Dict[str, Dict]:
+    """
+    Parse the token configuration file
+
+    Lines have the form ``name:hash:salt[:created[:token_id]]``. Tokens
+    without a token id predate id-prefixed keys and are still accepted.
+
+    Returns:
+        Dictionary of token configurations
+    """
+    tokens = {}
+    with open(TOKEN_FILE, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                parts = line.split(':')
+                if len(parts) >= 3:
+                    name = parts[0]
+                    tokens[name] = {
+                        'hash': parts[1],
+                        'salt': parts[2],
+                        'created': parts[3] if len(parts) > 3 else str(int(time.time())),
+                        'token_id': parts[4] if len(parts) > 4 and parts[4] else None
+                    }
+    return tokens
+
 def load_tokens() -> Dict[str, Dict]:
     """
     Load tokens from configuration file
     
+    The file is parsed once and re-read only when its mtime changes.
+    A reload also invalidates the verified-token cache so revoked
+    tokens stop working immediately.
+    
     Returns:
         Dictionary of token configurations
     """
     try:
         ensure_auth_directory()
         
-        if not TOKEN_FILE.exists():
+        try:
+            file_stat = TOKEN_FILE.stat()
+            mtime = (file_stat.st_mtime_ns, file_stat.st_size)
+        except FileNotFoundError:
+            mtime = None
+        
+        with _token_lock:
+            if mtime == _token_file_cache["mtime"] and _token_file_cache["loaded"]:
+                return _token_file_cache["tokens"]
+        
+        if mtime is None:
             logger.info("No token file found, using defaults")
-            return {}
+            tokens = {}
+        else:
+            tokens = _parse_token_file()
+            logger.debug(f"Loaded {len(tokens)} tokens from configuration")
         
-        tokens = {}
-        with open(TOKEN_FILE, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    parts = line.split(':')
-                    if len(parts) >= 3:
-                        name = parts[0]
-                        hashed_token = parts[1]
-                        salt = parts[2]
-                        tokens[name] = {
-                            'hash': hashed_token,
-                            'salt': salt,
-                            'created': parts[3] if len(parts) > 3 else str(int(time.time()))
-                        }
+        with _token_lock:
+            _token_file_cache["mtime"] = mtime
+            _token_file_cache["loaded"] = True
+            _token_file_cache["tokens"] = tokens
+            _token_file_cache["by_id"] = {
+                data['token_id']: name for name, data in tokens.items() if data['token_id']
+            }
+            _token_file_cache["legacy"] = [
+                name for name, data in tokens.items() if not data['token_id']
+            ]
+            _verified_tokens.clear()
         
-        logger.debug(f"Loaded {len(tokens)} tokens from configuration")
         return tokens
         
     except Exception as e:
         logger.error("Failed to load tokens", exc_info=True)
         return {}
 
-def save_token(name: str, token: str) -> bool:
+def _token_digest(token: str) -> bytes:
+    """Fast keyed digest of a presented token, used as the cache key"""
+    return hmac.new(_token_cache_key, token.encode(), hashlib.sha256).digest()
+
+def _get_cached_token(digest: bytes) -> Optional[str]:
+    """Return the token name for a cached, unexpired verification"""
+    with _token_lock:
+        entry = _verified_tokens.get(digest)
+        if entry is None:
+            return None
+        expires_at, token_name = entry
+        if time.monotonic() >= expires_at:
+            del _verified_tokens[digest]
+            return None
+        return token_name
+
+def _cache_verified_token(digest: bytes, token_name: str):
+    """Remember a successful verification for TOKEN_CACHE_TTL seconds"""
+    with _token_lock:
+        if len(_verified_tokens) >= TOKEN_CACHE_MAX_ENTRIES:
+            # Drop the oldest entry; dicts preserve insertion order
+            _verified_tokens.pop(next(iter(_verified_tokens)))
+        _verified_tokens[digest] = (time.monotonic() + TOKEN_CACHE_TTL, token_name)
+
+def invalidate_token_cache(token: Optional[str] = None):
+    """
+    Invalidate cached token verifications
+    
+    Args:
+        token: Token to forget (all cached tokens are forgotten if None)
+    """
+    with _token_lock:
+        if token is None:
+            _verified_tokens.clear()
+            _token_file_cache["loaded"] = False
+        else:
+            _verified_tokens.pop(_token_digest(token), None)
+    logger.debug("Token verification cache invalidated")
+
+def _candidate_tokens(token: str, stored_tokens: Dict[str, Dict]) -> List[str]:
+    """
+    Select the stored tokens a presented token could match
+    
+    Id-prefixed tokens (``<token_id>.<secret>``) map to exactly one stored
+    hash. Anything else is checked against the legacy tokens without an id.
+    """
+    with _token_lock:
+        by_id = _token_file_cache["by_id"]
+        legacy = list(_token_file_cache["legacy"])
+    
+    token_id, sep, _ = token.partition(TOKEN_ID_SEPARATOR)
+    if sep and token_id in by_id:
+        return [by_id[token_id]]
+    return [name for name in legacy if name in stored_tokens]
+
+def save_token(name: str, token: str, token_id: Optional[str] = None) -> bool:
     """
     Save a new token to configuration file
     
     Args:
         name: Token name/identifier
         token: Token value
+        token_id: Optional public id the token is prefixed with
         
     Returns:
         True if token was saved successfully
@@ -215,8 +321,9 @@ def save_token(name: str, token: str) -> bool:
         
         # Append to token file
         with open(TOKEN_FILE, 'a') as f:
-            f.write(f"{name}:{hashed_token}:{salt}:{int(time.time())}\n")
+            f.write(f"{name}:{hashed_token}:{salt}:{int(time.time())}:{token_id or ''}\n")
         
+        invalidate_token_cache()
         logger.info(f"Token saved successfully: {name}")
         return True
         
@@ -253,11 +360,23 @@ def verify_token(token: str, ip_address: str = "unknown") -> bool:
         })
         return True
     
-    # Check file-based tokens
+    # Check file-based tokens (reloads the file only if it changed)
     stored_tokens = load_tokens()
     
-    for token_name, token_data in stored_tokens.items():
+    digest = _token_digest(token)
+    cached_name = _get_cached_token(digest)
+    if cached_name is not None and cached_name in stored_tokens:
+        logger.debug(f"Cached authentication from {ip_address}", extra={
+            "ip_address": ip_address,
+            "auth_method": "file_token_cached",
+            "token_name": cached_name
+        })
+        return True
+    
+    for token_name in _candidate_tokens(token, stored_tokens):
+        token_data = stored_tokens[token_name]
         if verify_token_hash(token, token_data['hash'], token_data['salt']):
+            _cache_verified_token(digest, token_name)
             logger.info(f"Successful authentication from {ip_address}", extra={
                 "ip_address": ip_address,
                 "auth_method": "file_token",
@@ -274,10 +393,47 @@ def verify_token(token: str, ip_address: str = "unknown") -> bool:
     record_failed_attempt(ip_address)
     return False
 
+async def verify_token_async(token: str, ip_address: str = "unknown") -> bool:
+    """
+    verify_token for async handlers; runs on the "cpu" pool since a cache
+    miss costs a PBKDF2 and the token file may be re-read
+    """
+    return await run_blocking("cpu", verify_token, token, ip_address)
+
+async def authenticate_websocket(websocket, timeout: float = 10) -> bool:
+    """
+    Verify the token of an accepted WebSocket connection
+    
+    The token may come from the Authorization header, a ``token`` query
+    parameter, or a first text message ``{"type": "auth", "token": "..."}``.
+    Verification runs on the "cpu" pool since a cache miss costs a PBKDF2.
+    
+    Args:
+        websocket: Accepted WebSocket connection
+        timeout: Seconds to wait for the auth message
+        
+    Returns:
+        True if the token is valid
+    """
+    ip_address = websocket.client.host if websocket.client else "unknown"
+    token = websocket.headers.get("Authorization") or websocket.query_params.get("token")
+    
+    if not token:
+        try:
+            message = await asyncio.wait_for(websocket.receive_text(), timeout)
+            token = json.loads(message).get("token", "")
+        except (asyncio.TimeoutError, ValueError, AttributeError):
+            return False
+    
+    return await verify_token_async(str(token), ip_address)
+
 def create_api_key(name: str, permissions: Optional[List[str]] = None) -> Optional[str]:
     """
     Create a new API key with specified permissions
     
+    Keys have the form ``<token_id>.<secret>``; the token id lets
+    verification go straight to the one stored hash for this key.
+    
     Args:
         name: Name/identifier for the key
         permissions: List of permissions (future feature)
@@ -286,9 +442,10 @@ def create_api_key(name: str, permissions: Optional[List[str]] = None) -> Option
         Generated API key or None if creation failed
     """
     try:
-        token = generate_secure_token(32)
+        token_id = secrets.token_hex(4)
+        token = f"{token_id}{TOKEN_ID_SEPARATOR}{generate_secure_token(32)}"
         
-        if save_token(name, token):
+        if save_token(name, token, token_id):
             logger.info(f"API key created successfully: {name}", extra={
                 "key_name": name,
                 "permissions": permissions or []
@@ -303,17 +460,9 @@ def create_api_key(name: str, permissions: Optional[List[str]] = None) -> Option
 
 def get_auth_stats() -> Dict:
     """Get authentication statistics and security metrics"""
-    current_time = time.time()
-    
-    # Clean expired data
-    active_blocks = {ip: block_time for ip, block_time in blocked_ips.items() 
-                    if current_time - block_time <= LOCKOUT_DURATION}
-    
-    recent_attempts = {}
-    for ip, attempts in failed_attempts.items():
-        recent = [t for t in attempts if current_time - t <= LOCKOUT_DURATION]
-        if recent:
-            recent_attempts[ip] = len(recent)
+    store = get_store()
+    active_blocks = store.scan(BLOCKED_IP_PREFIX)
+    recent_attempts = store.event_counts(FAILED_ATTEMPTS_PREFIX, LOCKOUT_DURATION)
     
     return {
         "blocked_ips": len(active_blocks),
@@ -321,6 +470,9 @@ def get_auth_stats() -> Dict:
         "unique_ips_with_failures": len(recent_attempts),
         "token_file_exists": TOKEN_FILE.exists(),
         "stored_tokens": len(load_tokens()),
+        "cached_verifications": len(_verified_tokens),
+        "token_cache_ttl": TOKEN_CACHE_TTL,
         "lockout_duration": LOCKOUT_DURATION,
-        "max_attempts": MAX_FAILED_ATTEMPTS
+        "max_attempts": MAX_FAILED_ATTEMPTS,
+        "state_store": store.name
     }
\ No newline at end of file
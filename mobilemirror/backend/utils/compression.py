@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Response Compression
+==================================
+
+ASGI middleware compressing API responses with the best encoding the client
+accepts, for slow cellular links to the mesh.
+
+Features:
+- Negotiates brotli, zstd or gzip from Accept-Encoding (q-values honoured);
+  brotli and zstd are used only when their packages are installed
+- Responses below COMPRESSION_MIN_SIZE are sent as they are
+- Streamed responses (NDJSON search results) are compressed chunk by chunk
+  with a flush after each, so clients still see results as they arrive
+- Already-compressed types, byte-range responses and Server-Sent Events are
+  passed through untouched
+
+Security Considerations:
+- Only response bodies are compressed; request bodies are never inflated here
+- Responses that mix secrets with attacker-controlled input (BREACH) are
+  not produced by this API: tokens travel in headers, never in bodies
+"""
+
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from .logger import get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4      # Fast enough to run per request; most of the gain of 11
+ZSTD_LEVEL = 3
+
+# Content types that are already compressed or must reach the client unbuffered
+SKIPPED_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip",
+                         "application/gzip", "text/event-stream")
+
+class _Encoder:
+    """Incremental compressor with a common compress/flush/finish interface"""
+    
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        elif encoding == "zstd":
+            self._zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            self._gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        if self.encoding == "zstd":
+            out = self._zstd.compress(data)
+            return out + self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+        out = self._gzip.compress(data)
+        return out + self._gzip.flush(zlib.Z_SYNC_FLUSH) if flush else out
+    
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        if self.encoding == "zstd":
+            return self._zstd.flush()
+        return self._gzip.flush()
+
+def available_encodings() -> List[str]:
+    """Encodings this process can produce, in order of preference"""
+    encodings = []
+    if BROTLI_AVAILABLE:
+        encodings.append("br")
+    if ZSTD_AVAILABLE:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return encodings
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding for an Accept-Encoding header
+    
+    Args:
+        accept_encoding: Raw header value, e.g. "gzip, br;q=0.9"
+    
+    Returns:
+        "br", "zstd", "gzip" or None for identity
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+def _compressible(status: int, headers: List[Tuple[bytes, bytes]]) -> bool:
+    if status < 200 or status in (204, 206, 304):
+        return False
+    if _header(headers, b"content-encoding") is not None:
+        return False
+    if _header(headers, b"accept-ranges") is not None:
+        return False  # Byte offsets must keep referring to the stored bytes
+    content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+    return not content_type.startswith(SKIPPED_CONTENT_TYPES)
+
+class CompressionMiddleware:
+    """ASGI middleware applying negotiated response compression"""
+    
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        accept = dict(scope.get("headers") or []).get(b"accept-encoding", b"").decode("latin-1")
+        encoding = negotiate_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message: Optional[Dict[str, Any]] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            
+            if encoder is None:
+                headers = list(start_message.get("headers", []))
+                small = not more_body and len(body) < self.minimum_size
+                if small or not _compressible(start_message["status"], headers):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                
+                encoder = _Encoder(encoding)
+                headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+                vary = _header(headers, b"vary")
+                if vary is None:
+                    headers.append((b"vary", b"Accept-Encoding"))
+                elif b"accept-encoding" not in vary.lower():
+                    headers = [(k, v + b", Accept-Encoding" if k.lower() == b"vary" else v)
+                               for k, v in headers]
+                headers.append((b"content-encoding", encoding.encode("ascii")))
+                
+                if not more_body:
+                    # Whole body in hand: one shot, with an exact length
+                    compressed = encoder.compress(body) + encoder.finish()
+                    headers.append((b"content-length", str(len(compressed)).encode("ascii")))
+                    await send({**start_message, "headers": headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send({**start_message, "headers": headers})
+            
+            if more_body:
+                chunk = encoder.compress(body, flush=True)
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body",
+                            "body": encoder.compress(body) + encoder.finish()})
+        
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Blocking Work Dispatch
+====================================
+
+Bounded worker pools for blocking calls made from async handlers, so disk
+I/O, password hashing and input injection never run on the event loop that
+also relays terminal and screen WebSockets.
+
+Features:
+- One pool per category of work, each with its own worker count:
+  - "io": file reads, writes, listings, log reads
+  - "cpu": PBKDF2 token hashing and QR rendering (hashlib and Pillow release
+    the GIL, so threads are enough)
+  - "input": X input injection; a single worker keeps events in order
+- Per-pool queue limit: work beyond it fails fast with PoolSaturated
+  (HTTP 503) instead of piling up behind a slow disk
+- Queue depth, active workers, queue wait and rejections exported on
+  /metrics
+
+Security Considerations:
+- Saturation is reported, never waited out, so one client flooding a pool
+  cannot stall unrelated requests
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from .logger import get_logger
+from .metrics import REGISTRY, Counter, Histogram
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Configuration: pool name -> (workers, queued calls allowed beyond busy workers)
+POOL_LIMITS = {
+    "io": (int(os.environ.get("MOBILEMIRROR_IO_WORKERS", min(32, (os.cpu_count() or 2) * 4))), 256),
+    "cpu": (int(os.environ.get("MOBILEMIRROR_CPU_WORKERS", min(4, os.cpu_count() or 2))), 64),
+    "input": (1, 64),
+}
+
+# Metrics
+POOL_WAIT_SECONDS = Histogram(
+    "mobilemirror_pool_wait_seconds",
+    "Time blocking calls spent queued before a worker picked them up",
+    ["pool"]
+)
+POOL_RUN_SECONDS = Histogram(
+    "mobilemirror_pool_run_seconds",
+    "Time blocking calls spent running on a worker",
+    ["pool"]
+)
+POOL_REJECTED = Counter(
+    "mobilemirror_pool_rejected_total",
+    "Blocking calls refused because the pool queue was full",
+    ["pool"]
+)
+
+class PoolSaturated(Exception):
+    """Raised when a pool already has its maximum number of calls queued"""
+    
+    def __init__(self, pool: str):
+        super().__init__(f"Server busy: {pool} pool saturated")
+        self.pool = pool
+
+class BlockingPool:
+    """Thread pool with a bounded queue and live queue/active counts"""
+    
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix=f"mm-{name}")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self._wait_seconds = POOL_WAIT_SECONDS.labels(name)
+        self._run_seconds = POOL_RUN_SECONDS.labels(name)
+        self._rejected = POOL_REJECTED.labels(name)
+    
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run ``func(*args, **kwargs)`` on a worker and await its result
+        
+        Raises:
+            PoolSaturated: If the pool's queue is already full
+        """
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self._rejected.inc()
+                logger.warning(f"{self.name} pool saturated ({self.queued} queued); rejecting call")
+                raise PoolSaturated(self.name)
+            self.queued += 1
+        
+        submitted = time.perf_counter()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        
+        def work():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+            self._wait_seconds.observe(started - submitted)
+            try:
+                return call()
+            finally:
+                self._run_seconds.observe(time.perf_counter() - started)
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+        
+        def release_if_cancelled(future):
+            # A call cancelled before a worker picked it up never runs work(),
+            # so its queue slot is returned here instead
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+        
+        try:
+            future = self._executor.submit(work)
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(release_if_cancelled)
+        return await asyncio.wrap_future(future)
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed
+            }
+
+_pools: Dict[str, BlockingPool] = {
+    name: BlockingPool(name, workers, max_queue)
+    for name, (workers, max_queue) in POOL_LIMITS.items()
+}
+
+async def run_blocking(pool: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking call on the named pool ("io", "cpu" or "input")
+    
+    Args:
+        pool: Pool name from POOL_LIMITS
+        func: Blocking callable
+        *args, **kwargs: Passed to ``func``
+    
+    Returns:
+        Whatever ``func`` returns; its exceptions propagate
+    """
+    return await _pools[pool].run(func, *args, **kwargs)
+
+def get_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Get queue and worker counts for every pool"""
+    return {name: pool.get_stats() for name, pool in _pools.items()}
+
+def _collect_metrics():
+    stats = get_pool_stats()
+    yield ("mobilemirror_pool_queued", "gauge", "Blocking calls waiting for a worker",
+           [({"pool": name}, pool["queued"]) for name, pool in stats.items()])
+    yield ("mobilemirror_pool_active", "gauge", "Blocking calls currently running",
+           [({"pool": name}, pool["active"]) for name, pool in stats.items()])
+    yield ("mobilemirror_pool_workers", "gauge", "Worker threads per pool",
+           [({"pool": name}, pool["workers"]) for name, pool in stats.items()])
+
+REGISTRY.register_collector(_collect_metrics)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Filesystem Watcher
+===============================
+
+Thin inotify wrapper used to invalidate in-memory caches (directory
+listings, search results) as soon as the files behind them change.
+
+Features:
+- Direct libc inotify calls through ctypes; no extra dependency
+- One background thread and one inotify fd for the whole process
+- Per-directory subscriptions with any number of callbacks
+- Bounded number of watches so caches cannot exhaust the kernel limit
+- Graceful degradation: ``available()`` is False on non-Linux systems and
+  callers fall back to mtime checks
+
+Security Considerations:
+- Watches are only added for paths callers have already resolved
+- Callback errors are logged and never stop the watcher thread
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .logger import get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration (kept well below the usual fs.inotify.max_user_watches)
+MAX_WATCHES = int(os.environ.get("MOBILEMIRROR_MAX_WATCHES", "8192"))
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# Anything that changes what a listing or a file search would return
+CHANGE_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+               IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# Callback(directory, name, mask); name is "" for events on the directory itself
+WatchCallback = Callable[[str, str, int], None]
+
+class DirectoryWatcher:
+    """Process-wide inotify watcher dispatching events to per-directory callbacks"""
+    
+    def __init__(self):
+        self._libc = None
+        self._fd = -1
+        self._lock = threading.Lock()
+        self._wd_to_path: Dict[int, str] = {}
+        self._path_to_wd: Dict[str, int] = {}
+        self._callbacks: Dict[str, List[WatchCallback]] = {}
+        self._global_callbacks: List[Callable[[], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self.events = 0
+        self.overflows = 0
+        
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            return
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            logger.warning(f"inotify unavailable: {os.strerror(ctypes.get_errno())}")
+            return
+        self._libc = libc
+        self._fd = fd
+    
+    def available(self) -> bool:
+        return self._fd >= 0
+    
+    def watch(self, path: str, callback: WatchCallback) -> bool:
+        """
+        Subscribe to changes directly inside a directory
+        
+        Args:
+            path: Resolved directory path
+            callback: Called from the watcher thread as callback(path, name, mask)
+        
+        Returns:
+            True if the directory is being watched
+        """
+        if not self.available():
+            return False
+        
+        with self._lock:
+            if path not in self._path_to_wd:
+                if len(self._path_to_wd) >= MAX_WATCHES:
+                    return False
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), CHANGE_MASK | IN_ONLYDIR)
+                if wd < 0:
+                    err = ctypes.get_errno()
+                    if err == errno.ENOSPC:
+                        logger.warning("inotify watch limit reached (fs.inotify.max_user_watches)")
+                    return False
+                self._path_to_wd[path] = wd
+                self._wd_to_path[wd] = path
+            self._callbacks.setdefault(path, []).append(callback)
+            self._ensure_thread()
+        return True
+    
+    def unwatch(self, path: str, callback: WatchCallback):
+        """Drop one subscription, removing the kernel watch with the last one"""
+        with self._lock:
+            callbacks = self._callbacks.get(path)
+            if not callbacks or callback not in callbacks:
+                return
+            callbacks.remove(callback)
+            if callbacks:
+                return
+            del self._callbacks[path]
+            wd = self._path_to_wd.pop(path, None)
+            if wd is not None:
+                self._wd_to_path.pop(wd, None)
+                self._libc.inotify_rm_watch(self._fd, wd)
+    
+    def on_overflow(self, callback: Callable[[], None]):
+        """Register a callback for queue overflows, after which any cache may be stale"""
+        with self._lock:
+            self._global_callbacks.append(callback)
+    
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="fs-watch", daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        while True:
+            poller.poll()
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                logger.error("inotify read failed; watcher stopping", exc_info=True)
+                return
+            self._dispatch(data)
+    
+    def _dispatch(self, data: bytes):
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            name = data[pos + EVENT_HEADER.size:pos + EVENT_HEADER.size + length].rstrip(b"\0")
+            pos += EVENT_HEADER.size + length
+            self.events += 1
+            
+            if mask & IN_Q_OVERFLOW:
+                self.overflows += 1
+                logger.warning("inotify queue overflow; invalidating all watched caches")
+                with self._lock:
+                    callbacks = list(self._global_callbacks)
+                for callback in callbacks:
+                    self._call(callback)
+                continue
+            
+            with self._lock:
+                path = self._wd_to_path.get(wd)
+                callbacks = list(self._callbacks.get(path, ())) if path else []
+                if mask & IN_IGNORED and path:
+                    # Kernel dropped the watch (directory deleted or unmounted)
+                    self._wd_to_path.pop(wd, None)
+                    self._path_to_wd.pop(path, None)
+                    self._callbacks.pop(path, None)
+            for callback in callbacks:
+                self._call(callback, path, os.fsdecode(name), mask)
+    
+    @staticmethod
+    def _call(callback, *args):
+        try:
+            callback(*args)
+        except Exception:
+            logger.error("Filesystem watch callback failed", exc_info=True)
+    
+    def watch_count(self) -> int:
+        with self._lock:
+            return len(self._path_to_wd)
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "available": self.available(),
+                "watches": len(self._path_to_wd),
+                "events": self.events,
+                "overflows": self.overflows
+            }
+
+_watcher: Optional[DirectoryWatcher] = None
+_watcher_lock = threading.Lock()
+
+def get_watcher() -> DirectoryWatcher:
+    """Get the process-wide directory watcher, creating it on first use"""
+    global _watcher
+    
+    if _watcher is None:
+        with _watcher_lock:
+            if _watcher is None:
+                _watcher = DirectoryWatcher()
+    return _watcher
\ No newline at end of file
@@ -10,6 +10,21 @@ Provides comprehensive logging functionality for all Mobile Mirror components:
 - Performance monitoring and metrics
 - Error tracking with stack traces
 - Structured logging with JSON support
+- Non-blocking: callers only enqueue records; one listener thread formats
+  them and owns the file handlers (and therefore rotation)
+- Per-level (and optionally per-logger) sampling for chatty DEBUG paths
+- Sync and async aware decorators that also feed latency histograms
+  (see metrics.py)
+
+Every logger returned by get_logger is a child of the "mobilemirror" logger,
+which holds the single QueueHandler. Records are not formatted on the
+calling thread: %-style args are resolved eagerly (they may reference
+mutable objects), while extras, JSON encoding and tracebacks are rendered
+by the listener.
+
+Environment:
+    MOBILEMIRROR_LOG_LEVEL=INFO          default level for get_logger
+    MOBILEMIRROR_LOG_SAMPLE_DEBUG=0.01   keep 1 in 100 DEBUG records (any level name works)
 
 Usage:
     from mobilemirror.backend.utils.logger import get_logger
@@ -19,21 +34,32 @@ Usage:
     logger.error("Error occurred", exc_info=True)
 """
 
+import atexit
+import inspect
+import itertools
 import logging
 import logging.handlers
 import json
+import os
+import queue
 import sys
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import threading
 from functools import wraps
 
+from .metrics import API_HANDLER_SECONDS, FUNCTION_SECONDS
+
 # Global configuration
 LOG_DIR = Path.home() / ".local/share/mobilemirror/logs"
 LOG_FORMAT = "[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s"
 JSON_FORMAT = True  # Enable structured JSON logging
+ROOT_LOGGER_NAME = "mobilemirror"
+DEFAULT_LEVEL = os.environ.get("MOBILEMIRROR_LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = 10000  # Records beyond this are dropped rather than blocking callers
 
 # Ensure log directory exists
 LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -42,6 +68,10 @@ LOG_DIR.mkdir(parents=True, exist_ok=True)
 _loggers: Dict[str, logging.Logger] = {}
 _lock = threading.Lock()
 
+# Queue pipeline, created on first get_logger call
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
 class MobileMirrorFormatter(logging.Formatter):
     """Custom formatter with JSON support and enhanced metadata"""
     
@@ -81,7 +111,8 @@ class MobileMirrorFormatter(logging.Formatter):
             if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 
                           'filename', 'module', 'lineno', 'funcName', 'created', 
                           'msecs', 'relativeCreated', 'thread', 'threadName', 
-                          'processName', 'process', 'getMessage', 'exc_info', 'exc_text', 'stack_info']:
+                          'processName', 'process', 'getMessage', 'exc_info', 'exc_text', 'stack_info',
+                          'taskName']:
                 log_data[key] = value
         
         return json.dumps(log_data, default=str)
@@ -98,128 +129,307 @@ class MobileMirrorFormatter(logging.Formatter):
         
         return formatted
 
-def get_logger(name: str, level: str = "INFO") -> logging.Logger:
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and leaves formatting to the listener"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The base class formats the whole record here, on the caller's thread.
+        # Only resolve %-args; the listener formats everything else.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N records per level, optionally scoped to a logger subtree"""
+    
+    def __init__(self):
+        super().__init__()
+        self._every: Dict[Tuple[Optional[str], int], int] = {}
+        self._counters: Dict[Tuple[Optional[str], int], itertools.count] = {}
+        self.sampled_out = 0
+    
+    def set_rate(self, level: int, rate: float, name: Optional[str] = None):
+        key = (name, level)
+        if rate >= 1:
+            self._every.pop(key, None)
+            return
+        self._every[key] = 0 if rate <= 0 else max(1, round(1 / rate))
+        self._counters[key] = itertools.count()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self._every:
+            return True
+        # Most specific scope wins: the logger, its ancestors, then global
+        name = record.name
+        while True:
+            key = (name or None, record.levelno)
+            every = self._every.get(key)
+            if every is not None:
+                break
+            if not name:
+                return True
+            name = name.rpartition(".")[0]
+        if every and next(self._counters[key]) % every == 0:
+            return True
+        self.sampled_out += 1
+        return False
+
+_sampler = SamplingFilter()
+
+def _configure():
+    """Build the single queue -> listener -> handlers pipeline (call with _lock held)"""
+    global _queue_handler, _listener
+    
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.propagate = False
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    
+    # File handler with rotation; the listener thread is its only user
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_DIR / "mobilemirror.log",
+        maxBytes=10*1024*1024,  # 10MB
+        backupCount=5
+    )
+    file_handler.setFormatter(MobileMirrorFormatter(use_json=JSON_FORMAT))
+    
+    # Console handler for development
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(MobileMirrorFormatter(use_json=False))
+    
+    # Error file handler
+    error_handler = logging.handlers.RotatingFileHandler(
+        LOG_DIR / "errors.log",
+        maxBytes=5*1024*1024,  # 5MB
+        backupCount=3
+    )
+    error_handler.setLevel(logging.ERROR)
+    error_handler.setFormatter(MobileMirrorFormatter(use_json=JSON_FORMAT))
+    
+    for level_name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        rate = os.environ.get(f"MOBILEMIRROR_LOG_SAMPLE_{level_name}")
+        if rate:
+            _sampler.set_rate(getattr(logging, level_name), float(rate))
+    
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(_sampler)
+    root.addHandler(_queue_handler)
+    
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, error_handler,
+        respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def _qualified_name(name: str) -> str:
+    """Place a logger name under the mobilemirror root logger"""
+    if name == ROOT_LOGGER_NAME or name.startswith(ROOT_LOGGER_NAME + "."):
+        return name
+    return f"{ROOT_LOGGER_NAME}.{name}"
+
+def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     """
     Get or create a logger for the specified module
     
     Args:
-        name: Logger name (typically __name__)
-        level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        name: Logger name (typically __name__); placed under "mobilemirror"
+        level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL),
+            defaults to MOBILEMIRROR_LOG_LEVEL or INFO
     
     Returns:
         Configured logger instance
     """
+    name = _qualified_name(name)
     with _lock:
         if name in _loggers:
             return _loggers[name]
         
-        logger = logging.getLogger(name)
-        logger.setLevel(getattr(logging, level.upper()))
-        
-        # Remove existing handlers to avoid duplicates
-        for handler in logger.handlers[:]:
-            logger.removeHandler(handler)
-        
-        # File handler with rotation
-        file_handler = logging.handlers.RotatingFileHandler(
-            LOG_DIR / "mobilemirror.log",
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5
-        )
-        file_handler.setFormatter(MobileMirrorFormatter(use_json=JSON_FORMAT))
-        logger.addHandler(file_handler)
+        if _queue_handler is None:
+            _configure()
         
-        # Console handler for development
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(MobileMirrorFormatter(use_json=False))
-        logger.addHandler(console_handler)
+        logger = logging.getLogger(name)
+        logger.setLevel(getattr(logging, (level or DEFAULT_LEVEL).upper()))
         
-        # Error file handler
-        error_handler = logging.handlers.RotatingFileHandler(
-            LOG_DIR / "errors.log",
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=3
-        )
-        error_handler.setLevel(logging.ERROR)
-        error_handler.setFormatter(MobileMirrorFormatter(use_json=JSON_FORMAT))
-        logger.addHandler(error_handler)
+        # Children hold no handlers; records propagate to the root queue handler
+        if name != ROOT_LOGGER_NAME:
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+            logger.propagate = True
         
         _loggers[name] = logger
         return logger
 
-def log_performance(func):
-    """Decorator to log function performance metrics"""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        logger = get_logger(f"{func.__module__}.{func.__name__}")
-        start_time = datetime.now()
-        
+def set_log_sampling(level: str, rate: float, name: Optional[str] = None):
+    """
+    Sample records of one level, e.g. keep 1% of DEBUG output from a hot path
+    
+    Args:
+        level: Level name the rate applies to
+        rate: Fraction of records kept (1 disables sampling, 0 drops all)
+        name: Logger (and its children) to scope the rate to; global if omitted
+    """
+    _sampler.set_rate(getattr(logging, level.upper()), rate,
+                      _qualified_name(name) if name else None)
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+def _perf_start(logger: logging.Logger, func, args, kwargs) -> float:
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"Starting {func.__name__}", extra={
             "function": func.__name__,
             "args_count": len(args),
             "kwargs_count": len(kwargs)
         })
+    return time.perf_counter()
+
+def _perf_end(logger: logging.Logger, histogram, func, start_time: float,
+              error: Optional[BaseException] = None):
+    duration = time.perf_counter() - start_time
+    histogram.observe(duration)
+    
+    if error is None:
+        logger.info(f"Completed {func.__name__}", extra={
+            "function": func.__name__,
+            "duration_seconds": duration,
+            "status": "success"
+        })
+    else:
+        logger.error(f"Failed {func.__name__}", extra={
+            "function": func.__name__,
+            "duration_seconds": duration,
+            "status": "error",
+            "error_type": type(error).__name__
+        }, exc_info=error)
+
+def log_performance(func):
+    """Decorator to log function performance metrics
+    
+    Works on both plain and ``async def`` functions; coroutines are timed
+    until they finish, not just until they are created. Durations also feed
+    the mobilemirror_function_duration_seconds histogram.
+    """
+    logger = get_logger(f"{func.__module__}.{func.__name__}")
+    histogram = FUNCTION_SECONDS.labels(f"{func.__module__}.{func.__qualname__}")
+    
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start_time = _perf_start(logger, func, args, kwargs)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                _perf_end(logger, histogram, func, start_time, e)
+                raise
+            _perf_end(logger, histogram, func, start_time)
+            return result
         
+        return async_wrapper
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = _perf_start(logger, func, args, kwargs)
         try:
             result = func(*args, **kwargs)
-            duration = (datetime.now() - start_time).total_seconds()
-            
-            logger.info(f"Completed {func.__name__}", extra={
-                "function": func.__name__,
-                "duration_seconds": duration,
-                "status": "success"
-            })
-            
-            return result
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds()
-            
-            logger.error(f"Failed {func.__name__}", extra={
-                "function": func.__name__,
-                "duration_seconds": duration,
-                "status": "error",
-                "error_type": type(e).__name__
-            }, exc_info=True)
-            
+            _perf_end(logger, histogram, func, start_time, e)
             raise
+        _perf_end(logger, histogram, func, start_time)
+        return result
     
     return wrapper
 
-def log_api_request(func):
-    """Decorator to log API requests and responses"""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        logger = get_logger(f"api.{func.__name__}")
-        
-        # Extract request info if available
-        request_info = {}
-        for arg in args:
-            if hasattr(arg, 'method') and hasattr(arg, 'url'):
-                request_info = {
-                    "method": arg.method,
-                    "path": str(arg.url.path) if arg.url else "unknown",
-                    "client": arg.client.host if hasattr(arg, 'client') else "unknown"
-                }
-                break
-        
-        logger.info(f"API Request: {func.__name__}", extra={
+def _api_request_start(logger: logging.Logger, func, args, kwargs) -> float:
+    # Extract request info if available
+    request_info = {}
+    for arg in list(args) + list(kwargs.values()):
+        if hasattr(arg, 'method') and hasattr(arg, 'url'):
+            request_info = {
+                "method": arg.method,
+                "path": str(arg.url.path) if arg.url else "unknown",
+                "client": arg.client.host if getattr(arg, 'client', None) else "unknown"
+            }
+            break
+    
+    logger.info(f"API Request: {func.__name__}", extra={
+        "endpoint": func.__name__,
+        **request_info
+    })
+    return time.perf_counter()
+
+def _api_request_end(logger: logging.Logger, histograms, func, start_time: float,
+                     error: Optional[BaseException] = None):
+    duration = time.perf_counter() - start_time
+    if error is None:
+        histograms[0].observe(duration)
+        logger.info(f"API Response: {func.__name__}", extra={
             "endpoint": func.__name__,
-            **request_info
+            "status": "success",
+            "duration_seconds": duration
         })
+    else:
+        histograms[1].observe(duration)
+        logger.error(f"API Error: {func.__name__}", extra={
+            "endpoint": func.__name__,
+            "error_type": type(error).__name__,
+            "duration_seconds": duration
+        }, exc_info=error)
+
+def log_api_request(func):
+    """Decorator to log API requests and responses
+    
+    ``async def`` handlers get an async wrapper, so FastAPI still sees a
+    coroutine function and awaits it on the event loop.
+    """
+    logger = get_logger(f"api.{func.__name__}")
+    histograms = (API_HANDLER_SECONDS.labels(func.__name__, "success"),
+                  API_HANDLER_SECONDS.labels(func.__name__, "error"))
+    
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start_time = _api_request_start(logger, func, args, kwargs)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                _api_request_end(logger, histograms, func, start_time, e)
+                raise
+            _api_request_end(logger, histograms, func, start_time)
+            return result
         
+        return async_wrapper
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = _api_request_start(logger, func, args, kwargs)
         try:
             result = func(*args, **kwargs)
-            logger.info(f"API Response: {func.__name__}", extra={
-                "endpoint": func.__name__,
-                "status": "success"
-            })
-            return result
         except Exception as e:
-            logger.error(f"API Error: {func.__name__}", extra={
-                "endpoint": func.__name__,
-                "error_type": type(e).__name__
-            }, exc_info=True)
+            _api_request_end(logger, histograms, func, start_time, e)
             raise
+        _api_request_end(logger, histograms, func, start_time)
+        return result
     
     return wrapper
 
@@ -240,14 +450,11 @@ def log_event(msg: str, inline: bool = False, level: str = "INFO"):
     log_func(msg)
     
     if inline:
+        from ..log_stream import read_recent_logs  # Reads backwards; never the whole file
         try:
-            log_file = LOG_DIR / "mobilemirror.log"
-            if log_file.exists():
-                with open(log_file, "r", encoding="utf-8") as f:
-                    return "".join(f.readlines()[-50:])
+            return read_recent_logs(50)["log"]
         except Exception:
             return "[Log unavailable]"
-        return ""
 
 def get_log_stats() -> Dict[str, Any]:
     """Get logging statistics and metrics"""
@@ -255,6 +462,13 @@ def get_log_stats() -> Dict[str, Any]:
         "log_directory": str(LOG_DIR),
         "active_loggers": len(_loggers),
         "logger_names": list(_loggers.keys()),
+        "queue": {
+            "pending": _queue_handler.queue.qsize() if _queue_handler else 0,
+            "capacity": LOG_QUEUE_SIZE,
+            "dropped": _queue_handler.dropped if _queue_handler else 0,
+            "listener_running": _listener is not None
+        },
+        "sampled_out": _sampler.sampled_out,
         "log_files": []
     }
     
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Mesh Address Discovery
+====================================
+
+Resolves this node's headscale/tailscale mesh address once and keeps it
+current in the background, so request handlers never fork to find it.
+
+Features:
+- Address from `headscale nodes list`, falling back to the first
+  100.64.0.0/10 address on a local interface
+- Refreshed on netlink address/link change events (debounced), with a
+  slow periodic refresh as a safety net and when netlink is unavailable
+- Lock-free reads of the cached value
+
+Security Considerations:
+- External commands run with fixed arguments and a timeout
+- Resolution errors keep the last known address instead of failing
+"""
+
+import json
+import re
+import select
+import socket
+import subprocess
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .logger import get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+REFRESH_INTERVAL = 300      # Seconds between safety-net refreshes
+CHANGE_DEBOUNCE = 1.0       # Seconds of quiet after a netlink event before re-resolving
+COMMAND_TIMEOUT = 5
+FALLBACK_ADDRESS = "localhost"
+MESH_ADDRESS_PATTERN = re.compile(r"inet (100\.\d+\.\d+\.\d+)")
+
+# rtnetlink multicast groups (linux/rtnetlink.h)
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+def resolve_mesh_address() -> str:
+    """Look the mesh address up now (forks; prefer get_mesh_address)"""
+    try:
+        # Try to get IP from headscale status
+        result = subprocess.check_output(["headscale", "nodes", "list", "--output", "json"],
+                                         stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).decode()
+        nodes = json.loads(result)
+        if nodes:
+            # Return the first node's IP
+            return nodes[0].get('ip_addresses', [FALLBACK_ADDRESS])[0]
+    except Exception:
+        pass
+    
+    # Fallback to checking network interfaces using ip command
+    try:
+        result = subprocess.check_output(["ip", "addr", "show"], timeout=COMMAND_TIMEOUT).decode()
+        # Look for headscale IP range (100.64.0.0/10)
+        matches = MESH_ADDRESS_PATTERN.findall(result)
+        if matches:
+            return matches[0]
+    except Exception:
+        pass
+    
+    return FALLBACK_ADDRESS
+
+class MeshAddressMonitor:
+    """Cached mesh address kept fresh by a netlink listener thread"""
+    
+    def __init__(self):
+        self._address: Optional[str] = None
+        self._resolved_at = 0.0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.netlink = False
+    
+    def get(self) -> str:
+        address = self._address
+        if address is None:
+            # First caller resolves synchronously; later callers only read
+            with self._lock:
+                if self._address is None:
+                    self._refresh_locked()
+                    self._start()
+            address = self._address
+        return address
+    
+    def refresh(self) -> str:
+        with self._lock:
+            self._refresh_locked()
+            return self._address
+    
+    def _refresh_locked(self):
+        address = resolve_mesh_address()
+        if address != self._address:
+            logger.info(f"Mesh address is now {address}", extra={"previous": self._address})
+        self._address = address
+        self._resolved_at = time.time()
+        self.refreshes += 1
+    
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mesh-address", daemon=True)
+            self._thread.start()
+    
+    def _open_netlink(self) -> Optional[socket.socket]:
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+        except (AttributeError, OSError) as e:
+            logger.info(f"Netlink unavailable, refreshing mesh address every {REFRESH_INTERVAL}s: {e}")
+            return None
+        self.netlink = True
+        return sock
+    
+    def _run(self):
+        sock = self._open_netlink()
+        while True:
+            try:
+                if sock is None:
+                    time.sleep(REFRESH_INTERVAL)
+                elif select.select([sock], [], [], REFRESH_INTERVAL)[0]:
+                    # Address changes come in bursts (link up, addr add, route add)
+                    deadline = time.monotonic() + REFRESH_INTERVAL / 10
+                    while (select.select([sock], [], [], CHANGE_DEBOUNCE)[0]
+                           and time.monotonic() < deadline):
+                        sock.recv(65536)
+                self.refresh()
+            except Exception:
+                logger.error("Mesh address refresh failed", exc_info=True)
+                time.sleep(CHANGE_DEBOUNCE)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "address": self._address,
+            "resolved_at": self._resolved_at or None,
+            "refreshes": self.refreshes,
+            "netlink": self.netlink
+        }
+
+_monitor = MeshAddressMonitor()
+
+def get_mesh_address() -> str:
+    """Get the cached mesh address of this node, resolving it on first use"""
+    return _monitor.get()
+
+def get_mesh_address_stats() -> Dict[str, Any]:
+    return _monitor.get_stats()
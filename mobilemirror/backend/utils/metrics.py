@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Metrics
+=====================
+
+In-process counters, gauges and latency histograms exposed in the
+Prometheus text format on /metrics.
+
+Features:
+- Counters, gauges and HDR-style log-linear latency histograms
+  (4 sub-buckets per power of two, ~61us to 64s, so relative error stays
+  under 25% at every scale)
+- Labelled children are created once and cached; hot paths hold on to the
+  child, so recording is one short lock and an add
+- Scrape-time collectors for values that already live elsewhere, such as
+  per-session terminal byte counts, so those paths pay nothing at all
+- Pure ASGI middleware timing every HTTP request by route template
+
+Security Considerations:
+- Route labels use the matched route template, never the raw path, which
+  keeps label cardinality bounded
+- Nothing secret (tokens, session ids) is ever used as a label value
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Log-linear bucket upper bounds in seconds
+SUB_BUCKETS = 4
+MIN_EXPONENT = -14   # 2**-14 s ~= 61 microseconds
+MAX_EXPONENT = 6     # 2**6 s = 64 seconds
+LATENCY_BUCKETS: Tuple[float, ...] = tuple(
+    2.0 ** exponent * (1 + step / SUB_BUCKETS)
+    for exponent in range(MIN_EXPONENT, MAX_EXPONENT)
+    for step in range(SUB_BUCKETS)
+) + (2.0 ** MAX_EXPONENT,)
+
+# Collector output: (name, type, help, [(labels, value), ...])
+CollectorResult = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+    
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+class _GaugeChild:
+    __slots__ = ("value", "_lock")
+    
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+    
+    def set(self, value: float):
+        self.value = value
+    
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self.value -= amount
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+    
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+    
+    def time(self) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block"""
+        return _Timer(self)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate a percentile from the buckets
+        
+        Args:
+            q: Percentile in [0, 100]
+        
+        Returns:
+            Upper bound of the bucket holding the percentile, or None if empty
+        """
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if not total:
+            return None
+        rank = q / 100 * total
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+class _Timer:
+    __slots__ = ("child", "started")
+    
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+
+class _Metric:
+    """Base for a named metric family with optional labels"""
+    
+    type = "untyped"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 registry: Optional["MetricsRegistry"] = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values: Any):
+        """Get (creating once) the child for these label values"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+    
+    def remove(self, *values: Any):
+        """Drop one labelled child, e.g. when the thing it tracked is gone"""
+        with self._lock:
+            self._children.pop(tuple(str(value) for value in values), None)
+    
+    def _items(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+    
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    
+    type = "counter"
+    
+    def _new_child(self):
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+    
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"
+                for labels, child in self._items()]
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    
+    type = "gauge"
+    
+    def _new_child(self):
+        return _GaugeChild()
+    
+    def set(self, value: float):
+        self.labels().set(value)
+    
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+    
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+    
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"
+                for labels, child in self._items()]
+
+class Histogram(_Metric):
+    """Distribution of observations in log-linear buckets"""
+    
+    type = "histogram"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS,
+                 registry: Optional["MetricsRegistry"] = None):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames, registry)
+    
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+    
+    def observe(self, value: float):
+        self.labels().observe(value)
+    
+    def time(self) -> _Timer:
+        return self.labels().time()
+    
+    def render(self) -> List[str]:
+        lines = []
+        for labels, child in self._items():
+            with child._lock:
+                counts = list(child.counts)
+                total, value_sum = child.count, child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(value_sum)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {total}")
+        return lines
+
+class MetricsRegistry:
+    """Holds metric families and scrape-time collectors"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[CollectorResult]]] = []
+        self._lock = threading.Lock()
+    
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+    
+    def register_collector(self, collector: Callable[[], Iterable[CollectorResult]]):
+        """Add a callable run at scrape time, yielding (name, type, help, samples)"""
+        with self._lock:
+            self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                continue  # A broken collector must not take the whole scrape down
+            for name, metric_type, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}"
+                             for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# ─────────── Shared metrics ───────────
+
+FUNCTION_SECONDS = Histogram(
+    "mobilemirror_function_duration_seconds",
+    "Duration of functions instrumented with log_performance",
+    ["function"]
+)
+API_HANDLER_SECONDS = Histogram(
+    "mobilemirror_api_handler_duration_seconds",
+    "Duration of API handlers instrumented with log_api_request",
+    ["endpoint", "status"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "mobilemirror_http_request_duration_seconds",
+    "HTTP request latency from first byte in to last byte out",
+    ["method", "route", "status"]
+)
+HTTP_IN_FLIGHT = Gauge(
+    "mobilemirror_http_requests_in_flight",
+    "HTTP requests currently being served"
+)
+WEBSOCKET_CONNECTIONS = Counter(
+    "mobilemirror_websocket_connections_total",
+    "WebSocket connections handled, by route",
+    ["route"]
+)
+WEBSOCKETS_OPEN = Gauge(
+    "mobilemirror_websockets_open",
+    "WebSocket connections currently open"
+)
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and WebSocket counts
+    
+    Streaming responses are timed until their last chunk is sent.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self._in_flight = HTTP_IN_FLIGHT.labels()
+        self._ws_open = WEBSOCKETS_OPEN.labels()
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket":
+            self._ws_open.inc()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self._ws_open.dec()
+                WEBSOCKET_CONNECTIONS.labels(_route_template(scope)).inc()
+            return
+        
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        self._in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._in_flight.dec()
+            HTTP_REQUEST_SECONDS.labels(scope["method"], _route_template(scope), status).observe(
+                time.perf_counter() - started)
+
+def render_metrics() -> str:
+    """Prometheus exposition of the default registry"""
+    return REGISTRY.render()
\ No newline at end of file
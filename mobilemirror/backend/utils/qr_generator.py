@@ -14,6 +14,8 @@ Features:
 - Error correction level control
 - Custom styling and branding
 - Comprehensive logging and monitoring
+- Rendered images cached in memory (LRU) and on disk under QR_CACHE_DIR,
+  keyed by URL, size, style and error correction, with content ETags
 
 Security Considerations:
 - URL validation and sanitization
@@ -23,9 +25,16 @@ Security Considerations:
 
 import subprocess
 import base64
+import hashlib
 import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from io import BytesIO
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, NamedTuple
 from datetime import datetime
 from pathlib import Path
 
@@ -48,6 +57,9 @@ logger = get_logger(__name__)
 DEFAULT_ERROR_CORRECTION = constants.ERROR_CORRECT_M
 MAX_URL_LENGTH = 2048
 QR_CACHE_DIR = Path.home() / ".local/share/mobilemirror/qr_cache"
+QR_MEMORY_CACHE_SIZE = 64
+QR_DISK_CACHE_LIMIT = 512  # Files kept in QR_CACHE_DIR; oldest are pruned beyond this
+ERROR_CORRECTION_LEVELS = ("L", "M", "Q", "H")
 
 def ensure_qr_directory():
     """Ensure QR code cache directory exists"""
@@ -74,23 +86,24 @@ def validate_url(url: str) -> bool:
     
     return True
 
+@lru_cache(maxsize=1)
 def check_qrencode_available() -> bool:
-    """Check if qrencode command line tool is available"""
-    try:
-        subprocess.run(["which", "qrencode"], check=True, capture_output=True)
+    """Check if qrencode command line tool is available (looked up once)"""
+    if shutil.which("qrencode"):
         return True
-    except subprocess.CalledProcessError:
-        logger.warning("qrencode command not found")
-        return False
+    logger.warning("qrencode command not found")
+    return False
 
 @log_performance
-def generate_qr_with_qrencode(url: str, size: str = "medium") -> Optional[bytes]:
+def generate_qr_with_qrencode(url: str, size: str = "medium",
+                              error_correction: str = "M") -> Optional[bytes]:
     """
     Generate QR code using qrencode command line tool
     
     Args:
         url: URL to encode
         size: QR code size (small, medium, large)
+        error_correction: Error correction level (L, M, Q, H)
         
     Returns:
         PNG image bytes or None if generation fails
@@ -106,7 +119,9 @@ def generate_qr_with_qrencode(url: str, size: str = "medium") -> Optional[bytes]
             "large": ["-s", "10"]
         }
         
-        cmd = ["qrencode", "-t", "PNG", "-o", "-"] + size_args.get(size, ["-s", "6"]) + [url]
+        level = error_correction if error_correction in ERROR_CORRECTION_LEVELS else "M"
+        cmd = (["qrencode", "-t", "PNG", "-o", "-", "-l", level] +
+               size_args.get(size, ["-s", "6"]) + [url])
         
         logger.debug(f"Generating QR code with qrencode: {size}")
         
@@ -195,6 +210,122 @@ def generate_qr_with_python(url: str,
         logger.error("Failed to generate QR code with Python library", exc_info=True)
         return None
 
+# ─────────── Image cache ───────────
+
+class QRImage(NamedTuple):
+    """A rendered QR code and the strong ETag of its bytes"""
+    data: bytes
+    etag: str
+
+def _cache_key(url: str, size: str, error_correction: str, style: str) -> str:
+    params = json.dumps([url, size, error_correction, style], separators=(",", ":"))
+    return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+def _make_image(data: bytes) -> QRImage:
+    return QRImage(data, '"' + hashlib.sha256(data).hexdigest()[:32] + '"')
+
+class QRImageCache:
+    """Memory LRU in front of a directory of rendered images named by cache key"""
+    
+    def __init__(self, directory: Path, max_entries: int = QR_MEMORY_CACHE_SIZE):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, QRImage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[QRImage]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image
+        
+        try:
+            data = (self.directory / f"{key}.png").read_bytes()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        image = _make_image(data)
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, image)
+        return image
+    
+    def put(self, key: str, data: bytes) -> QRImage:
+        image = _make_image(data)
+        with self._lock:
+            self._remember(key, image)
+        try:
+            ensure_qr_directory()
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.directory / f"{key}.png")
+            self._prune_disk()
+        except OSError:
+            logger.warning("Failed to write QR cache entry", exc_info=True)
+        return image
+    
+    def _remember(self, key: str, image: QRImage):
+        self._entries[key] = image
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _prune_disk(self):
+        files = list(self.directory.glob("*.png"))
+        if len(files) <= QR_DISK_CACHE_LIMIT:
+            return
+        files.sort(key=lambda path: path.stat().st_mtime)
+        for path in files[:len(files) - QR_DISK_CACHE_LIMIT]:
+            path.unlink(missing_ok=True)
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+_image_cache = QRImageCache(QR_CACHE_DIR)
+
+def get_qr_image(url: str, size: str = "medium", error_correction: str = "M",
+                 style: str = "default") -> Optional[QRImage]:
+    """
+    Get a rendered PNG QR code, from the cache when possible
+    
+    Args:
+        url: URL to encode (must already be validated)
+        size: QR code size (small, medium, large)
+        error_correction: Error correction level (L, M, Q, H)
+        style: QR code style (default, rounded)
+    
+    Returns:
+        QRImage with PNG bytes and ETag, or None if generation fails
+    """
+    key = _cache_key(url, size, error_correction, style)
+    image = _image_cache.get(key)
+    if image is not None:
+        return image
+    
+    # qrencode cannot draw rounded modules, so only try it for the default style
+    qr_bytes = None
+    if style != "rounded" or not STYLED_QR_AVAILABLE:
+        qr_bytes = generate_qr_with_qrencode(url, size, error_correction)
+    if qr_bytes is None:
+        logger.debug("qrencode unavailable or failed, trying Python library")
+        qr_bytes = generate_qr_with_python(url, size, error_correction, style)
+    if qr_bytes is None:
+        return None
+    return _image_cache.put(key, qr_bytes)
+
 @log_performance
 def generate_qr(url: str, 
                format: str = "png",
@@ -233,13 +364,10 @@ def generate_qr(url: str,
                 "url": url
             }
         
-        # Try qrencode first, fallback to Python library
-        qr_bytes = generate_qr_with_qrencode(url, size)
-        if qr_bytes is None:
-            logger.debug("qrencode failed, trying Python library")
-            qr_bytes = generate_qr_with_python(url, size, error_correction, style)
+        # Try qrencode first, fallback to Python library; repeats come from the cache
+        image = get_qr_image(url, size, error_correction, style)
         
-        if qr_bytes is None:
+        if image is None:
             logger.error("All QR generation methods failed")
             return {
                 "status": "error",
@@ -247,6 +375,8 @@ def generate_qr(url: str,
                 "url": url
             }
         
+        qr_bytes = image.data
+        
         # Prepare result
         result = {
             "status": "success",
@@ -254,7 +384,8 @@ def generate_qr(url: str,
             "format": format,
             "size": size,
             "generated_at": datetime.now().isoformat(),
-            "qr_size_bytes": len(qr_bytes)
+            "qr_size_bytes": len(qr_bytes),
+            "etag": image.etag
         }
         
         # Add QR code data based on format
@@ -342,6 +473,7 @@ def get_qr_stats() -> Dict[str, Any]:
             "python_qrcode": True  # Always available since we import it
         },
         "cache_directory": str(QR_CACHE_DIR),
+        "cache": _image_cache.get_stats(),
         "max_url_length": MAX_URL_LENGTH,
         "supported_formats": ["png", "base64"],
         "supported_sizes": ["small", "medium", "large"],
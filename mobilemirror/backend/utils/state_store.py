@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Shared State Store
+================================
+
+Small key/value and sliding-window event store for state that must agree
+across API worker processes: authentication lockout counters and the
+terminal session registry.
+
+Features:
+- Three interchangeable backends behind one interface:
+  - "memory": process-local dicts (single worker, the default)
+  - "sqlite": one WAL-mode database file shared by every worker on the host
+  - "redis": a local Redis (or Redis-compatible) server
+- Values with optional TTL; expired entries are never returned
+- Sliding-window event counts (e.g. failed logins per IP in the last 5 min)
+- Backend chosen with MOBILEMIRROR_STATE_STORE; multi-worker mode defaults
+  to sqlite since memory cannot be shared
+
+Security Considerations:
+- The SQLite file is created with owner-only permissions
+- Redis keys are namespaced; only keys under that namespace are scanned
+- Store failures are logged and surfaced to callers, which decide whether
+  to fail open or closed
+"""
+
+import math
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from .logger import get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+STORE_BACKENDS = ("memory", "sqlite", "redis")
+STATE_DB = Path(os.environ.get("MOBILEMIRROR_STATE_DB",
+                               Path.home() / ".local/share/mobilemirror/state.db"))
+REDIS_URL = os.environ.get("MOBILEMIRROR_REDIS_URL", "redis://127.0.0.1:6379/0")
+REDIS_NAMESPACE = "mobilemirror:"
+SQLITE_BUSY_TIMEOUT = 5.0   # Seconds a writer waits for another worker's transaction
+PRUNE_EVERY = 256           # Writes between sweeps of expired SQLite rows
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with ``prefix``"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class StateStore(ABC):
+    """Interface shared by every backend"""
+    
+    name = "base"
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Live value for ``key``, or None if missing or expired"""
+    
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """Store a value, expiring after ``ttl`` seconds if given"""
+    
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove a value if present"""
+    
+    @abstractmethod
+    def scan(self, prefix: str) -> Dict[str, str]:
+        """All live values whose key starts with ``prefix``"""
+    
+    @abstractmethod
+    def record_event(self, key: str, window: float) -> int:
+        """
+        Record one event now and count the events within the last ``window`` seconds
+        
+        Returns:
+            Number of events for ``key`` in the window, including this one
+        """
+    
+    @abstractmethod
+    def event_counts(self, prefix: str, window: float) -> Dict[str, int]:
+        """Events in the last ``window`` seconds for every key starting with ``prefix``"""
+    
+    @abstractmethod
+    def clear_events(self, key: str):
+        """Forget every event recorded for ``key``"""
+    
+    def close(self):
+        pass
+
+class MemoryStore(StateStore):
+    """Process-local store; correct only with a single worker"""
+    
+    name = "memory"
+    
+    def __init__(self):
+        self._values: Dict[str, tuple] = {}
+        self._events: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= time.time():
+                del self._values[key]
+                return None
+            return entry[0]
+    
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl if ttl else None)
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+    
+    def scan(self, prefix: str) -> Dict[str, str]:
+        now = time.time()
+        with self._lock:
+            return {key: value for key, (value, expires_at) in self._values.items()
+                    if key.startswith(prefix) and (expires_at is None or expires_at > now)}
+    
+    def record_event(self, key: str, window: float) -> int:
+        now = time.time()
+        with self._lock:
+            events = [at for at in self._events.get(key, []) if now - at < window]
+            events.append(now)
+            self._events[key] = events
+            return len(events)
+    
+    def event_counts(self, prefix: str, window: float) -> Dict[str, int]:
+        now = time.time()
+        counts = {}
+        with self._lock:
+            for key in [key for key in self._events if key.startswith(prefix)]:
+                events = [at for at in self._events[key] if now - at < window]
+                if events:
+                    self._events[key] = events
+                    counts[key] = len(events)
+                else:
+                    del self._events[key]
+        return counts
+    
+    def clear_events(self, key: str):
+        with self._lock:
+            self._events.pop(key, None)
+
+class SQLiteStore(StateStore):
+    """Store in a WAL-mode SQLite file shared by all workers on the host
+    
+    Each thread gets its own connection. WAL lets readers proceed while
+    one worker writes; writers wait up to SQLITE_BUSY_TIMEOUT for each other.
+    """
+    
+    name = "sqlite"
+    
+    def __init__(self, path: Path = STATE_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        self._max_window = 0.0   # Longest event window seen; older events are dead
+        
+        if not self.path.exists():
+            # Create owner-only before SQLite opens it
+            os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+        db = self._db()
+        db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)")
+        db.execute("CREATE TABLE IF NOT EXISTS events (key TEXT NOT NULL, at REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS events_key_at ON events (key, at)")
+    
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Autocommit mode; multi-statement updates use explicit transactions
+            db = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; lockout state can tolerate that
+            self._local.db = db
+        return db
+    
+    def _after_write(self, db: sqlite3.Connection):
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            now = time.time()
+            db.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            if self._max_window:
+                # Keys nobody records to again are never trimmed by record_event
+                db.execute("DELETE FROM events WHERE at <= ?", (now - self._max_window,))
+    
+    def get(self, key: str) -> Optional[str]:
+        row = self._db().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        db = self._db()
+        db.execute("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                   (key, value, time.time() + ttl if ttl else None))
+        self._after_write(db)
+    
+    def delete(self, key: str):
+        self._db().execute("DELETE FROM kv WHERE key = ?", (key,))
+    
+    def scan(self, prefix: str) -> Dict[str, str]:
+        rows = self._db().execute(
+            "SELECT key, value FROM kv WHERE key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?)",
+            (prefix, _prefix_upper_bound(prefix), time.time())
+        ).fetchall()
+        return dict(rows)
+    
+    def record_event(self, key: str, window: float) -> int:
+        now = time.time()
+        self._max_window = max(self._max_window, window)
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM events WHERE key = ? AND at <= ?", (key, now - window))
+            db.execute("INSERT INTO events (key, at) VALUES (?, ?)", (key, now))
+            count = db.execute("SELECT COUNT(*) FROM events WHERE key = ?", (key,)).fetchone()[0]
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._after_write(db)
+        return count
+    
+    def event_counts(self, prefix: str, window: float) -> Dict[str, int]:
+        self._max_window = max(self._max_window, window)
+        rows = self._db().execute(
+            "SELECT key, COUNT(*) FROM events WHERE key >= ? AND key < ? AND at > ? GROUP BY key",
+            (prefix, _prefix_upper_bound(prefix), time.time() - window)
+        ).fetchall()
+        return dict(rows)
+    
+    def clear_events(self, key: str):
+        self._db().execute("DELETE FROM events WHERE key = ?", (key,))
+    
+    def close(self):
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+class RedisStore(StateStore):
+    """Store on a local Redis server; events are sorted sets scored by time"""
+    
+    name = "redis"
+    
+    def __init__(self, url: str = REDIS_URL, namespace: str = REDIS_NAMESPACE):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed")
+        self._redis = redis.Redis.from_url(url, decode_responses=True, socket_timeout=2)
+        self._redis.ping()
+        self._namespace = namespace
+    
+    def _key(self, key: str) -> str:
+        return self._namespace + key
+    
+    def get(self, key: str) -> Optional[str]:
+        return self._redis.get(self._key(key))
+    
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        self._redis.set(self._key(key), value, px=int(ttl * 1000) if ttl else None)
+    
+    def delete(self, key: str):
+        self._redis.delete(self._key(key))
+    
+    def scan(self, prefix: str) -> Dict[str, str]:
+        keys = list(self._redis.scan_iter(match=self._key(prefix) + "*", count=500))
+        if not keys:
+            return {}
+        start = len(self._namespace)
+        return {key[start:]: value for key, value in zip(keys, self._redis.mget(keys))
+                if value is not None}
+    
+    def record_event(self, key: str, window: float) -> int:
+        now = time.time()
+        name = self._key(key)
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(name, "-inf", now - window)
+        pipe.zadd(name, {f"{now}:{secrets.token_hex(4)}": now})
+        pipe.zcard(name)
+        pipe.expire(name, math.ceil(window))
+        return pipe.execute()[2]
+    
+    def event_counts(self, prefix: str, window: float) -> Dict[str, int]:
+        since = time.time() - window
+        keys = list(self._redis.scan_iter(match=self._key(prefix) + "*", count=500))
+        if not keys:
+            return {}
+        pipe = self._redis.pipeline()
+        for name in keys:
+            pipe.zcount(name, f"({since}", "+inf")
+        start = len(self._namespace)
+        return {name[start:]: count for name, count in zip(keys, pipe.execute()) if count}
+    
+    def clear_events(self, key: str):
+        self._redis.delete(self._key(key))
+    
+    def close(self):
+        self._redis.close()
+
+_store: Optional[StateStore] = None
+_store_lock = threading.Lock()
+
+def create_store(backend: str) -> StateStore:
+    """
+    Open a store backend by name
+    
+    Args:
+        backend: One of STORE_BACKENDS
+    
+    Returns:
+        The store; "redis" falls back to "sqlite" if Redis cannot be reached
+    """
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unknown state store: {backend}")
+    if backend == "redis":
+        try:
+            return RedisStore()
+        except Exception as e:
+            logger.error(f"Redis state store unavailable at {REDIS_URL}, using SQLite: {e}")
+            backend = "sqlite"
+    if backend == "sqlite":
+        return SQLiteStore()
+    return MemoryStore()
+
+def get_store() -> StateStore:
+    """Get the process-wide store, opening it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from .workers import WORKER_COUNT
+                default = "sqlite" if WORKER_COUNT > 1 else "memory"
+                backend = os.environ.get("MOBILEMIRROR_STATE_STORE", default).lower()
+                if backend == "memory" and WORKER_COUNT > 1:
+                    logger.warning("Memory state store cannot be shared between workers; using SQLite")
+                    backend = "sqlite"
+                _store = create_store(backend)
+                logger.info(f"Shared state store: {_store.name}")
+    return _store
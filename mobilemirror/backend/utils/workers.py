@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Worker Processes
+==============================
+
+Multi-process mode for the API: a supervisor binds the public port once and
+runs MOBILEMIRROR_WORKERS uvicorn workers on it, so file operations, search
+and token hashing scale across cores.
+
+Features:
+- Workers are spawned (not forked) and share the listening socket; the
+  kernel spreads new connections between them
+- Each worker also listens on a private 127.0.0.1 port, recorded with the
+  terminal sessions it owns, so a reattaching terminal can be relayed to
+  the process holding its PTY
+- Crashed workers are restarted; SIGTERM/SIGINT shut every worker down
+- State that must agree between workers (auth lockout, session registry)
+  lives in the shared state store (state_store.py)
+
+Security Considerations:
+- Private worker ports bind loopback only
+- Workers run with the supervisor's user and environment; nothing is
+  passed on the command line
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+from .logger import get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+WORKER_COUNT = max(1, int(os.environ.get("MOBILEMIRROR_WORKERS", "1")))
+RESTART_DELAY = 1.0         # Seconds before a crashed worker is replaced
+SHUTDOWN_TIMEOUT = 10.0     # Seconds workers get to finish before being killed
+LISTEN_BACKLOG = 2048
+
+# Set inside worker processes only
+_private_port: Optional[int] = None
+_worker_index: Optional[int] = None
+
+def get_worker_address() -> Optional[Dict[str, int]]:
+    """
+    Where other workers can reach this process
+    
+    Returns:
+        {"pid", "port", "index"} inside a worker process, None in single-process mode
+    """
+    if _private_port is None:
+        return None
+    return {"pid": os.getpid(), "port": _private_port, "index": _worker_index}
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+def _worker_main(index: int, app_import: str, shared: socket.socket):
+    """Entry point of a spawned worker process"""
+    global _private_port, _worker_index
+    import uvicorn
+    
+    private = _bind("127.0.0.1", 0)
+    _private_port = private.getsockname()[1]
+    _worker_index = index
+    logger.info(f"Worker {index} serving", extra={"pid": os.getpid(), "private_port": _private_port})
+    
+    server = uvicorn.Server(uvicorn.Config(app_import, log_level="info"))
+    server.run(sockets=[shared, private])
+
+def run_workers(app_import: str, host: str, port: int, count: int = WORKER_COUNT):
+    """
+    Serve the app from ``count`` worker processes until signalled
+    
+    Args:
+        app_import: "module:attribute" import string of the ASGI app
+        host: Public bind address
+        port: Public port
+        count: Number of workers
+    """
+    shared = _bind(host, port)
+    context = multiprocessing.get_context("spawn")
+    stopping = threading.Event()
+    
+    def start(index: int) -> multiprocessing.Process:
+        process = context.Process(target=_worker_main, args=(index, app_import, shared),
+                                  name=f"mobilemirror-worker-{index}")
+        process.start()
+        return process
+    
+    def stop(signum, frame):
+        logger.info(f"Stopping {count} workers (signal {signum})")
+        stopping.set()
+    
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
+    workers = {index: start(index) for index in range(count)}
+    logger.info(f"Started {count} workers on {host}:{port}", extra={
+        "pids": [process.pid for process in workers.values()]
+    })
+    
+    try:
+        while not stopping.wait(RESTART_DELAY):
+            for index, process in list(workers.items()):
+                if not process.is_alive():
+                    logger.error(f"Worker {index} (pid {process.pid}) exited with {process.exitcode}; restarting")
+                    workers[index] = start(index)
+    finally:
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM: uvicorn finishes in-flight requests
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for process in workers.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+        shared.close()
+        logger.info("All workers stopped")
@@ -0,0 +1 @@
+# Mobile Mirror Benchmarks
\ No newline at end of file
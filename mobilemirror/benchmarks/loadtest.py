@@ -0,0 +1,897 @@
+#!/usr/bin/env python3
+"""
+Mobile Mirror Load Test
+=======================
+
+Drives the Mobile Mirror API with concurrent terminals, mouse bursts, large
+directory listings and 10 MB reads, and reports latency percentiles,
+throughput, event-loop lag and RSS. Results are written as JSON and can be
+compared against a stored baseline so that regressions in terminal_bridge,
+file_ops and auth fail CI.
+
+Features:
+- Two transports:
+  - "asgi": requests are fed straight into the ASGI app on the same event
+    loop; measures handler cost without sockets (loop lag includes the
+    client side)
+  - "loopback": the app runs under uvicorn in a server thread on 127.0.0.1
+    and is driven over real HTTP and WebSocket connections; loop lag is
+    measured on the server's own loop
+- Scenarios (each run on its own, with its own lag and RSS samples):
+  - terminal: N concurrent /terminal sessions, `yes` output throughput and
+    `cat` keystroke echo round-trip time
+  - mouse: bursts of single and batched /mouse events
+  - files: cold (rescanned) and warm (cached) pages of a large directory
+  - read: 10 MB /read bodies, then conditional re-reads answered with 304
+  - auth: requests authenticated with a file token, and file-token
+    verification cold (PBKDF2) and warm (cached)
+- Baseline comparison with a relative tolerance and an absolute noise
+  floor; exits non-zero on regression, or if an explicit --baseline is
+  missing
+
+Usage:
+    python -m mobilemirror.benchmarks.loadtest --mode asgi,loopback \\
+        --output results.json --baseline mobilemirror/benchmarks/baseline.json
+
+Security Considerations:
+- The server only ever binds 127.0.0.1 on an ephemeral port
+- Throwaway random tokens are used; the file token is written to a scratch
+  token file, never the real one
+- Scratch files live in a temporary directory removed on exit
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import secrets
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+# Auth reads the expected token from the environment at verification time
+BENCH_TOKEN = os.environ.setdefault("MOBILEMIRROR_TOKEN", f"bench-{secrets.token_urlsafe(16)}")
+
+from ..backend.utils.logger import get_logger
+
+# Initialize module logger
+logger = get_logger(__name__)
+
+# Configuration
+TRANSPORTS = ("asgi", "loopback")
+SCENARIOS = ("terminal", "mouse", "files", "read", "auth")
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+LAG_PROBE_INTERVAL = 0.01       # Seconds between event-loop lag samples
+STEP_TIMEOUT = 60.0             # Longest any single wait may take before the step fails
+DEFAULT_TOLERANCE = 0.30        # Allowed relative slowdown before a metric counts as regressed
+NOISE_FLOOR_MS = 1.0            # Latency differences below this are never regressions
+
+# Workload sizes: full run, and the --quick profile used in CI
+PROFILES = {
+    "full": {
+        "terminals": 16, "yes_bytes": 8 * 1024 * 1024, "echo_rounds": 200,
+        "mouse_bursts": 20, "mouse_burst_size": 50, "mouse_batch_size": 20,
+        "directory_entries": 50000, "listing_requests": 200, "cold_listings": 10,
+        "read_requests": 20, "read_concurrency": 4,
+        "auth_requests": 2000, "auth_concurrency": 32, "token_hashes": 20,
+    },
+    "quick": {
+        "terminals": 4, "yes_bytes": 1024 * 1024, "echo_rounds": 50,
+        "mouse_bursts": 5, "mouse_burst_size": 20, "mouse_batch_size": 20,
+        "directory_entries": 10000, "listing_requests": 50, "cold_listings": 3,
+        "read_requests": 6, "read_concurrency": 2,
+        "auth_requests": 300, "auth_concurrency": 16, "token_hashes": 5,
+    },
+}
+
+# Metrics compared against the baseline, and which direction is better
+LOWER_IS_BETTER = ("p50_ms", "p99_ms")
+HIGHER_IS_BETTER = ("ops_per_second", "mb_per_second")
+
+Message = Union[bytes, str]
+
+class BenchmarkError(Exception):
+    """A scenario step failed or timed out"""
+
+# ─────────── Measurement ───────────
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), int(round(q / 100 * len(ordered) + 0.5))))
+    return ordered[rank - 1]
+
+def summarize(samples: List[float], elapsed: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Latency summary of samples given in seconds
+    
+    Args:
+        samples: One duration per operation
+        elapsed: Wall time the operations took together, for throughput
+    
+    Returns:
+        Dictionary with count, p50/p90/p99/max/mean in ms and ops_per_second
+    """
+    ordered = sorted(samples)
+    summary = {
+        "count": len(ordered),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+        "p90_ms": round(_percentile(ordered, 90) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+    }
+    if elapsed:
+        summary["ops_per_second"] = round(len(ordered) / elapsed, 2)
+    return summary
+
+def summarize_rates(rates: List[float]) -> Dict[str, float]:
+    """Minimum and median of per-session rates"""
+    ordered = sorted(rates)
+    return {"min": round(ordered[0], 2) if ordered else 0.0,
+            "p50": round(_percentile(ordered, 50), 2)}
+
+def rss_megabytes() -> Dict[str, float]:
+    """Current and peak resident set size of this process"""
+    current = 0.0
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"rss_mb": round(current, 1), "peak_rss_mb": round(peak, 1)}
+
+class LoopLagProbe:
+    """Measures how late a periodic timer fires on an event loop"""
+    
+    def __init__(self, interval: float = LAG_PROBE_INTERVAL):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._stopped = False
+    
+    async def run(self):
+        while not self._stopped:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+    
+    def stop(self) -> Dict[str, Any]:
+        self._stopped = True
+        ordered = sorted(self.samples)
+        return {
+            "samples": len(ordered),
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        }
+
+# ─────────── Transports ───────────
+
+class ASGIWebSocket:
+    """WebSocket session driven directly through the ASGI interface"""
+    
+    def __init__(self, app, path: str, query: str = ""):
+        self._app = app
+        self._path = path
+        self._query = query
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+    
+    async def __aenter__(self) -> "ASGIWebSocket":
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws",
+            "path": self._path, "raw_path": self._path.encode(), "root_path": "",
+            "query_string": self._query.encode(), "headers": [(b"host", b"127.0.0.1")],
+            "client": ("127.0.0.1", 40000), "server": ("127.0.0.1", 8000), "subprotocols": [],
+        }
+        self._task = asyncio.ensure_future(self._app(scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await asyncio.wait_for(self._from_app.get(), STEP_TIMEOUT)
+        if message["type"] != "websocket.accept":
+            raise BenchmarkError(f"WebSocket {self._path} refused: {message}")
+        return self
+    
+    async def send(self, data: Message):
+        key = "bytes" if isinstance(data, bytes) else "text"
+        await self._to_app.put({"type": "websocket.receive", key: data})
+    
+    async def recv(self) -> Message:
+        message = await self._from_app.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionResetError("closed by server")
+        return message["bytes"] if message.get("bytes") is not None else message.get("text", "")
+    
+    async def __aexit__(self, *exc):
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self._task, 5)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+class ASGIClient:
+    """In-process client calling the ASGI app on the current event loop"""
+    
+    name = "asgi"
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      body: Any = None, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        payload = json.dumps(body).encode() if body is not None else b""
+        all_headers = {"host": "127.0.0.1", "authorization": BENCH_TOKEN,
+                       "content-type": "application/json", "content-length": str(len(payload)),
+                       **{k.lower(): v for k, v in (headers or {}).items()}}
+        raw_headers = [(k.encode(), v.encode()) for k, v in all_headers.items()]
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "root_path": "", "query_string": urlencode(params or {}).encode(),
+            "headers": raw_headers, "client": ("127.0.0.1", 40000), "server": ("127.0.0.1", 8000),
+        }
+        status = 0
+        response_headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+        done = asyncio.Event()
+        sent_body = False
+        
+        async def receive():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+        
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update((k.decode().lower(), v.decode()) for k, v in message["headers"])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    done.set()
+        
+        await asyncio.wait_for(self.app(scope, receive, send), STEP_TIMEOUT)
+        done.set()
+        return status, response_headers, b"".join(chunks)
+    
+    def websocket(self, path: str, query: str = "") -> ASGIWebSocket:
+        return ASGIWebSocket(self.app, path, query)
+    
+    async def close(self):
+        pass
+
+class _HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client connection (Content-Length bodies only)"""
+    
+    def __init__(self, port: int):
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+    
+    async def request(self, method: str, target: str, payload: bytes,
+                      headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection("127.0.0.1", self.port)
+        lines = [f"{method} {target} HTTP/1.1", f"Host: 127.0.0.1:{self.port}",
+                 f"Content-Length: {len(payload)}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        status = int(status_line.split()[1])
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+        
+        if status < 200 or status in (204, 304):
+            body = b""
+        elif "content-length" in response_headers:
+            body = await self._reader.readexactly(int(response_headers["content-length"]))
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked()
+        else:
+            body = await self._reader.read()
+            await self.close()
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, response_headers, body
+    
+    async def _read_chunked(self) -> bytes:
+        parts = []
+        while True:
+            size = int((await self._reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await self._reader.readline()
+                return b"".join(parts)
+            parts.append(await self._reader.readexactly(size))
+            await self._reader.readline()
+    
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+class LoopbackWebSocket:
+    """Adapter giving a `websockets` client connection the ASGIWebSocket interface"""
+    
+    def __init__(self, uri: str):
+        self._uri = uri
+        self._connection = None
+    
+    async def __aenter__(self) -> "LoopbackWebSocket":
+        import websockets
+        self._connection = await asyncio.wait_for(
+            websockets.connect(self._uri, max_size=None), STEP_TIMEOUT)
+        return self
+    
+    async def send(self, data: Message):
+        await self._connection.send(data)
+    
+    async def recv(self) -> Message:
+        import websockets
+        try:
+            return await self._connection.recv()
+        except websockets.ConnectionClosed as e:
+            raise ConnectionResetError("closed by server") from e
+    
+    async def __aexit__(self, *exc):
+        await self._connection.close()
+
+class LoopbackClient:
+    """Client speaking real HTTP and WebSocket to a uvicorn server thread"""
+    
+    name = "loopback"
+    
+    def __init__(self, port: int):
+        self.port = port
+        self._idle: List[_HTTPConnection] = []
+    
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      body: Any = None, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        payload = json.dumps(body).encode() if body is not None else b""
+        target = f"{path}?{urlencode(params)}" if params else path
+        all_headers = {"Authorization": BENCH_TOKEN, "Content-Type": "application/json", **(headers or {})}
+        # One connection per concurrent caller, reused across its requests
+        connection = self._idle.pop() if self._idle else _HTTPConnection(self.port)
+        try:
+            result = await asyncio.wait_for(
+                connection.request(method, target, payload, all_headers), STEP_TIMEOUT)
+        except BaseException:
+            await connection.close()
+            raise
+        self._idle.append(connection)
+        return result
+    
+    def websocket(self, path: str, query: str = "") -> LoopbackWebSocket:
+        return LoopbackWebSocket(f"ws://127.0.0.1:{self.port}{path}" + (f"?{query}" if query else ""))
+    
+    async def close(self):
+        for connection in self._idle:
+            await connection.close()
+        self._idle.clear()
+
+class ServerThread:
+    """uvicorn serving the app on 127.0.0.1 from its own thread and event loop"""
+    
+    def __init__(self, app):
+        import uvicorn
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self.port = self._sock.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="bench-server", daemon=True)
+    
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve(sockets=[self._sock]))
+    
+    def start(self):
+        self._thread.start()
+        deadline = time.monotonic() + STEP_TIMEOUT
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise BenchmarkError("uvicorn did not start")
+            time.sleep(0.05)
+    
+    def stop(self):
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+        self._sock.close()
+
+# ─────────── Scenarios ───────────
+
+async def _gather_timed(count: int, concurrency: int,
+                        operation: Callable[[int], Awaitable[Any]]) -> Tuple[List[float], int, float]:
+    """
+    Run ``operation(i)`` for i in range(count) with bounded concurrency
+    
+    Returns:
+        (per-operation durations, failures, total elapsed seconds)
+    """
+    samples: List[float] = []
+    failures = 0
+    indexes = iter(range(count))
+    
+    async def worker():
+        nonlocal failures
+        for index in indexes:
+            started = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception as e:
+                failures += 1
+                logger.debug(f"Benchmark operation failed: {e}")
+                continue
+            samples.append(time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, count)))))
+    return samples, failures, time.perf_counter() - started
+
+def _expect(status: int, body: bytes, *allowed: int):
+    if status not in allowed:
+        raise BenchmarkError(f"HTTP {status}: {body[:200]!r}")
+    if status == 200 and body.startswith(b"{") and b'"error"' in body[:200]:
+        raise BenchmarkError(body[:200].decode("utf-8", "replace"))
+
+async def _read_until(ws, buffer: bytearray, marker: bytes, start: int) -> int:
+    """Read frames into ``buffer`` until ``marker`` appears after ``start``; returns its end"""
+    while True:
+        found = buffer.find(marker, max(0, start - len(marker)))
+        if found >= 0:
+            return found + len(marker)
+        frame = await asyncio.wait_for(ws.recv(), STEP_TIMEOUT)
+        buffer.extend(frame if isinstance(frame, bytes) else frame.encode())
+
+async def _terminal_session(client, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """One terminal: connect, `yes` throughput, then `cat` echo round trips"""
+    connect_started = time.perf_counter()
+    async with client.websocket("/terminal", "cols=120&rows=40") as ws:
+        session = json.loads(await asyncio.wait_for(ws.recv(), STEP_TIMEOUT))
+        connect_seconds = time.perf_counter() - connect_started
+        buffer = bytearray()
+        
+        # $((..)) keeps the markers out of the echoed command line itself
+        await ws.send(b"stty -echo; echo BENCH_$((0+1))_READY\n")
+        position = await _read_until(ws, buffer, b"BENCH_1_READY", 0)
+        
+        yes_started = time.perf_counter()
+        await ws.send(f"yes | head -c {profile['yes_bytes']}; echo BENCH_$((1+1))_DONE\n".encode())
+        end = await _read_until(ws, buffer, b"BENCH_2_DONE", position)
+        yes_seconds = time.perf_counter() - yes_started
+        yes_bytes = end - position
+        
+        # cat with echo off writes each line back once
+        await ws.send(b"exec cat\n")
+        echo_samples = []
+        position = end
+        for round_number in range(profile["echo_rounds"]):
+            marker = f"<{round_number}>".encode()
+            started = time.perf_counter()
+            await ws.send(marker + b"\n")
+            position = await _read_until(ws, buffer, marker, position)
+            echo_samples.append(time.perf_counter() - started)
+        
+        # EOF ends cat, which was the shell, so the session is cleaned up now
+        # rather than lingering for the reattach grace period
+        await ws.send(b"\x04")
+        try:
+            while True:
+                await asyncio.wait_for(ws.recv(), 5)
+        except (ConnectionResetError, asyncio.TimeoutError):
+            pass
+    
+    return {"session_id": session.get("session_id"), "connect": connect_seconds,
+            "yes_seconds": yes_seconds, "yes_bytes": yes_bytes, "echo": echo_samples}
+
+async def scenario_terminal(client, profile: Dict[str, Any], scratch: Path) -> Dict[str, Any]:
+    """N concurrent terminals running `yes` then `cat`"""
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_terminal_session(client, profile)
+                                     for _ in range(profile["terminals"])), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    sessions = [r for r in results if not isinstance(r, BaseException)]
+    for failure in (r for r in results if isinstance(r, BaseException)):
+        logger.warning(f"Terminal session failed: {failure!r}")
+    
+    total_bytes = sum(s["yes_bytes"] for s in sessions)
+    slowest = max((s["yes_seconds"] for s in sessions), default=0.0)
+    return {
+        "sessions": len(sessions),
+        "failures": len(results) - len(sessions),
+        "connect": summarize([s["connect"] for s in sessions]),
+        "echo": summarize([sample for s in sessions for sample in s["echo"]]),
+        "output": {
+            "bytes": total_bytes,
+            "mb_per_second": round(total_bytes / slowest / 1e6, 2) if slowest else 0.0,
+            "per_session_mb_per_second": summarize_rates(
+                [s["yes_bytes"] / s["yes_seconds"] / 1e6 for s in sessions if s["yes_seconds"]]),
+        },
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+async def scenario_mouse(client, profile: Dict[str, Any], scratch: Path) -> Dict[str, Any]:
+    """Bursts of single /mouse moves, then the same events batched"""
+    burst = profile["mouse_burst_size"]
+    
+    async def single(index: int):
+        status, _, body = await client.request("POST", "/mouse", body={"x": index % 500, "y": index % 300})
+        _expect(status, body, 200)
+    
+    single_samples, single_failures, single_elapsed = [], 0, 0.0
+    for _ in range(profile["mouse_bursts"]):
+        samples, failures, elapsed = await _gather_timed(burst, burst, single)
+        single_samples += samples
+        single_failures += failures
+        single_elapsed += elapsed
+    
+    batch_size = profile["mouse_batch_size"]
+    
+    async def batched(index: int):
+        events = [{"type": "move", "x": (index + i) % 500, "y": i % 300} for i in range(batch_size)]
+        status, _, body = await client.request("POST", "/mouse", body={"events": events})
+        _expect(status, body, 200)
+    
+    batches = max(1, profile["mouse_bursts"] * burst // batch_size)
+    batch_samples, batch_failures, batch_elapsed = await _gather_timed(batches, 4, batched)
+    
+    # Without an X display every call fails fast; those timings are not comparable
+    return {
+        "single": {**summarize(single_samples, single_elapsed), "failures": single_failures},
+        "batched": {**summarize(batch_samples, batch_elapsed), "failures": batch_failures,
+                    "events_per_second": round(len(batch_samples) * batch_size / batch_elapsed, 1)
+                    if batch_elapsed else 0.0},
+    }
+
+async def scenario_files(client, profile: Dict[str, Any], scratch: Path) -> Dict[str, Any]:
+    """Cold rescans and warm cursor pages of one large directory"""
+    directory = scratch / "listing"
+    directory.mkdir(exist_ok=True)
+    for index in range(profile["directory_entries"]):
+        (directory / f"file_{index:06d}.txt").touch()
+    
+    async def page(cursor: Optional[str]) -> Optional[str]:
+        params = {"path": str(directory), "limit": 500}
+        if cursor:
+            params["cursor"] = cursor
+        status, _, body = await client.request("GET", "/files", params=params)
+        _expect(status, body, 200)
+        return json.loads(body).get("next_cursor")
+    
+    # Adding an entry changes the directory, so the next listing rescans it
+    cold_samples = []
+    for index in range(profile["cold_listings"]):
+        (directory / f"cold_{index}.txt").touch()
+        await asyncio.sleep(0.05)  # Let inotify deliver the change
+        started = time.perf_counter()
+        await page(None)
+        cold_samples.append(time.perf_counter() - started)
+    
+    cursors: List[Optional[str]] = [None]
+    
+    async def warm(index: int):
+        cursor = cursors[index % len(cursors)]
+        next_cursor = await page(cursor)
+        if next_cursor and len(cursors) < 64:
+            cursors.append(next_cursor)
+    
+    samples, failures, elapsed = await _gather_timed(profile["listing_requests"], 8, warm)
+    return {
+        "entries": profile["directory_entries"],
+        "cold": summarize(cold_samples),
+        "warm": {**summarize(samples, elapsed), "failures": failures},
+    }
+
+async def scenario_read(client, profile: Dict[str, Any], scratch: Path) -> Dict[str, Any]:
+    """Full 10 MB JSON reads, then conditional re-reads of the unchanged file"""
+    from ..backend.file_ops import MAX_READ_SIZE
+    
+    path = scratch / "large.log"
+    line = b"mobilemirror benchmark line with some ordinary log text 0123456789\n"
+    with open(path, "wb") as f:
+        f.write(line * (MAX_READ_SIZE // len(line)))
+    size = path.stat().st_size
+    etag = None
+    
+    async def read(index: int):
+        nonlocal etag
+        status, headers, body = await client.request("POST", "/read", body={"path": str(path)})
+        _expect(status, body, 200)
+        etag = headers.get("etag", etag)
+    
+    samples, failures, elapsed = await _gather_timed(profile["read_requests"], profile["read_concurrency"], read)
+    
+    async def revalidate(index: int):
+        status, _, body = await client.request("POST", "/read", body={"path": str(path)},
+                                               headers={"If-None-Match": etag} if etag else None)
+        _expect(status, body, 304)
+    
+    cached, cached_failures, cached_elapsed = await _gather_timed(
+        profile["read_requests"], profile["read_concurrency"], revalidate)
+    return {
+        "file_bytes": size,
+        "full": {**summarize(samples, elapsed), "failures": failures,
+                 "mb_per_second": round(len(samples) * size / elapsed / 1e6, 2) if elapsed else 0.0},
+        "not_modified": {**summarize(cached, cached_elapsed), "failures": cached_failures},
+    }
+
+async def scenario_auth(client, profile: Dict[str, Any], scratch: Path) -> Dict[str, Any]:
+    """Requests authenticated with a file token, and its verification cold and cached"""
+    from ..backend.utils import auth
+    
+    # BENCH_TOKEN matches the environment token before the token file is ever
+    # read, so this scenario authenticates with a token from a scratch file
+    real_token_file = auth.TOKEN_FILE
+    auth.TOKEN_FILE = scratch / "auth" / "tokens.conf"
+    try:
+        token_id = secrets.token_hex(4)
+        token = f"{token_id}{auth.TOKEN_ID_SEPARATOR}{secrets.token_urlsafe(32)}"
+        if not await asyncio.to_thread(auth.save_token, "bench", token, token_id):
+            raise BenchmarkError("Could not write the scratch token file")
+        
+        async def verify() -> float:
+            started = time.perf_counter()
+            if not await auth.verify_token_async(token, "127.0.0.1"):
+                raise BenchmarkError("File token was rejected")
+            return time.perf_counter() - started
+        
+        # Cold: the first check of a presented token costs a PBKDF2
+        cold_samples = []
+        for _ in range(profile["token_hashes"]):
+            auth.invalidate_token_cache(token)
+            cold_samples.append(await verify())
+        
+        # Warm: later checks within TOKEN_CACHE_TTL are answered from the cache
+        warm_samples = [await verify() for _ in range(profile["auth_requests"])]
+        
+        async def metrics(index: int):
+            status, _, body = await client.request("GET", "/metrics", headers={"Authorization": token})
+            _expect(status, body, 200)
+        
+        samples, failures, elapsed = await _gather_timed(profile["auth_requests"],
+                                                         profile["auth_concurrency"], metrics)
+    finally:
+        auth.TOKEN_FILE = real_token_file
+        auth.invalidate_token_cache()
+    
+    return {
+        "requests": {**summarize(samples, elapsed), "failures": failures},
+        "cold_verify": summarize(cold_samples),
+        "warm_verify": summarize(warm_samples),
+    }
+
+SCENARIO_FUNCTIONS = {
+    "terminal": scenario_terminal,
+    "mouse": scenario_mouse,
+    "files": scenario_files,
+    "read": scenario_read,
+    "auth": scenario_auth,
+}
+
+# ─────────── Runner ───────────
+
+async def _run_scenarios(client, probe_loop: Optional[asyncio.AbstractEventLoop],
+                         scenarios: List[str], profile: Dict[str, Any], scratch: Path) -> Dict[str, Any]:
+    results = {}
+    for name in scenarios:
+        probe = LoopLagProbe()
+        if probe_loop is None:
+            probe_task = asyncio.ensure_future(probe.run())
+        else:
+            probe_task = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(probe.run(), probe_loop))
+        rss_before = rss_megabytes()
+        started = time.perf_counter()
+        try:
+            result = await SCENARIO_FUNCTIONS[name](client, profile, scratch)
+        except Exception as e:
+            logger.error(f"Scenario {name} failed", exc_info=True)
+            result = {"error": str(e)}
+        finally:
+            lag = probe.stop()
+            await asyncio.gather(probe_task, return_exceptions=True)
+        rss_after = rss_megabytes()
+        result.update({
+            "loop_lag": lag,
+            "rss_mb": rss_after["rss_mb"],
+            "rss_growth_mb": round(rss_after["rss_mb"] - rss_before["rss_mb"], 1),
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        })
+        results[name] = result
+        logger.info(f"Scenario {name} finished in {result['duration_seconds']}s")
+    return results
+
+async def run_transport(transport: str, scenarios: List[str], profile: Dict[str, Any],
+                        scratch: Path) -> Dict[str, Any]:
+    """Run the scenarios against the app over one transport"""
+    from ..backend.app import app
+    
+    if transport == "asgi":
+        client = ASGIClient(app)
+        try:
+            return await _run_scenarios(client, None, scenarios, profile, scratch)
+        finally:
+            await client.close()
+    
+    server = ServerThread(app)
+    server.start()
+    client = LoopbackClient(server.port)
+    try:
+        return await _run_scenarios(client, server.loop, scenarios, profile, scratch)
+    finally:
+        await client.close()
+        server.stop()
+
+def run_benchmarks(transports: List[str], scenarios: List[str], profile_name: str) -> Dict[str, Any]:
+    """
+    Run every requested scenario over every requested transport
+    
+    Returns:
+        Results document: {"meta": {...}, "runs": {transport: {scenario: {...}}}}
+    """
+    profile = PROFILES[profile_name]
+    scratch = Path(tempfile.mkdtemp(prefix="mobilemirror-bench-"))
+    runs = {}
+    try:
+        for transport in transports:
+            (scratch / transport).mkdir()
+            runs[transport] = asyncio.run(run_transport(transport, scenarios, profile, scratch / transport))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "profile": profile_name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            **rss_megabytes(),
+        },
+        "runs": runs,
+    }
+
+# ─────────── Baseline comparison ───────────
+
+def _flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flatten nested results to {"runs.asgi.files.warm.p99_ms": value, ...}"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Find metrics that got worse than the baseline by more than ``tolerance``
+    
+    Only latency percentiles and throughputs are compared; counts and sizes
+    differ legitimately between profiles.
+    
+    Returns:
+        One entry per regressed metric with baseline, current and relative change
+    """
+    regressions = []
+    current_flat = _flatten(current.get("runs", {}))
+    for path, old in _flatten(baseline.get("runs", {})).items():
+        new = current_flat.get(path)
+        metric = path.rsplit(".", 1)[-1]
+        if new is None or not old:
+            continue
+        if metric in LOWER_IS_BETTER:
+            worse = new > old * (1 + tolerance) and new - old > NOISE_FLOOR_MS
+        elif metric in HIGHER_IS_BETTER:
+            worse = new < old * (1 - tolerance)
+        else:
+            continue
+        if worse:
+            regressions.append({"metric": path, "baseline": old, "current": new,
+                                "change": round((new - old) / old, 3)})
+    return regressions
+
+def _print_report(results: Dict[str, Any]):
+    for transport, scenarios in results["runs"].items():
+        print(f"\n== {transport} ==")
+        for name, result in scenarios.items():
+            if "error" in result:
+                print(f"  {name:<9} ERROR {result['error']}")
+                continue
+            parts = []
+            for key, value in result.items():
+                if isinstance(value, dict) and "p50_ms" in value and key != "loop_lag":
+                    parts.append(f"{key} p50={value['p50_ms']}ms p99={value['p99_ms']}ms")
+            if "output" in result:
+                parts.append(f"output {result['output']['mb_per_second']} MB/s")
+            if "full" in result and "mb_per_second" in result["full"]:
+                parts.append(f"{result['full']['mb_per_second']} MB/s")
+            lag = result["loop_lag"]
+            parts.append(f"lag p99={lag['p99_ms']}ms max={lag['max_ms']}ms rss={result['rss_mb']}MB")
+            print(f"  {name:<9} " + "; ".join(parts))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mobile Mirror load test and latency benchmark")
+    parser.add_argument("--mode", default="asgi,loopback",
+                        help=f"Comma-separated transports: {', '.join(TRANSPORTS)}")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios: {', '.join(SCENARIOS)}")
+    parser.add_argument("--quick", action="store_true", help="Small workloads for CI")
+    parser.add_argument("--terminals", type=int, help="Concurrent terminal sessions")
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="Compare against this results JSON")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write the results to --baseline (default benchmarks/baseline.json)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown (0.3 = 30%%)")
+    args = parser.parse_args(argv)
+    
+    transports = [t for t in args.mode.split(",") if t]
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = [t for t in transports if t not in TRANSPORTS] + [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown transport or scenario: {', '.join(unknown)}")
+    
+    profile_name = "quick" if args.quick else "full"
+    if args.terminals:
+        PROFILES[profile_name] = {**PROFILES[profile_name], "terminals": args.terminals}
+    
+    results = run_benchmarks(transports, scenarios, profile_name)
+    _print_report(results)
+    
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"\nBaseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path}; run with --update-baseline to record one")
+        # Asked to compare against a specific baseline: a missing one must not pass silently
+        return 1 if args.baseline else 0
+    
+    baseline = json.loads(baseline_path.read_text())
+    if baseline.get("meta", {}).get("profile") != profile_name:
+        print(f"\nBaseline profile is {baseline.get('meta', {}).get('profile')}, not {profile_name}; not comparing")
+        return 0
+    regressions = compare_results(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"\nNo regressions against {baseline_path} (tolerance {args.tolerance:.0%})")
+        return 0
+    print(f"\n{len(regressions)} regression(s) against {baseline_path}:")
+    for regression in regressions:
+        print(f"  {regression['metric']}: {regression['baseline']} -> {regression['current']} "
+              f"({regression['change']:+.0%})")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,13 +2,31 @@
 
 import React, { useEffect, useRef, useState } from 'react';
 import * as monaco from 'monaco-editor';
-import { readFile, writeFile } from './api';
+import { readFile, writeFile, patchFile } from './api';
 import './theme.css';
 
+const encoder = new TextEncoder();
+
+// Single splice covering everything between the common prefix and suffix
+function diffRegion(base, current) {
+  let prefix = 0;
+  const max = Math.min(base.length, current.length);
+  while (prefix < max && base[prefix] === current[prefix]) prefix++;
+  let suffix = 0;
+  while (suffix < max - prefix &&
+         base[base.length - 1 - suffix] === current[current.length - 1 - suffix]) suffix++;
+
+  const start = encoder.encode(base.slice(0, prefix)).length;
+  const end = start + encoder.encode(base.slice(prefix, base.length - suffix)).length;
+  return { start, end, data: current.slice(prefix, current.length - suffix) };
+}
+
 function Editor() {
   const editorRef = useRef(null);
   const monacoRef = useRef(null);
   const [filePath, setFilePath] = useState("/home/user/sample.py");
+  // Last contents known to be on disk, and their hash, for incremental saves
+  const baseRef = useRef({ content: null, sha256: null });
 
   useEffect(() => {
     monacoRef.current = monaco.editor.create(editorRef.current, {
@@ -29,13 +47,25 @@ function Editor() {
     const res = await readFile(path);
     if (res.content) {
       monacoRef.current.setValue(res.content);
+      baseRef.current = { content: res.content, sha256: res.metadata.sha256 };
     }
   };
 
   const saveFile = async () => {
     const content = monacoRef.current.getValue();
-    const res = await writeFile(filePath, content);
+    const base = baseRef.current;
+    let res;
+    if (base.sha256 && base.content !== null) {
+      res = await patchFile(filePath, base.sha256, [diffRegion(base.content, content)]);
+      if (res.conflict && !window.confirm("File changed on disk. Overwrite it?")) {
+        return;
+      }
+    }
+    if (!res || res.status !== "success") {
+      res = await writeFile(filePath, content);
+    }
     if (res.status === "success") {
+      baseRef.current = { content, sha256: res.sha256 };
       alert("💾 Saved successfully.");
     } else {
       alert("❌ Save failed.");
@@ -7,15 +7,17 @@ import './theme.css';
 function FileManager() {
   const [currentPath, setCurrentPath] = useState(".");
   const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
 
   useEffect(() => {
     loadFiles(currentPath);
   }, [currentPath]);
 
-  const loadFiles = (path) => {
-    getFiles(path).then(data => {
+  const loadFiles = (path, cursor = null) => {
+    getFiles(path, { cursor }).then(data => {
       if (data.items) {
-        setItems(data.items);
+        setItems(prev => cursor ? [...prev, ...data.items] : data.items);
+        setNextCursor(data.next_cursor);
       }
     });
   };
@@ -45,6 +47,11 @@ function FileManager() {
           </li>
         ))}
       </ul>
+      {nextCursor && (
+        <button className="file-item" onClick={() => loadFiles(currentPath, nextCursor)}>
+          ⬇️ Load more
+        </button>
+      )}
     </div>
   );
 }
@@ -1,32 +1,37 @@
 // MouseController.js — Handles advanced mobile gestures for TouchCore
 
+import { openInputStream } from './api';
+
 export function bindTouchToMouse(element, options = {}) {
   const scale = options.scale || window.devicePixelRatio || 1;
+  // One authenticated stream per element; the server coalesces motion
+  const input = options.input || openInputStream();
 
   element.addEventListener("touchstart", (e) => {
     const touch = e.touches[0];
-    sendMouseEvent(touch, scale, false);
+    sendMouseEvent(input, touch, scale, false);
   });
 
   element.addEventListener("touchmove", (e) => {
     const touch = e.touches[0];
-    sendMouseEvent(touch, scale, false);
+    sendMouseEvent(input, touch, scale, false);
   });
 
   element.addEventListener("touchend", (e) => {
     const touch = e.changedTouches[0];
-    sendMouseEvent(touch, scale, true);
+    sendMouseEvent(input, touch, scale, true);
   });
+
+  return input;
 }
 
-function sendMouseEvent(touch, scale, click) {
+function sendMouseEvent(input, touch, scale, click) {
   const bounds = touch.target.getBoundingClientRect();
   const x = Math.round((touch.clientX - bounds.left) * scale);
   const y = Math.round((touch.clientY - bounds.top) * scale);
 
-  fetch("http://localhost:8000/mouse", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ x, y, click })
-  });
-}
\ No newline at end of file
+  input.move(Math.max(0, x), Math.max(0, y));
+  if (click) {
+    input.click(1);
+  }
+}
@@ -2,6 +2,7 @@
 
 import React, { useRef } from 'react';
 import { sendMouse } from './api';
+import ScreenViewer from './ScreenViewer';
 import './theme.css';
 
 function ScreenView() {
@@ -20,10 +21,8 @@ function ScreenView() {
 
   return (
     <div className="screen-container">
-      <img
-        src={`http://${window.location.hostname}:5901/`}
-        alt="Live Desktop"
-        ref={screenRef}
+      <ScreenViewer
+        canvasRef={screenRef}
         onTouchStart={handleTouch}
         onTouchEnd={handleTouch}
         style={{ width: "100%", height: "auto", backgroundColor: "#000" }}
@@ -0,0 +1,63 @@
+// ScreenViewer.jsx — Canvas client for the native /screen/stream WebSocket
+
+import React, { useEffect, useRef } from 'react';
+
+const TOKEN = localStorage.getItem("TOUCHCORE_TOKEN") || "touchcore-access";
+const MIME_TYPES = { 1: "image/jpeg", 2: "image/webp" };
+const FRAME_HEADER_SIZE = 12;
+const RECT_HEADER_SIZE = 12;
+
+function ScreenViewer({ canvasRef, ...props }) {
+  const localRef = useRef(null);
+  const ref = canvasRef || localRef;
+
+  useEffect(() => {
+    const canvas = ref.current;
+    const ctx = canvas.getContext("2d");
+    const socket = new WebSocket(`ws://${window.location.hostname}:8000/screen/stream`);
+    socket.binaryType = "arraybuffer";
+    socket.onopen = () => socket.send(JSON.stringify({ type: "auth", token: TOKEN }));
+
+    socket.onmessage = async (event) => {
+      if (typeof event.data === "string") return;
+
+      const view = new DataView(event.data);
+      const seq = view.getUint32(0, true);
+      const width = view.getUint16(4, true);
+      const height = view.getUint16(6, true);
+      const count = view.getUint16(8, true);
+      const mime = MIME_TYPES[view.getUint8(10)];
+
+      if (canvas.width !== width || canvas.height !== height) {
+        canvas.width = width;
+        canvas.height = height;
+        socket.send(JSON.stringify({ type: "keyframe" }));
+      }
+
+      // Decode all dirty rectangles, then paint them together
+      let offset = FRAME_HEADER_SIZE;
+      const rects = [];
+      for (let i = 0; i < count; i++) {
+        const x = view.getUint16(offset, true);
+        const y = view.getUint16(offset + 2, true);
+        const length = view.getUint32(offset + 8, true);
+        const blob = new Blob([new Uint8Array(event.data, offset + RECT_HEADER_SIZE, length)], { type: mime });
+        rects.push(createImageBitmap(blob).then((bitmap) => ({ x, y, bitmap })));
+        offset += RECT_HEADER_SIZE + length;
+      }
+      for (const { x, y, bitmap } of await Promise.all(rects)) {
+        ctx.drawImage(bitmap, x, y);
+        bitmap.close();
+      }
+
+      // Acks drive the server's RTT measurement and adaptive quality
+      socket.send(JSON.stringify({ type: "ack", seq }));
+    };
+
+    return () => socket.close();
+  }, [ref]);
+
+  return <canvas ref={ref} {...props} />;
+}
+
+export default ScreenViewer;
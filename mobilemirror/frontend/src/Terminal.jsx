@@ -4,6 +4,9 @@ import React, { useEffect, useRef } from 'react';
 import { Terminal } from 'xterm';
 import 'xterm/css/xterm.css';
 
+const SESSION_KEY = 'mobilemirror.terminal.session';
+const RECONNECT_DELAY_MS = 1000;
+
 function TerminalView() {
   const termRef = useRef(null);
   const socketRef = useRef(null);
@@ -20,24 +23,93 @@ function TerminalView() {
 
     term.open(termRef.current);
 
-    const socket = new WebSocket(`ws://${window.location.hostname}:8000/terminal`);
-    socketRef.current = socket;
+    const encoder = new TextEncoder();
+    // Session id and bytes received so far, so a reconnect replays only what we missed
+    const saved = JSON.parse(sessionStorage.getItem(SESSION_KEY) || 'null');
+    let sessionId = saved ? saved.sessionId : null;
+    let offset = saved ? saved.offset : 0;
+    let disposed = false;
+    let reconnectTimer = null;
+
+    const saveSession = () => {
+      sessionStorage.setItem(SESSION_KEY, JSON.stringify({ sessionId, offset }));
+    };
+
+    const sendResize = () => {
+      const socket = socketRef.current;
+      if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({ type: 'resize', cols: term.cols, rows: term.rows }));
+      }
+    };
+
+    const connect = () => {
+      const params = new URLSearchParams({ cols: term.cols, rows: term.rows });
+      if (sessionId) {
+        params.set('session_id', sessionId);
+        params.set('offset', offset);
+      }
+
+      const socket = new WebSocket(`ws://${window.location.hostname}:8000/terminal?${params}`);
+      socket.binaryType = 'arraybuffer';
+      socketRef.current = socket;
 
-    socket.onmessage = (event) => {
-      term.write(event.data);
+      socket.onmessage = (event) => {
+        if (typeof event.data === 'string') {
+          const message = JSON.parse(event.data);
+          if (message.type === 'session') {
+            if (message.session_id !== sessionId) {
+              // New shell: the old session expired or this is the first connect
+              sessionId = message.session_id;
+              if (offset) term.reset();
+            } else if (message.missed_bytes) {
+              term.write('\r\n[Some output was lost while disconnected]\r\n');
+            }
+            offset = message.offset;
+            saveSession();
+            sendResize();
+          }
+          return;
+        }
+        // Shell output arrives as binary frames; xterm decodes the UTF-8 itself
+        const bytes = new Uint8Array(event.data);
+        offset += bytes.length;
+        term.write(bytes);
+      };
+
+      socket.onclose = (event) => {
+        saveSession();
+        if (disposed || event.code === 4001) {
+          return;
+        }
+        if (event.code === 1000) {
+          // Shell exited
+          sessionStorage.removeItem(SESSION_KEY);
+          term.write('\r\n[Connection closed]');
+          return;
+        }
+        term.write('\r\n[Reconnecting...]');
+        reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+      };
     };
 
     term.onData((data) => {
-      socket.send(data);
+      const socket = socketRef.current;
+      if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(encoder.encode(data));
+      }
     });
 
-    socket.onclose = () => {
-      term.write('\r\n[Connection closed]');
-    };
+    term.onResize(sendResize);
+
+    connect();
 
     return () => {
+      disposed = true;
+      clearTimeout(reconnectTimer);
       term.dispose();
-      socket.close();
+      if (socketRef.current) {
+        socketRef.current.close();
+      }
     };
   }, []);
 
@@ -48,4 +120,4 @@ function TerminalView() {
   );
 }
 
-export default TerminalView;
\ No newline at end of file
+export default TerminalView;
@@ -8,27 +8,94 @@ const defaultHeaders = {
   "Authorization": TOKEN
 };
 
-export async function getFiles(path = ".") {
-  const res = await fetch(`${API_HOST}/files?path=${encodeURIComponent(path)}`, {
+// options: { cursor, limit, sort, order, pattern, kind, show_hidden, format, since }
+// format "compact" returns rows matching `fields`; pass a previous sync_token
+// as `since` to get only { changed, removed } entries.
+export async function getFiles(path = ".", options = {}) {
+  const params = new URLSearchParams({ path });
+  for (const [key, value] of Object.entries(options)) {
+    if (value !== undefined && value !== null) params.set(key, value);
+  }
+  const res = await fetch(`${API_HOST}/files?${params}`, {
     headers: defaultHeaders
   });
   return await res.json();
 }
 
+// Streams NDJSON search results to onResult as they arrive. Aborting the
+// signal closes the request, which cancels the search on the server.
+export async function searchFiles(root, { glob, query, regex = true, caseSensitive = false } = {}, onResult, signal) {
+  const params = new URLSearchParams({ root, regex, case_sensitive: caseSensitive });
+  if (glob) params.set("glob", glob);
+  if (query) params.set("query", query);
+  const res = await fetch(`${API_HOST}/search?${params}`, { headers: defaultHeaders, signal });
+  if (!res.ok) return await res.json();
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  let summary = null;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop();
+    for (const line of lines) {
+      if (!line) continue;
+      const result = JSON.parse(line);
+      if (result.type === "done") summary = result;
+      else onResult(result);
+    }
+  }
+  return summary;
+}
+
+// Last read of each path with its ETag; unchanged files come back as 304
+const readCache = new Map();
+
 export async function readFile(path) {
+  const cached = readCache.get(path);
   const res = await fetch(`${API_HOST}/read`, {
     method: "POST",
-    headers: defaultHeaders,
+    headers: cached ? { ...defaultHeaders, "If-None-Match": cached.etag } : defaultHeaders,
     body: JSON.stringify({ path })
   });
+  if (res.status === 304 && cached) return cached;
+  const result = await res.json();
+  if (result.etag) readCache.set(path, result);
+  else readCache.delete(path);
+  return result;
+}
+
+// Raw streamed read: pass { tail } for the last N lines, { startLine, endLine }
+// for a line span, or { range: "bytes=0-1023" } for a byte range.
+export async function readFileContent(path, { tail, startLine, endLine, range } = {}) {
+  const params = new URLSearchParams({ path });
+  if (tail !== undefined) params.set("tail", tail);
+  if (startLine !== undefined) params.set("start_line", startLine);
+  if (endLine !== undefined) params.set("end_line", endLine);
+  const headers = { "Authorization": TOKEN };
+  if (range) headers["Range"] = range;
+  return await fetch(`${API_HOST}/files/content?${params}`, { headers });
+}
+
+export async function writeFile(path, content, baseHash) {
+  const res = await fetch(`${API_HOST}/write`, {
+    method: "POST",
+    headers: defaultHeaders,
+    body: JSON.stringify({ path, content, base_hash: baseHash })
+  });
   return await res.json();
 }
 
-export async function writeFile(path, content) {
+// Incremental save: splices are [{ start, end, data }] in UTF-8 byte offsets
+// of the contents whose SHA-256 is baseHash.
+export async function patchFile(path, baseHash, splices) {
   const res = await fetch(`${API_HOST}/write`, {
     method: "POST",
     headers: defaultHeaders,
-    body: JSON.stringify({ path, content })
+    body: JSON.stringify({ path, base_hash: baseHash, splices })
   });
   return await res.json();
 }
@@ -41,7 +108,72 @@ export async function sendMouse(x, y, click = false) {
   });
 }
 
+// Streamed pointer/keyboard input over one authenticated WebSocket.
+// Events are packed in the backend's binary format (see input_stream.py).
+export function openInputStream() {
+  const socket = new WebSocket(`ws://${window.location.hostname}:8000/input?encoding=binary`);
+  socket.binaryType = "arraybuffer";
+  socket.onopen = () => socket.send(JSON.stringify({ type: "auth", token: TOKEN }));
+
+  const send = (bytes) => {
+    if (socket.readyState === WebSocket.OPEN) socket.send(bytes);
+  };
+  const packXY = (opcode, a, b, signed) => {
+    const view = new DataView(new ArrayBuffer(5));
+    view.setUint8(0, opcode);
+    if (signed) {
+      view.setInt16(1, a, true);
+      view.setInt16(3, b, true);
+    } else {
+      view.setUint16(1, a, true);
+      view.setUint16(3, b, true);
+    }
+    return view.buffer;
+  };
+  const packKey = (opcode, keysym) => {
+    const bytes = new Uint8Array(2 + keysym.length);
+    bytes[0] = opcode;
+    bytes[1] = keysym.length;
+    for (let i = 0; i < keysym.length; i++) bytes[2 + i] = keysym.charCodeAt(i);
+    return bytes.buffer;
+  };
+
+  return {
+    move: (x, y) => send(packXY(0x01, x, y, false)),
+    moveRelative: (dx, dy) => send(packXY(0x02, dx, dy, true)),
+    click: (button = 1) => send(new Uint8Array([0x03, button]).buffer),
+    down: (button = 1) => send(new Uint8Array([0x04, button]).buffer),
+    up: (button = 1) => send(new Uint8Array([0x05, button]).buffer),
+    scroll: (dx, dy) => send(new Int8Array([0x06, dx, dy]).buffer),
+    key: (keysym) => send(packKey(0x07, keysym)),
+    close: () => socket.close()
+  };
+}
+
 export async function getQR() {
   const res = await fetch(`${API_HOST}/qr`);
   return await res.json();
+}
+// Follows the server log (SSE over fetch so the token header can be sent); resolves when aborted or closed
+export async function followLog({ lines = 50, level, module } = {}, onLine, signal) {
+  const params = new URLSearchParams({ n: lines });
+  if (level) params.set("level", level);
+  if (module) params.set("module", module);
+  const res = await fetch(`${API_HOST}/log/stream?${params}`, { headers: defaultHeaders, signal });
+  if (!res.ok) return await res.json();
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  for (;;) {
+    const { done, value } = await reader.read().catch(() => ({ done: true }));
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const events = buffered.split("\n\n");
+    buffered = events.pop();
+    for (const event of events) {
+      if (event.startsWith("data: ")) onLine(event.slice(6));
+    }
+  }
+  return null;
 }
\ No newline at end of file
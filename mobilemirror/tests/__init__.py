@@ -0,0 +1 @@
+# Mobile Mirror Tests
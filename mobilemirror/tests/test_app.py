@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for API routes that wrap blocking helpers.
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from mobilemirror.backend import app as app_module
+
+
+def test_qr_looks_up_mesh_address_off_the_event_loop(monkeypatch):
+    calls = []
+
+    def mesh_address():
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append("worker")
+        return "100.64.0.7"
+
+    def fake_qr(url, fmt, *args):
+        return {"status": "success", "qr_data": url.encode(), "etag": '"qr"'}
+
+    monkeypatch.setattr(app_module, "get_headscale_ip", mesh_address)
+    monkeypatch.setattr(app_module, "generate_qr", fake_qr)
+    with TestClient(app_module.app) as client:
+        response = client.get("/qr", params={"format": "png"})
+    assert response.status_code == 200
+    assert response.content == b"https://100.64.0.7:5000"
+    assert calls == ["worker"]
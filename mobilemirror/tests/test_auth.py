@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for file-token verification and the verified-token cache.
+"""
+
+import os
+
+import pytest
+
+from mobilemirror.backend.utils import auth
+
+
+@pytest.fixture
+def tokens(tmp_path, monkeypatch):
+    """Token file under tmp_path, with PBKDF2 checks counted"""
+    monkeypatch.setattr(auth, "TOKEN_FILE", tmp_path / "auth" / "tokens.conf")
+    monkeypatch.setenv("MOBILEMIRROR_TOKEN", "environment-token-not-used-here")
+    monkeypatch.setattr(auth, "_token_file_cache",
+                        {"mtime": None, "loaded": False, "tokens": {}, "by_id": {}, "legacy": []})
+    monkeypatch.setattr(auth, "_verified_tokens", {})
+
+    hashed = []
+    verify_hash = auth.verify_token_hash
+
+    def counting(token, hashed_token, salt):
+        hashed.append(token)
+        return verify_hash(token, hashed_token, salt)
+
+    monkeypatch.setattr(auth, "verify_token_hash", counting)
+    return hashed
+
+
+def test_cached_within_ttl(tokens):
+    key = auth.create_api_key("phone")
+    assert auth.verify_token(key, "10.0.0.1")
+    assert auth.verify_token(key, "10.0.0.1")
+    assert tokens == [key]  # second check answered from the cache
+
+
+def test_cache_expires_after_ttl(tokens, monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_CACHE_TTL", 0)
+    key = auth.create_api_key("phone")
+    assert auth.verify_token(key, "10.0.0.2")
+    assert auth.verify_token(key, "10.0.0.2")
+    assert tokens == [key, key]
+
+
+def test_token_file_reloaded_on_change(tokens):
+    key = auth.create_api_key("phone")
+    assert auth.verify_token(key, "10.0.0.3")
+
+    # Revoke by rewriting the file without the token; the new mtime forces a reload
+    auth.TOKEN_FILE.write_text("# revoked\n")
+    stat = auth.TOKEN_FILE.stat()
+    os.utime(auth.TOKEN_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not auth.verify_token(key, "10.0.0.3")
+    assert tokens == [key]  # rejected without rehashing
+
+
+def test_unchanged_file_is_not_reparsed(tokens, monkeypatch):
+    auth.create_api_key("phone")
+    auth.load_tokens()
+    monkeypatch.setattr(auth, "_parse_token_file", lambda: pytest.fail("token file re-read"))
+    assert "phone" in auth.load_tokens()
+
+
+def test_token_id_selects_one_stored_hash(tokens):
+    keys = [auth.create_api_key(f"device-{i}") for i in range(3)]
+    auth.save_token("legacy", "legacy-secret")
+    assert auth.verify_token(keys[2], "10.0.0.4")
+    assert tokens == [keys[2]]
+
+    # Tokens without an id are only checked against legacy entries
+    assert auth.verify_token("legacy-secret", "10.0.0.4")
+    assert tokens == [keys[2], "legacy-secret"]
+
+
+def test_invalidate_forces_rehash(tokens):
+    key = auth.create_api_key("phone")
+    assert auth.verify_token(key, "10.0.0.5")
+    auth.invalidate_token_cache(key)
+    assert auth.verify_token(key, "10.0.0.5")
+    assert tokens == [key, key]
+
+
+def test_saving_a_token_clears_the_cache(tokens):
+    key = auth.create_api_key("phone")
+    assert auth.verify_token(key, "10.0.0.6")
+    auth.create_api_key("tablet")
+    assert auth._verified_tokens == {}
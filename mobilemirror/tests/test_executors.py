@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded blocking-call pools.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from mobilemirror.backend.utils.executors import BlockingPool, PoolSaturated
+
+
+def test_run_returns_result_and_releases_slot():
+    pool = BlockingPool("test-run", workers=1, max_queue=1)
+    assert asyncio.run(pool.run(sum, [1, 2, 3])) == 6
+    stats = pool.get_stats()
+    assert (stats["queued"], stats["active"], stats["completed"]) == (0, 0, 1)
+
+
+def test_cancelled_queued_call_returns_its_slot():
+    pool = BlockingPool("test-cancel", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.ensure_future(pool.run(release.wait))
+        while pool.get_stats()["active"] == 0:
+            await asyncio.sleep(0.001)
+        waiting = asyncio.ensure_future(pool.run(lambda: "never"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(PoolSaturated):
+            await pool.run(lambda: "rejected")
+
+        waiting.cancel()  # cancelled before the only worker is free
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert pool.get_stats()["queued"] == 0
+
+        release.set()
+        await busy
+        assert await pool.run(lambda: "ok") == "ok"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()  # never leave the worker blocked if an assertion fails
+    assert pool.get_stats()["queued"] == 0
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Tests for file reads, listings and writes in file_ops and their HTTP routes.
+"""
+
+import base64
+import hashlib
+import os
+import stat
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mobilemirror.backend import file_ops
+from mobilemirror.backend.app import app
+from mobilemirror.backend.file_ops import RangeNotSatisfiable, parse_range_header
+from mobilemirror.backend.utils.fs_watch import get_watcher
+
+TOKEN = "file-ops-test-token"
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv("MOBILEMIRROR_TOKEN", TOKEN)
+    with TestClient(app, headers={"Authorization": TOKEN}) as client:
+        yield client
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)) * 4)  # 1024 bytes
+    return path
+
+
+# ─────────── Ranges and ETags ───────────
+
+def test_parse_range_header():
+    assert parse_range_header(None, 100) is None
+    assert parse_range_header("bytes=10-19", 100) == (10, 19)
+    assert parse_range_header("bytes=90-200", 100) == (90, 99)   # end clamped to the file
+    assert parse_range_header("bytes=50-", 100) == (50, 99)
+    assert parse_range_header("bytes=-10", 100) == (90, 99)
+    assert parse_range_header("bytes=-500", 100) == (0, 99)      # suffix longer than the file
+    assert parse_range_header("bytes=0-1,5-6", 100) is None      # multi-range: whole file
+    for header in ("bytes=100-", "bytes=20-10", "bytes=-0"):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range_header(header, 100)
+
+
+def test_byte_range_request(api, data_file):
+    response = api.get("/files/content", params={"path": str(data_file)}, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == data_file.read_bytes()[10:20]
+    assert response.headers["Content-Range"] == "bytes 10-19/1024"
+
+
+def test_suffix_range_request(api, data_file):
+    response = api.get("/files/content", params={"path": str(data_file)}, headers={"Range": "bytes=-100"})
+    assert response.status_code == 206
+    assert response.content == data_file.read_bytes()[-100:]
+    assert response.headers["Content-Range"] == "bytes 924-1023/1024"
+
+
+def test_unsatisfiable_range_is_416(api, data_file):
+    response = api.get("/files/content", params={"path": str(data_file)}, headers={"Range": "bytes=2000-"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == "bytes */1024"
+
+
+def test_if_none_match_is_304(api, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("hello\n")
+    first = api.post("/read", json={"path": str(path)})
+    assert first.status_code == 200 and first.json()["content"] == "hello\n"
+    etag = first.headers["ETag"]
+
+    again = api.post("/read", json={"path": str(path)}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+    path.write_text("hello, world\n")
+    changed = api.post("/read", json={"path": str(path)}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+# ─────────── Tail and line reads ───────────
+
+def read_stream(result) -> bytes:
+    assert "error" not in result, result
+    return b"".join(result["chunks"])
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """Tiny read blocks and index stride so boundaries are crossed in small files"""
+    monkeypatch.setattr(file_ops, "STREAM_CHUNK_SIZE", 7)
+    monkeypatch.setattr(file_ops, "LINE_INDEX_STRIDE", 10)
+    monkeypatch.setattr(file_ops, "_line_indexes", file_ops.OrderedDict())
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_tail_reads_last_lines(tmp_path, small_blocks, trailing_newline):
+    lines = [f"line {i}" for i in range(1, 51)]
+    path = tmp_path / "app.log"
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""))
+
+    tail = read_stream(file_ops.stream_file(str(path), tail=3)).decode()
+    assert tail.splitlines() == lines[-3:]
+    assert tail.endswith("\n") is trailing_newline
+    assert read_stream(file_ops.stream_file(str(path), tail=500)) == path.read_bytes()
+    assert read_stream(file_ops.stream_file(str(path), tail=0)) == b""
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_line_range_uses_line_index(tmp_path, small_blocks, trailing_newline):
+    lines = [f"row {i:03d}" for i in range(1, 96)]
+    path = tmp_path / "rows.txt"
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""))
+
+    result = file_ops.stream_file(str(path), start_line=42, end_line=44)
+    assert result["mode"] == "lines" and result["start_line"] == 42
+    assert read_stream(result).decode().splitlines() == lines[41:44]
+    index = file_ops._line_indexes[str(path)]
+    assert len(index.offsets) == 10  # a checkpoint for every 10th line
+
+    # Open-ended and past-the-end spans
+    assert read_stream(file_ops.stream_file(str(path), start_line=94)).decode().splitlines() == lines[93:]
+    assert read_stream(file_ops.stream_file(str(path), start_line=200)) == b""
+
+
+def test_line_index_extends_after_append(tmp_path, small_blocks):
+    path = tmp_path / "grow.log"
+    path.write_text("".join(f"{i}\n" for i in range(1, 16)))
+    assert read_stream(file_ops.stream_file(str(path), start_line=15, end_line=15)) == b"15\n"
+
+    with open(path, "a") as f:
+        f.write("".join(f"{i}\n" for i in range(16, 31)) + "31")
+    assert read_stream(file_ops.stream_file(str(path), start_line=30, end_line=31)) == b"30\n31"
+    assert file_ops._line_indexes[str(path)].lines == 30
+
+
+# ─────────── Listings ───────────
+
+requires_inotify = pytest.mark.skipif(not get_watcher().available(), reason="inotify unavailable")
+
+
+@pytest.fixture
+def directory(tmp_path):
+    root = tmp_path / "listing"
+    root.mkdir()
+    for name in ("b_dir", "a_dir"):
+        (root / name).mkdir()
+    for i in range(18):
+        (root / f"file{i:02d}.txt").write_text("x" * i)
+    file_ops.invalidate_listing()
+    yield root
+    file_ops.invalidate_listing()
+
+
+def list_names(directory, **kwargs):
+    result = file_ops.list_files(str(directory), **kwargs)
+    assert "error" not in result, result
+    return [item["name"] for item in result["items"]], result
+
+
+def test_pages_follow_cursor_to_the_end(directory):
+    expected = ["a_dir", "b_dir"] + [f"file{i:02d}.txt" for i in range(18)]
+    names, cursor, pages = [], None, 0
+    while True:
+        page, result = list_names(directory, limit=5, cursor=cursor)
+        names += page
+        pages += 1
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+    assert names == expected
+    assert pages == 4  # 20 entries in pages of 5: no trailing empty page
+
+
+def test_cursor_survives_rescan(directory):
+    first, result = list_names(directory, limit=5)
+    assert first[-1] == "file02.txt"
+
+    # An entry sorting before the cursor must not shift the next page
+    (directory / "file00a.txt").write_text("new")
+    second, _ = list_names(directory, limit=5, cursor=result["next_cursor"])
+    assert second == [f"file{i:02d}.txt" for i in range(3, 8)]
+
+
+def test_filtered_page_boundary(directory):
+    page, result = list_names(directory, limit=2, kind="dir")
+    assert page == ["a_dir", "b_dir"]
+    rest, result = list_names(directory, limit=2, kind="dir", cursor=result["next_cursor"])
+    assert rest == [] and result["next_cursor"] is None
+
+
+def test_create_invalidates_cached_listing(directory):
+    assert not list_names(directory)[1]["page"]["cached"]
+    assert list_names(directory)[1]["page"]["cached"]
+
+    (directory / "created.txt").write_text("hello")
+    names, result = list_names(directory)
+    assert "created.txt" in names and not result["page"]["cached"]
+
+
+@requires_inotify
+def test_change_during_scan_is_not_cached(directory, monkeypatch):
+    scan = file_ops._scan_directory
+    content = "changed while scanning"
+
+    def scan_then_modify(path):
+        result = scan(path)
+        # Grows a scanned file without touching the directory mtime
+        (directory / "file05.txt").write_text(content)
+        time.sleep(0.05)  # let the watcher thread deliver the event
+        return result
+
+    monkeypatch.setattr(file_ops, "_scan_directory", scan_then_modify)
+    list_names(directory)
+    monkeypatch.setattr(file_ops, "_scan_directory", scan)
+
+    for _ in range(100):
+        sizes = {item["name"]: item["size"] for item in list_names(directory)[1]["items"]}
+        if sizes["file05.txt"] == len(content):
+            break
+        time.sleep(0.01)
+    assert sizes["file05.txt"] == len(content)
+
+
+# ─────────── Writes and patches ───────────
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_atomic_write_keeps_mode_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "script.sh"
+    path.write_text("echo old\n")
+    path.chmod(0o751)
+
+    result = file_ops.write_file(str(path), "echo new\n")
+    assert result["status"] == "success"
+    assert result["sha256"] == sha256(b"echo new\n")
+    assert path.read_text() == "echo new\n"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o751
+    assert os.listdir(tmp_path) == ["script.sh"]
+
+
+def test_new_file_gets_default_mode(tmp_path):
+    path = tmp_path / "new" / "file.txt"
+    assert file_ops.write_file(str(path), "hi")["status"] == "success"
+    assert stat.S_IMODE(path.stat().st_mode) == file_ops.NEW_FILE_MODE
+
+
+def test_write_with_stale_base_hash_conflicts(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("theirs\n")
+    result = file_ops.write_file(str(path), "mine\n", base_hash=sha256(b"original\n"))
+    assert result["conflict"] and result["sha256"] == sha256(b"theirs\n")
+    assert path.read_text() == "theirs\n"
+
+
+def test_splice_at_offset(tmp_path):
+    path = tmp_path / "big.txt"
+    base = b"0123456789" * 10
+    path.write_bytes(base)
+    path.chmod(0o640)
+
+    result = file_ops.patch_file(str(path), sha256(base), splices=[
+        {"start": 50, "end": 51, "data": "X"},
+        {"start": 10, "end": 10, "data_b64": base64.b64encode(b"++").decode()},  # insertion
+    ])
+    expected = base[:10] + b"++" + base[10:50] + b"X" + base[51:]
+    assert result["status"] == "success" and result["sha256"] == sha256(expected)
+    assert path.read_bytes() == expected
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+def test_unified_diff_patch(tmp_path):
+    path = tmp_path / "code.py"
+    base = b"a = 1\nb = 2\nc = 3\n"
+    path.write_bytes(base)
+    diff = "--- a/code.py\n+++ b/code.py\n@@ -2,1 +2,1 @@\n-b = 2\n+b = 20\n"
+    assert file_ops.patch_file(str(path), sha256(base), diff=diff)["status"] == "success"
+    assert path.read_bytes() == b"a = 1\nb = 20\nc = 3\n"
+
+
+def test_stale_base_patch_is_rejected(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"current contents")
+    result = file_ops.patch_file(str(path), sha256(b"what the client read"),
+                                 splices=[{"start": 0, "end": 1, "data": "C"}])
+    assert result["conflict"] and result["sha256"] == sha256(b"current contents")
+    assert path.read_bytes() == b"current contents"
+
+
+def test_bad_patches_leave_file_untouched(tmp_path):
+    path = tmp_path / "code.py"
+    base = b"a = 1\n"
+    path.write_bytes(base)
+    overlapping = [{"start": 0, "end": 3, "data": ""}, {"start": 2, "end": 4, "data": ""}]
+    assert "Splices overlap" in file_ops.patch_file(str(path), sha256(base), splices=overlapping)["error"]
+    mismatch = "@@ -1,1 +1,1 @@\n-a = 2\n+a = 3\n"
+    assert "does not apply" in file_ops.patch_file(str(path), sha256(base), diff=mismatch)["error"]
+    assert path.read_bytes() == base
+    assert os.listdir(tmp_path) == ["code.py"]
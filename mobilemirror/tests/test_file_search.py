@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the recursive file search and its result cache.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from mobilemirror.backend import file_search
+from mobilemirror.backend.utils.fs_watch import get_watcher
+
+requires_inotify = pytest.mark.skipif(not get_watcher().available(), reason="inotify unavailable")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("needle = 1\n")
+    (tmp_path / "b.txt").write_text("no match\nneedle\n")
+    file_search.invalidate_search_cache()
+    yield tmp_path
+    file_search.invalidate_search_cache()
+
+
+def search(root, **kwargs):
+    prepared = file_search.prepare_search(str(root), **kwargs)
+
+    async def collect():
+        return [json.loads(line) async for line in file_search.stream_search(prepared["query"])]
+
+    return asyncio.run(collect())
+
+
+def wait_for_invalidation(key):
+    for _ in range(200):
+        if file_search._get_cached(key) is None:
+            return
+        time.sleep(0.01)
+    raise AssertionError("cached search was not invalidated")
+
+
+def test_cached_replay_reports_scan_totals(tree):
+    first = search(tree, query="needle", max_results=1)
+    second = search(tree, query="needle", max_results=1)
+
+    assert [line for line in second if line["type"] != "done"] == [line for line in first if line["type"] != "done"]
+    done_first, done_second = first[-1], second[-1]
+    assert (done_first["cached"], done_second["cached"]) == (False, True)
+    assert done_second["truncated"] is done_first["truncated"] is True
+    assert done_second["files_scanned"] == done_first["files_scanned"]
+
+
+@requires_inotify
+def test_change_after_search_invalidates_cache(tree):
+    search(tree, query="needle")
+    key = file_search.prepare_search(str(tree), query="needle")["query"].key
+    entry = file_search._get_cached(key)
+    assert entry is not None and entry.watched
+
+    (tree / "src" / "c.py").write_text("needle\n")
+    wait_for_invalidation(key)
+    assert sum(line["type"] == "match" for line in search(tree, query="needle")) == 3
+
+
+@requires_inotify
+def test_change_during_walk_is_not_cached(tree, monkeypatch):
+    scan = file_search.os.scandir
+
+    def scan_then_change(directory):
+        # A file appears in the root after it was scanned, while the walk continues
+        if directory.endswith("src"):
+            (tree / "late.txt").write_text("needle\n")
+            time.sleep(0.05)  # let the watcher thread deliver the event
+        return scan(directory)
+
+    monkeypatch.setattr(file_search.os, "scandir", scan_then_change)
+    search(tree, query="needle")
+    monkeypatch.setattr(file_search.os, "scandir", scan)
+
+    assert file_search._get_cached(file_search.prepare_search(str(tree), query="needle")["query"].key) is None
+    assert file_search.get_search_stats()["watched_directories"] == 0
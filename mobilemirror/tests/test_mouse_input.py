@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tests for the Mobile Mirror input backends, rate limiter and event validation.
+
+The Xvfb test starts a virtual framebuffer and is skipped when ``Xvfb``
+(or both python-xlib and xdotool) is not installed.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from mobilemirror.backend import mouse_input
+from mobilemirror.backend.mouse_input import (
+    MouseInputError,
+    TokenBucket,
+    XdotoolBackend,
+    _normalize_event,
+    send_input_events,
+)
+
+BOUNDS = (800, 600)
+
+
+class RecordingBackend:
+    """Stand-in backend that records applied batches"""
+
+    name = "recording"
+    display_name = ":test"
+
+    def __init__(self):
+        self.batches = []
+
+    def screen_bounds(self):
+        return BOUNDS
+
+    def apply(self, events):
+        self.batches.append(events)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    recording = RecordingBackend()
+    monkeypatch.setattr(mouse_input, "_backend", recording)
+    monkeypatch.setattr(mouse_input, "rate_limiter", TokenBucket(1000, 1000))
+    return recording
+
+
+def test_token_bucket_allows_burst_then_rejects():
+    bucket = TokenBucket(rate=10, capacity=5)
+    assert all(bucket.consume() for _ in range(5))
+    assert not bucket.consume()
+    assert bucket.rejected == 1
+
+
+def test_token_bucket_refills_at_rate(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(mouse_input.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=10, capacity=5)
+    assert bucket.consume(5)
+    assert not bucket.consume(1)
+    now[0] += 0.25  # 2.5 tokens
+    assert bucket.consume(2)
+    assert not bucket.consume(1)
+    now[0] += 60  # refill never exceeds capacity
+    assert bucket.consume(5)
+    assert not bucket.consume(1)
+
+
+def test_normalize_event_coerces_and_clamps():
+    assert _normalize_event({"type": "move", "x": "10", "y": 20.0}, BOUNDS) == {"type": "move", "x": 10, "y": 20}
+    assert _normalize_event({"type": "scroll", "dy": 500}, BOUNDS) == {
+        "type": "scroll", "dx": 0, "dy": mouse_input.MAX_SCROLL_CLICKS}
+    assert _normalize_event({"type": "click"}, BOUNDS) == {"type": "click", "button": 1}
+    assert _normalize_event({"type": "key", "keysym": "Return"}, BOUNDS) == {"type": "key", "keysym": "Return"}
+
+
+@pytest.mark.parametrize("event", [
+    {"type": "teleport"},
+    "move",
+    {"type": "move", "x": 800, "y": 0},
+    {"type": "move", "x": -1, "y": 0},
+    {"type": "move", "x": 1},
+    {"type": "click", "button": 9},
+    {"type": "down", "button": "left"},
+    {"type": "key", "keysym": "Return; rm -rf /"},
+])
+def test_normalize_event_rejects_bad_input(event):
+    with pytest.raises(MouseInputError):
+        _normalize_event(event, BOUNDS)
+
+
+def test_send_input_events_applies_one_batch(backend):
+    result = send_input_events([
+        {"type": "move", "x": 5, "y": 6},
+        {"type": "click", "button": 3},
+    ])
+    assert result["status"] == "success" and result["count"] == 2
+    assert backend.batches == [[{"type": "move", "x": 5, "y": 6}, {"type": "click", "button": 3}]]
+
+
+def test_send_input_events_rejects_whole_batch(backend):
+    result = send_input_events([{"type": "move", "x": 5, "y": 6}, {"type": "move", "x": 5000, "y": 6}])
+    assert result["status"] == "error"
+    assert backend.batches == []
+
+
+def test_send_input_events_limits(backend, monkeypatch):
+    assert send_input_events([])["status"] == "error"
+    too_many = [{"type": "click"}] * (mouse_input.MAX_EVENTS_PER_BATCH + 1)
+    assert "Too many events" in send_input_events(too_many)["error"]
+    monkeypatch.setattr(mouse_input, "rate_limiter", TokenBucket(1, 1))
+    assert send_input_events([{"type": "click"}] * 2)["error"] == "Rate limit exceeded"
+    assert backend.batches == []
+
+
+def test_largest_batch_fits_module_rate_limiter(monkeypatch):
+    recording = RecordingBackend()
+    monkeypatch.setattr(mouse_input, "_backend", recording)
+    # The real limiter settings, with a full bucket
+    monkeypatch.setattr(mouse_input, "rate_limiter",
+                        TokenBucket(mouse_input.MAX_ACTIONS_PER_SECOND, mouse_input.MAX_ACTIONS_BURST))
+    assert mouse_input.MAX_EVENTS_PER_BATCH <= mouse_input.rate_limiter.capacity
+    result = send_input_events([{"type": "click"}] * mouse_input.MAX_EVENTS_PER_BATCH)
+    assert result["status"] == "success"
+    assert len(recording.batches) == 1
+
+
+def test_xdotool_backend_chains_batch(monkeypatch):
+    calls = []
+    monkeypatch.setattr(mouse_input.subprocess, "run", lambda args, **kwargs: calls.append(args))
+    XdotoolBackend(":5").apply([
+        {"type": "move", "x": 1, "y": 2},
+        {"type": "scroll", "dx": 0, "dy": -3},
+        {"type": "key_down", "keysym": "Shift_L"},
+    ])
+    assert calls == [["xdotool", "mousemove", "1", "2", "click", "--repeat", "3", "4", "keydown", "Shift_L"]]
+
+
+@pytest.fixture
+def xvfb_display():
+    if not shutil.which("Xvfb"):
+        pytest.skip("Xvfb not installed")
+    display = f":{90 + os.getpid() % 9}"
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", "640x480x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socket_path = f"/tmp/.X11-unix/X{display[1:]}"
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path) and time.monotonic() < deadline:
+        if proc.poll() is not None:
+            pytest.skip(f"Xvfb exited with status {proc.returncode}")
+        time.sleep(0.05)
+    try:
+        yield display
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+
+def test_backend_moves_pointer_on_xvfb(xvfb_display):
+    if mouse_input.XLIB_AVAILABLE:
+        backend = mouse_input.XTestBackend(xvfb_display)
+    elif shutil.which("xdotool"):
+        backend = XdotoolBackend(xvfb_display)
+    else:
+        pytest.skip("neither python-xlib nor xdotool is installed")
+    try:
+        assert backend.screen_bounds() == (640, 480)
+        backend.apply([{"type": "move", "x": 100, "y": 50}, {"type": "click", "button": 1}])
+        if isinstance(backend, XdotoolBackend):
+            out = subprocess.run(["xdotool", "getmouselocation", "--shell"], capture_output=True,
+                                 text=True, check=True, env=backend._env).stdout
+            assert "X=100" in out and "Y=50" in out
+        else:
+            pointer = backend._root.query_pointer()
+            assert (pointer.root_x, pointer.root_y) == (100, 50)
+    finally:
+        backend.close()
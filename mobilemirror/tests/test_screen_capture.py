@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the screen capture diffing, framing and quality control.
+"""
+
+from mobilemirror.backend import screen_capture
+from mobilemirror.backend.screen_capture import (
+    FRAME_HEADER, RECT_HEADER, AdaptiveQuality, Frame, TileDiffer, pack_frame
+)
+
+WIDTH, HEIGHT, BPP = 160, 130, 4  # partial tiles on the right and bottom edges
+
+
+def make_frame(pixels: bytearray) -> Frame:
+    return Frame(memoryview(pixels), WIDTH, HEIGHT, WIDTH * BPP, "BGRX", BPP)
+
+
+def blank() -> bytearray:
+    return bytearray(WIDTH * HEIGHT * BPP)
+
+
+def test_first_diff_is_the_whole_screen():
+    rects = TileDiffer(64).diff(make_frame(blank()))
+    assert rects == [(0, 0, WIDTH, 64), (0, 64, WIDTH, 64), (0, 128, WIDTH, 2)]
+
+
+def test_identical_frames_have_no_dirty_tiles():
+    differ = TileDiffer(64)
+    differ.diff(make_frame(blank()))
+    assert differ.diff(make_frame(blank())) == []
+
+
+def test_only_the_changed_tile_is_dirty():
+    differ = TileDiffer(64)
+    differ.diff(make_frame(blank()))
+
+    pixels = blank()
+    x, y = 70, 100  # inside tile (64, 64)
+    pixels[(y * WIDTH + x) * BPP] = 0xFF
+    assert differ.diff(make_frame(pixels)) == [(64, 64, 64, 64)]
+
+    pixels[(129 * WIDTH + 159) * BPP] = 0xFF  # bottom-right partial tile
+    assert differ.diff(make_frame(pixels)) == [(128, 128, 32, 2)]
+
+
+def test_reset_makes_the_next_diff_full():
+    differ = TileDiffer(64)
+    differ.diff(make_frame(blank()))
+    differ.reset()
+    assert len(differ.diff(make_frame(blank()))) == 3
+
+
+def test_pack_frame_layout():
+    frame = make_frame(blank())
+    rects = [(0, 0, 64, 64), (64, 64, 32, 2)]
+    payloads = [b"first", b"second!"]
+    data = pack_frame(2 ** 32 + 7, frame, rects, payloads, "webp", True)
+
+    assert FRAME_HEADER.unpack_from(data, 0) == (7, WIDTH, HEIGHT, 2, 2, 1)
+    offset = FRAME_HEADER.size
+    for rect, payload in zip(rects, payloads):
+        x, y, w, h, length = RECT_HEADER.unpack_from(data, offset)
+        offset += RECT_HEADER.size
+        assert (x, y, w, h) == rect
+        assert data[offset:offset + length] == payload
+        offset += length
+    assert offset == len(data)
+
+
+def test_adaptive_quality_drops_on_slow_acks():
+    quality = AdaptiveQuality(70)
+    quality.on_ack(screen_capture.TARGET_RTT * 3, 0)
+    assert quality.quality == 60
+    for _ in range(20):
+        quality.on_ack(screen_capture.TARGET_RTT * 3, 0)
+    assert quality.quality == screen_capture.MIN_QUALITY
+
+
+def test_adaptive_quality_drops_when_acks_back_up():
+    quality = AdaptiveQuality(70)
+    quality.on_ack(0.001, screen_capture.MAX_IN_FLIGHT - 1)
+    assert quality.quality == 60
+
+
+def test_adaptive_quality_recovers_on_fast_acks():
+    quality = AdaptiveQuality(70)
+    quality.on_ack(0.001, 0)
+    assert quality.quality == 75
+    for _ in range(20):
+        quality.on_ack(0.001, 0)
+    assert quality.quality == screen_capture.MAX_QUALITY
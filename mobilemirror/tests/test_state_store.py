@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared state store backends.
+"""
+
+import time
+
+import pytest
+
+from mobilemirror.backend.utils import state_store
+from mobilemirror.backend.utils.state_store import MemoryStore, SQLiteStore, StateStore
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        StateStore()
+
+    class Partial(StateStore):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = MemoryStore() if request.param == "memory" else SQLiteStore(tmp_path / "state.db")
+    yield store
+    store.close()
+
+
+def test_values_and_events(store):
+    store.set("a:1", "one")
+    store.set("a:2", "two", ttl=0.01)
+    store.set("b:1", "other")
+    time.sleep(0.02)
+    assert store.get("a:1") == "one" and store.get("a:2") is None
+    assert store.scan("a:") == {"a:1": "one"}
+
+    assert [store.record_event("fail:x", 60) for _ in range(3)] == [1, 2, 3]
+    store.record_event("fail:y", 60)
+    assert store.event_counts("fail:", 60) == {"fail:x": 3, "fail:y": 1}
+    store.clear_events("fail:x")
+    assert store.event_counts("fail:", 60) == {"fail:y": 1}
+
+
+def test_sqlite_prunes_events_outside_every_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, "PRUNE_EVERY", 1)
+    store = SQLiteStore(tmp_path / "state.db")
+    db = store._db()
+    # Events for a key that is never recorded to again
+    db.executemany("INSERT INTO events (key, at) VALUES (?, ?)",
+                   [("fail:gone", time.time() - 120)] * 5)
+
+    store.record_event("fail:live", 60)
+    keys = [row[0] for row in db.execute("SELECT key FROM events")]
+    assert keys == ["fail:live"]
+    store.close()
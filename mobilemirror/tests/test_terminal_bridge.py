@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for terminal session attach/detach and takeover.
+"""
+
+import asyncio
+import os
+
+from mobilemirror.backend import terminal_bridge
+
+
+class FakeWebSocket:
+    """Records what the session sends; receive() blocks until closed"""
+
+    def __init__(self):
+        self.sent = []
+        self.close_code = None
+        self._incoming = asyncio.Queue()
+
+    async def send_text(self, text):
+        self.sent.append(text)
+        for _ in range(5):  # give other tasks a chance to interleave
+            await asyncio.sleep(0)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def receive(self):
+        return await self._incoming.get()
+
+    async def close(self, code=1000):
+        self.close_code = code
+        self._incoming.put_nowait({"type": "websocket.disconnect"})
+
+
+async def _wait_for(predicate):
+    for _ in range(1000):
+        if predicate():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition not reached")
+
+
+def test_takeover_keeps_new_connection_attached(monkeypatch):
+    monkeypatch.setattr(terminal_bridge, "active_sessions", {})
+    read_fd, write_fd = os.pipe()
+
+    async def scenario():
+        session = terminal_bridge.TerminalSession("takeover")
+        session.fd = read_fd  # an idle "PTY": never readable
+        session._loop = asyncio.get_running_loop()
+        terminal_bridge.active_sessions[session.session_id] = {"session": session}
+
+        old, new = FakeWebSocket(), FakeWebSocket()
+        first = asyncio.ensure_future(session.attach(old))
+        await _wait_for(lambda: session._pumps)
+
+        second = asyncio.ensure_future(session.attach(new))
+        await first
+        await _wait_for(lambda: session._pumps)
+
+        # The old connection's cleanup must not detach the new one
+        assert old.close_code == 4001
+        assert session.websocket is new
+        assert session._grace_handle is None
+
+        await new.close()
+        await second
+        assert session.websocket is None
+        assert session._grace_handle is not None  # a real disconnect still detaches
+        session._grace_handle.cancel()
+        session._pause_reading()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-session terminal byte counters on /metrics.
+"""
+
+import pytest
+
+from mobilemirror.backend import terminal_bridge
+from mobilemirror.backend.utils.metrics import render_metrics
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    monkeypatch.setattr(terminal_bridge, "active_sessions", {})
+    monkeypatch.setattr(terminal_bridge, "_metrics_slots", set())
+
+    def add(session_id, sent, received):
+        session = terminal_bridge.TerminalSession(session_id)
+        session.bytes_sent, session.bytes_received = sent, received
+        session.metrics_slot = terminal_bridge._claim_metrics_slot()
+        terminal_bridge.active_sessions[session_id] = {"session": session}
+        return session
+
+    return add
+
+
+def test_sessions_get_their_own_series(sessions):
+    sessions("secret-a", 100, 7)
+    sessions("secret-b", 5, 1)
+
+    lines = render_metrics().splitlines()
+    assert 'mobilemirror_terminal_session_bytes_total{slot="0",direction="sent"} 100' in lines
+    assert 'mobilemirror_terminal_session_bytes_total{slot="1",direction="received"} 1' in lines
+    assert not any("secret-" in line for line in lines)
+
+
+def test_slots_are_reused_and_bounded(sessions, monkeypatch):
+    monkeypatch.setattr(terminal_bridge, "METRICS_SESSION_SLOTS", 2)
+    first, second = sessions("a", 0, 0), sessions("b", 0, 0)
+    assert (first.metrics_slot, second.metrics_slot) == (0, 1)
+    assert sessions("c", 0, 0).metrics_slot is None  # totals only
+
+    terminal_bridge._metrics_slots.discard(first.metrics_slot)
+    assert terminal_bridge._claim_metrics_slot() == 0
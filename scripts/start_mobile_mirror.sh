@@ -11,15 +11,20 @@ cd "$DIR/.."
 /home/statiksmoke8/miniconda3/envs/Mob-Dev/bin/python -c "
 import uvicorn
 from mobilemirror.backend.app import app
+from mobilemirror.backend.utils.workers import WORKER_COUNT, run_workers
 
 print('✅ Mobile Mirror Backend Starting on http://0.0.0.0:8000')
 print('📱 Ready for mobile connections!')
 
-uvicorn.run(
-    app, 
-    host='0.0.0.0', 
-    port=8000, 
-    log_level='info',
-    reload=False
-)
+if WORKER_COUNT > 1:
+    # MOBILEMIRROR_WORKERS > 1: one process per worker, shared state in the state store
+    run_workers('mobilemirror.backend.app:app', '0.0.0.0', 8000, WORKER_COUNT)
+else:
+    uvicorn.run(
+        app, 
+        host='0.0.0.0', 
+        port=8000, 
+        log_level='info',
+        reload=False
+    )
 "
@@ -10,8 +10,9 @@
 # GremlinGPT v1.0.3 :: FSM Core & Module Integrity Directive
 
 from backend.globals import CFG, logger, resolve_path, DATA_DIR, MEM
-from backend.api.api_endpoints import *
 from backend.router import route_task
+from backend.utils.git_ops import auto_commit
+from utils.nltk_setup import setup_nltk_data
 
 
 NLTK_DATA_DIR = setup_nltk_data()
@@ -42,7 +43,10 @@ if __name__ == "__main__":
 
 def get_fsm_status():
     return route_task("get_fsm_status")
-...existing code...
+
+
+def step_fsm():
+    return route_task("step_fsm")
 
 
 def reset_fsm():
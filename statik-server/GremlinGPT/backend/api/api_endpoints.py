@@ -24,12 +24,42 @@ from utils.logging_config import setup_module_logger
 # ...existing code...
 logger = setup_module_logger('backend', 'INFO')
 
-from agent_core.fsm import (
-    fsm_loop,
-    get_fsm_status,
-from backend.globals import CFG, logger, resolve_path, DATA_DIR, MEM
-from backend.api.api_endpoints import *
-from backend.router import route_task
+from backend.globals import CFG, resolve_path, DATA_DIR, MEM
+from agent_core.task_queue import TaskQueue
+from backend.api.planner import list_tasks, mutation_notify, set_task_priority
+from backend.api.scraping_api import scrape_url
+from memory.vector_store.embedder import get_memory_graph
+from nlp_engine.chat_session import ChatSession
+from tools.reward_model import get_reward_feed
+from trading_core.signal_generator import generate_signals
+
+try:
+    from agent_core.fsm import (
+        fsm_loop,
+        get_fsm_status,
+        step_fsm,
+        reset_fsm,
+        inject_task as fsm_inject_task,
+    )
+except ImportError as e:
+    # agent_core.fsm dispatches through backend.router.route_task, which is
+    # not implemented yet; the rest of the API must not depend on it
+    logger.warning(f"[API] FSM unavailable; /api/fsm/* will return 503: {e}")
+
+    def _fsm_unavailable(*args, _error=str(e), **kwargs):
+        flask.abort(503, description=f"FSM unavailable: {_error}")
+
+    fsm_loop = get_fsm_status = step_fsm = reset_fsm = fsm_inject_task = _fsm_unavailable
+
+api_blueprint = flask.Blueprint("api", __name__)
+
+# Chat sessions by session_id, kept for the life of the process
+_sessions = {}
+
+
+# --- Chat ---
+@api_blueprint.route("/api/chat", methods=["POST"])
+def api_chat():
     data = flask.request.get_json()
     user_input = data.get("message", "")
     session_id = data.get("session_id")
@@ -565,22 +595,29 @@ def api_experimental_broken_scrapers():
 # --- Memory Search (if not already implemented) ---
 @api_blueprint.route("/api/memory/search", methods=["POST"])
 def api_memory_search():
-    data = flask.request.get_json()
+    data = flask.request.get_json() or {}
     query = data.get("query", "")
     if not query:
         return flask.jsonify({"error": "Missing 'query'"}), 400
+    filters = data.get("filters") or {}
+    if not isinstance(filters, dict):
+        return flask.jsonify({"error": "'filters' must be an object"}), 400
     
     try:
-        try:
-            from memory.vector_store.embedder import search_memory  # type: ignore
-            results = search_memory(query)
-        except ImportError:
-            # Fallback: mock search results
-            results = [
-                {"text": f"Mock result for: {query}", "score": 0.85, "metadata": {"source": "mock"}},
-                {"text": f"Another result for: {query}", "score": 0.72, "metadata": {"source": "mock"}}
-            ]
+        from memory.vector_store.embedder import search_memory  # type: ignore
+    except ImportError as e:
+        return flask.jsonify({"error": f"Memory search unavailable: {e}"}), 503
+    try:
+        results = search_memory(
+            query,
+            top_k=data.get("top_k"),
+            filters=filters,
+            threshold=data.get("threshold"),
+            collection=data.get("collection"),
+        )
         return flask.jsonify({"results": results})
+    except (ValueError, KeyError) as e:
+        return flask.jsonify({"error": str(e)}), 400
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -13,7 +13,6 @@
 from flask import request, jsonify, has_request_context
 from backend.interface import commands
 from nlp_engine.tokenizer import tokenize
-from nlp_engine.transformer_core import encode
 from agent_core.task_queue import enqueue_task
 from memory.vector_store import embedder
 from memory.log_history import log_event
@@ -49,7 +48,7 @@ def chat(user_input=None):
             return resp, 400
 
     tokens = tokenize(user_input)
-    vector = encode(user_input)
+    vector = embedder.embed_text(user_input)
     task = commands.parse_command(user_input)
     result = commands.execute_command(task)
 
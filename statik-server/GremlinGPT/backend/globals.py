@@ -12,7 +12,13 @@
 
 # backend/globals.py
 
-from backend.globals import CFG, logger, resolve_path, DATA_DIR, MEM
+import os
+import json
+from pathlib import Path
+
+import toml
+
+from utils.logging_config import get_module_logger
 
 # Initialize module-specific logger
 logger = get_module_logger("backend")
@@ -27,7 +33,23 @@ def load_config():
         return toml.load(CONFIG_PATH)
     except Exception as e:
         logger.critical(f"[GLOBALS] Failed to load TOML config: {e}")
-from backend.globals import CFG, logger, resolve_path, DATA_DIR, MEM
+        return {}
+
+
+def load_memory_config():
+    try:
+        with open(MEMORY_JSON, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"[GLOBALS] Failed to load memory config: {e}")
+        return {}
+
+
+CFG = load_config()
+MEM = load_memory_config()
+
+
+def resolve_path(p):
     project_root = Path(__file__).parent.parent.resolve()
     return os.path.expanduser(p.replace("$ROOT", str(project_root)))
 
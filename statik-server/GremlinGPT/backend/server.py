@@ -14,14 +14,30 @@ try:
     import eventlet
     eventlet.monkey_patch()
 except ImportError:
-    pass  # eventlet is optional
+    eventlet = None  # eventlet is optional
+
+import os
+import sys
+import traceback
+
+# Add project root to path so `python backend/server.py` works too
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask, send_from_directory
+from flask_socketio import SocketIO
 
-# Set up NLTK data path before any imports
-eventlet.monkey_patch()
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
 from backend.globals import CFG, logger, resolve_path, DATA_DIR, MEM
+from utils.warmup import start_warmup
 from backend.api.api_endpoints import *
-from backend.router import *
+from backend.router import register_routes
+
+app = Flask(__name__)
+app.register_blueprint(api_blueprint)
+socketio = SocketIO(
+    app, cors_allowed_origins="*", async_mode="eventlet" if eventlet else "threading"
+)
+
+try:
     register_routes(app)
     logger.info("[SERVER] Additional routes registered")
 except Exception as e:
@@ -55,6 +71,9 @@ def run_server_forever():
     host = CFG.get("backend", {}).get("host", "0.0.0.0")
     port = CFG.get("backend", {}).get("port", 8080)
 
+    # Models load on first use; optionally start loading them now in the background
+    start_warmup()
+
     # Main bulletproof loop
     while True:
         try:
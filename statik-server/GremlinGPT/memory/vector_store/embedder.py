@@ -9,8 +9,32 @@
 
 # GremlinGPT v1.0.3 :: Memory Embedder & Vector Store Core
 
+import os
+import json
+import uuid
+import atexit
+import shutil
+import threading
+import numpy as np
+from datetime import datetime, timezone
 from backend.globals import CFG, logger, resolve_path, DATA_DIR, MEM
-...existing code...
+
+# --- Resilient Imports ---
+try:
+    import faiss  # type: ignore
+except ImportError as e:
+    logger.error(f"[EMBEDDER] faiss import failed: {e}")
+    faiss = None
+
+from memory.vector_store.memory_store import MemoryStore
+from memory.vector_store.search_index import SearchIndex
+from memory.vector_store.write_buffer import WriteBuffer
+from nlp_engine.embedding_cache import get_embedding_cache
+from nlp_engine.batching import MicroBatcher
+from nlp_engine.encoder_registry import (
+    DEFAULT_COLLECTION, bind_encoder, collection_encoder, conform_vector,
+    encoder_for_dimension, load_model, registry_info,
+)
 
 try:
     from backend.globals import MEM, CFG
@@ -20,14 +44,6 @@ except Exception as e:
     MEM = {}
     dashboard_selected_backend = 'faiss'
 
-try:
-    from nlp_engine.transformer_core import encode
-except Exception:
-    # fallback to a dummy encoder
-    def encode(text):
-        _ = text  # Access the parameter to avoid unused variable warning
-        return np.zeros(MEM.get("embedding", {}).get("dimension", 384), dtype="float32")
-
 # --- Configuration & Paths ---
 storage_conf = MEM.get("storage", {})
 if not isinstance(storage_conf, dict):
@@ -57,125 +73,94 @@ METADATA_DB_PATH:
 # Use dashboard-selected backend for toggling
 USE_FAISS   = dashboard_selected_backend == "faiss"
 USE_CHROMA  = dashboard_selected_backend == "chromadb"
-EMBED_MODEL = MEM.get("embedding", {}).get("model", "all-MiniLM-L6-v2")
-DIMENSION   = MEM.get("embedding", {}).get("dimension", 384)
+ENCODER     = collection_encoder(DEFAULT_COLLECTION)  # encoder bound to the memory collection
+EMBED_MODEL = ENCODER.model
+DIMENSION   = ENCODER.dimension
+BATCH_SIZE  = MEM.get("embedding", {}).get("batch_size", 250)
+MICRO_BATCH_WAIT_MS = MEM.get("embedding", {}).get("micro_batch_wait_ms", 5)
 
 # --- Ensure directories exist (and log failures) ---
-for path in (FAISS_DIR, CHROMA_DIR, LOCAL_INDEX_PATH):
+for path in (FAISS_DIR, CHROMA_DIR, LOCAL_INDEX_ROOT):
     try:
         os.makedirs(path, exist_ok=True)
     except Exception as e:
         logger.error(f"[EMBEDDER] Failed to create directory {path}: {e}")
 
-# --- Chroma Client Setup ---
-if chromadb:
-    try:
-        chroma_client = chromadb.PersistentClient(path=CHROMA_DIR)
-        collection = chroma_client.get_or_create_collection(name="gremlin_memory")
-    except Exception as e:
-        logger.error(f"[EMBEDDER] Failed to initialize Chroma client: {e}")
-        collection = None
-else:
-    collection = None
+# --- Memory Store (SQLite metadata + memory-mapped vectors), opened by ensure_ready() ---
+memory_store = None
 
-def add_to_chroma(text, emb_id, vector, meta):
-    if not collection:
+# --- Chroma Client Setup (on first use) ---
+collection = None
+_chroma_tried = False
+_chroma_lock = threading.Lock()
+
+def get_chroma_collection():
+    """The Chroma collection, created on first use; None when chromadb is unavailable."""
+    global collection, _chroma_tried
+    if not _chroma_tried:
+        with _chroma_lock:
+            if not _chroma_tried:
+                try:
+                    import chromadb  # type: ignore
+                    chroma_client = chromadb.PersistentClient(path=CHROMA_DIR)
+                    collection = chroma_client.get_or_create_collection(name="gremlin_memory")
+                except Exception as e:
+                    logger.error(f"[EMBEDDER] Failed to initialize Chroma client: {e}")
+                    collection = None
+                _chroma_tried = True
+    return collection
+
+def add_batch_to_chroma(texts, emb_ids, vectors, metas):
+    chroma = get_chroma_collection()
+    if not chroma:
         logger.warning(f"[CHROMA] Skipping add; collection not available")
         return
+    # upsert keeps WAL replay idempotent for ids Chroma already holds
+    write = getattr(chroma, "upsert", chroma.add)
     try:
-        collection.add(
-            documents=[text],
-            embeddings=[vector.tolist() if hasattr(vector, "tolist") else list(vector)],
-            metadatas=[meta],
-            ids=[emb_id]
+        write(
+            documents=list(texts),
+            embeddings=[v.tolist() if hasattr(v, "tolist") else list(v) for v in vectors],
+            metadatas=list(metas),
+            ids=list(emb_ids)
         )
-        logger.info(f"[CHROMA] Added {emb_id}")
+        logger.debug(f"[CHROMA] Added batch of {len(emb_ids)}")
     except Exception as e:
-        logger.error(f"[CHROMA] Add failed for {emb_id}: {e}")
+        logger.error(f"[CHROMA] Batch add of {len(emb_ids)} failed: {e}")
+        raise
 
-# --- FAISS Index Setup ---
-FAISS_INDEX_PATH = os.path.join(FAISS_DIR, "faiss_index.index")
-try:
-    if faiss and os.path.exists(FAISS_INDEX_PATH):
-        faiss_index = faiss.read_index(FAISS_INDEX_PATH)  # type: ignore
-        logger.info(f"[FAISS] Loaded index from {FAISS_INDEX_PATH}")
-    elif faiss:
-        faiss_index = faiss.IndexFlatL2(DIMENSION)  # type: ignore
-        logger.info("[FAISS] Initialized new IndexFlatL2")
-    else:
-        faiss_index = None
-        logger.error("[FAISS] faiss unavailable; index not initialized")
-except Exception as e:
-    logger.error(f"[FAISS] Failed to load or init index: {e}")
-    faiss_index = None
+def add_to_chroma(text, emb_id, vector, meta):
+    add_batch_to_chroma([text], [emb_id], [vector], [meta])
+
+# --- Vector Index Files (one SearchIndex per dimension, see Similarity Search) ---
+FAISS_INDEX_PATH = os.path.join(FAISS_DIR, "faiss_index.index")  # DIMENSION, the memory collection
+
+def faiss_index_path(dimension):
+    if dimension == DIMENSION:
+        return FAISS_INDEX_PATH
+    return os.path.join(FAISS_DIR, f"faiss_index_d{dimension}.index")
+
+if not faiss:
+    logger.error("[FAISS] faiss unavailable; memory search falls back to exact scans")
 
-def add_to_faiss(vector, emb_id):
-    if not faiss_index:
-        logger.warning(f"[FAISS] Skipping add; index not available")
-        return
-    try:
-        vec = np.array(vector, dtype="float32").reshape(1, -1)
-        # Diagnostic logging for FAISS index type and available methods
-        logger.info(f"[FAISS] Index type: {type(faiss_index)}")
-        logger.debug(f"[FAISS] Index methods: {[m for m in dir(faiss_index) if 'add' in m]}")
-        
-        # Check if index supports IDs (not all FAISS indexes do)
-        supports_ids = hasattr(faiss_index, 'add_with_ids') and callable(getattr(faiss_index, 'add_with_ids', None))
-        
-        if supports_ids:
-            logger.info(f"[FAISS] Using add_with_ids method.")
-            try:
-                emb_id_int = int(emb_id) if isinstance(emb_id, int) or (isinstance(emb_id, str) and emb_id.isdigit()) else abs(hash(emb_id)) % (2**63)
-            except Exception:
-                emb_id_int = abs(hash(str(emb_id))) % (2**63)
-            try:
-                # Ensure vec is 2D (n, d)
-                vec_2d = np.array(vector, dtype="float32").reshape(1, -1)
-                ids_array = np.array([emb_id_int], dtype="int64")
-                logger.debug(f"[FAISS] add_with_ids vec shape: {vec_2d.shape}, emb_id_int: {emb_id_int}")
-                
-                # Use type ignore to handle various FAISS implementations
-                faiss_index.add_with_ids(vec_2d, ids_array)  # type: ignore
-                logger.info(f"[FAISS] Added {emb_id} with ID")
-            except Exception as e:
-                # Some indexes claim to support add_with_ids but actually don't
-                logger.warning(f"[FAISS] add_with_ids failed, falling back to add: {e}")
-                supports_ids = False
-        
-        if not supports_ids:
-            logger.info(f"[FAISS] Using add method (no ID support).")
-            try:
-                # Ensure vec is 2D (n, d)
-                vec_2d = np.array(vector, dtype="float32").reshape(1, -1)
-                logger.debug(f"[FAISS] add vec shape: {vec_2d.shape}")
-                
-                # Use type ignore to handle various FAISS implementations
-                faiss_index.add(vec_2d)  # type: ignore
-                logger.info(f"[FAISS] Added {emb_id} without ID")
-            except Exception as e:
-                logger.error(f"[FAISS] add failed: {e}")
-                return
-        else:
-            logger.error(f"[FAISS] Index object missing valid 'add' or 'add_with_ids' method. Type: {type(faiss_index)}")
-            return
-        faiss.write_index(faiss_index, FAISS_INDEX_PATH)  # type: ignore
-        logger.info(f"[FAISS] Added {emb_id}")
-    except Exception as e:
-        logger.error(f"[FAISS] Add failed for {emb_id}: {e}")
 def get_index_info():
     """Return diagnostic info about FAISS and Chroma index types and available methods."""
     info = {}
-    # FAISS
-    if 'faiss_index' in globals() and faiss_index:
-        info['faiss_type'] = str(type(faiss_index))
-        info['faiss_methods'] = dir(faiss_index)
+    ensure_ready()
+    # FAISS (the memory collection's ANN index; None while exact search suffices)
+    index = search_indexes.get(DIMENSION)
+    info['index_kind'] = index.ann_kind if index is not None else None
+    if index is not None and index.ann is not None:
+        info['faiss_type'] = str(type(index.ann))
+        info['faiss_methods'] = dir(index.ann)
     else:
         info['faiss_type'] = None
         info['faiss_methods'] = []
     # Chroma
-    if 'collection' in globals() and collection:
-        info['chroma_type'] = str(type(collection))
-        info['chroma_methods'] = dir(collection)
+    chroma = get_chroma_collection()
+    if chroma:
+        info['chroma_type'] = str(type(chroma))
+        info['chroma_methods'] = dir(chroma)
     else:
         info['chroma_type'] = None
         info['chroma_methods'] = []
@@ -217,88 +202,158 @@ def set_backend(backend_name):
 
 def get_backend_status():
     """Get status of both FAISS and Chroma backends."""
+    ensure_ready()
+    chroma = get_chroma_collection()
     status = {
         "current_backend": dashboard_selected_backend,
-        "faiss_available": faiss is not None and faiss_index is not None,
-        "chromadb_available": chromadb is not None and collection is not None,
+        "faiss_available": faiss is not None,
+        "chromadb_available": chroma is not None,
         "faiss_index_count": 0,
-        "chroma_collection_count": 0
+        "chroma_collection_count": 0,
+        "pending_writes": write_buffer.pending,
+        "embedding_cache": get_embedding_cache().info(),
+        "faiss_indexes": {dim: index.stats() for dim, index in search_indexes.items()},
+        "encoders": registry_info(),
+        "conformed": dict(conform_counts),
+        "model_loaded": model is not None,
     }
     
-    # Get FAISS count
-    if status["faiss_available"]:
-        try:
-            status["faiss_index_count"] = faiss_index.ntotal  # type: ignore
-        except Exception as e:
-            logger.warning(f"[EMBEDDER] Failed to get FAISS count: {e}")
+    # Rows indexed for the memory collection
+    if DIMENSION in search_indexes:
+        status["faiss_index_count"] = search_indexes[DIMENSION].size
     
     # Get Chroma count
     if status["chromadb_available"]:
         try:
-            status["chroma_collection_count"] = collection.count()  # type: ignore
+            status["chroma_collection_count"] = chroma.count()  # type: ignore
         except Exception as e:
             logger.warning(f"[EMBEDDER] Failed to get Chroma count: {e}")
     
     return status
 
-# --- Model Loading (Resilient) ---
+# --- Model Loading (Resilient, on first use) ---
 model = None
-if SentenceTransformer:
-    try:
-        model = SentenceTransformer(EMBED_MODEL)
-        logger.info(f"[EMBEDDER] Loaded model: {EMBED_MODEL}")
-    except Exception as e:
-        logger.error(f"[EMBEDDER] Model load failed: {e}")
-        model = None
-else:
-    logger.error("[EMBEDDER] SentenceTransformer unavailable; using fallback")
+_model_failed = False
+_model_lock = threading.Lock()
+# Otherwise another module implements the memory encoder and binds it in the registry
+OWN_MODEL = ENCODER.backend == "sentence-transformers"
 
-memory_vectors = {}
+def get_model():
+    """The memory collection's sentence-transformers model, loaded on first call; None if unavailable."""
+    global model, _model_failed
+    if model is None and not _model_failed and OWN_MODEL:
+        with _model_lock:
+            if model is None and not _model_failed:
+                try:
+                    # Shared through the encoder registry with semantic_score
+                    model = load_model("sentence-transformers", EMBED_MODEL)
+                    logger.info(f"[EMBEDDER] Loaded model: {EMBED_MODEL}")
+                except Exception as e:
+                    logger.error(f"[EMBEDDER] Model load failed: {e}")
+                    _model_failed = True
+    return model
 
 # --- Core Embedding Functions ---
+MODEL_ID = f"sentence-transformers:{EMBED_MODEL}"  # embedding cache namespace
+
+def _encode_batch(texts):
+    # sentence-transformers sorts each call by length and pads per batch itself
+    return list(model.encode(list(texts), batch_size=BATCH_SIZE, convert_to_numpy=True))
+
+def _encode_and_cache(texts):
+    vectors = _encode_batch(texts)
+    get_embedding_cache().put_many(MODEL_ID, texts, vectors)
+    return vectors
+
+_batcher = MicroBatcher(_encode_and_cache, max_batch=BATCH_SIZE, max_wait_ms=MICRO_BATCH_WAIT_MS,
+                        name="embedder") if MICRO_BATCH_WAIT_MS > 0 else None
+
 def embed_text(text):
-    if not model:
-        logger.error("[EMBEDDER] No model; returning zero-vector")
-        return np.zeros(DIMENSION, dtype="float32")
+    if not OWN_MODEL and ENCODER.bound:
+        return ENCODER.encode(text)
     try:
-        vec = model.encode(text, convert_to_numpy=True)
+        vec = get_embedding_cache().get(MODEL_ID, text)
+        if vec is None:
+            if not get_model():
+                logger.error("[EMBEDDER] No model; returning zero-vector")
+                return np.zeros(DIMENSION, dtype="float32")
+            vec = _batcher.encode(text) if _batcher else _encode_and_cache([text])[0]
         logger.debug(f"[EMBEDDER] Embedding norm: {np.linalg.norm(vec):.4f}")
         return vec
     except Exception as e:
         logger.error(f"[EMBEDDER] Embedding failed: {e}")
         return np.zeros(DIMENSION, dtype="float32")
 
-def package_embedding(text, vector, meta):
+def embed_many(texts):
+    """Embed a list of texts in batches of embedding.batch_size; returns an (n, DIMENSION) matrix."""
+    texts = list(texts)
+    if not OWN_MODEL and ENCODER.bound:
+        return ENCODER.encode_many(texts)
+    if not texts:
+        return np.zeros((0, DIMENSION), dtype="float32")
+    if not get_model():
+        logger.error("[EMBEDDER] No model; returning zero-vectors")
+        return np.zeros((len(texts), DIMENSION), dtype="float32")
+    try:
+        return np.vstack(get_embedding_cache().get_many(MODEL_ID, texts, _encode_batch))
+    except Exception as e:
+        logger.error(f"[EMBEDDER] Batch embedding of {len(texts)} texts failed: {e}")
+        return np.zeros((len(texts), DIMENSION), dtype="float32")
+
+if OWN_MODEL:
+    bind_encoder(ENCODER.id, embed_many)
+
+conform_counts = {}  # how vectors were made to fit their collection's encoder
+
+def package_embedding(text, vector, meta, collection=None):
     emb_id = str(uuid.uuid4())
     if not isinstance(meta, dict):
         logger.warning(f"[EMBEDDER] meta not dict; got {type(meta)}; coercing")
         meta = {"source": str(meta)}
+    encoder = collection_encoder(collection)
+    try:
+        vector, how = conform_vector(vector, encoder, text)
+    except ValueError as e:
+        # Kept in its own dimension's index rather than coerced into this one
+        vector = np.asarray(vector, dtype="float32").reshape(-1)
+        encoder = encoder_for_dimension(len(vector)) or encoder
+        how = "unconformed"
+        logger.warning(f"[EMBEDDER] {e}; storing {emb_id} as {len(vector)}-d")
+    if how != "native":
+        conform_counts[how] = conform_counts.get(how, 0) + 1
+        logger.debug(f"[EMBEDDER] {emb_id} {how} into encoder '{encoder.id}'")
     embedding = {
         "id": emb_id,
         "text": text,
-        "embedding": vector.tolist() if hasattr(vector, "tolist") else list(vector),
+        "embedding": vector.tolist(),
         "meta": meta,
         "created": datetime.now(timezone.utc).isoformat(),
         "source": meta.get("source", "system"),
-        "model": EMBED_MODEL,
+        "model": encoder.model,
+        "encoder": encoder.id,
+        "collection": collection or DEFAULT_COLLECTION,
         "replaceable": True,
     }
     
-    # Use current backend selection (dynamically determined)
-    current_backend = get_current_backend()
-    if current_backend == "faiss" and faiss_index is not None:
-        add_to_faiss(vector, emb_id)
-    if current_backend == "chromadb" and collection is not None:
-        add_to_chroma(text, emb_id, vector, meta)
-        
-    memory_vectors[emb_id] = embedding
+    # Logged to the WAL now; store and index writes happen in batches
     try:
-        _write_to_disk(embedding)
-        logger.info(f"[EMBEDDER] Stored embedding: {emb_id} using {current_backend}")
+        ensure_ready()
+        write_buffer.append(embedding)
+        logger.info(f"[EMBEDDER] Queued embedding: {emb_id} using {get_current_backend()}")
     except Exception as e:
-        logger.error(f"[EMBEDDER] Disk write failed for {emb_id}: {e}")
+        logger.error(f"[EMBEDDER] WAL append failed for {emb_id}: {e}")
     return embedding
 
+def flush_embeddings():
+    """Push queued embeddings to the vector backend and document store now."""
+    ensure_ready()
+    return write_buffer.flush()
+
+def checkpoint_embeddings():
+    """Flush, persist the search indexes and truncate the write-ahead log."""
+    ensure_ready()
+    return write_buffer.checkpoint()
+
 def archive_plan(vector_path="data/nlp_training_sets/auto_generated.jsonl"):
     stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
     archive = os.path.join("GremlinGPT", "docs", f"planlog_{stamp}.jsonl")
@@ -322,46 +377,34 @@ def auto_commit(file_path):
         logger.error(f"[EMBEDDER] Git commit failed: {e}")
 
 def get_all_embeddings(limit=50):
-    if not memory_vectors:
-        _load_from_disk()
-    return list(memory_vectors.values())[:limit]
+    return ensure_ready().list(limit)
 
 def get_embedding_by_id(emb_id):
-    if emb_id not in memory_vectors:
-        _load_from_disk()
-    return memory_vectors.get(emb_id)
+    found = ensure_ready().get(emb_id)
+    if found is None:
+        # Still waiting in the write buffer
+        found = next((emb for emb in write_buffer.snapshot() if emb["id"] == emb_id), None)
+    return found
 
-def _write_to_disk(embedding):
-    try:
-        path = os.path.join(LOCAL_INDEX_PATH, f"{embedding['id']}.json")
-        with open(path, "w") as f:
-            json.dump(embedding, f, indent=2)
-    except Exception as e:
-        logger.error(f"[EMBEDDER] Failed to write {embedding['id']} to disk: {e}")
-
-def _load_from_disk():
-    if not os.path.isdir(LOCAL_INDEX_PATH):
-        logger.warning(f"[EMBEDDER] Local index missing: {LOCAL_INDEX_PATH}")
-        return
-    for fname in os.listdir(LOCAL_INDEX_PATH):
-        if not fname.endswith(".json"):
-            continue
-        fpath = os.path.join(LOCAL_INDEX_PATH, fname)
-        try:
-            with open(fpath, "r") as f:
-                emb = json.load(f)
-            memory_vectors[emb["id"]] = emb
-        except Exception as e:
-            logger.warning(f"[EMBEDDER] Failed to load {fname}: {e}")
+def _flush_embeddings(batch):
+    """WriteBuffer flush_fn: one store write and one backend add per batch."""
+    current_backend = get_current_backend()
+    memory_store.add_many(batch)
+    if current_backend == "faiss":
+        # The search index is the vector index: extend it now, not on the next search
+        for dimension in {len(emb["embedding"]) for emb in batch}:
+            _sync_search_index(dimension)
+    if current_backend == "chromadb" and get_chroma_collection() is not None:
+        add_batch_to_chroma([emb["text"] for emb in batch], [emb["id"] for emb in batch],
+                            [emb["embedding"] for emb in batch], [emb["meta"] for emb in batch])
+    logger.info(f"[EMBEDDER] Flushed {len(batch)} embeddings using {current_backend}")
 
 def get_memory_graph():
-    if not memory_vectors:
-        _load_from_disk()
     nodes, edges = [], []
-    for emb in memory_vectors.values():
+    for emb in ensure_ready().iter_records():
         nodes.append({
             "id": emb["id"],
-            "label": emb["meta"].get("label", emb["text"][:24] + "..."),
+            "label": emb["meta"].get("label", (emb["text"] or "")[:24] + "..."),
             "group": emb["meta"].get("source", "system"),
         })
         if "source_id" in emb["meta"]:
@@ -369,19 +412,187 @@ def get_memory_graph():
     return {"nodes": nodes, "edges": edges}
 
 def repair_index():
-    memory_vectors.clear()
-    _load_from_disk()
+    ensure_ready()
+    write_buffer.flush()
+    with _search_sync_lock:
+        for index in search_indexes.values():
+            index.clear()
+        _search_synced.clear()
+        for dimension in memory_store.dimensions():
+            _sync_search_index(dimension)
     logger.info("[EMBEDDER] Index repaired")
 
 def inject_watermark(origin="unknown"):
     text = f"Watermark from {origin} @ {datetime.now(timezone.utc).isoformat()}"
-    vector = encode(text)
+    vector = embed_text(text)
     meta = {"origin": origin, "timestamp": datetime.now(timezone.utc).isoformat()}
     return package_embedding(text, vector, meta)
 
-# --- Initial Load ---
-try:
-    _load_from_disk()
-    logger.info("[EMBEDDER] Initial disk load complete")
-except Exception as e:
-    logger.error(f"[EMBEDDER] Initial load failed: {e}")
+# --- Similarity Search ---
+search_conf = MEM.get("search", {})
+if not isinstance(search_conf, dict):
+    logger.error("[EMBEDDER] search config malformed; resetting to empty dict")
+    search_conf = {}
+
+DEFAULT_TOP_K        = search_conf.get("default_top_k", 10)
+SIMILARITY_THRESHOLD = search_conf.get("similarity_threshold", 0.75)
+LOG_QUERIES          = MEM.get("diagnostics", {}).get("log_queries", False)
+
+# One index per dimension serves both ingest and search. Vectors stay in the
+# store's memory-mapped segments; an index holds row norms, filter columns
+# and the ANN, which checkpoints save so restarts reload rather than rebuild.
+search_indexes = {}
+_search_synced = {}  # dimension -> store rows already offered to its search index
+_search_sync_lock = threading.RLock()
+
+def get_search_index(dimension):
+    """The index over `dimension`-d store rows, restored from its last checkpoint on first use."""
+    index = search_indexes.get(dimension)
+    if index is None:
+        with _search_sync_lock:
+            index = search_indexes.get(dimension)
+            if index is None:
+                index = SearchIndex(dimension, search_conf, source=memory_store.segments(dimension))
+                index.load(faiss_index_path(dimension), max_rows=memory_store.count(dimension))
+                search_indexes[dimension] = index
+    return index
+
+def _sync_search_index(dimension=DIMENSION):
+    """Index embeddings of `dimension` the store received since the last sync."""
+    if memory_store.count(dimension) == _search_synced.get(dimension, 0):
+        return get_search_index(dimension)
+    with _search_sync_lock:
+        index = get_search_index(dimension)
+        stored = memory_store.count(dimension)
+        for start in range(_search_synced.get(dimension, 0), stored, 65536):
+            end = min(start + 65536, stored)
+            ids, types, sources, created = memory_store.columns(dimension, start, end)
+            # No vectors passed: the index reads the store only for rows it was not restored with
+            index.add_batch(ids, None, types, sources, created)
+        _search_synced[dimension] = stored
+    return index
+
+def save_search_indexes():
+    """Persist every synced index atomically."""
+    with _search_sync_lock:
+        for dimension, index in list(search_indexes.items()):
+            if dimension in _search_synced:
+                index.save(faiss_index_path(dimension))
+
+def checkpoint_memory():
+    """
+    WriteBuffer checkpoint_fn: make every flushed add durable before the
+    WAL covering it is removed. The store commits with synchronous=NORMAL,
+    so it is synced first; the indexes are then saved from it.
+    """
+    memory_store.sync()
+    save_search_indexes()
+
+def search_memory(query, top_k=None, filters=None, threshold=None, collection=None):
+    """
+    Find the stored memories most similar to `query` (text or a vector).
+
+    filters: optional {"type": str|list, "source": str|list,
+                       "since": ISO-8601|epoch, "until": ISO-8601|epoch}
+    top_k and threshold default to config/memory.json search settings.
+    collection picks the encoder (and so the index) searched; default "memory".
+    Returns dicts (id, text, score, meta, source, created), best first.
+    """
+    top_k = DEFAULT_TOP_K if top_k is None else int(top_k)
+    threshold = SIMILARITY_THRESHOLD if threshold is None else float(threshold)
+    encoder = collection_encoder(collection)
+    ensure_ready()
+
+    if isinstance(query, str):
+        vector = embed_text(query) if encoder is ENCODER else encoder.encode(query)
+    else:
+        vector, _ = conform_vector(query, encoder)
+    search_index = _sync_search_index(encoder.dimension)
+    if search_index is None:
+        return []
+    hits = search_index.search(vector, top_k=top_k, threshold=threshold, filters=filters)
+    results = []
+    for emb_id, score in hits:
+        emb = memory_store.get(emb_id, with_vector=False)
+        if emb is None:
+            continue
+        results.append({
+            "id": emb_id,
+            "text": emb.get("text", ""),
+            "score": round(score, 4),
+            "meta": emb.get("meta", {}),
+            "source": emb.get("source", "system"),
+            "created": emb.get("created"),
+        })
+    if LOG_QUERIES:
+        logger.info(f"[EMBEDDER] Search returned {len(results)} results ({search_index.ann_kind}, filters={filters})")
+    return results
+
+def get_search_stats():
+    ensure_ready()
+    return _sync_search_index().stats()
+
+# --- Write-Behind Persistence ---
+persistence_conf = MEM.get("persistence", {})
+if not isinstance(persistence_conf, dict):
+    logger.error("[EMBEDDER] persistence config malformed; resetting to empty dict")
+    persistence_conf = {}
+
+WAL_PATH = os.path.join(FAISS_DIR, "faiss_index.wal")
+write_buffer = WriteBuffer(
+    WAL_PATH,
+    flush_fn=_flush_embeddings,
+    checkpoint_fn=checkpoint_memory,
+    batch_size=persistence_conf.get("write_batch_size", MEM.get("embedding", {}).get("batch_size", 250)),
+    flush_interval=persistence_conf.get("flush_interval_sec", 2.0),
+    checkpoint_every=persistence_conf.get("checkpoint_every", 10000),
+    checkpoint_interval=persistence_conf.get("snapshot_interval_min", 15) * 60,
+    fsync=persistence_conf.get("wal_fsync", True),
+)
+
+# --- Initial Load (on first use) ---
+_ready = False
+_ready_lock = threading.RLock()
+
+def ensure_ready():
+    """
+    Open the memory store and replay the write-ahead log. Runs once, on the
+    first call that needs memory; returns the store. Search indexes load
+    from their last checkpoint when first used.
+    """
+    global memory_store, _ready
+    if _ready:
+        return memory_store
+    with _ready_lock:
+        if _ready:
+            return memory_store
+        try:
+            memory_store = MemoryStore(
+                LOCAL_INDEX_ROOT,
+                db_path=LOCAL_INDEX_FILE,
+                dtype=storage_conf.get("vector_dtype", MEM.get("embedding", {}).get("format", "float32")),
+            )
+        except Exception as e:
+            logger.error(f"[EMBEDDER] Failed to open memory store at {LOCAL_INDEX_ROOT}: {e}")
+            raise
+        try:
+            if os.path.isdir(LOCAL_INDEX_PATH):
+                # One-time move from per-embedding JSON files; rows restart with it, so drop saved indexes
+                if memory_store.migrate_json_documents(LOCAL_INDEX_PATH):
+                    for dimension in memory_store.dimensions():
+                        header = faiss_index_path(dimension) + ".json"
+                        if os.path.exists(header):
+                            os.remove(header)
+            # Adds logged after the last checkpoint may be missing from the store
+            replayed = write_buffer.replay()
+            if replayed:
+                memory_store.add_many(replayed)
+                write_buffer.checkpoint()
+            logger.info(f"[EMBEDDER] Memory store ready: {len(memory_store)} embeddings")
+        except Exception as e:
+            logger.error(f"[EMBEDDER] Initial load failed: {e}")
+        write_buffer.start()
+        # Only once the WAL has been replayed: closing checkpoints and retires it
+        atexit.register(write_buffer.close)
+        _ready = True
+    return memory_store
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: Memory Ingest Benchmark
+
+"""
+Sustained ingest throughput of the memory store, before and after
+write-behind persistence.
+
+  per_add:  the previous package_embedding path; every add writes the whole
+            FAISS index and one indented JSON document
+  buffered: memory.vector_store.write_buffer.WriteBuffer; a WAL append per
+            add, batched index adds and documents, periodic checkpoints
+
+Both modes start from an index already holding `--preload` vectors, since
+the per-add cost grows with index size. Runs in a temporary directory.
+
+Usage:
+    python -m memory.vector_store.ingest_benchmark
+    python -m memory.vector_store.ingest_benchmark --adds 5000 --preload 100000 --no-fsync
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+try:
+    import faiss  # type: ignore
+except ImportError:
+    faiss = None
+
+from memory.vector_store.write_buffer import WriteBuffer
+
+
+def make_record(vector):
+    emb_id = str(uuid.uuid4())
+    return {
+        "id": emb_id,
+        "text": f"benchmark memory {emb_id}",
+        "embedding": vector.tolist(),
+        "meta": {"source": "benchmark"},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
+        "source": "benchmark",
+    }
+
+
+def preloaded_index(dimension, preload, rng):
+    index = faiss.IndexFlatL2(dimension)
+    if preload:
+        index.add(rng.standard_normal((preload, dimension), dtype="float32"))
+    return index
+
+
+def run_per_add(workdir, vectors, preload, rng):
+    index = preloaded_index(vectors.shape[1], preload, rng)
+    index_path = os.path.join(workdir, "per_add.index")
+    docs = os.path.join(workdir, "per_add_docs")
+    os.makedirs(docs)
+    started = time.perf_counter()
+    for vector in vectors:
+        record = make_record(vector)
+        index.add(vector.reshape(1, -1))
+        faiss.write_index(index, index_path)
+        with open(os.path.join(docs, f"{record['id']}.json"), "w") as f:
+            json.dump(record, f, indent=2)
+    return time.perf_counter() - started, {}
+
+
+def run_buffered(workdir, vectors, preload, rng, args):
+    index = preloaded_index(vectors.shape[1], preload, rng)
+    index_path = os.path.join(workdir, "buffered.index")
+    docs = os.path.join(workdir, "buffered_docs")
+    os.makedirs(docs)
+
+    def flush(batch):
+        index.add(np.array([r["embedding"] for r in batch], dtype="float32"))
+        for record in batch:
+            with open(os.path.join(docs, f"{record['id']}.json"), "w") as f:
+                json.dump(record, f, separators=(",", ":"))
+
+    def checkpoint():
+        faiss.write_index(index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+
+    buffer = WriteBuffer(
+        os.path.join(workdir, "buffered.wal"), flush, checkpoint,
+        batch_size=args.batch_size, checkpoint_every=args.checkpoint_every,
+        fsync=not args.no_fsync,
+    )
+    started = time.perf_counter()
+    for vector in vectors:
+        buffer.append(make_record(vector))
+    buffer.close()  # final checkpoint counts: the data must be on disk
+    return time.perf_counter() - started, dict(buffer.stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark memory ingest throughput")
+    parser.add_argument("--adds", type=int, default=2000)
+    parser.add_argument("--preload", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=250)
+    parser.add_argument("--checkpoint-every", type=int, default=10000)
+    parser.add_argument("--no-fsync", action="store_true", help="Skip the fsync after each WAL append")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if faiss is None:
+        print("faiss is not installed", file=sys.stderr)
+        return 1
+
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.standard_normal((args.adds, args.dimension), dtype="float32")
+    with tempfile.TemporaryDirectory(prefix="gremlin_ingest_") as workdir:
+        for mode in ("per_add", "buffered"):
+            if mode == "per_add":
+                elapsed, stats = run_per_add(workdir, vectors, args.preload, rng)
+            else:
+                elapsed, stats = run_buffered(workdir, vectors, args.preload, rng, args)
+            print(f"{mode:<9} {args.adds} adds onto {args.preload}: "
+                  f"{args.adds / elapsed:,.0f} adds/s ({elapsed:.2f}s) {stats or ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: Columnar Memory Store
+
+"""
+Segment-based store for embeddings and their metadata.
+
+Layout under `root`:
+  documents.db                       SQLite: one row per memory (text, meta, ...)
+  vectors/d<dim>/seg_<n>.f32|.f16    fixed-size memory-mapped vector segments
+
+Each memory gets a stable integer id (the SQLite rowid) plus a (dim, row)
+slot: `row` numbers the vectors of that dimension 0, 1, 2, ... so it doubles
+as the label in a positional FAISS index of that dimension. Opening the store
+reads no vectors and parses no documents; vectors are paged in from the
+memory maps when they are asked for.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from utils.logging_config import setup_module_logger
+
+# Initialize module-specific logger
+logger = setup_module_logger("memory", "memory_store")
+
+SEGMENT_ROWS = 65536
+DTYPES = {"float32": ("float32", ".f32"), "float16": ("float16", ".f16")}
+CORE_FIELDS = ("id", "text", "embedding", "meta", "created", "source", "model", "replaceable")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id          INTEGER PRIMARY KEY,
+    uuid        TEXT NOT NULL UNIQUE,
+    dim         INTEGER NOT NULL,
+    row         INTEGER NOT NULL,
+    text        TEXT,
+    meta        TEXT,
+    type        TEXT,
+    source      TEXT,
+    created     TEXT,
+    created_ts  REAL,
+    model       TEXT,
+    replaceable INTEGER,
+    extra       TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS memories_slot ON memories (dim, row);
+CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _epoch(created):
+    if not created:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(created).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class VectorSegments:
+    """Append-only float matrix for one dimension, split into memory-mapped files."""
+
+    def __init__(self, directory, dimension, dtype="float32", segment_rows=SEGMENT_ROWS):
+        self.directory = directory
+        self.dimension = dimension
+        self.dtype, self.suffix = DTYPES[dtype]
+        self.segment_rows = segment_rows
+        self._maps = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment(self, number):
+        seg = self._maps.get(number)
+        if seg is None:
+            path = os.path.join(self.directory, f"seg_{number:05d}{self.suffix}")
+            size = self.segment_rows * self.dimension * np.dtype(self.dtype).itemsize
+            if not os.path.exists(path) or os.path.getsize(path) < size:
+                with open(path, "ab") as f:
+                    f.truncate(size)  # sparse until written
+            seg = np.memmap(path, dtype=self.dtype, mode="r+", shape=(self.segment_rows, self.dimension))
+            self._maps[number] = seg
+        return seg
+
+    def write(self, start, matrix):
+        """Write `matrix` into rows start.. and flush the touched segments."""
+        touched = set()
+        done = 0
+        while done < len(matrix):
+            number, offset = divmod(start + done, self.segment_rows)
+            take = min(len(matrix) - done, self.segment_rows - offset)
+            seg = self._segment(number)
+            seg[offset:offset + take] = matrix[done:done + take]
+            touched.add(number)
+            done += take
+        for number in touched:
+            self._maps[number].flush()
+
+    def read(self, start, end):
+        """Rows [start, end) as a float32 array (a copy)."""
+        parts = []
+        row = start
+        while row < end:
+            number, offset = divmod(row, self.segment_rows)
+            take = min(end - row, self.segment_rows - offset)
+            parts.append(np.asarray(self._segment(number)[offset:offset + take], dtype="float32"))
+            row += take
+        if not parts:
+            return np.zeros((0, self.dimension), dtype="float32")
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def take(self, rows):
+        """The given rows, in the given order, as a float32 array."""
+        rows = np.asarray(rows, dtype="int64")
+        out = np.empty((len(rows), self.dimension), dtype="float32")
+        numbers, offsets = np.divmod(rows, self.segment_rows)
+        for number in np.unique(numbers):
+            picked = numbers == number
+            out[picked] = self._segment(int(number))[offsets[picked]]
+        return out
+
+    def sync(self):
+        """Flush every open segment and fsync it (and the directory) to disk."""
+        for seg in self._maps.values():
+            seg.flush()
+            fd = os.open(seg.filename, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)  # new segment files
+        finally:
+            os.close(fd)
+
+    def close(self):
+        for seg in self._maps.values():
+            seg.flush()
+        self._maps.clear()
+
+
+class MemoryStore:
+    """SQLite metadata + per-dimension memory-mapped vector segments."""
+
+    def __init__(self, root, db_path=None, dtype="float32", segment_rows=SEGMENT_ROWS):
+        if dtype not in DTYPES:
+            logger.warning(f"[STORE] Unsupported vector dtype {dtype}; using float32")
+            dtype = "float32"
+        self.root = root
+        self.db_path = db_path or os.path.join(root, "documents.db")
+        self.vector_dir = os.path.join(root, "vectors")
+        self.dtype = dtype
+        self.segment_rows = segment_rows
+        self._lock = threading.RLock()
+        self._segments = {}
+        os.makedirs(root, exist_ok=True)
+
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._next_row = {dim: (top + 1) for dim, top in
+                          self._db.execute("SELECT dim, MAX(row) FROM memories GROUP BY dim")}
+
+    # --- Vectors ---
+    def segments(self, dimension):
+        seg = self._segments.get(dimension)
+        if seg is None:
+            seg = VectorSegments(os.path.join(self.vector_dir, f"d{dimension}"), dimension,
+                                 self.dtype, self.segment_rows)
+            self._segments[dimension] = seg
+        return seg
+
+    def dimensions(self):
+        return sorted(self._next_row)
+
+    def count(self, dimension=None):
+        if dimension is None:
+            return sum(self._next_row.values())
+        return self._next_row.get(dimension, 0)
+
+    def __len__(self):
+        return self.count()
+
+    def vectors(self, dimension, start=0, end=None):
+        end = self.count(dimension) if end is None else min(end, self.count(dimension))
+        return self.segments(dimension).read(start, end)
+
+    # --- Writes ---
+    def add_many(self, records):
+        """
+        Store embedding dicts (the package_embedding shape). Records whose
+        uuid is already stored are not written again.
+        Returns a (dim, row) slot for every record, in order.
+        """
+        with self._lock:
+            uuids = [r["id"] for r in records]
+            known = {}
+            for chunk in range(0, len(uuids), 500):
+                part = uuids[chunk:chunk + 500]
+                marks = ",".join("?" * len(part))
+                for uuid, dim, row in self._db.execute(
+                        f"SELECT uuid, dim, row FROM memories WHERE uuid IN ({marks})", part):
+                    known[uuid] = (dim, row)
+
+            by_dim = {}
+            slots = []
+            for record in records:
+                if record["id"] in known:
+                    slots.append(known[record["id"]])
+                    continue
+                dim = len(record.get("embedding") or [])
+                row = self._next_row.get(dim, 0) + len(by_dim.get(dim, []))
+                by_dim.setdefault(dim, []).append(record)
+                known[record["id"]] = (dim, row)
+                slots.append((dim, row))
+
+            # Vectors land before the rows that point at them
+            for dim, group in by_dim.items():
+                if dim:
+                    matrix = np.array([r["embedding"] for r in group], dtype="float32")
+                    self.segments(dim).write(self._next_row.get(dim, 0), matrix)
+
+            rows = []
+            for dim, group in by_dim.items():
+                start = self._next_row.get(dim, 0)
+                for offset, r in enumerate(group):
+                    meta = r.get("meta") or {}
+                    extra = {k: v for k, v in r.items() if k not in CORE_FIELDS}
+                    rows.append((
+                        r["id"], dim, start + offset, r.get("text", ""),
+                        json.dumps(meta), meta.get("type"),
+                        r.get("source", meta.get("source")), r.get("created"),
+                        _epoch(r.get("created")), r.get("model"),
+                        int(bool(r.get("replaceable", True))),
+                        json.dumps(extra) if extra else None,
+                    ))
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO memories (uuid, dim, row, text, meta, type, source, created,"
+                    " created_ts, model, replaceable, extra) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+            for dim, group in by_dim.items():
+                self._next_row[dim] = self._next_row.get(dim, 0) + len(group)
+            return slots
+
+    # --- Reads ---
+    _COLUMNS = "id, uuid, dim, row, text, meta, source, created, model, replaceable, extra"
+
+    def _record(self, row, with_vector=True):
+        int_id, uuid, dim, slot, text, meta, source, created, model, replaceable, extra = row
+        record = {
+            "id": uuid,
+            "int_id": int_id,
+            "text": text,
+            "embedding": self.segments(dim).read(slot, slot + 1)[0].tolist() if with_vector and dim else [],
+            "meta": json.loads(meta) if meta else {},
+            "created": created,
+            "source": source,
+            "model": model,
+            "replaceable": bool(replaceable),
+        }
+        if extra:
+            record.update(json.loads(extra))
+        return record
+
+    def get(self, uuid, with_vector=True):
+        with self._lock:
+            row = self._db.execute(f"SELECT {self._COLUMNS} FROM memories WHERE uuid = ?", (uuid,)).fetchone()
+        return self._record(row, with_vector) if row else None
+
+    def get_slot(self, dimension, row, with_vector=True):
+        with self._lock:
+            found = self._db.execute(f"SELECT {self._COLUMNS} FROM memories WHERE dim = ? AND row = ?",
+                                     (dimension, int(row))).fetchone()
+        return self._record(found, with_vector) if found else None
+
+    def int_id(self, uuid):
+        with self._lock:
+            row = self._db.execute("SELECT id FROM memories WHERE uuid = ?", (uuid,)).fetchone()
+        return row[0] if row else None
+
+    def list(self, limit=50, offset=0, with_vector=True):
+        with self._lock:
+            rows = self._db.execute(f"SELECT {self._COLUMNS} FROM memories ORDER BY id LIMIT ? OFFSET ?",
+                                    (int(limit), int(offset))).fetchall()
+        return [self._record(r, with_vector) for r in rows]
+
+    def iter_records(self, with_vector=False, batch=1000):
+        offset = 0
+        while True:
+            page = self.list(batch, offset, with_vector)
+            if not page:
+                return
+            yield from page
+            offset += len(page)
+
+    def columns(self, dimension, start=0, end=None):
+        """uuid, type, source and created for rows [start, end) of one dimension."""
+        end = self.count(dimension) if end is None else end
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT uuid, type, source, created FROM memories WHERE dim = ? AND row >= ? AND row < ?"
+                " ORDER BY row", (dimension, start, end)).fetchall()
+        return [list(col) for col in zip(*rows)] if rows else [[], [], [], []]
+
+    # --- Migration ---
+    def info(self, key, default=None):
+        row = self._db.execute("SELECT value FROM store_info WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_info(self, key, value):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO store_info (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def migrate_json_documents(self, documents_dir, batch=1000):
+        """
+        One-time import of the legacy one-JSON-file-per-embedding layout.
+        The directory is renamed to <documents_dir>.migrated afterwards, so
+        later starts never list it again. Returns the number imported.
+        """
+        if not os.path.isdir(documents_dir):
+            return 0
+        names = [n for n in os.listdir(documents_dir) if n.endswith(".json")]
+        if not names:
+            return 0
+        imported, pending = 0, []
+        for name in names:
+            try:
+                with open(os.path.join(documents_dir, name), "r") as f:
+                    record = json.load(f)
+                record["id"] = str(record.get("id") or os.path.splitext(name)[0])
+                pending.append(record)
+            except Exception as e:
+                logger.warning(f"[STORE] Skipping unreadable document {name}: {e}")
+            if len(pending) >= batch:
+                self.add_many(pending)
+                imported, pending = imported + len(pending), []
+        if pending:
+            self.add_many(pending)
+            imported += len(pending)
+
+        target = documents_dir.rstrip(os.sep) + ".migrated"
+        if os.path.exists(target):
+            target += datetime.now(timezone.utc).strftime(".%Y%m%dT%H%M%S")
+        try:
+            os.replace(documents_dir, target)
+        except OSError as e:
+            logger.warning(f"[STORE] Could not rename {documents_dir} after migration: {e}")
+        self.set_info("json_migrated_at", datetime.now(timezone.utc).isoformat())
+        logger.info(f"[STORE] Migrated {imported} JSON documents from {documents_dir}")
+        return imported
+
+    def sync(self):
+        """
+        Make everything written so far durable. With synchronous=NORMAL a
+        commit is not fsync'd until the SQLite WAL is checkpointed, so this
+        must run before anything that could rebuild the data (e.g. the write
+        buffer's WAL) is deleted.
+        """
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(FULL)").fetchall()
+            for seg in self._segments.values():
+                seg.sync()
+
+    def close(self):
+        with self._lock:
+            for seg in self._segments.values():
+                seg.close()
+            self._db.close()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: Memory Search Benchmark
+
+"""
+Recall@k and query latency of memory.vector_store.search_index.SearchIndex
+on synthetic clustered embeddings.
+
+Ground truth is exact inner-product search over the same normalised matrix,
+so recall measures only what the ANN tier (HNSW / IVF-PQ) gives up.
+Each size is measured unfiltered and with a source filter keeping ~10% of rows.
+
+Usage:
+    python -m memory.vector_store.search_benchmark
+    python -m memory.vector_store.search_benchmark --sizes 10000 100000 --queries 500
+    python -m memory.vector_store.search_benchmark --index hnsw --output bench.json
+
+The 1M run needs ~3 GB of RAM (vectors, index and ground-truth scratch).
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from memory.vector_store.search_index import SearchIndex, DEFAULT_SEARCH_CONF
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+SOURCES = [f"source_{i}" for i in range(10)]
+
+
+def synthetic_corpus(size, dimension, rng, clusters=None):
+    """Gaussian clusters on the unit sphere, roughly how sentence embeddings group by topic."""
+    clusters = clusters or max(16, int(np.sqrt(size)))
+    centres = rng.standard_normal((clusters, dimension)).astype("float32")
+    assignment = rng.integers(0, clusters, size)
+    vectors = rng.standard_normal((size, dimension), dtype="float32")
+    vectors *= 0.6
+    for start in range(0, size, 65536):
+        chunk = vectors[start:start + 65536]
+        chunk += centres[assignment[start:start + 65536]]
+        chunk /= np.linalg.norm(chunk, axis=1, keepdims=True)
+    return vectors
+
+
+def exact_top_k(vectors, queries, k, rows=None, chunk=50000):
+    """Ground truth row numbers, best first, optionally restricted to `rows`."""
+    candidates = vectors if rows is None else vectors[rows]
+    best_scores = np.full((len(queries), k), -np.inf, dtype="float32")
+    best_labels = np.zeros((len(queries), k), dtype="int64")
+    for start in range(0, len(candidates), chunk):
+        scores = queries @ candidates[start:start + chunk].T
+        labels = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+        scores = np.concatenate([best_scores, scores], axis=1)
+        labels = np.concatenate([best_labels, labels], axis=1)
+        top = np.argpartition(-scores, k, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_labels = np.take_along_axis(labels, top, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    best_labels = np.take_along_axis(best_labels, order, axis=1)
+    return best_labels if rows is None else rows[best_labels]
+
+
+def measure(index, queries, truth, k, filters=None):
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        results = index.search(query, top_k=k, filters=filters)
+        latencies.append(time.perf_counter() - started)
+        found = {index.rows[emb_id] for emb_id, _ in results}
+        hits += len(found & set(expected.tolist()))
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+    }
+
+
+def run_size(size, args, rng):
+    conf = dict(DEFAULT_SEARCH_CONF)
+    conf["index_type"] = args.index
+    vectors = synthetic_corpus(size, args.dimension, rng)
+    sources = rng.integers(0, len(SOURCES), size)
+
+    index = SearchIndex(args.dimension, conf)
+    started = time.perf_counter()
+    index.add_batch([str(i) for i in range(size)], vectors, sources=[SOURCES[s] for s in sources])
+    build_s = time.perf_counter() - started
+    del vectors  # the index holds its own copy; keep peak memory to one corpus
+
+    picks = rng.choice(size, args.queries, replace=False)
+    queries = index.vectors[picks] + 0.2 * rng.standard_normal((args.queries, args.dimension), dtype="float32")
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    result = {"size": size, "index_kind": index.ann_kind, "build_s": round(build_s, 2)}
+    truth = exact_top_k(index.vectors, queries, args.k)
+    result["unfiltered"] = measure(index, queries, truth, args.k)
+
+    filtered_rows = np.flatnonzero(sources == 0)
+    truth = exact_top_k(index.vectors, queries, args.k, rows=filtered_rows)
+    result["filtered"] = measure(index, queries, truth, args.k, filters={"source": SOURCES[0]})
+    result["filtered"]["candidates"] = int(len(filtered_rows))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark memory similarity search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--index", choices=["auto", "flat", "hnsw", "ivfpq"], default="auto")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for size in args.sizes:
+        result = run_size(size, args, rng)
+        results.append(result)
+        for mode in ("unfiltered", "filtered"):
+            stats = result[mode]
+            print(f"{size:>9} {result['index_kind']:<6} {mode:<10} "
+                  f"recall@{args.k}={stats[f'recall@{args.k}']:.3f} "
+                  f"p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"index": args.index, "dimension": args.dimension, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
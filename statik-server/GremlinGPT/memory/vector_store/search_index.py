@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: Memory Similarity Search Index
+
+"""
+Similarity index over stored embeddings.
+
+Scores are cosine similarities: a dot product divided by the row's norm.
+Metadata used for pre-filtering (type, source, creation time) is kept as
+integer code / float arrays, one entry per row.
+
+Where the vectors live:
+  - standalone: the index keeps its own L2-normalised float32 matrix
+  - `source` given (e.g. MemoryStore.segments(dim)): vectors stay in the
+    store's memory-mapped segments and are read from there for exact
+    scans, ANN builds and re-ranking; the index only keeps the row norms
+    and the ANN, which `save()` persists so a restart does not rebuild it
+
+Index tiers, chosen from corpus size unless `index_type` forces one:
+  - "flat":  exact search, for corpora up to `exact_search_max` vectors
+  - "hnsw":  faiss IndexHNSWFlat (inner product), up to `hnsw_max` vectors
+  - "ivfpq": faiss IndexIVFPQ trained on the corpus, candidates re-ranked
+             exactly against the full-precision matrix
+
+Row numbers double as faiss labels, so a filter becomes a bitmap selector
+passed to the ANN search; filters that leave few rows are searched exactly.
+"""
+
+import os
+import json
+import math
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    import faiss  # type: ignore
+except ImportError:
+    faiss = None
+
+from utils.logging_config import setup_module_logger
+
+# Initialize module-specific logger
+logger = setup_module_logger("memory", "search_index")
+
+INDEX_TYPES = ("auto", "flat", "hnsw", "ivfpq")
+IVF_MIN_TRAIN = 10000  # PQ codebooks and IVF centroids need a reasonable sample
+SCAN_CHUNK = 65536      # rows scored / read at a time, bounding scratch memory
+
+DEFAULT_SEARCH_CONF = {
+    "index_type": "auto",
+    "exact_search_max": 10000,
+    "hnsw_max": 250000,
+    "hnsw_m": 32,
+    "hnsw_ef_construction": 200,
+    "hnsw_ef_search": 256,
+    "ivf_nprobe": 32,
+    "pq_m": 48,
+    "rerank_factor": 8,
+    "train_sample_max": 100000,
+}
+
+
+def to_epoch(value):
+    """Accept epoch seconds, a datetime or an ISO-8601 string; None if unparseable."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            logger.warning(f"[SEARCH] Unparseable timestamp: {value}")
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _as_list(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set)):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+class SearchIndex:
+    """Row norms + metadata arrays + optional faiss ANN index over a vector source."""
+
+    def __init__(self, dimension, conf=None, source=None):
+        self.dimension = int(dimension)
+        self.source = source  # read(start, end) / take(rows); None keeps vectors here
+        self.conf = dict(DEFAULT_SEARCH_CONF)
+        self.conf.update({k: v for k, v in (conf or {}).items() if k in DEFAULT_SEARCH_CONF})
+        if self.conf["index_type"] not in INDEX_TYPES:
+            logger.warning(f"[SEARCH] Unknown index_type {self.conf['index_type']}; using auto")
+            self.conf["index_type"] = "auto"
+
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.ids = []
+        self.rows = {}
+        self._vectors = np.zeros((0, self.dimension), dtype="float32")
+        self._norms = np.zeros(0, dtype="float32")
+        self._restored = 0  # rows whose norms (and ANN entries) came from save()
+        self._types = np.zeros(0, dtype="int32")
+        self._sources = np.zeros(0, dtype="int32")
+        self._created = np.zeros(0, dtype="float64")
+        self._codes = {"type": {}, "source": {}}
+
+        self.ann = None
+        self.ann_kind = "flat"
+        self._ann_trained_size = 0
+        self._quantizer = None
+
+    @property
+    def size(self):
+        return len(self.ids)
+
+    @property
+    def vectors(self):
+        """Unit-length vectors of every row (a copy when backed by a source)."""
+        return self._rows(0, self.size)
+
+    def _rows(self, start, end):
+        if self.source is None:
+            return self._vectors[start:end]
+        return self.source.read(start, end) / self._norms[start:end, None]
+
+    def _take(self, rows):
+        if self.source is None:
+            return self._vectors[rows]
+        return self.source.take(rows) / self._norms[rows, None]
+
+    # --- Ingest ---
+    def _code(self, field, value):
+        table = self._codes[field]
+        key = "" if value is None else str(value)
+        if key not in table:
+            table[key] = len(table)
+        return table[key]
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        capacity = len(self._created)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        if self.source is None:
+            vectors = np.zeros((capacity, self.dimension), dtype="float32")
+            vectors[: self.size] = self._vectors[: self.size]
+            self._vectors = vectors
+        for name in ("_norms", "_types", "_sources", "_created"):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[: self.size] = old[: self.size]
+            setattr(self, name, grown)
+
+    def add_batch(self, ids, vectors=None, types=None, sources=None, created=None):
+        """
+        Append vectors with their metadata. Ids already present are skipped,
+        as are vectors whose dimension does not match the index. With a
+        `source`, rows are the source's rows and `vectors` may be None; they
+        are then read from the source where needed.
+        Returns the number of rows added.
+        """
+        matrix = None
+        if vectors is not None:
+            matrix = np.asarray(vectors, dtype="float32").reshape(len(ids), -1)
+            if matrix.shape[1] != self.dimension:
+                logger.warning(f"[SEARCH] Skipping {len(ids)} vectors of dimension {matrix.shape[1]} (index is {self.dimension})")
+                return 0
+        elif self.source is None:
+            raise ValueError("vectors are required without a source")
+        types = types if types is not None else [None] * len(ids)
+        sources = sources if sources is not None else [None] * len(ids)
+        created = created if created is not None else [None] * len(ids)
+
+        with self._lock:
+            keep = [i for i, emb_id in enumerate(ids) if emb_id not in self.rows]
+            if not keep:
+                return 0
+            start = self.size
+            self._reserve(len(keep))
+            end = start + len(keep)
+            if matrix is not None and len(keep) != len(ids):
+                matrix = matrix[keep]
+            if self.source is None:
+                added = self._vectors[start:end]
+                added[:] = matrix
+                norms = np.linalg.norm(added, axis=1, keepdims=True)
+                added /= np.where(norms > 0, norms, 1.0)  # in place: no second copy of a large batch
+                self._norms[start:end] = 1.0
+            elif end > self._restored:
+                first = max(start, self._restored)
+                fresh = matrix[first - start:] if matrix is not None else self.source.read(first, end)
+                norms = np.linalg.norm(fresh, axis=1)
+                self._norms[first:end] = np.where(norms > 0, norms, 1.0)
+            self._types[start:end] = [self._code("type", types[i]) for i in keep]
+            self._sources[start:end] = [self._code("source", sources[i]) for i in keep]
+            self._created[start:end] = [to_epoch(created[i]) or 0.0 for i in keep]
+            for row, i in enumerate(keep, start):
+                self.rows[ids[i]] = row
+                self.ids.append(ids[i])
+            self._extend_ann(end)
+            return len(keep)
+
+    def add(self, emb_id, vector, mem_type=None, source=None, created=None):
+        return self.add_batch([emb_id], [vector], [mem_type], [source], [created])
+
+    # --- ANN maintenance ---
+    def _extend_ann(self, end):
+        covered = self.ann.ntotal if self.ann is not None else 0
+        if covered >= end:
+            return  # rows restored together with a saved index
+        if self.ann is not None and self._wanted_kind() == self.ann_kind and not self._stale():
+            self.ann.add(np.ascontiguousarray(self._rows(covered, end)))  # labels continue from ntotal
+        else:
+            self._build_ann()
+
+    def _wanted_kind(self):
+        forced = self.conf["index_type"]
+        if faiss is None:
+            return "flat"
+        if forced == "ivfpq" and self.size < IVF_MIN_TRAIN:
+            return "flat"
+        if forced != "auto":
+            return forced
+        if self.size <= self.conf["exact_search_max"]:
+            return "flat"
+        if self.size <= self.conf["hnsw_max"]:
+            return "hnsw"
+        return "ivfpq"
+
+    def _stale(self):
+        # IVF centroids trained on a much smaller corpus lose recall; retrain on doubling
+        return self.ann_kind == "ivfpq" and self.size > 2 * self._ann_trained_size
+
+    def _build_ann(self):
+        kind = self._wanted_kind()
+        self.ann, self._quantizer = None, None
+        self.ann_kind = "flat"
+        if kind == "flat" or self.size == 0:
+            return
+        try:
+            if kind == "hnsw":
+                index = faiss.IndexHNSWFlat(self.dimension, self.conf["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+                index.hnsw.efConstruction = self.conf["hnsw_ef_construction"]
+            else:
+                nlist = int(min(max(4 * math.sqrt(self.size), 16), self.size // 39))
+                pq_m = self.conf["pq_m"] if self.dimension % self.conf["pq_m"] == 0 else 8
+                quantizer = faiss.IndexFlatIP(self.dimension)
+                index = faiss.IndexIVFPQ(quantizer, self.dimension, max(nlist, 1), pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+                sample_size = max(self.conf["train_sample_max"], 64 * nlist)
+                if self.size > sample_size:
+                    picks = np.random.default_rng(0).choice(self.size, sample_size, replace=False)
+                    index.train(np.ascontiguousarray(self._take(np.sort(picks))))
+                else:
+                    index.train(np.ascontiguousarray(self._rows(0, self.size)))
+                self._quantizer = quantizer
+            for start in range(0, self.size, SCAN_CHUNK):
+                index.add(np.ascontiguousarray(self._rows(start, min(start + SCAN_CHUNK, self.size))))
+            self.ann, self.ann_kind = index, kind
+            self._ann_trained_size = self.size
+            logger.info(f"[SEARCH] Built {kind} index over {self.size} vectors")
+        except Exception as e:
+            logger.error(f"[SEARCH] Failed to build {kind} index; using exact search: {e}")
+
+    # --- Query ---
+    def _filter_mask(self, filters):
+        if not filters:
+            return None
+        mask = np.ones(self.size, dtype=bool)
+        for field, column in (("type", self._types), ("source", self._sources)):
+            wanted = _as_list(filters.get(field))
+            if wanted is None:
+                continue
+            codes = [self._codes[field][v] for v in wanted if v in self._codes[field]]
+            mask &= np.isin(column[: self.size], codes)
+        since, until = to_epoch(filters.get("since")), to_epoch(filters.get("until"))
+        if since is not None:
+            mask &= self._created[: self.size] >= since
+        if until is not None:
+            mask &= self._created[: self.size] <= until
+        return mask
+
+    def _exact(self, query, rows, k):
+        # Chunked so a source-backed scan never materialises the whole corpus
+        total = self.size if rows is None else len(rows)
+        kept_labels, kept_scores = [], []
+        for start in range(0, total, SCAN_CHUNK):
+            end = min(start + SCAN_CHUNK, total)
+            if rows is None:
+                labels, scores = np.arange(start, end), self._rows(start, end) @ query
+            else:
+                labels = rows[start:end]
+                scores = self._take(labels) @ query
+            if k < len(scores):
+                top = np.argpartition(-scores, k)[:k]
+                labels, scores = labels[top], scores[top]
+            kept_labels.append(labels)
+            kept_scores.append(scores)
+        labels, scores = np.concatenate(kept_labels), np.concatenate(kept_scores)
+        order = np.argsort(-scores)[:k]
+        return labels[order], scores[order]
+
+    def _approximate(self, query, mask, k):
+        fetch = k * self.conf["rerank_factor"] if self.ann_kind == "ivfpq" else k
+        params = None
+        if mask is not None:
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(bitmap)
+            if self.ann_kind == "hnsw":
+                params = faiss.SearchParametersHNSW(sel=selector, efSearch=max(self.conf["hnsw_ef_search"], fetch))
+            else:
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=self.conf["ivf_nprobe"])
+        elif self.ann_kind == "hnsw":
+            self.ann.hnsw.efSearch = max(self.conf["hnsw_ef_search"], fetch)
+        else:
+            self.ann.nprobe = self.conf["ivf_nprobe"]
+
+        _, labels = self.ann.search(query.reshape(1, -1), fetch, params=params)
+        labels = labels[0][labels[0] >= 0]
+        # Re-rank against full-precision vectors (PQ distances are approximate)
+        scores = self._take(labels) @ query
+        order = np.argsort(-scores)[:k]
+        return labels[order], scores[order]
+
+    def search(self, vector, top_k=10, threshold=None, filters=None):
+        """
+        Return [(emb_id, score)] for the `top_k` most similar vectors, best first.
+        `threshold` drops results whose cosine similarity is below it.
+        `filters` may hold "type", "source" (value or list), "since" and "until".
+        """
+        query = np.asarray(vector, dtype="float32").reshape(-1)
+        if query.shape[0] != self.dimension:
+            raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self.dimension}")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        with self._lock:
+            if self.size == 0 or top_k <= 0:
+                return []
+            mask = self._filter_mask(filters)
+            candidates = self.size if mask is None else int(mask.sum())
+            if candidates == 0:
+                return []
+            k = min(top_k, candidates)
+            if self.ann is None or candidates <= self.conf["exact_search_max"]:
+                rows = None if mask is None else np.flatnonzero(mask)
+                labels, scores = self._exact(query, rows, k)
+            else:
+                labels, scores = self._approximate(query, mask, k)
+                if len(labels) < k:
+                    # Probed lists held too few filtered rows; the exact scan is still bounded by the filter
+                    rows = None if mask is None else np.flatnonzero(mask)
+                    labels, scores = self._exact(query, rows, k)
+            results = [(self.ids[int(row)], float(score)) for row, score in zip(labels, scores)]
+
+        if threshold is not None:
+            results = [(emb_id, score) for emb_id, score in results if score >= threshold]
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    # --- Persistence (source-backed indexes) ---
+    def save(self, path):
+        """
+        Write the ANN index to `path`, with the row norms and a small header
+        beside it; each file is replaced atomically, the header last.
+        """
+        with self._lock:
+            rows = self.size
+            if self.ann is not None:
+                faiss.write_index(self.ann, path + ".tmp")
+                _commit(path)
+            elif os.path.exists(path):
+                os.remove(path)
+            with open(path + ".norms.tmp", "wb") as f:
+                np.save(f, self._norms[:rows])
+            _commit(path + ".norms")
+            header = {"dimension": self.dimension, "rows": rows, "kind": self.ann_kind,
+                      "trained_size": self._ann_trained_size}
+            with open(path + ".json.tmp", "w", encoding="utf-8") as f:
+                json.dump(header, f)
+            _commit(path + ".json")
+        logger.info(f"[SEARCH] Saved {self.ann_kind} index over {rows} {self.dimension}-d vectors to {path}")
+
+    def load(self, path, max_rows=None):
+        """
+        Restore what `save()` wrote into this empty index. Rows added next
+        reuse the saved norms and ANN entries instead of reading and
+        re-indexing their vectors. Returns the number of rows restored.
+        """
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                header = json.load(f)
+            rows = int(header["rows"])
+            if header.get("dimension") != self.dimension or (max_rows is not None and rows > max_rows):
+                logger.warning(f"[SEARCH] Saved index at {path} does not match the store; rebuilding")
+                return 0
+            norms = np.load(path + ".norms")
+            ann, kind = None, "flat"
+            if header.get("kind", "flat") != "flat" and faiss is not None:
+                ann, kind = faiss.read_index(path), header["kind"]
+            if len(norms) < rows or (ann is not None and ann.ntotal != rows):
+                logger.warning(f"[SEARCH] Saved index at {path} is incomplete; rebuilding")
+                return 0
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.warning(f"[SEARCH] Could not load saved index at {path}: {e}")
+            return 0
+        with self._lock:
+            if self.size:
+                return 0
+            self._reserve(rows)
+            self._norms[:rows] = norms[:rows]
+            self._restored = rows
+            self.ann, self.ann_kind = ann, kind
+            self._ann_trained_size = int(header.get("trained_size", 0))
+        logger.info(f"[SEARCH] Loaded {kind} index over {rows} {self.dimension}-d vectors from {path}")
+        return rows
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "dimension": self.dimension,
+            "index_kind": self.ann_kind,
+            "trained_size": self._ann_trained_size,
+            "restored_rows": self._restored,
+        }
+
+
+def _commit(path):
+    with open(path + ".tmp", "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+    fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)  # the rename itself
+    finally:
+        os.close(fd)
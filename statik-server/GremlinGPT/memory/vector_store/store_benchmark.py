@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: Memory Store Cold-Start Benchmark
+
+"""
+Cold-start cost of memory.vector_store.memory_store.MemoryStore.
+
+Builds a store of `--memories` synthetic embeddings in a temporary
+directory (or reuses `--root`), then times a fresh open, the first record
+read and a full scan of one dimension's vectors.
+
+Usage:
+    python -m memory.vector_store.store_benchmark --memories 500000
+    python -m memory.vector_store.store_benchmark --root /tmp/store --dtype float16
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+from memory.vector_store.memory_store import MemoryStore
+
+
+def build(root, memories, dimension, dtype, rng, batch=10000):
+    store = MemoryStore(root, dtype=dtype)
+    for start in range(store.count(), memories, batch):
+        size = min(batch, memories - start)
+        vectors = rng.standard_normal((size, dimension), dtype="float32")
+        store.add_many([{
+            "id": str(uuid.uuid4()),
+            "text": f"synthetic memory {start + i}",
+            "embedding": vectors[i],
+            "meta": {"source": "benchmark", "type": "note"},
+            "created": "2025-01-01T00:00:00+00:00",
+            "source": "benchmark",
+        } for i in range(size)])
+    store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark memory store cold start")
+    parser.add_argument("--memories", type=int, default=500000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--root", help="Store directory to build or reuse (default: temporary)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="gremlin_store_") as tmp:
+        root = args.root or tmp
+        started = time.perf_counter()
+        build(root, args.memories, args.dimension, args.dtype, np.random.default_rng(args.seed))
+        print(f"build      {args.memories} memories: {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        store = MemoryStore(root, dtype=args.dtype)
+        count = store.count()
+        opened = time.perf_counter() - started
+        store.list(1)
+        first_read = time.perf_counter() - started - opened
+        print(f"cold open  {count} memories: {opened * 1000:.1f}ms "
+              f"(first record +{first_read * 1000:.1f}ms)")
+
+        started = time.perf_counter()
+        matrix = store.vectors(args.dimension)
+        print(f"full scan  {matrix.shape[0]}x{matrix.shape[1]} {args.dtype}: {time.perf_counter() - started:.2f}s")
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: Memory Write-Behind Buffer
+
+"""
+Write-behind buffer for memory ingest.
+
+Each record is appended to a JSON-lines write-ahead log (WAL) and queued in
+memory. Queued records reach the vector index in batches through `flush_fn`,
+either when `batch_size` records are waiting or after `flush_interval`
+seconds. A checkpoint (`checkpoint_fn`, e.g. writing the FAISS index) runs
+every `checkpoint_every` records or `checkpoint_interval` seconds instead of
+after every add.
+
+WAL lifecycle:
+  - append:     record is written (and optionally fsync'd) to <wal>
+  - checkpoint: <wal> is rotated to <wal>.old, the queue is flushed,
+                `checkpoint_fn` persists the index, then <wal>.old is removed
+  - failure:    if `checkpoint_fn` raises, <wal>.old is kept for replay
+  - failure:    a batch `flush_fn` rejects goes back to the head of the
+                queue, and no checkpoint completes until it has been flushed
+  - startup:    `replay()` returns every record in <wal>.old and <wal>;
+                these are exactly the adds newer than the last checkpoint
+
+Durability contract: once `checkpoint_fn` returns, every record `flush_fn`
+accepted must survive a crash without the WAL. `flush_fn` may write without
+syncing, so `checkpoint_fn` has to sync (or atomically save) every store that
+replay would otherwise rebuild, not just the index.
+"""
+
+import os
+import json
+import time
+import threading
+
+from utils.logging_config import setup_module_logger
+
+# Initialize module-specific logger
+logger = setup_module_logger("memory", "write_buffer")
+
+
+class WriteBuffer:
+    """Batches record persistence behind an append-only write-ahead log."""
+
+    def __init__(self, wal_path, flush_fn, checkpoint_fn=None, batch_size=250,
+                 flush_interval=2.0, checkpoint_every=10000, checkpoint_interval=900.0,
+                 fsync=True):
+        self.wal_path = wal_path
+        self.old_wal_path = wal_path + ".old"
+        self.flush_fn = flush_fn
+        self.checkpoint_fn = checkpoint_fn
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.checkpoint_interval = float(checkpoint_interval)
+        self.fsync = fsync
+
+        self._pending = []
+        self._pending_since = None
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self._append_lock = threading.Lock()   # WAL handle + queue
+        self._flush_lock = threading.RLock()   # keeps flush_fn calls in ingest order
+        self._wal = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"appended": 0, "flushed": 0, "flushes": 0, "checkpoints": 0, "flush_failures": 0}
+
+        wal_dir = os.path.dirname(wal_path)
+        if wal_dir:
+            os.makedirs(wal_dir, exist_ok=True)
+
+    # --- WAL ---
+    def _open_wal(self):
+        if self._wal is None:
+            self._wal = open(self.wal_path, "a", encoding="utf-8")
+        return self._wal
+
+    def _read_wal(self, path):
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, "r", encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line is expected after a crash mid-append
+                    logger.warning(f"[WAL] Skipping unreadable line {lineno} in {path}")
+        return records
+
+    def replay(self):
+        """Records logged since the last completed checkpoint, oldest first."""
+        records = self._read_wal(self.old_wal_path) + self._read_wal(self.wal_path)
+        if records:
+            logger.info(f"[WAL] Replaying {len(records)} records from {self.wal_path}")
+        return records
+
+    # --- Ingest ---
+    def append(self, record):
+        """Log `record` durably and queue it; flushes inline once a batch is full."""
+        line = json.dumps(record, separators=(",", ":"))
+        with self._append_lock:
+            wal = self._open_wal()
+            wal.write(line + "\n")
+            wal.flush()
+            if self.fsync:
+                os.fsync(wal.fileno())
+            self._pending.append(record)
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            self.stats["appended"] += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def _drain(self):
+        with self._append_lock:
+            batch, self._pending = self._pending, []
+            since, self._pending_since = self._pending_since, None
+        return batch, since
+
+    def _requeue(self, batch, since):
+        # Failed records go back ahead of anything appended meanwhile
+        with self._append_lock:
+            self._pending = batch + self._pending
+            self._pending_since = since if since is not None else time.monotonic()
+
+    def flush(self):
+        """Hand every queued record to `flush_fn`; checkpoints when one is due."""
+        with self._flush_lock:
+            batch, since = self._drain()
+            if batch and not self._flush_batch(batch, since):
+                return 0
+            due = (self._since_checkpoint >= self.checkpoint_every or
+                   (self._since_checkpoint and
+                    time.monotonic() - self._last_checkpoint >= self.checkpoint_interval))
+        if due:
+            self.checkpoint()
+        return len(batch)
+
+    def _flush_batch(self, batch, since=None):
+        try:
+            self.flush_fn(batch)
+        except Exception as e:
+            # Requeued and still in the WAL; retried on the next flush
+            logger.error(f"[WAL] Flush of {len(batch)} records failed: {e}")
+            self.stats["flush_failures"] += 1
+            self._requeue(batch, since)
+            return False
+        self._since_checkpoint += len(batch)
+        self.stats["flushed"] += len(batch)
+        self.stats["flushes"] += 1
+        return True
+
+    def checkpoint(self):
+        """Persist everything flushed so far and retire the WAL it covers."""
+        with self._flush_lock:
+            with self._append_lock:
+                if self._wal is not None:
+                    self._wal.close()
+                    self._wal = None
+                if os.path.exists(self.wal_path):
+                    if os.path.exists(self.old_wal_path):
+                        # A previous checkpoint failed; keep its records ahead of ours
+                        with open(self.old_wal_path, "a", encoding="utf-8") as old, \
+                                open(self.wal_path, "r", encoding="utf-8") as cur:
+                            old.write(cur.read())
+                        os.remove(self.wal_path)
+                    else:
+                        os.replace(self.wal_path, self.old_wal_path)
+                batch, self._pending = self._pending, []
+                since, self._pending_since = self._pending_since, None
+            if batch and not self._flush_batch(batch, since):
+                # The batch is requeued and <wal>.old still holds it
+                return False
+            if self.checkpoint_fn is not None:
+                try:
+                    self.checkpoint_fn()
+                except Exception as e:
+                    logger.error(f"[WAL] Checkpoint failed; keeping {self.old_wal_path}: {e}")
+                    return False
+            if os.path.exists(self.old_wal_path):
+                os.remove(self.old_wal_path)
+            self._since_checkpoint = 0
+            self._last_checkpoint = time.monotonic()
+            self.stats["checkpoints"] += 1
+            logger.debug("[WAL] Checkpoint complete")
+            return True
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def snapshot(self):
+        """Queued records not yet handed to `flush_fn`."""
+        with self._append_lock:
+            return list(self._pending)
+
+    # --- Background flusher ---
+    def _run(self):
+        tick = max(0.05, min(self.flush_interval, self.checkpoint_interval) / 2)
+        while not self._stop.wait(tick):
+            since = self._pending_since
+            if since is not None and time.monotonic() - since >= self.flush_interval:
+                self.flush()
+            elif (self._since_checkpoint and
+                  time.monotonic() - self._last_checkpoint >= self.checkpoint_interval):
+                self.checkpoint()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="memory-write-buffer", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the flusher and checkpoint whatever is still queued."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pending or self._since_checkpoint or os.path.exists(self.wal_path):
+            self.checkpoint()
+        with self._append_lock:
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
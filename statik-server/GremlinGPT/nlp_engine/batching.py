@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: nlp_engine/batching.py :: Module Integrity Directive
+# Batch helpers shared by the encoders.
+# This script is a component of the GremlinGPT system, under Alpha expansion.
+
+"""
+Batch-first encoding helpers.
+
+  length_buckets: orders texts by length and cuts batches, so dynamic
+                  (pad-to-longest) padding wastes little work per batch
+  MicroBatcher:   lets many threads call a single-text encode while the
+                  model sees one batch per `max_wait_ms` window
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.logging_config import setup_module_logger
+
+# Initialize module-specific logger
+logger = setup_module_logger("nlp_engine", "batching")
+
+ENGINE_NAME = "batching"
+
+
+def length_buckets(texts, batch_size, key=len):
+    """Lists of indices into `texts`: similar lengths together, at most `batch_size` each."""
+    order = sorted(range(len(texts)), key=lambda i: key(texts[i]))
+    batch_size = max(1, int(batch_size))
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def encode_bucketed(texts, encode_batch, batch_size):
+    """
+    Run `encode_batch(list_of_texts) -> list_of_vectors` over length buckets
+    and return the vectors in the original order of `texts`.
+    """
+    vectors = [None] * len(texts)
+    for bucket in length_buckets(texts, batch_size):
+        for i, vector in zip(bucket, encode_batch([texts[i] for i in bucket])):
+            vectors[i] = vector
+    return vectors
+
+
+class MicroBatcher:
+    """Groups concurrent single-text requests into one `encode_many` call."""
+
+    def __init__(self, encode_many, max_batch=32, max_wait_ms=5.0, name="encoder"):
+        self.encode_many = encode_many
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self.stats = {"requests": 0, "batches": 0}
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-microbatch", daemon=True)
+            self._thread.start()
+
+    def submit(self, text) -> Future:
+        future = Future()
+        with self._cond:
+            self._queue.append((text, future))
+            self.stats["requests"] += 1
+            self._ensure_worker()
+            self._cond.notify()
+        return future
+
+    def encode(self, text, timeout=None):
+        """Blocking single-text encode that shares a batch with concurrent callers."""
+        return self.submit(text).result(timeout)
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            # First request opens the window; later ones join until it closes or fills
+            deadline = time.monotonic() + self.max_wait
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            texts = [text for text, _ in batch]
+            try:
+                vectors = self.encode_many(texts)
+                self.stats["batches"] += 1
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+            except Exception as e:
+                logger.error(f"[{ENGINE_NAME}] {self.name} batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+__all__ = ["length_buckets", "encode_bucketed", "MicroBatcher"]
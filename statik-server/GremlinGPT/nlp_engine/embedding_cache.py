@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: nlp_engine/embedding_cache.py :: Module Integrity Directive
+# Process-wide content-hash cache for text embeddings.
+# This script is a component of the GremlinGPT system, under Alpha expansion.
+
+"""
+Embeddings keyed by (model id, sha1 of the normalised text).
+
+Every encoder (transformer_core, semantic_score, the memory embedder) goes
+through `get_embedding_cache()`, so a string encoded by one caller is free
+for the next one using the same model. Tiers:
+  - memory: bounded LRU of float32 vectors
+  - disk:   optional SQLite table, for reuse across restarts
+
+Configured from config/memory.json embedding.cache:
+  {"enabled": true, "max_entries": 20000, "disk_path": null, "disk_max_entries": 200000}
+"""
+
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.logging_config import setup_module_logger
+
+# Initialize module-specific logger
+logger = setup_module_logger("nlp_engine", "embedding_cache")
+
+ENGINE_NAME = "embedding_cache"
+
+
+def normalise_text(text) -> str:
+    """NFC, trimmed, internal whitespace collapsed: formatting-only changes hit the cache."""
+    return " ".join(unicodedata.normalize("NFC", str(text)).split())
+
+
+def text_key(model_id: str, text) -> str:
+    digest = hashlib.sha1(normalise_text(text).encode("utf-8")).hexdigest()
+    return f"{model_id}:{digest}"
+
+
+class EmbeddingCache:
+    """Bounded LRU of embeddings with an optional SQLite second tier."""
+
+    def __init__(self, max_entries=20000, disk_path=None, disk_max_entries=200000):
+        self.max_entries = max(0, int(max_entries))
+        self.disk_max_entries = int(disk_max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_writes = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if disk_path:
+            try:
+                self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+                self._disk.execute("PRAGMA journal_mode=WAL")
+                self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    " key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)")
+                self._disk.commit()
+            except Exception as e:
+                logger.error(f"[{ENGINE_NAME}] Disk tier unavailable at {disk_path}: {e}")
+                self._disk = None
+
+    # --- Tiers ---
+    def _remember(self, key, vector):
+        if self.max_entries == 0:
+            return
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_get(self, key):
+        row = self._disk.execute("SELECT dim, vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[1], dtype=np.float32, count=row[0])
+
+    def _disk_put(self, items):
+        with self._disk:
+            self._disk.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+                [(key, len(vec), vec.tobytes()) for key, vec in items])
+        self._disk_writes += len(items)
+        if self._disk_writes >= 1000:
+            self._disk_writes = 0
+            with self._disk:
+                # rowid order approximates insertion order: drop the oldest overflow
+                self._disk.execute(
+                    "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY rowid"
+                    " LIMIT MAX(0, (SELECT COUNT(*) FROM embeddings) - ?))", (self.disk_max_entries,))
+
+    # --- Lookup ---
+    def get(self, model_id, text):
+        """Cached vector (a private copy) or None."""
+        key = text_key(model_id, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return vector.copy()
+            if self._disk is not None:
+                vector = self._disk_get(key)
+                if vector is not None:
+                    self._remember(key, vector)
+                    self.stats["disk_hits"] += 1
+                    return vector.copy()
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, model_id, text, vector):
+        self.put_many(model_id, [text], [vector])
+
+    def put_many(self, model_id, texts, vectors):
+        items = []
+        for text, vector in zip(texts, vectors):
+            vec = np.array(vector, dtype=np.float32).reshape(-1)
+            vec.setflags(write=False)
+            items.append((text_key(model_id, text), vec))
+        with self._lock:
+            for key, vec in items:
+                self._remember(key, vec)
+            if self._disk is not None and items:
+                try:
+                    self._disk_put(items)
+                except Exception as e:
+                    logger.warning(f"[{ENGINE_NAME}] Disk write failed: {e}")
+
+    def get_or_compute(self, model_id, text, compute):
+        """Cached vector for `text`, calling `compute(text)` on a miss."""
+        vector = self.get(model_id, text)
+        if vector is None:
+            vector = np.asarray(compute(text), dtype=np.float32)
+            self.put(model_id, text, vector)
+        return vector
+
+    def get_many(self, model_id, texts, compute_many):
+        """
+        Vectors for every text, in order. Misses are de-duplicated and sent to
+        `compute_many(list_of_texts)` in a single call.
+        """
+        vectors = [self.get(model_id, t) for t in texts]
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(normalise_text(texts[i]), []).append(i)
+        if missing:
+            first = [texts[positions[0]] for positions in missing.values()]
+            computed = compute_many(first)
+            self.put_many(model_id, first, computed)
+            for positions, vector in zip(missing.values(), computed):
+                vector = np.asarray(vector, dtype=np.float32)
+                for i in positions:
+                    vectors[i] = vector.copy()
+        return vectors
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                with self._disk:
+                    self._disk.execute("DELETE FROM embeddings")
+
+    def info(self):
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk": self._disk is not None,
+            "hit_rate": round((self.stats["hits"] + self.stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """The process-wide cache, configured from config/memory.json on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    from backend.globals import MEM, resolve_path
+                    conf = MEM.get("embedding", {}).get("cache", {})
+                    disk_path = conf.get("disk_path")
+                    disk_path = resolve_path(disk_path) if disk_path else None
+                except Exception as e:
+                    logger.warning(f"[{ENGINE_NAME}] Config unavailable; using defaults: {e}")
+                    conf, disk_path = {}, None
+                enabled = conf.get("enabled", True)
+                _cache = EmbeddingCache(
+                    max_entries=conf.get("max_entries", 20000) if enabled else 0,
+                    disk_path=disk_path if enabled else None,
+                    disk_max_entries=conf.get("disk_max_entries", 200000),
+                )
+    return _cache
+
+
+__all__ = ["EmbeddingCache", "get_embedding_cache", "normalise_text", "text_key"]
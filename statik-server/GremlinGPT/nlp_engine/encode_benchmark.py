@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: nlp_engine/encode_benchmark.py :: Module Integrity Directive
+# Encoder throughput benchmark (texts/second on CPU).
+# This script is a component of the GremlinGPT system, under Alpha expansion.
+
+"""
+Texts/second for transformer_core on CPU, with the embedding cache bypassed:
+
+  serial:      one forward pass per text (the old encode loop)
+  batched:     encode_bucketed over length buckets with dynamic padding
+  unbucketed:  same batch size, original order (shows what bucketing saves)
+  microbatch:  --threads concurrent single-text callers through MicroBatcher
+
+Usage:
+    python -m nlp_engine.encode_benchmark
+    python -m nlp_engine.encode_benchmark --texts 512 --batch-size 64 --threads 16
+"""
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from nlp_engine import transformer_core
+from nlp_engine.batching import MicroBatcher, encode_bucketed
+
+WORDS = ("price volume signal resistance support breakout memory agent task vector "
+         "index planner mutation scraper market order trend momentum").split()
+
+
+def synthetic_texts(count, rng):
+    """Mixed short chat lines and long log lines, the spread padding hurts most."""
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.choice((4, 8, 16, 64, 200))))
+            for _ in range(count)]
+
+
+def timed(label, texts, run):
+    started = time.perf_counter()
+    vectors = run(texts)
+    elapsed = time.perf_counter() - started
+    assert len(vectors) == len(texts)
+    print(f"{label:<11} {len(texts) / elapsed:8.1f} texts/s ({elapsed:.2f}s)")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark batched text encoding on CPU")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=transformer_core.BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent callers for the micro-batch run")
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument("--torch-threads", type=int, default=0, help="torch.set_num_threads (0: leave default)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if not transformer_core.load():
+        print("transformer model unavailable", file=sys.stderr)
+        return 1
+    transformer_core.DEVICE = "cpu"
+    transformer_core.model.to("cpu")
+    if args.torch_threads:
+        torch.set_num_threads(args.torch_threads)
+
+    texts = synthetic_texts(args.texts, random.Random(args.seed))
+    encode_batch = transformer_core._encode_batch_uncached
+    encode_batch(texts[:2])  # warm-up
+
+    def unbucketed(batch):
+        out = []
+        for i in range(0, len(batch), args.batch_size):
+            out.extend(encode_batch(batch[i:i + args.batch_size]))
+        return out
+
+    def microbatch(batch):
+        batcher = MicroBatcher(lambda ts: encode_bucketed(ts, encode_batch, args.batch_size),
+                               max_batch=args.batch_size, max_wait_ms=args.wait_ms, name="bench")
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            return list(pool.map(batcher.encode, batch))
+
+    print(f"{args.texts} texts, batch {args.batch_size}, {torch.get_num_threads()} torch threads, "
+          f"model {transformer_core.MODEL_NAME}")
+    serial = timed("serial", texts, lambda batch: [encode_batch([t])[0] for t in batch])
+    batched = timed("batched", texts, lambda batch: encode_bucketed(batch, encode_batch, args.batch_size))
+    timed("unbucketed", texts, unbucketed)
+    timed("microbatch", texts, microbatch)
+    print(f"batched speed-up over serial: {serial / batched:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: nlp_engine/encoder_registry.py :: Module Integrity Directive
+# Encoder registry: model ids, dimensions, normalisation and shared model copies.
+# This script is a component of the GremlinGPT system, under Alpha expansion.
+
+"""
+Every text encoder GremlinGPT uses, and the memory collections bound to them.
+
+Configured from config/memory.json:
+  "encoders":    {id: {"backend", "model", "dimension", "normalize"}}
+  "collections": {name: {"encoder": id}}
+  "projections": {"<src>-><dst>": path to a saved (src_dim, dst_dim) .npy matrix}
+
+- `load_model(backend, name)` keeps one copy of each model per process, so
+  semantic_score, the memory embedder and transformer_core share weights.
+- Modules that implement an encoder call `bind_encoder(id, encode_many)`;
+  `get_encoder(id).encode_many(texts)` then works from anywhere.
+- `conform_vector` makes a vector fit a collection's encoder. It projects
+  with a learned matrix when one exists, and re-encodes the text otherwise,
+  so an index never mixes vector spaces.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from utils.logging_config import setup_module_logger
+
+# Initialize module-specific logger
+logger = setup_module_logger("nlp_engine", "encoder_registry")
+
+ENGINE_NAME = "encoder_registry"
+
+DEFAULT_ENCODERS = {
+    "minilm": {"backend": "sentence-transformers", "model": "all-MiniLM-L6-v2", "dimension": 384, "normalize": True},
+    "bert": {"backend": "transformers", "model": "bert-base-uncased", "dimension": 768, "normalize": False},
+}
+DEFAULT_COLLECTIONS = {"memory": {"encoder": "minilm"}}
+DEFAULT_COLLECTION = "memory"
+
+
+class EncoderSpec:
+    """One encoder: model id, output dimension and normalisation policy."""
+
+    def __init__(self, encoder_id, backend, model, dimension, normalize=False):
+        self.id = encoder_id
+        self.backend = backend
+        self.model = model
+        self.dimension = int(dimension)
+        self.normalize = bool(normalize)
+        self._encode_many = None
+
+    @property
+    def bound(self):
+        return self._encode_many is not None
+
+    def prepare(self, vector):
+        """Apply this encoder's normalisation policy to one vector."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if self.normalize:
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector = vector / norm
+        return vector
+
+    def encode_many(self, texts):
+        if self._encode_many is None:
+            raise RuntimeError(f"Encoder '{self.id}' has no bound implementation")
+        return np.vstack([self.prepare(v) for v in self._encode_many(list(texts))])
+
+    def encode(self, text):
+        return self.encode_many([text])[0]
+
+    def info(self):
+        return {"id": self.id, "backend": self.backend, "model": self.model,
+                "dimension": self.dimension, "normalize": self.normalize, "bound": self.bound}
+
+
+_lock = threading.RLock()
+_encoders = {}
+_collections = {}
+_projection_paths = {}
+_projections = {}
+_models = {}
+_model_locks = {}
+_configured = False
+
+
+def _configure():
+    global _configured
+    if _configured:
+        return
+    with _lock:
+        if _configured:
+            return
+        try:
+            from backend.globals import MEM, resolve_path
+        except Exception as e:
+            logger.warning(f"[{ENGINE_NAME}] Config unavailable; using defaults: {e}")
+            MEM, resolve_path = {}, (lambda p: p)
+        encoders = MEM.get("encoders") or DEFAULT_ENCODERS
+        for encoder_id, conf in encoders.items():
+            _encoders[encoder_id] = EncoderSpec(
+                encoder_id, conf.get("backend", "sentence-transformers"), conf["model"],
+                conf["dimension"], conf.get("normalize", False))
+        for name, conf in (MEM.get("collections") or DEFAULT_COLLECTIONS).items():
+            if conf.get("encoder") not in _encoders:
+                logger.error(f"[{ENGINE_NAME}] Collection '{name}' names unknown encoder {conf.get('encoder')}")
+                continue
+            _collections[name] = conf["encoder"]
+        for key, path in (MEM.get("projections") or {}).items():
+            _projection_paths[key] = resolve_path(path)
+        _configured = True
+
+
+# --- Lookup ---
+def get_encoder(encoder_id) -> EncoderSpec:
+    _configure()
+    if encoder_id not in _encoders:
+        raise KeyError(f"Unknown encoder '{encoder_id}'")
+    return _encoders[encoder_id]
+
+
+def find_encoder(backend, model):
+    """The registered spec for a (backend, model name) pair, or None."""
+    _configure()
+    return next((e for e in _encoders.values() if e.backend == backend and e.model == model), None)
+
+
+def encoder_for_dimension(dimension):
+    """Unique encoder producing `dimension`-d vectors, or None when ambiguous/unknown."""
+    _configure()
+    matches = [e for e in _encoders.values() if e.dimension == int(dimension)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def collection_encoder(collection=None) -> EncoderSpec:
+    _configure()
+    collection = collection or DEFAULT_COLLECTION
+    if collection not in _collections:
+        raise KeyError(f"Unknown collection '{collection}'")
+    return _encoders[_collections[collection]]
+
+
+def bind_encoder(encoder_id, encode_many):
+    """Register the function that implements `encoder_id` (list of texts -> vectors)."""
+    get_encoder(encoder_id)._encode_many = encode_many
+
+
+# --- Shared model copies ---
+def _load(backend, name, device):
+    if backend == "sentence-transformers":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name, device=device) if device else SentenceTransformer(name)
+    if backend == "transformers":
+        from transformers import AutoModel, AutoTokenizer
+        model = AutoModel.from_pretrained(name)
+        if device:
+            model = model.to(device)
+        model.eval()
+        return AutoTokenizer.from_pretrained(name), model
+    raise ValueError(f"Unknown encoder backend '{backend}'")
+
+
+def load_model(backend, name, device=None):
+    """
+    Load `name` once per process and return the shared copy. Transformers
+    models come back as (tokenizer, model). Raises if loading fails; the
+    failure is not cached, so a later call retries.
+    """
+    key = (backend, name)
+    if key in _models:
+        return _models[key]
+    with _lock:
+        model_lock = _model_locks.setdefault(key, threading.Lock())
+    with model_lock:
+        if key not in _models:
+            logger.info(f"[{ENGINE_NAME}] Loading {backend} model {name}")
+            _models[key] = _load(backend, name, device)
+    return _models[key]
+
+
+def loaded_models():
+    return [f"{backend}:{name}" for backend, name in _models]
+
+
+# --- Projections ---
+def get_projection(src_id, dst_id):
+    """(src_dim, dst_dim) matrix mapping src vectors into dst space, or None."""
+    _configure()
+    key = f"{src_id}->{dst_id}"
+    if key not in _projections:
+        path = _projection_paths.get(key)
+        matrix = None
+        if path and os.path.exists(path):
+            try:
+                matrix = np.load(path).astype(np.float32)
+            except Exception as e:
+                logger.error(f"[{ENGINE_NAME}] Failed to load projection {key} from {path}: {e}")
+        _projections[key] = matrix
+    return _projections[key]
+
+
+def fit_projection(src_id, dst_id, texts, path=None):
+    """
+    Learn a least-squares linear map from src to dst vectors of the same
+    texts (a few thousand representative texts is plenty); optionally save it.
+    """
+    src, dst = get_encoder(src_id), get_encoder(dst_id)
+    x, y = src.encode_many(texts), dst.encode_many(texts)
+    matrix, *_ = np.linalg.lstsq(x, y, rcond=None)
+    matrix = matrix.astype(np.float32)
+    _projections[f"{src_id}->{dst_id}"] = matrix
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.save(path, matrix)
+        _projection_paths[f"{src_id}->{dst_id}"] = path
+    logger.info(f"[{ENGINE_NAME}] Fitted projection {src_id}->{dst_id} on {len(texts)} texts")
+    return matrix
+
+
+def conform_vector(vector, encoder, text=None):
+    """
+    Return (vector, how) with the vector in `encoder`'s space and policy.
+    how is "native", "projected:<src>" or "reencoded".
+    Raises ValueError when the vector cannot be made to fit.
+    """
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    if vector.shape[0] == encoder.dimension:
+        return encoder.prepare(vector), "native"
+    source = encoder_for_dimension(vector.shape[0])
+    matrix = get_projection(source.id, encoder.id) if source else None
+    if matrix is not None:
+        return encoder.prepare(vector @ matrix), f"projected:{source.id}"
+    if text is not None and encoder.bound:
+        return encoder.encode(text), "reencoded"
+    raise ValueError(f"{vector.shape[0]}-d vector does not fit encoder '{encoder.id}' ({encoder.dimension}-d)")
+
+
+def registry_info():
+    _configure()
+    return {
+        "encoders": [e.info() for e in _encoders.values()],
+        "collections": dict(_collections),
+        "projections": sorted(set(_projection_paths) | {k for k, v in _projections.items() if v is not None}),
+        "loaded_models": loaded_models(),
+    }
+
+
+__all__ = [
+    "EncoderSpec", "get_encoder", "find_encoder", "encoder_for_dimension", "collection_encoder",
+    "bind_encoder", "load_model", "loaded_models", "get_projection", "fit_projection",
+    "conform_vector", "registry_info",
+]
@@ -11,8 +11,8 @@
 # GremlinGPT v1.0.3 :: Module Integrity Directive
 # This script is a component of the GremlinGPT system, under Alpha expansion.
 
-import spacy
 import ast
+import threading
 from datetime import datetime
 from nlp_engine.tokenizer import tokenize
 from nlp_engine.pos_tagger import get_pos_tags
@@ -25,8 +25,25 @@ logger = setup_module_logger("nlp_engine", "parser")
 WATERMARK = "source:GremlinGPT"
 ORIGIN = "nlp_parser"
 
-# Load SpaCy English model
-nlp = spacy.load("en_core_web_sm")
+# SpaCy English model, loaded on first parse
+SPACY_MODEL = "en_core_web_sm"
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """
+    Load the SpaCy pipeline on first use and reuse it afterwards.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+
+                _nlp = spacy.load(SPACY_MODEL)
+                logger.info(f"[PARSER] Loaded SpaCy model: {SPACY_MODEL}")
+    return _nlp
 
 # === Financial Ontology Dictionary ===
 FIN_KEYWORDS = {
@@ -82,7 +99,7 @@ def parse_nlp(text):
     tokens = tokenize(text)
     pos_tags = get_pos_tags(text)
 
-    doc = nlp(text)
+    doc = get_nlp()(text)
     entities = [(ent.text, ent.label_) for ent in doc.ents]
     dependencies = [(token.text, token.dep_, token.head.text) for token in doc]
 
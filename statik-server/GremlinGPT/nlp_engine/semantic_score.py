@@ -14,13 +14,13 @@
 import re
 import numpy as np
 import langdetect
-import torch
 from utils.logging_config import setup_module_logger
 
 # Initialize module-specific logger
 logger = setup_module_logger("nlp_engine", "semantic_score")
 from backend.globals import CFG
-from sentence_transformers import SentenceTransformer, util
+from nlp_engine.embedding_cache import get_embedding_cache
+from nlp_engine.encoder_registry import load_model
 from utils.nltk_setup import setup_nltk_data
 import nltk
 from nltk.tokenize import word_tokenize
@@ -81,15 +81,17 @@ def _get_lang(text):
         return "en"
 
 
+def _model_name(lang_code):
+    # Use multilingual for any non-english language
+    return MODEL_MAP.get(lang_code) or MULTILINGUAL_MODEL
+
+
 def _get_model(lang_code):
     """
     Loads or reuses a transformer for the requested language.
     Defaults to multilingual for non-English.
     """
-    model_name = MODEL_MAP.get(lang_code, None)
-    if not model_name:
-        # Use multilingual for any non-english language
-        model_name = MULTILINGUAL_MODEL
+    model_name = _model_name(lang_code)
     if model_name not in _model_cache:
         try:
             logger.info(f"[{ENGINE_NAME}] Loading model: {model_name}")
@@ -100,13 +102,30 @@ def _get_model(lang_code):
                 import torch
 
                 device = "cuda" if torch.cuda.is_available() else "cpu"
-            _model_cache[model_name] = SentenceTransformer(model_name, device=device)
+            # Shared with the memory embedder when both use the same model
+            _model_cache[model_name] = load_model("sentence-transformers", model_name, device)
         except Exception as e:
             logger.error(f"[{ENGINE_NAME}] Model {model_name} load failed: {e}")
             _model_cache[model_name] = None
     return _model_cache[model_name]
 
 
+def _embed(lang_code, model, texts):
+    """Sentence embeddings for `texts` as a float32 matrix, via the shared embedding cache."""
+    vectors = get_embedding_cache().get_many(
+        f"sentence-transformers:{_model_name(lang_code)}",
+        list(texts),
+        lambda missing: model.encode(missing, convert_to_numpy=True),
+    )
+    return np.vstack(vectors)
+
+
+def _cos_sim(a, b):
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return a @ b.T
+
+
 def clean_text(text: str) -> str:
     """
     Strips non-ASCII chars, compresses whitespace, removes control codes.
@@ -167,12 +186,10 @@ def semantic_similarity(
         if sentence_level:
             sents_a = split_sentences(text_a)
             sents_b = split_sentences(text_b)
-            embs_a = model.encode(sents_a, convert_to_tensor=True)
-            embs_b = model.encode(sents_b, convert_to_tensor=True)
-            sims = util.cos_sim(embs_a, embs_b)
+            sims = _cos_sim(_embed(lang, model, sents_a), _embed(lang, model, sents_b))
             # Return the mean of all max pairwise similarities
-            max_per_a = np.max(sims.cpu().numpy(), axis=1)
-            max_per_b = np.max(sims.cpu().numpy(), axis=0)
+            max_per_a = np.max(sims, axis=1)
+            max_per_b = np.max(sims, axis=0)
             sim_avg = (np.mean(max_per_a) + np.mean(max_per_b)) / 2.0
             sim_clamped = float(np.clip(sim_avg, 0.0, 1.0))
             logger.debug(
@@ -181,9 +198,8 @@ def semantic_similarity(
             return sim_clamped
 
         # Whole-text similarity
-        emb_a = model.encode(text_a, convert_to_tensor=True)
-        emb_b = model.encode(text_b, convert_to_tensor=True)
-        sim = util.cos_sim(emb_a, emb_b).item()
+        embs = _embed(lang, model, [text_a, text_b])
+        sim = _cos_sim(embs[:1], embs[1:])[0, 0]
         sim_clamped = max(0.0, min(1.0, float(sim)))
         logger.debug(
             f"[{ENGINE_NAME}] Semantic similarity: {sim_clamped:.4f} (lang: {lang})"
@@ -235,19 +251,16 @@ def reasoned_similarity(
         if sentence_level:
             sents_a = split_sentences(text_a)
             sents_b = split_sentences(text_b)
-            embs_a = model.encode(sents_a, convert_to_tensor=True)
-            embs_b = model.encode(sents_b, convert_to_tensor=True)
-            sims = util.cos_sim(embs_a, embs_b)
-            max_per_a = np.max(sims.cpu().numpy(), axis=1)
-            max_per_b = np.max(sims.cpu().numpy(), axis=0)
+            sims = _cos_sim(_embed(lang, model, sents_a), _embed(lang, model, sents_b))
+            max_per_a = np.max(sims, axis=1)
+            max_per_b = np.max(sims, axis=0)
             sim_avg = (np.mean(max_per_a) + np.mean(max_per_b)) / 2.0
             sim_clamped = float(np.clip(sim_avg, 0.0, 1.0))
             result["score"] = sim_clamped
             result["explanation"] = f"Sentence-level similarity: {sim_clamped:.4f} (lang: {lang})"
         else:
-            emb_a = model.encode(text_a, convert_to_tensor=True)
-            emb_b = model.encode(text_b, convert_to_tensor=True)
-            sim = util.cos_sim(emb_a, emb_b).item()
+            embs = _embed(lang, model, [text_a, text_b])
+            sim = _cos_sim(embs[:1], embs[1:])[0, 0]
             sim_clamped = max(0.0, min(1.0, float(sim)))
             result["score"] = sim_clamped
             result["explanation"] = f"Whole-text similarity: {sim_clamped:.4f} (lang: {lang})"
@@ -282,6 +295,32 @@ def reasoned_similarity(
     return result
 
 
+def _batch_similarity(text, candidates, dynamic_language=True):
+    """
+    Whole-text similarity of `text` to every candidate with one encode per
+    model, matching semantic_similarity's per-pair language choice.
+    """
+    scores = np.zeros(len(candidates), dtype=np.float32)
+    try:
+        query = clean_text(text)
+        cleaned = [clean_text(c) for c in candidates]
+        lang_q = _get_lang(query) if dynamic_language else "en"
+        groups = {}
+        for i, cand in enumerate(cleaned):
+            lang = lang_q if dynamic_language and _get_lang(cand) == lang_q else "en"
+            groups.setdefault(lang, []).append(i)
+        for lang, positions in groups.items():
+            model = _get_model(lang)
+            if not model:
+                logger.error(f"[{ENGINE_NAME}] No valid model loaded for lang={lang}; scoring 0.0")
+                continue
+            embs = _embed(lang, model, [query] + [cleaned[i] for i in positions])
+            scores[positions] = np.clip(_cos_sim(embs[:1], embs[1:])[0], 0.0, 1.0)
+    except Exception as e:
+        logger.error(f"[{ENGINE_NAME}] Batch similarity computation failed: {e}")
+    return [float(s) for s in scores]
+
+
 # Utility: find best match from a list
 def most_similar(text, candidates, threshold=0.75, **kwargs):
     """
@@ -289,7 +328,10 @@ def most_similar(text, candidates, threshold=0.75, **kwargs):
     """
     if not candidates:
         return None, 0.0
-    scores = [semantic_similarity(text, c, **kwargs) for c in candidates]
+    if kwargs.get("sentence_level"):
+        scores = [semantic_similarity(text, c, **kwargs) for c in candidates]
+    else:
+        scores = _batch_similarity(text, candidates, kwargs.get("dynamic_language", True))
     best_idx = int(np.argmax(scores))
     best_score = float(scores[best_idx])
     if best_score >= threshold:
@@ -12,7 +12,7 @@
 # This script is a component of the GremlinGPT system, under Alpha expansion.
 
 import re
-from transformers import AutoTokenizer
+import threading
 from backend.globals import CFG, logger
 
 from memory.vector_store.embedder import embed_text, package_embedding, inject_watermark
@@ -26,12 +26,29 @@ ORIGIN = "tokenizer"
 MODEL = CFG["nlp"].get("tokenizer_model", "bert-base-uncased")
 
 
-try:
-    tokenizer = AutoTokenizer.from_pretrained(MODEL)
-    logger.success(f"[TOKENIZER] Loaded: {MODEL}")
-except Exception as e:
-    logger.warning(f"[TOKENIZER] Failed to load {MODEL}. Falling back to nltk: {e}")
-    tokenizer = None
+_tokenizer = None
+_tokenizer_tried = False
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer():
+    """
+    Loads the HuggingFace tokenizer on first use; None means the NLTK fallback.
+    """
+    global _tokenizer, _tokenizer_tried
+    if not _tokenizer_tried:
+        with _tokenizer_lock:
+            if not _tokenizer_tried:
+                try:
+                    from transformers import AutoTokenizer
+
+                    _tokenizer = AutoTokenizer.from_pretrained(MODEL)
+                    logger.success(f"[TOKENIZER] Loaded: {MODEL}")
+                except Exception as e:
+                    logger.warning(f"[TOKENIZER] Failed to load {MODEL}. Falling back to nltk: {e}")
+                    _tokenizer = None
+                _tokenizer_tried = True
+    return _tokenizer
 
 
 def clean_text(text):
@@ -49,6 +66,7 @@ def tokenize(text):
     Traces vector metadata for training and memory indexing.
     """
     text = clean_text(text)
+    tokenizer = get_tokenizer()
 
     if tokenizer:
         tokens = tokenizer.tokenize(text)
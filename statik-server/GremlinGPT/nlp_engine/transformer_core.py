@@ -10,62 +10,132 @@
 # GremlinGPT v1.0.3 :: Module Integrity Directive
 # This script is a component of the GremlinGPT system, under Alpha expansion.
 
-from transformers import AutoModel, AutoTokenizer
-import torch
+import threading
 import numpy as np
 from backend.globals import CFG, logger
+from nlp_engine.embedding_cache import get_embedding_cache
+from nlp_engine.batching import MicroBatcher, encode_bucketed
+from nlp_engine.encoder_registry import bind_encoder, find_encoder, load_model
 
 # ─────────────────────────────────────────────
 # Config Load
 MODEL_NAME = CFG["nlp"].get("transformer_model", "bert-base-uncased")
-EMBEDDING_DIM = CFG["nlp"].get("embedding_dim", 384)
-DEVICE = CFG["nlp"].get("device", "auto")
-
-if DEVICE == "auto":
-    DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+ENCODER = find_encoder("transformers", MODEL_NAME)
+EMBEDDING_DIM = ENCODER.dimension if ENCODER else CFG["nlp"].get("embedding_dim", 384)
+DEVICE = CFG["nlp"].get("device", "auto")  # "auto" is resolved when the model loads
+MODEL_ID = f"transformers:{MODEL_NAME}:mean"  # embedding cache namespace
+BATCH_SIZE = CFG["nlp"].get("encode_batch_size", 32)
+MICRO_BATCH_WAIT_MS = CFG["nlp"].get("micro_batch_wait_ms", 5)
 
 # ─────────────────────────────────────────────
-# Model Bootstrap
-try:
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModel.from_pretrained(MODEL_NAME).to(DEVICE)
-    model.eval()
-    logger.success(f"[TRANSFORMER] Loaded model: {MODEL_NAME} on {DEVICE}")
-except Exception as e:
-    logger.error(f"[TRANSFORMER] Failed to load model '{MODEL_NAME}': {e}")
-    tokenizer = None
-    model = None
+# Model Bootstrap (on first use, so importing this module stays cheap)
+tokenizer = None
+model = None
+_load_failed = False
+_load_lock = threading.Lock()
+
+
+def load():
+    """
+    Loads torch, the tokenizer and the model on the first call.
+    Returns True when the model is available.
+    """
+    global tokenizer, model, DEVICE, _load_failed
+    if model is None and not _load_failed:
+        with _load_lock:
+            if model is None and not _load_failed:
+                try:
+                    import torch
+
+                    if DEVICE == "auto":
+                        DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+                    # Shared through the encoder registry: one copy per process
+                    tokenizer, model = load_model("transformers", MODEL_NAME, DEVICE)
+                    logger.success(f"[TRANSFORMER] Loaded model: {MODEL_NAME} on {DEVICE}")
+                except Exception as e:
+                    logger.error(f"[TRANSFORMER] Failed to load model '{MODEL_NAME}': {e}")
+                    _load_failed = True
+    return model is not None
 
 
 # ─────────────────────────────────────────────
+def _encode_batch_uncached(texts):
+    """One forward pass; inputs are padded only to the longest text in the batch."""
+    import torch
+
+    inputs = tokenizer(
+        list(texts),
+        return_tensors="pt",
+        truncation=True,
+        padding="longest",
+        max_length=512,
+    )
+    # Move inputs to same device as model
+    inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
+    with torch.no_grad():
+        outputs = model(**inputs)
+
+    # Mean over real tokens only, so a text's vector does not depend on its batch-mates
+    hidden = outputs.last_hidden_state
+    mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+    pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+    return list(pooled.cpu().numpy().astype(np.float32))
+
+
+def _encode_and_cache(texts):
+    vectors = encode_bucketed(texts, _encode_batch_uncached, BATCH_SIZE)
+    get_embedding_cache().put_many(MODEL_ID, texts, vectors)
+    return vectors
+
+
+_batcher = MicroBatcher(_encode_and_cache, max_batch=BATCH_SIZE, max_wait_ms=MICRO_BATCH_WAIT_MS,
+                        name="transformer") if MICRO_BATCH_WAIT_MS > 0 else None
+
+
 def encode(text):
     """
     Encodes input text using the configured transformer model.
-    Returns a float32 numpy vector.
+    Returns a float32 numpy vector; repeated texts come from the embedding cache,
+    and concurrent callers share a micro-batch.
     """
-    if not tokenizer or not model:
-        logger.warning("[TRANSFORMER] Model not initialized. Returning zeros.")
+    try:
+        vector = get_embedding_cache().get(MODEL_ID, text)
+        if vector is None:
+            if not load():
+                logger.warning("[TRANSFORMER] Model not initialized. Returning zeros.")
+                return np.zeros(EMBEDDING_DIM, dtype=np.float32)
+            vector = _batcher.encode(text) if _batcher else _encode_and_cache([text])[0]
+        return vector
+    except Exception as e:
+        logger.error(f"[TRANSFORMER] Encoding failed: {e}")
         return np.zeros(EMBEDDING_DIM, dtype=np.float32)
 
+
+def encode_many(texts, batch_size=None):
+    """
+    Encodes a list of texts in length-bucketed, dynamically padded batches.
+    Returns a (len(texts), dim) float32 matrix in input order.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+    if not load():
+        logger.warning("[TRANSFORMER] Model not initialized. Returning zeros.")
+        return np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+
     try:
-        inputs = tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            padding=True,
-            max_length=512,
+        vectors = get_embedding_cache().get_many(
+            MODEL_ID, texts,
+            lambda missing: encode_bucketed(missing, _encode_batch_uncached, batch_size or BATCH_SIZE),
         )
-        # Move inputs to same device as model
-        inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
-        with torch.no_grad():
-            outputs = model(**inputs)
+        return np.vstack(vectors)
+    except Exception as e:
+        logger.error(f"[TRANSFORMER] Batch encoding of {len(texts)} texts failed: {e}")
+        return np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
 
-        vector = outputs.last_hidden_state.mean(dim=1).squeeze()
-        return vector.cpu().numpy().astype(np.float32)
 
-    except Exception as e:
-        logger.error(f"[TRANSFORMER] Encoding failed: {e}")
-        return np.zeros(EMBEDDING_DIM, dtype=np.float32)
+if ENCODER:
+    bind_encoder(ENCODER.id, encode_many)
 
 
 # ─────────────────────────────────────────────
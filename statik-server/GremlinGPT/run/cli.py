@@ -27,6 +27,7 @@ from utils.logging_config import setup_module_logger
 logger = setup_module_logger("run", "cli")
 from backend.api.chat_handler import chat
 from nlp_engine.chat_session import ChatSession
+from utils.warmup import start_warmup
 
 # --- Ensure NLTK Paths and Resources (centralized) ---
 NLTK_DATA_DIR = setup_nltk_data()
@@ -45,6 +46,7 @@ MODE_SESSION = "session"
 
 
 def main():
+    start_warmup()
     print(BANNER)
     mode = MODE_NLP
     session = ChatSession(user_id="cli_user")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: Import-Time Profile
+
+"""
+Cold-start import cost of GremlinGPT entry points.
+
+Imports each target in a fresh interpreter under `python -X importtime`,
+then reports the total import time, the wall time of the process and the
+slowest imports by cumulative time. Exits 1 when a target fails to import
+or its import time is over budget ([system] import_budget_sec in
+config/config.toml, or --budget).
+
+Usage:
+    python run/import_profile.py
+    python run/import_profile.py run.cli backend.server --top 15 --budget 3
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_TARGETS = ("run.cli", "backend.server")
+DEFAULT_BUDGET = 4.0
+
+
+def parse_importtime(stderr):
+    """
+    [(module, self_seconds, cumulative_seconds, depth)] from -X importtime
+    output, in the order the interpreter printed them.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header row
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(parts[0]) / 1e6, int(parts[1]) / 1e6, depth))
+    return rows
+
+
+def profile(target, python=sys.executable):
+    """Import `target` in a fresh interpreter; returns (rows, wall_seconds, error)."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [BASE_DIR, os.environ.get("PYTHONPATH")])))
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    error = None
+    if proc.returncode != 0:
+        lines = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        error = lines[-1] if lines else f"exit status {proc.returncode}"
+    return parse_importtime(proc.stderr), wall, error
+
+
+def configured_budget():
+    try:
+        sys.path.insert(0, BASE_DIR)
+        from backend.globals import CFG
+
+        return float(CFG.get("system", {}).get("import_budget_sec", DEFAULT_BUDGET))
+    except Exception:
+        return DEFAULT_BUDGET
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile import time of GremlinGPT entry points")
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS))
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per target")
+    parser.add_argument("--budget", type=float, help="Seconds allowed per target (default: config)")
+    args = parser.parse_args(argv)
+
+    budget = args.budget if args.budget is not None else configured_budget()
+    failed = False
+    for target in args.targets:
+        rows, wall, error = profile(target)
+        total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+        over = error is not None or total > budget
+        failed = failed or over
+        status = "FAILED" if error else ("OVER BUDGET" if over else "ok")
+        print(f"{target}: imports {total:.2f}s, process {wall:.2f}s, budget {budget:.2f}s [{status}]")
+        if error:
+            print(f"  error: {error}")
+        for name, _, cumulative, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+            print(f"  {cumulative:8.3f}s  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
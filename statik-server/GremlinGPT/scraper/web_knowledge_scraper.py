@@ -23,7 +23,7 @@ from utils.logging_config import get_module_logger
 logger = get_module_logger("scraper")
 
 from scraper.dom_navigator import extract_dom_structure
-from memory.vector_store.embedder import embed_text, package_embedding, inject_watermark
+from memory.vector_store.embedder import embed_many, package_embedding, inject_watermark
 from memory.log_history import log_event
 
 WATERMARK = "source:GremlinGPT"
@@ -55,6 +55,7 @@ async def scrape_web_knowledge(urls):
         tasks = [fetch_html(session, url) for url in urls]
         pages = await asyncio.gather(*tasks)
 
+    fetched = []
     for url, html in zip(urls, pages):
         if not html:
             continue
@@ -67,10 +68,13 @@ async def scrape_web_knowledge(urls):
             structure["text"] = fallback_text
             logger.warning(f"[{ORIGIN}] Fallback parsing used for {url}")
 
-        domain = urlparse(url).netloc.replace("www.", "")
-        summary = f"[{url}]\n{structure['text']}"
-        vector = embed_text(summary)
+        fetched.append((url, structure, f"[{url}]\n{structure['text']}"))
+
+    # One batched encode for every page instead of one model call per page
+    vectors = embed_many([summary for _, _, summary in fetched])
 
+    for (url, structure, summary), vector in zip(fetched, vectors):
+        domain = urlparse(url).netloc.replace("www.", "")
         metadata = {
             "origin": ORIGIN,
             "timestamp": timestamp,
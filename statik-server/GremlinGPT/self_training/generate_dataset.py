@@ -25,7 +25,7 @@ from agent_core.task_queue import enqueue_task
 from self_training.feedback_loop import inject_feedback
 from nlp_engine.tokenizer import tokenize
 from memory.vector_store.embedder import (
-    embed_text, package_embedding, inject_watermark
+    embed_many, package_embedding, inject_watermark
 )
 from memory.log_history import log_event
 
@@ -115,8 +115,8 @@ def generate_datasets(root_dir=ROOT_DIR, output_file=OUTPUT_FILE, min_len=15, ma
         log_event("dataset", "generated", {"count": len(entries), "output": output_file}, status="success")
         print(f"[DATASET] Extracted {len(entries)} entries → {output_file}")
         # Embed and store in vector memory
-        for entry in entries:
-            vector = embed_text(entry["input"])
+        vectors = embed_many([entry["input"] for entry in entries])
+        for entry, vector in zip(entries, vectors):
             package_embedding(
                 text=entry["input"],
                 vector=vector,
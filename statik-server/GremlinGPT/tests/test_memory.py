@@ -38,3 +38,160 @@ def test_embedding_store():
 
     embed = package_embedding(text, vec, {"test_case": True})
     assert "embedding" in embed and "meta" in embed
+
+
+def test_search_index_filters():
+    import numpy as np
+    from memory.vector_store.search_index import SearchIndex
+
+    index = SearchIndex(4)
+    index.add("a", np.array([1, 0, 0, 0]), mem_type="note", source="chat", created="2025-01-01T00:00:00+00:00")
+    index.add("b", np.array([0.9, 0.1, 0, 0]), mem_type="trade", source="signals", created="2025-02-01T00:00:00+00:00")
+    index.add("c", np.array([0, 1, 0, 0]), mem_type="note", source="chat", created="2025-03-01T00:00:00+00:00")
+
+    query = np.array([1, 0, 0, 0])
+    assert [emb_id for emb_id, _ in index.search(query, top_k=2)] == ["a", "b"]
+    assert [emb_id for emb_id, _ in index.search(query, top_k=3, threshold=0.5)] == ["a", "b"]
+    assert [emb_id for emb_id, _ in index.search(query, filters={"type": "trade"})] == ["b"]
+    assert [emb_id for emb_id, _ in index.search(query, filters={"source": ["chat"], "since": "2025-02-15"})] == ["c"]
+
+
+def test_search_index_reads_store_vectors(tmp_path):
+    import numpy as np
+    from memory.vector_store.memory_store import MemoryStore
+    from memory.vector_store.search_index import SearchIndex
+
+    store = MemoryStore(str(tmp_path), segment_rows=4)  # rows span several segments
+    vectors = np.random.default_rng(0).standard_normal((10, 8)).astype("float32")
+    store.add_many([{"id": str(i), "text": "", "embedding": v.tolist(), "meta": {}} for i, v in enumerate(vectors)])
+
+    def synced(index):
+        ids, types, sources, created = store.columns(8)
+        index.add_batch(ids, None, types, sources, created)
+        return index
+
+    index = synced(SearchIndex(8, source=store.segments(8)))
+    assert index._vectors.size == 0  # scored from the memory-mapped store, not a copy
+    assert [emb_id for emb_id, _ in index.search(vectors[3], top_k=1)] == ["3"]
+    assert abs(index.search(vectors[3] * 2, top_k=1)[0][1] - 1.0) < 1e-5
+
+    path = str(tmp_path / "index.faiss")
+    index.save(path)
+    restored = SearchIndex(8, source=store.segments(8))
+    assert restored.load(path, max_rows=store.count(8)) == 10
+    assert synced(restored).search(vectors[7], top_k=2) == index.search(vectors[7], top_k=2)
+    assert SearchIndex(8).load(path, max_rows=5) == 0  # saved for more rows than the store holds
+    store.close()
+
+
+def test_write_buffer_batches_and_replays(tmp_path):
+    from memory.vector_store.write_buffer import WriteBuffer
+
+    flushed, checkpoints = [], []
+    wal = str(tmp_path / "index.wal")
+    buffer = WriteBuffer(wal, flushed.append, lambda: checkpoints.append(len(flushed)),
+                         batch_size=2, checkpoint_every=100, fsync=False)
+    for i in range(3):
+        buffer.append({"id": str(i)})
+    assert [[r["id"] for r in batch] for batch in flushed] == [["0", "1"]]
+    assert buffer.pending == 1
+
+    # Nothing checkpointed yet: a restart replays every logged record
+    assert [r["id"] for r in WriteBuffer(wal, None).replay()] == ["0", "1", "2"]
+
+    assert buffer.checkpoint()
+    assert [[r["id"] for r in batch] for batch in flushed] == [["0", "1"], ["2"]]
+    assert checkpoints == [2]
+    assert WriteBuffer(wal, None).replay() == []
+    buffer.close()
+
+
+def test_write_buffer_keeps_failed_batches(tmp_path):
+    from memory.vector_store.write_buffer import WriteBuffer
+
+    stored, failures = [], [2]
+
+    def flush(batch):
+        if failures[0]:
+            failures[0] -= 1
+            raise RuntimeError("index unavailable")
+        stored.extend(r["id"] for r in batch)
+
+    wal = str(tmp_path / "index.wal")
+    buffer = WriteBuffer(wal, flush, batch_size=2, checkpoint_every=100, fsync=False)
+    buffer.append({"id": "a"})
+    buffer.append({"id": "b"})    # flush fails; a and b are requeued
+    assert buffer.pending == 2
+    assert not buffer.checkpoint()  # flush fails again; the WAL is kept
+    assert [r["id"] for r in WriteBuffer(wal, None).replay()] == ["a", "b"]
+
+    buffer.append({"id": "c"})
+    buffer.append({"id": "d"})
+    assert buffer.checkpoint()
+    assert stored == ["a", "b", "c", "d"]
+    assert WriteBuffer(wal, None).replay() == []
+    buffer.close()
+
+
+def test_write_buffer_keeps_wal_when_checkpoint_fn_fails(tmp_path):
+    from memory.vector_store.write_buffer import WriteBuffer
+
+    stored, synced, failures = [], [], [1]
+
+    def checkpoint():
+        if failures[0]:
+            failures[0] -= 1
+            raise OSError("disk full")
+        synced.extend(stored)
+
+    wal = str(tmp_path / "index.wal")
+    buffer = WriteBuffer(wal, lambda batch: stored.extend(r["id"] for r in batch), checkpoint,
+                         batch_size=10, checkpoint_every=100, fsync=False)
+    buffer.append({"id": "a"})
+    assert not buffer.checkpoint()  # flushed, but not durable: the WAL must stay
+    assert stored == ["a"] and synced == []
+    assert [r["id"] for r in WriteBuffer(wal, None).replay()] == ["a"]
+
+    assert buffer.checkpoint()
+    assert synced == ["a"]
+    assert WriteBuffer(wal, None).replay() == []
+    buffer.close()
+
+
+def test_memory_store_round_trip(tmp_path):
+    from memory.vector_store.memory_store import MemoryStore
+
+    store = MemoryStore(str(tmp_path))
+    records = [
+        {"id": "a", "text": "first", "embedding": [1.0, 0.0, 0.0], "meta": {"type": "note"}, "source": "chat"},
+        {"id": "b", "text": "wide", "embedding": [0.5] * 5, "meta": {}, "tags": ["legacy"]},
+        {"id": "c", "text": "second", "embedding": [0.0, 1.0, 0.0], "meta": {}},
+    ]
+    assert store.add_many(records) == [(3, 0), (5, 0), (3, 1)]
+    assert store.add_many(records[:1]) == [(3, 0)]  # already stored: not written again
+    store.close()
+
+    store = MemoryStore(str(tmp_path))
+    assert store.count() == 3 and store.count(3) == 2
+    assert store.vectors(3).tolist() == [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+    assert store.get("b")["tags"] == ["legacy"]
+    assert store.get_slot(3, 1)["text"] == "second"
+    assert store.columns(3) == [["a", "c"], ["note", None], ["chat", None], [None, None]]
+    store.close()
+
+
+def test_memory_store_sync_checkpoints_sqlite_wal(tmp_path):
+    import shutil
+    import sqlite3
+    from memory.vector_store.memory_store import MemoryStore
+
+    store = MemoryStore(str(tmp_path / "store"))
+    store.add_many([{"id": "a", "text": "first", "embedding": [1.0, 0.0], "meta": {}}])
+    store.sync()
+
+    # Everything is in the main database file now, not only in its -wal
+    shutil.copy(store.db_path, tmp_path / "copy.db")
+    db = sqlite3.connect(str(tmp_path / "copy.db"))
+    assert db.execute("SELECT uuid FROM memories").fetchall() == [("a",)]
+    db.close()
+    store.close()
@@ -185,6 +185,116 @@ def test_nlp_pipeline():
     logger.info("NLP pipeline integration test passed")
 
 
+def test_embedding_cache():
+    """Test the content-hash embedding cache tiers and counters"""
+    import tempfile
+    from nlp_engine.embedding_cache import EmbeddingCache
+
+    calls = []
+
+    def compute_many(texts):
+        calls.append(list(texts))
+        return [np.full(4, len(t), dtype=np.float32) for t in texts]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        disk_path = os.path.join(tmp, "cache.db")
+        cache = EmbeddingCache(max_entries=2, disk_path=disk_path)
+        vectors = cache.get_many("m", ["alpha", " alpha ", "beta"], compute_many)
+        assert calls == [["alpha", "beta"]]  # whitespace-only variants share one encode
+        assert [float(v[0]) for v in vectors] == [5.0, 5.0, 4.0]
+
+        vectors[0][0] = -1.0  # callers get private copies
+        assert float(cache.get("m", "alpha")[0]) == 5.0
+        assert cache.get("other-model", "alpha") is None
+
+        cache.put("m", "gamma", np.zeros(4))  # evicts the LRU entry from memory only
+        assert EmbeddingCache(disk_path=disk_path).get("m", "beta") is not None
+        assert cache.info()["evictions"] == 1
+    logger.info("Embedding cache test passed")
+
+
+def test_batched_encoding_helpers():
+    """Test length bucketing and micro-batching of concurrent encode calls"""
+    import threading
+    from nlp_engine.batching import MicroBatcher, encode_bucketed, length_buckets
+
+    texts = ["a" * n for n in (5, 1, 4, 2, 3)]
+    assert length_buckets(texts, 2) == [[1, 3], [4, 2], [0]]
+    assert encode_bucketed(texts, lambda batch: [len(t) for t in batch], 2) == [5, 1, 4, 2, 3]
+
+    batches = []
+
+    def encode_many(batch):
+        batches.append(len(batch))
+        return [len(t) for t in batch]
+
+    batcher = MicroBatcher(encode_many, max_batch=8, max_wait_ms=200)
+    results = [None] * 8
+    workers = [threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.encode("x" * i)))
+               for i in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert results == list(range(8))
+    assert len(batches) < 8 and sum(batches) == 8
+    logger.info("Batched encoding helpers test passed")
+
+
+def test_encoder_registry():
+    """Test encoder normalisation, vector conforming and shared model copies"""
+    from nlp_engine import encoder_registry
+    from nlp_engine.encoder_registry import EncoderSpec, conform_vector, get_encoder, load_model
+
+    small = EncoderSpec("small", "fake", "fake-model", 4, normalize=True)
+    vec, how = conform_vector([3.0, 4.0, 0.0, 0.0], small)
+    assert how == "native" and np.allclose(vec, [0.6, 0.8, 0.0, 0.0])
+
+    try:
+        conform_vector(np.ones(3), small, "text")  # unbound encoder cannot re-encode
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    small._encode_many = lambda texts: [np.full(4, 2.0) for _ in texts]
+    vec, how = conform_vector(np.ones(3), small, "text")
+    assert how == "reencoded" and np.allclose(vec, 0.5)
+
+    # A learned projection takes 768-d BERT vectors into MiniLM space
+    minilm = get_encoder("minilm")
+    encoder_registry._projections["bert->minilm"] = np.eye(768, minilm.dimension, dtype=np.float32)
+    try:
+        vec, how = conform_vector(np.ones(768), minilm)
+        assert how == "projected:bert" and vec.shape == (minilm.dimension,)
+        assert abs(float(np.linalg.norm(vec)) - 1.0) < 1e-5
+    finally:
+        encoder_registry._projections.pop("bert->minilm", None)
+
+    with patch.object(encoder_registry, "_load", side_effect=lambda *args: object()) as loader:
+        first = load_model("fake", "shared-model")
+        assert load_model("fake", "shared-model") is first
+        assert loader.call_count == 1
+    encoder_registry._models.pop(("fake", "shared-model"), None)
+    logger.info("Encoder registry test passed")
+
+
+def test_lazy_startup_helpers():
+    """Test warm-up step reporting and -X importtime parsing"""
+    from utils.warmup import warm_up
+    from run.import_profile import parse_importtime
+
+    timings = warm_up((("gc", "gc", "collect"), ("missing", "utils.warmup", "no_such_loader")))
+    assert timings["gc"] is not None and timings["missing"] is None
+
+    rows = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   numpy.core\n"
+        "import time:       300 |        420 | numpy\n"
+        "unrelated stderr line\n"
+    )
+    assert rows == [("numpy.core", 0.00012, 0.00012, 1), ("numpy", 0.0003, 0.00042, 0)]
+    logger.info("Lazy startup helpers test passed")
+
+
 if __name__ == "__main__":
     # Run tests directly if pytest is not available
     if not HAS_PYTEST:
@@ -193,6 +303,10 @@ if __name__ == "__main__":
         test_pos_tagger()
         test_encode_and_diff()
         test_semantic_similarity()
+        test_embedding_cache()
+        test_batched_encoding_helpers()
+        test_encoder_registry()
+        test_lazy_startup_helpers()
         test_text_parsing()
         test_text_quality_validation()
         test_nlp_pipeline()
@@ -216,12 +216,12 @@ class TestWebKnowledgeScraper:
     @pytest.mark.asyncio
     @patch('scraper.web_knowledge_scraper.package_embedding')
     @patch('scraper.web_knowledge_scraper.inject_watermark')
-    @patch('scraper.web_knowledge_scraper.embed_text')
+    @patch('scraper.web_knowledge_scraper.embed_many')
     @patch('scraper.web_knowledge_scraper.log_event')
     async def test_scrape_web_knowledge(self, mock_log, mock_embed, mock_inject, mock_package):
         """Test web knowledge scraping with mocked embedding."""
-        # Mock the embedding functions
-        mock_embed.return_value = [0.1, 0.2, 0.3] * 100  # Mock vector
+        # Mock the embedding functions: one mock vector per page
+        mock_embed.side_effect = lambda texts: [[0.1, 0.2, 0.3] * 100 for _ in texts]
         
         test_urls = ["https://httpbin.org/html"]
         
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+# ─────────────────────────────────────────────────────────────
+# ⚠️ GremlinGPT Fair Use Only | Commercial Use Requires License
+# Built under the GremlinGPT Dual License v1.0
+# © 2025 StatikFintechLLC / AscendAI Project
+# Contact: ascend.gremlin@gmail.com
+# ─────────────────────────────────────────────────────────────
+
+# GremlinGPT v1.0.3 :: utils/warmup.py :: Module Integrity Directive
+# Optional background warm-up of lazily loaded models and the memory store.
+# This script is a component of the GremlinGPT system, under Alpha expansion.
+
+"""
+Models and the memory store load on first use, so importing GremlinGPT is
+cheap. Entry points call `start_warmup()` to pay that cost in a daemon thread
+while the CLI or server comes up instead of on the first request.
+Enabled with `warmup = true` under [nlp] in config/config.toml.
+
+semantic_score shares the memory encoder through the encoder registry, so
+warming the embedder warms it too.
+"""
+
+import importlib
+import threading
+import time
+
+from utils.logging_config import setup_module_logger
+
+# Initialize module-specific logger
+logger = setup_module_logger("utils", "warmup")
+
+# (label, module, zero-argument loader), run in order
+WARMUP_STEPS = (
+    ("memory store", "memory.vector_store.embedder", "ensure_ready"),
+    ("memory encoder", "memory.vector_store.embedder", "get_model"),
+    ("tokenizer", "nlp_engine.tokenizer", "get_tokenizer"),
+    ("spacy", "nlp_engine.parser", "get_nlp"),
+    ("transformer", "nlp_engine.transformer_core", "load"),
+)
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def warm_up(steps=WARMUP_STEPS):
+    """
+    Run each loader once; returns {label: seconds}, or None for a failed step.
+    """
+    timings = {}
+    for label, module_name, loader in steps:
+        started = time.perf_counter()
+        try:
+            getattr(importlib.import_module(module_name), loader)()
+            timings[label] = round(time.perf_counter() - started, 3)
+            logger.info(f"[WARMUP] {label} ready in {timings[label]:.2f}s")
+        except Exception as e:
+            timings[label] = None
+            logger.warning(f"[WARMUP] {label} failed: {e}")
+    return timings
+
+
+def start_warmup(force=False):
+    """
+    Start `warm_up()` in a daemon thread when [nlp] warmup is enabled (or
+    `force`). Returns the thread, or None when warm-up is disabled.
+    """
+    global _thread
+    if not force:
+        try:
+            from backend.globals import CFG
+
+            enabled = CFG.get("nlp", {}).get("warmup", False)
+        except Exception as e:
+            logger.warning(f"[WARMUP] Config unavailable; skipping warm-up: {e}")
+            enabled = False
+        if not enabled:
+            return None
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm_up, name="gremlin-warmup", daemon=True)
+            _thread.start()
+    return _thread